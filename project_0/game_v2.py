@@ -1,6 +1,9 @@
 """Игра угадай число.
 Компьютер сам загадывает и угадывает число
 """
+from concurrent.futures import ProcessPoolExecutor
+import math
+
 import numpy as np
 
 def game_core_v2(number: int = 1) -> int:
@@ -33,17 +36,18 @@ def game_core_v2(number: int = 1) -> int:
 
     return count
 
-def score_game(random_predict) -> int:
+def score_game(random_predict, seed: int = 1) -> int:
     """За какое количество попыток в среднем за 10000 подходов угадывает наш алгоритм
 
     Args:
         random_predict ([type]): функция угадывания
+        seed (int, optional): Сид для воспроизводимости. Defaults to 1.
 
     Returns:
         int: среднее количество попыток
     """
     count_ls = []
-    np.random.seed(1)  # фиксируем сид для воспроизводимости
+    np.random.seed(seed)  # фиксируем сид для воспроизводимости
     random_array = np.random.randint(1, 101, size=(10000))  # загадали список чисел
 
     for number in random_array:
@@ -54,6 +58,189 @@ def score_game(random_predict) -> int:
     
     return(score)
     
+def play_batch(numbers: np.ndarray, predict: np.ndarray, step, max_attempts: int = 10_000) -> np.ndarray:
+    """Играет сразу во все игры: на каждом шаге одна векторная операция продвигает
+    только еще не угаданные числа, угаданные исключаются из дальнейших шагов.
+
+    Args:
+        numbers (np.ndarray): Загаданные числа.
+        predict (np.ndarray): Первые попытки (по одной на каждое число).
+        step (callable): Функция step(predict, numbers, index), возвращающая следующие попытки
+            для игр с номерами index; predict и numbers передаются уже для этих игр.
+            Номера позволяют стратегии хранить собственное состояние каждой игры.
+        max_attempts (int, optional): Предел числа попыток (защита от зацикливания). Defaults to 10_000.
+
+    Returns:
+        np.ndarray: Число попыток в каждой игре.
+    """
+    numbers = np.asarray(numbers)
+    predict = np.array(np.broadcast_to(predict, numbers.shape))
+    count = np.ones(numbers.shape, dtype=np.int64)
+    index = np.flatnonzero(predict != numbers)
+    attempts = 1
+    while index.size:
+        if attempts >= max_attempts:
+            raise RuntimeError(f"Стратегия не угадала {index.size} чисел за {max_attempts} попыток")
+        predict[index] = step(predict[index], numbers[index], index)
+        count[index] += 1
+        attempts += 1
+        index = index[predict[index] != numbers[index]]
+    return count
+
+
+def game_core_v2_batch(numbers: np.ndarray, low: int = 1, high: int = 100) -> np.ndarray:
+    """Векторная версия game_core_v2: те же шаги на 1 или на 10 для всех чисел сразу.
+
+    Args:
+        numbers (np.ndarray): Загаданные числа.
+        low (int, optional): Наименьшая первая попытка. Defaults to 1.
+        high (int, optional): Наибольшая первая попытка. Defaults to 100.
+
+    Returns:
+        np.ndarray: Число попыток для каждого числа
+    """
+    def step(predict, numbers, index):
+        difference = numbers - predict
+        return predict + np.where(np.abs(difference) >= 10, 10, 1) * np.sign(difference)
+
+    numbers = np.asarray(numbers)
+    return play_batch(numbers, np.random.randint(low, high + 1, size=numbers.shape), step)
+
+
+def summarize(histogram: np.ndarray) -> dict:
+    """Распределение числа попыток по гистограмме.
+
+    Гистограммы отдельных частей выборки складываются, поэтому итог
+    не требует хранения числа попыток каждой игры.
+
+    Args:
+        histogram (np.ndarray): histogram[k] - количество игр, угаданных за k попыток.
+
+    Returns:
+        dict: Количество игр, среднее, стандартное отклонение, минимум, перцентили 50/90/99,
+            максимум и сама гистограмма.
+    """
+    histogram = np.asarray(histogram, dtype=np.int64)
+    games = int(histogram.sum())
+    if games == 0:
+        raise ValueError("Пустая выборка")
+    attempts = np.arange(len(histogram))
+    mean = float(attempts @ histogram / games)
+    variance = float(((attempts - mean) ** 2) @ histogram / games)
+    cumulative = np.cumsum(histogram)
+    nonzero = np.flatnonzero(histogram)
+
+    def percentile(q):
+        # Наименьшее число попыток, за которое угадана доля q игр
+        return int(np.searchsorted(cumulative, np.ceil(games * q / 100), side='left'))
+
+    return {'games': games, 'mean': mean, 'std': variance ** 0.5, 'min': int(nonzero[0]),
+            'p50': percentile(50), 'p90': percentile(90), 'p99': percentile(99), 'max': int(nonzero[-1]),
+            'histogram': histogram[:nonzero[-1] + 1].tolist()}
+
+
+def score_game_batch(batch_predict, size: int = 10000, seed: int = 1, chunk: int = 1_000_000) -> dict:
+    """Распределение числа попыток векторной стратегии на size загаданных числах.
+
+    Числа генерируются и обрабатываются частями по chunk штук, поэтому память не
+    зависит от size. При size=10000 числа совпадают с числами score_game.
+
+    Args:
+        batch_predict ([type]): Векторная функция угадывания: массив чисел -> массив числа попыток
+        size (int, optional): Количество игр. Defaults to 10000.
+        seed (int, optional): Сид для воспроизводимости. Defaults to 1.
+        chunk (int, optional): Количество игр в одной части. Defaults to 1_000_000.
+
+    Returns:
+        dict: Распределение числа попыток (см. summarize)
+    """
+    np.random.seed(seed)  # фиксируем сид для воспроизводимости
+    histogram = np.zeros(0, dtype=np.int64)
+    for start in range(0, size, chunk):
+        random_array = np.random.randint(1, 101, size=min(chunk, size - start))  # загадали список чисел
+        histogram = merge_histograms(histogram, np.bincount(batch_predict(random_array)))
+
+    stats = summarize(histogram)
+    print(f"Ваш алгоритм угадывает число в среднем за: {stats['mean']:.2f} попытки "
+          f"(медиана {stats['p50']}, 99% за {stats['p99']}, максимум {stats['max']})")
+    return stats
+
+def merge_histograms(histogram: np.ndarray, other: np.ndarray) -> np.ndarray:
+    """Сложить две гистограммы числа попыток разной длины.
+
+    Args:
+        histogram (np.ndarray): Накопленная гистограмма.
+        other (np.ndarray): Гистограмма очередной части выборки.
+
+    Returns:
+        np.ndarray: Сумма гистограмм
+    """
+    if len(other) > len(histogram):
+        histogram = np.pad(histogram, (0, len(other) - len(histogram)))
+    histogram[:len(other)] += other
+    return histogram
+
+
+def _play_shard(task) -> np.ndarray:
+    """Сыграть одну часть выборки в рабочем процессе.
+
+    Args:
+        task (tuple): Функция угадывания, признак векторной функции, размер части
+            и SeedSequence части.
+
+    Returns:
+        np.ndarray: Гистограмма числа попыток части
+    """
+    predict, vectorized, size, seed_sequence = task
+    # Числа части и случайные попытки стратегии зависят только от SeedSequence части
+    np.random.seed(seed_sequence.generate_state(4))
+    random_array = np.random.randint(1, 101, size=size)  # загадали список чисел
+    if vectorized:
+        counts = predict(random_array)
+    else:
+        counts = np.fromiter((predict(number) for number in random_array), dtype=np.int64, count=size)
+    return np.bincount(counts)
+
+
+def score_game_parallel(predict, size: int = 10 ** 8, seed: int = 1, workers: int = None,
+                        shard: int = 1_000_000, vectorized: bool = True) -> dict:
+    """Распределение числа попыток на size играх, разделенных на части между процессами.
+
+    Каждая часть получает собственный сид из корневой SeedSequence(seed) по номеру части,
+    а размер части не зависит от количества процессов, поэтому результат одинаков
+    при любом workers. Процессы возвращают только гистограммы, которые складываются
+    по мере готовности: память не зависит от size.
+
+    Args:
+        predict ([type]): Функция угадывания уровня модуля (передается в процессы):
+            векторная (массив чисел -> массив числа попыток) или, при vectorized=False,
+            обычная, как game_core_v2
+        size (int, optional): Количество игр. Defaults to 10 ** 8.
+        seed (int, optional): Корневой сид. Defaults to 1.
+        workers (int, optional): Количество процессов (None - по числу ядер, 1 - без пула). Defaults to None.
+        shard (int, optional): Количество игр в одной части. Defaults to 1_000_000.
+        vectorized (bool, optional): Векторная ли функция угадывания. Defaults to True.
+
+    Returns:
+        dict: Распределение числа попыток (см. summarize)
+    """
+    shards = math.ceil(size / shard)
+    seeds = np.random.SeedSequence(seed).spawn(shards)
+    tasks = ((predict, vectorized, min(shard, size - i * shard), seeds[i]) for i in range(shards))
+    histogram = np.zeros(0, dtype=np.int64)
+    if workers == 1:
+        for task in tasks:
+            histogram = merge_histograms(histogram, _play_shard(task))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for part in executor.map(_play_shard, tasks):
+                histogram = merge_histograms(histogram, part)
+
+    stats = summarize(histogram)
+    print(f"Ваш алгоритм угадывает число в среднем за: {stats['mean']:.3f} попытки "
+          f"(игр {stats['games']}, медиана {stats['p50']}, 99% за {stats['p99']}, максимум {stats['max']})")
+    return stats
+
 ## score_game(game_core_v2)
 
 if __name__ == '__main__':
@@ -0,0 +1,120 @@
+import contextlib
+import io
+import unittest
+
+import numpy as np
+
+from game_v2 import (game_core_v2, game_core_v2_batch, merge_histograms, play_batch, score_game, score_game_batch,
+                     score_game_parallel, summarize)
+
+
+def quiet(function, *args, **kwargs):
+    """Вызвать функцию оценки без вывода результата в консоль"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*args, **kwargs)
+
+
+class TestPlayBatch(unittest.TestCase):
+    def test_counts_attempts(self):
+        numbers = np.array([5, 1, 3, 8])
+
+        # Шаг на 1 вверх от попытки 1: число n угадывается за n попыток
+        counts = play_batch(numbers, 1, lambda predict, numbers, index: predict + 1)
+
+        np.testing.assert_array_equal(counts, numbers)
+
+    def test_step_gets_only_unsolved_games(self):
+        seen = []
+
+        def step(predict, numbers, index):
+            seen.append(index.tolist())
+            return predict + 1
+
+        play_batch(np.array([1, 3, 2]), 1, step)
+
+        self.assertEqual(seen, [[1, 2], [1]])
+
+    def test_max_attempts(self):
+        with self.assertRaises(RuntimeError):
+            play_batch(np.array([5]), 1, lambda predict, numbers, index: predict, max_attempts=10)
+
+
+class TestSummarize(unittest.TestCase):
+    def test_percentiles(self):
+        counts = np.array([1] * 50 + [2] * 40 + [3] * 9 + [7])
+
+        stats = summarize(np.bincount(counts))
+
+        self.assertEqual(stats['games'], 100)
+        self.assertAlmostEqual(stats['mean'], counts.mean())
+        self.assertAlmostEqual(stats['std'], counts.std())
+        self.assertEqual((stats['min'], stats['p50'], stats['p90'], stats['p99'], stats['max']), (1, 1, 2, 3, 7))
+        self.assertEqual(stats['histogram'], [0, 50, 40, 9, 0, 0, 0, 1])
+
+    def test_percentiles_match_numpy(self):
+        counts = np.random.default_rng(1).integers(1, 30, size=1001)
+
+        stats = summarize(np.bincount(counts))
+
+        for q in (50, 90, 99):
+            self.assertEqual(stats[f'p{q}'], int(np.percentile(counts, q, method='inverted_cdf')))
+
+    def test_empty(self):
+        with self.assertRaises(ValueError):
+            summarize(np.zeros(3))
+
+    def test_merge_histograms(self):
+        first = np.array([2, 5, 1, 4, 4, 3])
+        second = np.array([9, 9, 1, 2])
+
+        merged = merge_histograms(np.bincount(first), np.bincount(second))
+        merged = merge_histograms(merged, np.bincount([1]))  # Более короткая гистограмма
+
+        np.testing.assert_array_equal(merged, np.bincount(np.concatenate([first, second, [1]])))
+        self.assertEqual(summarize(merged)['max'], 9)
+
+
+class TestGameCoreBatch(unittest.TestCase):
+    def test_matches_game_core_v2(self):
+        np.random.seed(1)
+        numbers = np.random.randint(1, 101, size=10000)
+        expected = [game_core_v2(number) for number in numbers]
+        np.random.seed(1)
+        numbers = np.random.randint(1, 101, size=10000)
+
+        # Первые попытки берутся из того же потока случайных чисел, поэтому игры совпадают
+        np.testing.assert_array_equal(game_core_v2_batch(numbers), expected)
+
+    def test_matches_score_game(self):
+        score = quiet(score_game, game_core_v2, seed=1)
+        stats = quiet(score_game_batch, game_core_v2_batch, seed=1)
+
+        self.assertEqual(int(stats['mean']), score)
+        self.assertEqual(stats['games'], 10000)
+
+
+class TestScoreGameParallel(unittest.TestCase):
+    def test_independent_of_workers(self):
+        single = quiet(score_game_parallel, game_core_v2_batch, size=25_000, seed=3, workers=1, shard=4_000)
+        pooled = quiet(score_game_parallel, game_core_v2_batch, size=25_000, seed=3, workers=2, shard=4_000)
+
+        self.assertEqual(single, pooled)
+        self.assertEqual(single['games'], 25_000)
+
+    def test_scalar_predict(self):
+        vectorized = quiet(score_game_parallel, game_core_v2_batch, size=3_000, seed=2, workers=1, shard=1_000)
+        scalar = quiet(score_game_parallel, game_core_v2, size=3_000, seed=2, workers=2, shard=1_000,
+                       vectorized=False)
+
+        # Обе функции получают одни и те же числа и первые попытки части
+        self.assertEqual(vectorized, scalar)
+
+    def test_seed_changes_result(self):
+        first = quiet(score_game_parallel, game_core_v2_batch, size=5_000, seed=1, workers=1)
+        second = quiet(score_game_parallel, game_core_v2_batch, size=5_000, seed=2, workers=1)
+
+        self.assertNotEqual(first['histogram'], second['histogram'])
+
+
+if __name__ == '__main__':
+    unittest.main()
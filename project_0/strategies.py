@@ -0,0 +1,256 @@
+"""Стратегии игры угадай число для произвольного диапазона и турнир стратегий.
+Стратегия получает только ответ «больше или меньше» и играет сразу во все игры (см. game_v2.play_batch)
+"""
+import argparse
+import time
+
+import numpy as np
+
+from game_v2 import game_core_v2_batch, play_batch, summarize
+
+# Наибольший диапазон, для которого оптимальное дерево решений строится точно (память и время O(n^2))
+OPTIMAL_LIMIT = 1000
+
+
+class Prior:
+    """Распределение загаданных чисел на [low, high]: low + floor(n * u ** power), u ~ U(0, 1).
+    power=1 - равномерное распределение, power > 1 - малые числа загадываются чаще.
+    """
+
+    def __init__(self, low: int = 1, high: int = 100, power: float = 1.0):
+        """
+        Args:
+            low (int, optional): Наименьшее загадываемое число. Defaults to 1.
+            high (int, optional): Наибольшее загадываемое число. Defaults to 100.
+            power (float, optional): Показатель степени распределения. Defaults to 1.0.
+        """
+        if high < low or power <= 0:
+            raise ValueError("Некорректный диапазон или показатель распределения")
+        self.low = int(low)
+        self.high = int(high)
+        self.power = float(power)
+
+    @property
+    def size(self) -> int:
+        """int: Количество чисел диапазона"""
+        return self.high - self.low + 1
+
+    @property
+    def uniform(self) -> bool:
+        """bool: Равномерное ли распределение"""
+        return self.power == 1.0
+
+    def sample(self, size: int, rng: np.random.Generator) -> np.ndarray:
+        """Загадать size чисел"""
+        numbers = self.low + np.floor(self.size * rng.random(size) ** self.power).astype(np.int64)
+        return np.minimum(numbers, self.high)
+
+    def cdf(self, x: np.ndarray) -> np.ndarray:
+        """Вероятность загадать число не больше x"""
+        x = np.clip(x, self.low - 1, self.high)
+        return ((x - self.low + 1) / self.size) ** (1 / self.power)
+
+    def ppf(self, p: np.ndarray) -> np.ndarray:
+        """Наименьшее число x, для которого cdf(x) >= p"""
+        x = np.ceil(self.low - 1 + self.size * np.asarray(p, dtype=float) ** self.power).astype(np.int64)
+        return np.clip(x, self.low, self.high)
+
+    def __repr__(self):
+        return f"{self.low}..{self.high}" + ("" if self.uniform else f" (power={self.power:g})")
+
+
+class Strategy:
+    """Стратегия угадывания: play() угадывает массив чисел и возвращает число попыток в каждой игре."""
+    name = 'strategy'
+    max_range = None  # Наибольший размер диапазона, для которого стратегия применима (None - любой)
+
+    def supports(self, prior: Prior) -> bool:
+        """Применима ли стратегия к распределению prior"""
+        return self.max_range is None or prior.size <= self.max_range
+
+    def play(self, numbers: np.ndarray, prior: Prior) -> np.ndarray:
+        """Угадать числа numbers, загаданные из распределения prior.
+
+        Returns:
+            np.ndarray: Число попыток в каждой игре
+        """
+        raise NotImplementedError
+
+
+class IntervalStrategy(Strategy):
+    """Стратегия, сужающая интервал возможных чисел [lo, hi] по ответу «больше или меньше».
+    Наследники задают только выбор попытки внутри интервала (guess).
+    """
+
+    def prepare(self, prior: Prior):
+        """Подготовить данные стратегии для распределения prior (передаются в guess)"""
+        return None
+
+    def guess(self, lo: np.ndarray, hi: np.ndarray, prior: Prior, context) -> np.ndarray:
+        """Попытки для интервалов [lo, hi]"""
+        raise NotImplementedError
+
+    def play(self, numbers: np.ndarray, prior: Prior) -> np.ndarray:
+        numbers = np.asarray(numbers, dtype=np.int64)
+        context = self.prepare(prior)
+        lo = np.full(numbers.shape, prior.low, dtype=np.int64)
+        hi = np.full(numbers.shape, prior.high, dtype=np.int64)
+
+        def step(predict, numbers, index):
+            greater = numbers > predict  # Единственная информация о загаданном числе
+            lo[index] = np.where(greater, predict + 1, lo[index])
+            hi[index] = np.where(greater, hi[index], predict - 1)
+            return self.guess(lo[index], hi[index], prior, context)
+
+        return play_batch(numbers, self.guess(lo, hi, prior, context), step)
+
+
+class BisectionStrategy(IntervalStrategy):
+    """Деление интервала пополам: не больше ceil(log2(n + 1)) попыток"""
+    name = 'bisection'
+
+    def guess(self, lo, hi, prior, context):
+        return lo + (hi - lo) // 2
+
+
+class InterpolationStrategy(IntervalStrategy):
+    """Деление интервала по медиане оставшейся вероятности: учитывает распределение загаданных чисел
+    (для равномерного распределения совпадает с делением пополам)
+    """
+    name = 'interpolation'
+
+    def guess(self, lo, hi, prior, context):
+        target = (prior.cdf(lo - 1) + prior.cdf(hi)) / 2
+        return np.clip(prior.ppf(target), lo, hi)
+
+
+class OptimalStrategy(IntervalStrategy):
+    """Дерево решений с наименьшим средним числом попыток.
+
+    Для равномерного распределения оптимально дерево, в котором каждый узел делит
+    интервал на равные части, то есть деление пополам (любой диапазон). Для других
+    распределений дерево строится динамическим программированием (оптимальное дерево
+    поиска Кнута), поэтому размер диапазона ограничен OPTIMAL_LIMIT.
+    """
+    name = 'optimal'
+
+    def supports(self, prior):
+        return prior.uniform or prior.size <= OPTIMAL_LIMIT
+
+    def prepare(self, prior):
+        if prior.uniform:
+            return None
+        if prior.size > OPTIMAL_LIMIT:
+            raise ValueError(f"Оптимальное дерево строится для диапазонов не больше {OPTIMAL_LIMIT} чисел")
+        return optimal_tree(np.diff(prior.cdf(np.arange(prior.low - 1, prior.high + 1))))
+
+    def guess(self, lo, hi, prior, context):
+        if context is None:
+            return lo + (hi - lo) // 2
+        return context[lo - prior.low, hi - prior.low + 1] + prior.low
+
+
+class GameV2Strategy(Strategy):
+    """game_core_v2: случайная первая попытка и шаги на 1 или на 10 (использует расстояние до числа)"""
+    name = 'game_core_v2'
+    max_range = 1000  # Число попыток растет линейно с диапазоном
+
+    def play(self, numbers, prior):
+        return game_core_v2_batch(numbers, prior.low, prior.high)
+
+
+def optimal_tree(weights: np.ndarray) -> np.ndarray:
+    """Корни оптимального дерева поиска по весам чисел (алгоритм Кнута, O(n^2)).
+
+    Args:
+        weights (np.ndarray): Вероятности чисел диапазона.
+
+    Returns:
+        np.ndarray: root[i, j] - номер числа, которое нужно назвать, если загаданное число
+            находится среди чисел с номерами i..j-1.
+    """
+    n = len(weights)
+    total = np.concatenate([[0.0], np.cumsum(weights)])
+    cost = np.zeros((n + 1, n + 1))
+    root = np.zeros((n + 1, n + 1), dtype=np.int64)
+    for i in range(n):
+        cost[i, i + 1] = weights[i]
+        root[i, i + 1] = i
+    for length in range(2, n + 1):
+        for i in range(n - length + 1):
+            j = i + length
+            # Корень оптимального дерева монотонен: root[i, j-1] <= root[i, j] <= root[i+1, j]
+            candidates = np.arange(root[i, j - 1], root[i + 1, j] + 1)
+            subtrees = cost[i, candidates] + cost[candidates + 1, j]
+            best = int(np.argmin(subtrees))
+            root[i, j] = candidates[best]
+            cost[i, j] = subtrees[best] + total[j] - total[i]
+    return root
+
+
+# Встроенные стратегии
+STRATEGIES = (BisectionStrategy(), InterpolationStrategy(), OptimalStrategy(), GameV2Strategy())
+
+
+def tournament(strategies=STRATEGIES, priors=(Prior(1, 100),), sizes=(10000,), seed: int = 1) -> list:
+    """Сравнить стратегии по числу попыток и времени работы.
+
+    Все стратегии угадывают одни и те же числа (для каждого распределения и размера выборки).
+
+    Args:
+        strategies (tuple, optional): Стратегии. Defaults to STRATEGIES.
+        priors (tuple, optional): Распределения загаданных чисел. Defaults to (Prior(1, 100),).
+        sizes (tuple, optional): Количества игр. Defaults to (10000,).
+        seed (int, optional): Сид для воспроизводимости. Defaults to 1.
+
+    Returns:
+        list: Строки результатов: стратегия, распределение, количество игр, распределение
+            числа попыток (см. summarize), время работы и время на одну игру.
+    """
+    results = []
+    for prior in priors:
+        for size in sizes:
+            numbers = prior.sample(size, np.random.default_rng(seed))
+            for strategy in strategies:
+                if not strategy.supports(prior):
+                    continue
+                np.random.seed(seed)  # случайные первые попытки game_core_v2
+                started = time.perf_counter()
+                counts = strategy.play(numbers, prior)
+                seconds = time.perf_counter() - started
+                stats = summarize(np.bincount(counts))
+                del stats['histogram']
+                results.append({'strategy': strategy.name, 'prior': repr(prior), 'games': size, **stats,
+                                'seconds': seconds, 'ns_per_game': seconds / size * 1e9})
+    return results
+
+
+def print_results(results: list):
+    """Вывести результаты турнира таблицей"""
+    print(f"{'стратегия':<15}{'диапазон':<28}{'игр':>10}{'среднее':>9}{'p99':>6}{'макс':>6}{'время, с':>10}"
+          f"{'нс/игра':>9}")
+    for row in results:
+        print(f"{row['strategy']:<15}{row['prior']:<28}{row['games']:>10}{row['mean']:>9.3f}{row['p99']:>6}"
+              f"{row['max']:>6}{row['seconds']:>10.3f}{row['ns_per_game']:>9.0f}")
+
+
+def parse_range(text: str) -> Prior:
+    """Распределение из строки low:high или low:high:power"""
+    parts = text.split(':')
+    if len(parts) not in (2, 3):
+        raise argparse.ArgumentTypeError(f"Ожидается low:high[:power], получено {text}")
+    return Prior(int(parts[0]), int(parts[1]), float(parts[2]) if len(parts) == 3 else 1.0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Турнир стратегий игры угадай число")
+    parser.add_argument('--ranges', nargs='+', type=parse_range, default=[Prior(1, 100), Prior(1, 10 ** 9)],
+                        help="Диапазоны low:high[:power] (power > 1 - малые числа загадываются чаще)")
+    parser.add_argument('--sizes', nargs='+', type=int, default=[10000], help="Количества игр")
+    parser.add_argument('--seed', type=int, default=1, help="Сид")
+    args = parser.parse_args(argv)
+    print_results(tournament(priors=args.ranges, sizes=args.sizes, seed=args.seed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+import itertools
+import math
+import unittest
+
+import numpy as np
+
+from strategies import (BisectionStrategy, InterpolationStrategy, OptimalStrategy, Prior, optimal_tree,
+                        tournament)
+
+
+def tree_cost(root: np.ndarray, weights: np.ndarray, i: int = 0, j: int = None, depth: int = 1) -> float:
+    """Среднее число попыток по дереву решений root на числах с номерами i..j-1"""
+    j = len(weights) if j is None else j
+    if i >= j:
+        return 0.0
+    r = root[i, j]
+    return (weights[r] * depth + tree_cost(root, weights, i, r, depth + 1)
+            + tree_cost(root, weights, r + 1, j, depth + 1))
+
+
+def brute_force_cost(weights: tuple, depth: int = 1) -> float:
+    """Наименьшее среднее число попыток перебором всех деревьев решений"""
+    if not weights:
+        return 0.0
+    return min(weights[r] * depth + brute_force_cost(weights[:r], depth + 1)
+               + brute_force_cost(weights[r + 1:], depth + 1) for r in range(len(weights)))
+
+
+class TestOptimalTree(unittest.TestCase):
+    def test_matches_brute_force(self):
+        rng = np.random.default_rng(1)
+        priors = [rng.dirichlet(np.full(n, 0.5)) for n in range(1, 8) for _ in range(5)]
+        priors += [np.diff(prior.cdf(np.arange(prior.low - 1, prior.high + 1)))
+                   for prior in (Prior(1, 7, power=3), Prior(10, 15, power=0.4))]
+        for weights in priors:
+            with self.subTest(weights=weights):
+                root = optimal_tree(weights)
+                self.assertAlmostEqual(tree_cost(root, weights), brute_force_cost(tuple(weights)))
+
+    def test_strategy_uses_tree(self):
+        prior = Prior(1, 7, power=3)
+        weights = np.diff(prior.cdf(np.arange(prior.low - 1, prior.high + 1)))
+        numbers = np.arange(prior.low, prior.high + 1)
+
+        counts = OptimalStrategy().play(numbers, prior)
+
+        self.assertAlmostEqual(float(counts @ weights), brute_force_cost(tuple(weights)))
+
+    def test_range_limit(self):
+        strategy = OptimalStrategy()
+
+        self.assertTrue(strategy.supports(Prior(1, 10 ** 9)))
+        self.assertFalse(strategy.supports(Prior(1, 10 ** 4, power=2)))
+        with self.assertRaises(ValueError):
+            strategy.play(np.array([1]), Prior(1, 10 ** 4, power=2))
+
+
+class TestBisection(unittest.TestCase):
+    def test_attempts_bound(self):
+        for n in itertools.chain(range(1, 130), (1000, 1023, 1024)):
+            with self.subTest(n=n):
+                prior = Prior(1, n)
+                counts = BisectionStrategy().play(np.arange(1, n + 1), prior)
+                self.assertEqual(counts.max(), math.ceil(math.log2(n + 1)))
+
+    def test_large_range(self):
+        prior = Prior(1, 10 ** 9)
+        numbers = np.concatenate([[1, 10 ** 9], prior.sample(10000, np.random.default_rng(1))])
+
+        counts = BisectionStrategy().play(numbers, prior)
+
+        self.assertLessEqual(counts.max(), 30)
+
+    def test_interpolation_guesses_inside_interval(self):
+        prior = Prior(1, 500, power=4)
+        numbers = np.arange(1, 501)
+
+        counts = InterpolationStrategy().play(numbers, prior)
+
+        self.assertLessEqual(counts.max(), prior.size)
+
+
+class TestTournament(unittest.TestCase):
+    def test_same_numbers(self):
+        results = tournament(priors=(Prior(1, 100),), sizes=(1000,))
+
+        means = {result['strategy']: result['mean'] for result in results}
+        # Для равномерного распределения оптимальное дерево - деление пополам
+        self.assertEqual(means['optimal'], means['bisection'])
+        self.assertGreater(means['game_core_v2'], means['bisection'])
+
+
+if __name__ == '__main__':
+    unittest.main()
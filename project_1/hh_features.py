@@ -0,0 +1,279 @@
+"""Признаки резюме HeadHunter из Project_1.ipynb.
+Те же преобразования, что и в ноутбуке, но векторными операциями pandas (.str, регулярные выражения)
+вместо построчного .apply. Признаки зависят от нескольких первых слов строки, поэтому строки разбираются
+один раз на каждое уникальное начало строки, а результат разносится по строкам по кодам factorize:
+обработка выгрузки занимает доли секунды и масштабируется на миллионы строк
+"""
+import numpy as np
+import pandas as pd
+
+# Города-миллионники (кроме Москвы и Санкт-Петербурга)
+MILLION_CITIES = ['Новосибирск', 'Екатеринбург', 'Нижний Новгород', 'Казань',
+                  'Челябинск', 'Омск', 'Самара', 'Ростов-на-Дону', 'Уфа',
+                  'Красноярск', 'Пермь', 'Воронеж', 'Волгоград']
+
+# Наименования валют по стандарту ISO
+CURRENCIES = {"грн": "UAH", "USD": "USD", "EUR": "EUR", "бел.руб": "BYN",
+              "KGS": "KGS", "сум": "UZS", "AZN": "AZN", "KZT": "KZT", "руб": "RUB"}
+
+# Признаки из столбцов "Занятость" и "График"
+EMPLOYMENT = ['полная занятость', 'частичная занятость', 'проектная работа', 'стажировка', 'волонтерство']
+SCHEDULE = ['гибкий график', 'полный день', 'сменный график', 'удаленная работа', 'вахтовый метод']
+
+# Столбцы места работы: резюме без них удаляются при очистке
+WORK_COLUMNS = ['Последнее/нынешнее место работы', 'Последняя/нынешняя должность']
+
+# Числовые признаки, от которых зависит очистка
+NUMERIC_COLUMNS = ['Возраст', 'Опыт работы (месяц)', 'ЗП (руб)']
+
+# Первые два слова строки (как str.split(' ')[:2])
+FIRST_TWO_WORDS = r'^([^ ]*) ([^ ]*)'
+
+
+def _by_unique(column: pd.Series, parse, words: int = None, width: int = None):
+    """Применить parse к уникальным значениям столбца и разнести результат по строкам.
+
+    Если заданы words и width, разбираются только первые width символов строки; строки, первые
+    words слов которых не помещаются в width символов, разбираются целиком, поэтому результат
+    совпадает с разбором полных строк.
+
+    Args:
+        column (pd.Series): Строковый столбец.
+        parse (callable): Векторный разбор строк: pd.Series -> pd.Series или pd.DataFrame.
+        words (int, optional): Количество первых слов, от которых зависит результат parse. Defaults to None.
+        width (int, optional): Количество разбираемых первых символов. Defaults to None.
+
+    Returns:
+        pd.Series or pd.DataFrame: Результат parse для каждой строки column.
+    """
+    key = column if width is None else column.str.slice(0, width)
+    codes, uniques = pd.factorize(key, use_na_sentinel=False)
+    uniques = pd.Series(uniques, dtype=column.dtype)
+    result = parse(uniques).iloc[codes]
+    result.index = column.index
+    if width is not None:
+        truncated = ((uniques.str.count(' ') < words) & (uniques.str.len() == width)).fillna(False)
+        rows = truncated.to_numpy(dtype=bool)[codes]
+        if rows.any():
+            result.loc[rows] = parse(column[rows])
+    return result
+
+
+def _education(column: pd.Series) -> pd.Series:
+    words = column.str.extract(FIRST_TWO_WORDS)
+    return words[0].where(words[1] == 'образование', words[0] + ' ' + words[1])
+
+
+def education(column: pd.Series) -> pd.Series:
+    """Признак "Образование" из столбца "Образование и ВУЗ" (clian_str в ноутбуке).
+
+    Args:
+        column (pd.Series): Столбец "Образование и ВУЗ".
+
+    Returns:
+        pd.Series: Уровень образования: "Высшее", "Неоконченное высшее", "Среднее специальное" и т.д.
+    """
+    return _by_unique(column, _education, words=2, width=40)
+
+
+def _gender_age(column: pd.Series) -> pd.DataFrame:
+    words = column.str.extract(FIRST_TWO_WORDS)
+    return pd.DataFrame({'Пол': np.where(words[0] == 'Мужчина', 'М', 'Ж'), 'Возраст': words[1].astype(np.int64)})
+
+
+def gender_age(column: pd.Series) -> pd.DataFrame:
+    """Признаки "Пол" и "Возраст" из столбца "Пол, возраст" (column_gender и column_age в ноутбуке).
+
+    Args:
+        column (pd.Series): Столбец "Пол, возраст", например "Мужчина ,  39 лет , родился 27 ноября 1979".
+
+    Returns:
+        pd.DataFrame: Столбцы "Пол" ("М" или "Ж") и "Возраст".
+    """
+    return _by_unique(column.str.replace(' , ', '', regex=False), _gender_age, words=2, width=24)
+
+
+def _experience(column: pd.Series) -> pd.Series:
+    head = column.str.extract(r'^((?:[^ ]* ){0,5}[^ ]*)', expand=False)
+    years = head.str.extract(r'(?:^| )(\d+) (?:год|года|лет)(?= |$)', expand=False).astype(float)
+    months = head.str.extract(r'(?:^| )(\d+) (?:месяца|месяцев|месяц)(?= |$)', expand=False).astype(float)
+    total = years.fillna(0) * 12 + months.fillna(0)
+    return total.where(column.notna() & (column != 'Не указано'))
+
+
+def experience(column: pd.Series) -> pd.Series:
+    """Признак "Опыт работы (месяц)" из столбца "Опыт работы" (column_experience в ноутбуке).
+
+    Как и в ноутбуке, учитываются только первые шесть слов строки.
+
+    Args:
+        column (pd.Series): Столбец "Опыт работы", например "Опыт работы 16 лет 10 месяцев  Август 2010 — ...".
+
+    Returns:
+        pd.Series: Опыт работы в месяцах (NaN, если опыт не указан).
+    """
+    return _by_unique(column, _experience, words=6, width=48)
+
+
+def _location(column: pd.Series) -> pd.DataFrame:
+    parts = column.str.split(' , ', n=4, expand=True).reindex(columns=range(4))
+    metro = parts[1].str.contains('м.', regex=False).fillna(False).astype(bool)
+    moving = parts[2].where(metro, parts[1])
+    trips = parts[3].where(metro, parts[2])
+    city = np.select([parts[0].isin(MILLION_CITIES), parts[0] == 'Москва', parts[0] == 'Санкт-Петербург'],
+                     ['город-миллионник', 'Москва', 'Санкт-Петербург'], 'другие')
+    return pd.DataFrame({'Город': city,
+                         'Готовность к переезду': ~moving.str.contains('не', regex=False).fillna(False).astype(bool),
+                         'Готовность к командировкам': trips.notna() & ~trips.str.contains('не', regex=False)
+                         .fillna(True).astype(bool)})
+
+
+def location(column: pd.Series) -> pd.DataFrame:
+    """Признаки "Город", "Готовность к переезду" и "Готовность к командировкам"
+    из столбца "Город, переезд, командировки" (col_clian, to_town, func_moving и func_business_trips в ноутбуке).
+
+    Args:
+        column (pd.Series): Столбец "Город, переезд, командировки",
+            например "Москва , м. Тверская , не готов к переезду , готов к командировкам".
+
+    Returns:
+        pd.DataFrame: Столбцы "Город" ("Москва", "Санкт-Петербург", "город-миллионник" или "другие"),
+            "Готовность к переезду" и "Готовность к командировкам".
+    """
+    return _by_unique(column, _location)
+
+
+def multi_hot(column: pd.Series, values: list) -> pd.DataFrame:
+    """Признаки наличия каждого из values в перечислении через запятую, за один проход по столбцу.
+
+    Args:
+        column (pd.Series): Столбец с перечислением, например "полная занятость, стажировка".
+        values (list): Значения, для которых создаются признаки.
+
+    Returns:
+        pd.DataFrame: Булевы столбцы с именами values.
+    """
+    return _by_unique(column, lambda unique: unique.str.get_dummies(sep=', ').reindex(columns=values, fill_value=0)
+                      .astype(bool))
+
+
+def salary(column: pd.Series) -> pd.DataFrame:
+    """Сумма и валюта желаемой зарплаты из столбца "ЗП" (func_salary и func_currency_name в ноутбуке).
+
+    Args:
+        column (pd.Series): Столбец "ЗП", например "29000 руб.".
+
+    Returns:
+        pd.DataFrame: Столбцы "Сумма ЗП" и "ISO" (код валюты, None для неизвестной валюты).
+    """
+    def parse(unique):
+        words = unique.str.extract(FIRST_TWO_WORDS)
+        return pd.DataFrame({'Сумма ЗП': words[0].astype(np.int64), 'ISO': words[1].str.rstrip('.').map(CURRENCIES)})
+
+    return _by_unique(column, parse)
+
+
+def resume_date(column: pd.Series) -> pd.Series:
+    """Дата обновления резюме без времени из столбца "Обновление резюме".
+
+    Args:
+        column (pd.Series): Столбец "Обновление резюме", например "16.04.2019 15:59".
+
+    Returns:
+        pd.Series: Дата (datetime64, полночь).
+    """
+    return _by_unique(column.str.slice(0, 10), lambda unique: pd.to_datetime(unique, format='%d.%m.%Y'))
+
+
+def read_exchange_rates(path: str) -> pd.DataFrame:
+    """Курсы валют (ExchangeRates.csv): столбцы date, ISO, close и proportion."""
+    rates = pd.read_csv(path, usecols=['currency', 'date', 'close', 'proportion'])
+    rates['date'] = pd.to_datetime(rates['date'], format='%d/%m/%y')
+    return rates.rename(columns={'currency': 'ISO'})
+
+
+def transform(hh_df: pd.DataFrame, exchange_rates: pd.DataFrame) -> pd.DataFrame:
+    """Преобразование выгрузки резюме (раздел "Преобразование данных" ноутбука).
+
+    Столбцы и их порядок совпадают с результатом ноутбука; столбец date хранит дату
+    как datetime64 (полночь), а не объекты datetime.date.
+
+    Args:
+        hh_df (pd.DataFrame): Выгрузка резюме (dst-3.0_16_1_hh_database.csv).
+        exchange_rates (pd.DataFrame): Курсы валют (см. read_exchange_rates).
+
+    Returns:
+        pd.DataFrame: Таблица признаков с зарплатой в рублях "ЗП (руб)".
+    """
+    df = hh_df.drop(columns=['Образование и ВУЗ', 'Пол, возраст', 'Опыт работы', 'Город, переезд, командировки',
+                             'Занятость', 'График', 'ЗП'])
+    df['date'] = resume_date(df.pop('Обновление резюме'))
+    df = df[['Ищет работу на должность:', 'Последнее/нынешнее место работы', 'Последняя/нынешняя должность', 'date',
+             'Авто']]
+    df = pd.concat([df, education(hh_df['Образование и ВУЗ']).rename('Образование'),
+                    gender_age(hh_df['Пол, возраст']),
+                    experience(hh_df['Опыт работы']).rename('Опыт работы (месяц)'),
+                    location(hh_df['Город, переезд, командировки']),
+                    multi_hot(hh_df['Занятость'], EMPLOYMENT),
+                    multi_hot(hh_df['График'], SCHEDULE),
+                    salary(hh_df['ЗП'])], axis=1)
+
+    rates = exchange_rates.astype({'date': df['date'].dtype}).set_index(['date', 'ISO'])
+    df = df.merge(rates, on=['date', 'ISO'], how='left')
+    df['ЗП (руб)'] = df['Сумма ЗП'] * df['close'].fillna(1) / df['proportion'].fillna(1)
+    return df.drop(columns=['Сумма ЗП', 'ISO', 'close', 'proportion'])
+
+
+def outliers_z_score(data: pd.DataFrame, feature: str, log_scale: bool = False, left: float = 3,
+                     right: float = 3, mu: float = None, sigma: float = None) -> tuple:
+    """Выбросы по методу z-отклонения.
+
+    Среднее и стандартное отклонение считаются по data, если не заданы mu и sigma
+    (например, посчитанные по всей выгрузке при обработке частями).
+
+    Args:
+        data (pd.DataFrame): Таблица.
+        feature (str): Признак.
+        log_scale (bool, optional): Искать выбросы в логарифме признака. Defaults to False.
+        left (float, optional): Число стандартных отклонений слева. Defaults to 3.
+        right (float, optional): Число стандартных отклонений справа. Defaults to 3.
+        mu (float, optional): Среднее признака (или его логарифма). Defaults to None.
+        sigma (float, optional): Стандартное отклонение признака (или его логарифма). Defaults to None.
+
+    Returns:
+        tuple: Выбросы и очищенная таблица.
+    """
+    x = np.log(data[feature]) if log_scale else data[feature]
+    mu = x.mean() if mu is None else mu
+    sigma = x.std() if sigma is None else sigma
+    inside = (x >= mu - left * sigma) & (x <= mu + right * sigma)
+    return data[~inside], data[inside]
+
+
+def filter_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """Удалить резюме с зарплатой вне 1 000 - 1 000 000 руб. и с опытом работы больше возраста.
+
+    Args:
+        df (pd.DataFrame): Таблица признаков без пропусков в NUMERIC_COLUMNS.
+
+    Returns:
+        pd.DataFrame: Отфильтрованная таблица.
+    """
+    df = df[(df['ЗП (руб)'] <= 1000000) & (df['ЗП (руб)'] >= 1000)]
+    return df[df['Возраст'] > df['Опыт работы (месяц)'] / 12]
+
+
+def clean(df: pd.DataFrame) -> pd.DataFrame:
+    """Очистка таблицы признаков (раздел "Очистка данных" ноутбука): дубликаты, пропуски,
+    зарплата вне 1 000 - 1 000 000 руб., опыт больше возраста и выбросы возраста.
+
+    Args:
+        df (pd.DataFrame): Результат transform.
+
+    Returns:
+        pd.DataFrame: Очищенная таблица.
+    """
+    df = df.drop_duplicates()
+    df = df.dropna(subset=WORK_COLUMNS)
+    df = filter_rows(df.fillna(value=df['Опыт работы (месяц)'].median()))
+    return outliers_z_score(df, 'Возраст', log_scale=True, left=3, right=4)[1]
@@ -0,0 +1,233 @@
+import os
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import hh_features
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+# Строки в формате выгрузки dst-3.0_16_1_hh_database.csv, включая редкие случаи:
+# станция метро, нет готовности к командировкам, опыт "Не указано" и пропуск, опыт только в месяцах или годах,
+# валюты с точкой в сокращении и неизвестная валюта
+ROWS = [
+    ['Мужчина ,  39 лет , родился 27 ноября 1979', '29000 руб.', 'Системный администратор',
+     'Советск (Калининградская область) , не готов к переезду , не готов к командировкам',
+     'частичная занятость, проектная работа, полная занятость',
+     'гибкий график, полный день, сменный график, вахтовый метод',
+     'Опыт работы 16 лет 10 месяцев  Август 2010 — по настоящее время', 'МАОУ "СОШ № 1 г.Немана"',
+     'Системный администратор', 'Неоконченное высшее образование 2000  Балтийский университет',
+     '16.04.2019 15:59', 'Имеется собственный автомобиль'],
+    ['Женщина ,  36 лет , родилась 12 августа 1982', '20000 руб.', 'Оператор',
+     'Москва , м. Тверская , готова к переезду , готова к командировкам', 'полная занятость', 'полный день',
+     'Опыт работы 10 месяцев  Октябрь 2018 — по настоящее время', 'ПАО Сбербанк', 'Кассир-операционист',
+     'Среднее специальное образование 2005  Колледж', '16.04.2019 08:35', 'Не указано'],
+    ['Мужчина ,  24 года , родился 6 октября 1994', '1000 USD', 'Разработчик',
+     'Санкт-Петербург , хочу переехать (Москва)', 'стажировка, волонтерство', 'удаленная работа',
+     'Не указано', 'IQ-Maxima', 'Менеджер проектов', 'Высшее образование 2015  Тамбовский университет',
+     '26.04.2019 14:25', 'Не указано'],
+    ['Женщина ,  48 лет , родилась 26 декабря 1970', '40000 бел.руб.', 'Аналитик данных, Математик',
+     'Челябинск , готова к переезду , готова к редким командировкам', 'полная занятость',
+     'полный день, удаленная работа', 'Опыт работы 21 год  Январь 1998 — по настоящее время',
+     'ОАО «ЧМК»', 'Начальник группы аналитики', 'Высшее образование 2000  Южно-Уральский университет',
+     '09.04.2019 05:07', 'Не указано'],
+    ['Мужчина ,  38 лет , родился 25 апреля 1980', '120000 руб.', 'Руководитель проекта',
+     'Казань , м. Кремлевская , не готов к переезду , готов к командировкам', 'полная занятость',
+     'полный день', None, 'ПАО ГК ТНС энерго', 'Руководитель отдела',
+     'Высшее образование 1997  Южно-Российский университет', '05.07.2018 20:15', 'Не указано'],
+    ['Мужчина ,  50 лет , родился 1 мая 1968', '500 EUR', 'Инженер', 'Пермь , не готов к переезду',
+     'проектная работа', 'вахтовый метод', 'Опыт работы 2 года 1 месяц  Май 2017 — по настоящее время',
+     None, 'Инженер', 'Среднее образование', '01.01.2019 10:00', 'Не указано'],
+    ['Женщина ,  29 лет , родилась 3 марта 1990', '5000 грн.', 'Бухгалтер', 'Киев , готова к переезду , '
+     'готова к командировкам', 'частичная занятость', 'гибкий график', 'Опыт работы 5 лет 3 месяца  Июнь',
+     'ООО Ромашка', 'Бухгалтер', 'Высшее образование 2012  КНУ', '20.02.2019 12:00', 'Не указано'],
+    ['Мужчина ,  33 года , родился 2 июня 1985', '300 XYZ', 'Водитель', 'Омск , не готов к переезду , '
+     'не готов к командировкам', 'полная занятость', 'сменный график', 'Опыт работы 1 год 1 месяц',
+     'ИП Иванов', 'Водитель', 'Среднее специальное образование 2004  Техникум', '11.03.2019 09:30',
+     'Имеется собственный автомобиль'],
+]
+
+COLUMNS = ['Пол, возраст', 'ЗП', 'Ищет работу на должность:', 'Город, переезд, командировки', 'Занятость', 'График',
+           'Опыт работы', 'Последнее/нынешнее место работы', 'Последняя/нынешняя должность', 'Образование и ВУЗ',
+           'Обновление резюме', 'Авто']
+
+
+def notebook_transform(hh_df, exchange_rates):
+    """Преобразования из Project_1.ipynb без изменений (кроме np.NaN, удаленного в NumPy 2)."""
+    hh_df = hh_df.copy()
+
+    def clian_str(str):
+        temp = str.split(' ')[:2]
+        if temp[1] == 'образование': return temp[0]
+        else: return ' '.join(temp)
+
+    hh_df['Образование'] = hh_df['Образование и ВУЗ'].apply(clian_str)
+    hh_df.drop('Образование и ВУЗ', axis=1, inplace=True)
+
+    def column_gender(str):
+        temp = (str.replace(' , ', '')).split(' ')[:2]
+        if temp[0] == 'Мужчина': return "М"
+        else: return "Ж"
+
+    def column_age(str):
+        temp = (str.replace(' , ', '')).split(' ')[:2]
+        return int(temp[1])
+
+    hh_df['Пол'] = hh_df['Пол, возраст'].apply(column_gender)
+    hh_df['Возраст'] = hh_df['Пол, возраст'].apply(column_age)
+    hh_df.drop('Пол, возраст', axis=1, inplace=True)
+
+    def column_experience(str):
+        if pd.isna(str) or str == 'Не указано':
+            return np.nan
+        list_year = ['год', 'года', 'лет']
+        list_manth = ['месяца', 'месяцев', 'месяц']
+        temp = str.split(' ')[:6]
+        manth = 0
+
+        for i, string in enumerate(temp):
+            if string.isdigit() and temp[i+1] in list_year:
+                manth += int(string) * 12
+            if string.isdigit() and temp[i+1] in list_manth:
+                manth += int(string)
+        return manth
+
+    hh_df['Опыт работы (месяц)'] = hh_df['Опыт работы'].apply(column_experience)
+    hh_df.drop('Опыт работы', axis=1, inplace=True)
+
+    def col_clian(text):
+        text = text.split(' , ')
+        if 'м.' in text[1]:
+            text.pop(1)
+        return text
+
+    def to_town(list_phrases):
+        million_cities = ['Новосибирск', 'Екатеринбург','Нижний Новгород','Казань',
+                          'Челябинск','Омск', 'Самара', 'Ростов-на-Дону', 'Уфа',
+                          'Красноярск', 'Пермь', 'Воронеж','Волгоград']
+        if list_phrases[0] in million_cities: return 'город-миллионник'
+        if list_phrases[0] == 'Москва': return 'Москва'
+        if list_phrases[0] == 'Санкт-Петербург': return 'Санкт-Петербург'
+        else: return 'другие'
+
+    def func_moving(list_phrases):
+        if 'не' in list_phrases[1]: return False
+        else: return True
+
+    def func_business_trips(list_phrases):
+        if len(list_phrases) < 3 or 'не' in list_phrases[2]: return False
+        else: return True
+
+    hh_df['Город, переезд, командировки'] = hh_df['Город, переезд, командировки'].apply(col_clian)
+    hh_df['Город'] = hh_df['Город, переезд, командировки'].apply(to_town)
+    hh_df['Готовность к переезду'] = hh_df['Город, переезд, командировки'].apply(func_moving)
+    hh_df['Готовность к командировкам'] = hh_df['Город, переезд, командировки'].apply(func_business_trips)
+    hh_df.drop('Город, переезд, командировки', axis=1, inplace=True)
+
+    def col_list(text):
+        text = text.split(', ')
+        return text
+
+    hh_df['Занятость'] = hh_df['Занятость'].apply(col_list)
+    hh_df['График'] = hh_df['График'].apply(col_list)
+    for name in hh_features.EMPLOYMENT:
+        hh_df[name] = hh_df['Занятость'].apply(lambda x: True if name in x else False)
+    for name in hh_features.SCHEDULE:
+        hh_df[name] = hh_df['График'].apply(lambda x: True if name in x else False)
+    hh_df.drop('Занятость', axis=1, inplace=True)
+    hh_df.drop('График', axis=1, inplace=True)
+
+    exchange_rates = exchange_rates.copy()
+    exchange_rates['date'] = pd.to_datetime(exchange_rates['date'], dayfirst=True).dt.date
+    exchange_rates.drop(['per', 'time', 'vol'], axis=1, inplace=True)
+    hh_df['Обновление резюме'] = pd.to_datetime(hh_df['Обновление резюме'], dayfirst=True).dt.date
+
+    def func_salary(str):
+        temp = str.split(' ')[:2]
+        return int(temp[0])
+
+    hh_df['Сумма ЗП'] = hh_df['ЗП'].apply(func_salary)
+
+    def func_currency_name(str):
+        currency_dict = {"грн":	"UAH", "USD":	"USD", "EUR":	"EUR", "бел.руб":	"BYN",
+              "KGS":	"KGS", "сум":	"UZS", "AZN":	"AZN", "KZT": "KZT", "руб": "RUB"}
+        temp = str.split(' ')[:2]
+        name = temp[1].rstrip(".")
+        if name in currency_dict:
+            return currency_dict[name]
+
+    hh_df['ISO'] = hh_df['ЗП'].apply(func_currency_name)
+    hh_df = hh_df.drop('ЗП', axis=1)
+    hh_df = hh_df.rename(columns={"Обновление резюме": "date"})
+    exchange_rates = exchange_rates.rename(columns={"currency": "ISO"})
+    hh_df = hh_df.merge(exchange_rates.set_index(['date', 'ISO']), on=(['date', 'ISO']), how='left')
+    hh_df = hh_df.fillna({'close': 1, 'proportion': 1})
+    hh_df['ЗП (руб)'] = hh_df['Сумма ЗП'] * hh_df['close'] / hh_df['proportion']
+    hh_df.drop(['Сумма ЗП', 'ISO', 'close', 'proportion'], axis=1, inplace=True)
+    return hh_df
+
+
+class TestFeatures(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.hh_df = pd.DataFrame(ROWS, columns=COLUMNS)
+        cls.raw_rates = pd.read_csv(os.path.join(DATA, 'ExchangeRates.csv'))
+        cls.rates = hh_features.read_exchange_rates(os.path.join(DATA, 'ExchangeRates.csv'))
+
+    def test_matches_notebook(self):
+        expected = notebook_transform(self.hh_df, self.raw_rates)
+        expected['date'] = pd.to_datetime(expected['date'])
+
+        result = hh_features.transform(self.hh_df, self.rates)
+
+        self.assertEqual(list(result.columns), list(expected.columns))
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+    def test_experience(self):
+        months = hh_features.experience(self.hh_df['Опыт работы'])
+
+        np.testing.assert_array_equal(months, [202, 10, np.nan, 252, np.nan, 25, 63, 13])
+
+    def test_long_prefix(self):
+        # Нужные слова не помещаются в обрезанный префикс: значение разбирается по полной строке
+        long_word = 'Очень' + 'о' * 60
+        column = pd.Series([f'{long_word} образование ВУЗ', f'Высшее {long_word}'])
+        self.assertEqual(list(hh_features.education(column)), [long_word, f'Высшее {long_word}'])
+
+        column = pd.Series(['Опыт работы 1 год 2 месяца ' + 'x' * 100,
+                            'Опыт работы ' + '1' * 40 + ' год 3 месяца'])
+        self.assertEqual(list(hh_features.experience(column)), [14, float('1' * 40) * 12 + 3])
+
+    def test_location(self):
+        location = hh_features.location(self.hh_df['Город, переезд, командировки'])
+
+        self.assertEqual(location['Город'].tolist()[:5], ['другие', 'Москва', 'Санкт-Петербург', 'город-миллионник',
+                                                          'город-миллионник'])
+        self.assertEqual(location['Готовность к переезду'].tolist()[:5], [False, True, True, True, False])
+        self.assertEqual(location['Готовность к командировкам'].tolist()[:5], [False, True, False, True, True])
+
+    def test_multi_hot(self):
+        employment = hh_features.multi_hot(self.hh_df['Занятость'], hh_features.EMPLOYMENT)
+
+        self.assertEqual(list(employment.columns), hh_features.EMPLOYMENT)
+        self.assertEqual(employment.iloc[0].tolist(), [True, True, True, False, False])
+        self.assertEqual(employment['стажировка'].dtype, bool)
+
+    def test_salary(self):
+        salary = hh_features.salary(self.hh_df['ЗП'])
+
+        self.assertEqual(salary['ISO'].tolist()[:4], ['RUB', 'RUB', 'USD', 'BYN'])
+        self.assertTrue(pd.isna(salary['ISO'][7]))
+        self.assertEqual(salary['Сумма ЗП'].tolist()[:3], [29000, 20000, 1000])
+
+    def test_clean(self):
+        cleaned = hh_features.clean(hh_features.transform(self.hh_df, self.rates))
+
+        self.assertFalse(cleaned['Последнее/нынешнее место работы'].isna().any())
+        self.assertFalse(cleaned['Опыт работы (месяц)'].isna().any())
+        self.assertTrue(cleaned['ЗП (руб)'].between(1000, 1000000).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
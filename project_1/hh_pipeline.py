@@ -0,0 +1,180 @@
+"""Потоковая обработка выгрузки резюме HeadHunter с записью в секционированный Parquet.
+Выгрузка читается частями (pd.read_csv(chunksize=...)), поэтому память не зависит от размера файла:
+многогигабайтные выгрузки обрабатываются на обычной машине. Результат совпадает с
+hh_features.clean(hh_features.transform(...)) по всей выгрузке
+"""
+import argparse
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import hh_features
+
+# Столбцы с небольшим числом значений, хранятся как категории
+CATEGORY_COLUMNS = ['Авто', 'Образование', 'Пол', 'Город']
+
+# Уменьшенные типы числовых признаков (float32 точно хранит целые значения и половины, в том числе медиану)
+DOWNCAST = {'Возраст': 'float32', 'Опыт работы (месяц)': 'float32'}
+
+# Столбец секционирования результата: месяц обновления резюме
+PARTITION = 'month'
+
+# Каталог промежуточных файлов внутри результата (каталоги с "_" не читаются как часть набора данных)
+STAGING = '_staging'
+
+
+def median_of_counts(counts: pd.Series) -> float:
+    """Медиана по количествам значений (как Series.median() по исходным значениям).
+
+    Args:
+        counts (pd.Series): Количество каждого значения (индекс - значения).
+
+    Returns:
+        float: Медиана или NaN, если значений нет.
+    """
+    counts = counts.sort_index()
+    total = int(counts.sum())
+    if total == 0:
+        return np.nan
+    cumulative = counts.cumsum().to_numpy()
+    values = counts.index.to_numpy(dtype=float)
+    lower = values[np.searchsorted(cumulative, (total - 1) // 2, side='right')]
+    upper = values[np.searchsorted(cumulative, total // 2, side='right')]
+    return (lower + upper) / 2
+
+
+def compact(df: pd.DataFrame) -> pd.DataFrame:
+    """Категории вместо строк и уменьшенные числовые типы (см. CATEGORY_COLUMNS, DOWNCAST)"""
+    return df.astype({**dict.fromkeys(CATEGORY_COLUMNS, 'category'), **DOWNCAST})
+
+
+def _stage(path: str, exchange_rates: pd.DataFrame, staging: str, chunksize: int) -> dict:
+    """Первый проход: преобразование частей выгрузки, удаление дубликатов и резюме без места работы.
+
+    Дубликаты ищутся по 64-битным хэшам строк признаков: отсортированный массив хэшей
+    занимает 8 байт на уникальное резюме - это единственное, что растет с размером выгрузки.
+
+    Returns:
+        dict: Промежуточные файлы, количество прочитанных строк и дубликатов,
+            количества значений опыта работы (для медианы).
+    """
+    seen = np.empty(0, dtype=np.uint64)
+    experience = pd.Series(dtype=float)
+    files, rows, duplicates = [], 0, 0
+    for number, chunk in enumerate(pd.read_csv(path, sep=';', dtype=str, chunksize=chunksize)):
+        df = hh_features.transform(chunk, exchange_rates)
+        df.index = chunk.index  # Номер строки выгрузки
+
+        hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        found = np.zeros(len(hashes), dtype=bool)
+        if len(seen):
+            found = seen[np.minimum(np.searchsorted(seen, hashes), len(seen) - 1)] == hashes
+        unique = ~found & ~pd.Series(hashes).duplicated().to_numpy()
+        new = np.sort(hashes[unique])
+        seen = np.insert(seen, np.searchsorted(seen, new), new)
+
+        rows += len(df)
+        duplicates += int((~unique).sum())
+        df = df[unique].dropna(subset=hh_features.WORK_COLUMNS)
+        experience = experience.add(df['Опыт работы (месяц)'].value_counts(), fill_value=0)
+        files.append(os.path.join(staging, f'{number:06d}.parquet'))
+        df.to_parquet(files[-1], index=True)
+    return {'files': files, 'rows': rows, 'duplicates': duplicates, 'experience': experience}
+
+
+def _fill(df: pd.DataFrame, median: float) -> pd.DataFrame:
+    # В отличие от clean() медианой заполняются только числовые признаки: строки и категории не смешиваются с числами
+    return df.fillna(dict.fromkeys(hh_features.NUMERIC_COLUMNS, median))
+
+
+def _log_age_stats(files: list, median: float) -> tuple:
+    """Второй проход: среднее и стандартное отклонение логарифма возраста после фильтров.
+    Читаются только числовые столбцы; части объединяются по формулам Чана.
+    """
+    count, mean, m2 = 0, 0.0, 0.0
+    for file in files:
+        df = _fill(pd.read_parquet(file, columns=hh_features.NUMERIC_COLUMNS), median)
+        x = np.log(hh_features.filter_rows(df)['Возраст'].to_numpy(dtype=float))
+        if not len(x):
+            continue
+        delta = x.mean() - mean
+        total = count + len(x)
+        mean += delta * len(x) / total
+        m2 += ((x - x.mean()) ** 2).sum() + delta ** 2 * count * len(x) / total
+        count = total
+    if count == 0:
+        return np.nan, np.nan
+    return mean, np.sqrt(m2 / (count - 1)) if count > 1 else np.nan
+
+
+def run(path: str, output: str, exchange_rates: pd.DataFrame, chunksize: int = 50_000,
+        overwrite: bool = False) -> dict:
+    """Обработать выгрузку резюме частями и записать очищенные признаки в Parquet.
+
+    Очистке нужны статистики всей выгрузки (медиана опыта работы, среднее и стандартное
+    отклонение логарифма возраста), поэтому выгрузка обрабатывается в три прохода:
+    части преобразуются и сохраняются во временные файлы Parquet, затем по ним считаются
+    статистики (читаются только числовые столбцы) и части дописываются в результат.
+    В памяти одновременно находится одна часть выгрузки.
+
+    Результат секционирован по месяцу обновления резюме (столбец month, каталоги month=ГГГГ-ММ);
+    индекс - номер строки выгрузки. Прочитать его можно pd.read_parquet(output).
+
+    Args:
+        path (str): Выгрузка резюме (dst-3.0_16_1_hh_database.csv).
+        output (str): Каталог результата.
+        exchange_rates (pd.DataFrame): Курсы валют (см. hh_features.read_exchange_rates).
+        chunksize (int, optional): Количество строк в части. Defaults to 50_000.
+        overwrite (bool, optional): Удалить существующий каталог результата. Defaults to False.
+
+    Returns:
+        dict: Количество прочитанных строк, дубликатов и записанных резюме, время работы.
+    """
+    if os.path.exists(output):
+        if not overwrite:
+            raise FileExistsError(f"Каталог результата {output} уже существует")
+        shutil.rmtree(output)
+    started = time.perf_counter()
+    staging = os.path.join(output, STAGING)
+    os.makedirs(staging)
+    try:
+        staged = _stage(path, exchange_rates, staging, chunksize)
+        median = median_of_counts(staged['experience'])
+        mu, sigma = _log_age_stats(staged['files'], median)
+
+        written = 0
+        for file in staged['files']:
+            df = hh_features.filter_rows(_fill(pd.read_parquet(file), median))
+            df = hh_features.outliers_z_score(df, 'Возраст', log_scale=True, left=3, right=4, mu=mu, sigma=sigma)[1]
+            df = compact(df)
+            df[PARTITION] = df['date'].dt.strftime('%Y-%m')
+            pq.write_to_dataset(pa.Table.from_pandas(df, preserve_index=True), output, partition_cols=[PARTITION])
+            written += len(df)
+            os.remove(file)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return {'rows': staged['rows'], 'duplicates': staged['duplicates'], 'written': written,
+            'seconds': time.perf_counter() - started}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Потоковая обработка выгрузки резюме HeadHunter в Parquet")
+    parser.add_argument('path', help="Выгрузка резюме (csv, разделитель ;)")
+    parser.add_argument('output', help="Каталог результата")
+    parser.add_argument('--rates', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data',
+                                                        'ExchangeRates.csv'), help="Курсы валют")
+    parser.add_argument('--chunksize', type=int, default=50_000, help="Количество строк в части")
+    parser.add_argument('--overwrite', action='store_true', help="Перезаписать каталог результата")
+    args = parser.parse_args(argv)
+    stats = run(args.path, args.output, hh_features.read_exchange_rates(args.rates), args.chunksize, args.overwrite)
+    print(f"Прочитано {stats['rows']} строк, дубликатов {stats['duplicates']}, записано {stats['written']} резюме "
+          f"за {stats['seconds']:.1f} с")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import hh_features
+import hh_pipeline
+from hh_features_unittest import COLUMNS, DATA, ROWS
+
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'hh.csv')
+        self.output = os.path.join(self.directory.name, 'output')
+        # Дубликаты попадают в другие части выгрузки
+        self.hh_df = pd.DataFrame(ROWS + ROWS[:3] + ROWS[5:], columns=COLUMNS)
+        self.hh_df.to_csv(self.path, sep=';', index=False)
+        self.rates = hh_features.read_exchange_rates(os.path.join(DATA, 'ExchangeRates.csv'))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_matches_clean(self):
+        expected = hh_features.clean(hh_features.transform(self.hh_df, self.rates))
+
+        stats = hh_pipeline.run(self.path, self.output, self.rates, chunksize=3)
+
+        result = pd.read_parquet(self.output).sort_index()
+        self.assertEqual(result[hh_pipeline.PARTITION].astype(str).tolist(),
+                         expected['date'].dt.strftime('%Y-%m').tolist())
+        self.assertEqual(result['Город'].dtype, 'category')
+        self.assertEqual(result['Возраст'].dtype, np.float32)
+        result = result.drop(columns=hh_pipeline.PARTITION).astype(expected.dtypes.to_dict())
+        pd.testing.assert_frame_equal(result, expected, check_index_type=False)
+        self.assertEqual((stats['rows'], stats['duplicates'], stats['written']),
+                         (len(self.hh_df), len(self.hh_df) - len(ROWS), len(expected)))
+        self.assertEqual(os.listdir(self.output).count(hh_pipeline.STAGING), 0)
+
+    def test_existing_output(self):
+        os.makedirs(self.output)
+
+        with self.assertRaises(FileExistsError):
+            hh_pipeline.run(self.path, self.output, self.rates)
+        hh_pipeline.run(self.path, self.output, self.rates, overwrite=True)
+
+    def test_median_of_counts(self):
+        for values in ([3.0], [1.0, 5.0], [2.0, 2.0, 7.0, 1.0], [4.0, 1.0, 1.0, 9.0, 9.0, 9.0, 2.0]):
+            values = pd.Series(values)
+            self.assertEqual(hh_pipeline.median_of_counts(values.value_counts()), values.median())
+        self.assertTrue(np.isnan(hh_pipeline.median_of_counts(pd.Series(dtype=float))))
+
+
+if __name__ == '__main__':
+    unittest.main()
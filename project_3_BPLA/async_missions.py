@@ -0,0 +1,541 @@
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import airsim
+import asyncio
+import logging
+import math
+import threading
+import time
+
+from capture import CapturePipeline
+from client_pool import default_pool
+from flight_utils import async_wait_until_settled
+from mission_plan import survey_mission
+from missions import MissionCancelled, OrbitTracker
+from plan_cache import default_cache
+
+
+# Размер пула потоков для вызовов AirSim по умолчанию (не зависит от количества дронов)
+DEFAULT_WORKERS = 4
+
+
+# Асинхронный аналог абстрактного класса Missions
+class AsyncMissions(ABC):
+    @abstractmethod
+    async def start(self):
+        """Запустить миссию."""
+        pass
+
+    @abstractmethod
+    async def landed(self):
+        """Запустить приземление дрона."""
+        pass
+
+
+# Общая часть асинхронных миссий: мост к блокирующему клиенту AirSim
+class AsyncNavigator(AsyncMissions):
+    def __init__(self, executor=None, vehicle_name='', ip='', client_pool=None, settle_rate=20,
+                 settle_window=5, settle_tolerance=0.05, settle_timeout=10.0, arrive_tolerance=0.5,
+                 still_speed=0.2):
+        """Инициализация моста к клиенту AirSim.
+
+        Args:
+            executor: Пул потоков для блокирующих вызовов AirSim (None - пул цикла событий).
+            vehicle_name: Имя дрона в settings.json AirSim ('' - дрон по умолчанию).
+            ip: Адрес симулятора AirSim ('' - локальный).
+            client_pool: Пул подключений к AirSim (по умолчанию - общий пул процесса).
+            settle_rate: Частота опроса позиции при ожидании остановки и завершения команд, Гц.
+            settle_window: Количество последних замеров позиции в окне.
+            settle_tolerance: Допустимое среднеквадратичное отклонение позиции в окне, м.
+            settle_timeout: Максимальное время ожидания остановки, с.
+            arrive_tolerance: Расстояние до цели, при котором перемещение считается завершенным, м.
+            still_speed: Скорость, ниже которой дрон считается остановившимся, м/с.
+        """
+        self.executor = executor
+        self.vehicle_name = vehicle_name
+        self.ip = ip
+        self.client_pool = client_pool if client_pool is not None else default_pool
+        self.settle_rate = settle_rate
+        self.settle_window = settle_window
+        self.settle_tolerance = settle_tolerance
+        self.settle_timeout = settle_timeout
+        self.arrive_tolerance = arrive_tolerance
+        self.still_speed = still_speed
+        self.client = None
+        self._cancelled = threading.Event()  # Флаг отмены миссии (может устанавливаться из другого потока)
+        self.phase = 'created'  # Текущий этап миссии для телеметрии
+
+    def cancel(self):
+        """Запросить отмену миссии (см. Missions.cancel).
+
+        Миссия прерывается между этапами полета или при очередном опросе состояния
+        во время перемещения; прерванное перемещение останавливается зависанием,
+        дрон остается в воздухе.
+        """
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        """bool: True, если запрошена отмена миссии."""
+        return self._cancelled.is_set()
+
+    def check_cancelled(self):
+        """Прервать миссию, если запрошена отмена.
+
+        Raises:
+            MissionCancelled: Если была вызвана cancel().
+        """
+        if self._cancelled.is_set():
+            raise MissionCancelled("Миссия отменена")
+
+    async def call(self, fn, *args, **kwargs):
+        """Выполнить блокирующий вызов в пуле потоков, не блокируя цикл событий."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(fn, *args, **kwargs))
+
+    async def move(self, method, *args, until=None, timeout=None, **kwargs):
+        """Отправить команду *Async клиента AirSim и дождаться ее завершения, не занимая поток пула.
+
+        Результат команды не ожидается через join(): поток пула занят только на время отправки,
+        а завершение определяется опросом состояния дрона с паузами asyncio.sleep (см. wait_for()),
+        поэтому небольшой пул потоков обслуживает любое количество дронов.
+
+        Args:
+            method: Метод *Async клиента AirSim.
+            until: Условие завершения по состоянию дрона (по умолчанию - дрон остановился).
+            timeout: Максимальное время ожидания, с (None - без ограничения).
+
+        Returns:
+            airsim.MultirotorState: Состояние дрона после завершения команды.
+        """
+        await self.call(method, *args, **kwargs)
+        return await self.wait_for(until, timeout)
+
+    async def wait_for(self, until=None, timeout=None):
+        """Дождаться завершения отправленной команды опросом состояния дрона с частотой settle_rate.
+
+        Команда завершена, когда дрон остановился (скорость не больше still_speed) и выполнено
+        условие until. Чтобы не принять за завершение состояние до начала движения, остановка
+        учитывается после того, как дрон начал двигаться, или спустя settle_window замеров
+        (команда, не требующая движения). Посадка (этап landing) отменой не прерывается.
+
+        Returns:
+            airsim.MultirotorState: Последнее состояние дрона.
+        """
+        loop = asyncio.get_running_loop()
+        period = 1.0 / self.settle_rate
+        started = loop.time()
+        moved = False
+        while True:
+            if self.cancelled and self.phase != 'landing':
+                await self.call(self.client.hoverAsync, vehicle_name=self.vehicle_name)  # Прерываем перемещение
+                self.check_cancelled()
+            state = await self.get_state()
+            velocity = state.kinematics_estimated.linear_velocity
+            still = math.hypot(velocity.x_val, velocity.y_val, velocity.z_val) <= self.still_speed
+            moved = moved or not still
+            elapsed = loop.time() - started
+            if still and (moved or elapsed >= self.settle_window * period) and (until is None or until(state)):
+                return state
+            if timeout is not None and elapsed >= timeout:
+                logging.info("Команда не завершилась за {:.1f} с, продолжаем".format(timeout))
+                return state
+            await asyncio.sleep(period)
+
+    def near(self, x, y, z):
+        """Условие завершения перемещения: дрон в пределах arrive_tolerance от точки (x, y, z)."""
+        def arrived(state):
+            pos = state.kinematics_estimated.position
+            return math.dist((pos.x_val, pos.y_val, pos.z_val), (x, y, z)) <= self.arrive_tolerance
+        return arrived
+
+    async def move_to(self, x, y, z, velocity, timeout=None, **kwargs):
+        """Перелет в точку (x, y, z) командой moveToPositionAsync с ожиданием прибытия.
+
+        Args:
+            timeout: Максимальное время ожидания, с (по умолчанию - расчетное время перелета
+                с запасом плюс settle_timeout).
+            kwargs: Дополнительные параметры moveToPositionAsync.
+        """
+        if timeout is None:
+            pos = await self.get_position()
+            distance = math.dist((pos.x_val, pos.y_val, pos.z_val), (x, y, z))
+            timeout = 1.5 * distance / velocity + self.settle_timeout
+        return await self.move(self.client.moveToPositionAsync, x, y, z, velocity, until=self.near(x, y, z),
+                               timeout=timeout, vehicle_name=self.vehicle_name, **kwargs)
+
+    async def hover(self):
+        """Зависание до стабилизации дрона, затем снова включается управление API."""
+        await self.call(self.client.hoverAsync, vehicle_name=self.vehicle_name)
+        await self.settle()
+        await self.call(self.client.enableApiControl, True, self.vehicle_name)
+
+    async def lift_off(self):
+        """Взлет с ожиданием набора высоты взлета.
+
+        Returns:
+            bool: True, если дрон в воздухе.
+        """
+        state = await self.move(self.client.takeoffAsync, vehicle_name=self.vehicle_name,
+                                until=lambda state: state.landed_state != airsim.LandedState.Landed, timeout=20)
+        return state.landed_state != airsim.LandedState.Landed
+
+    async def connect(self):
+        """Подключиться к AirSim, если подключение еще не установлено."""
+        if self.client is None:
+            client = await self.call(self.client_pool.get, self.ip, self.vehicle_name)  # Подключение из общего пула
+            await self.call(client.enableApiControl, True, self.vehicle_name)  # Включение API управления
+            self.client = client
+
+    def telemetry(self):
+        """Телеметрия миссии (см. Missions.telemetry)."""
+        return {'phase': self.phase}
+
+    async def get_state(self):
+        """Получить состояние дрона."""
+        return await self.call(self.client.getMultirotorState, self.vehicle_name)
+
+    async def get_position(self):
+        """Получить текущую позицию дрона."""
+        return (await self.get_state()).kinematics_estimated.position
+
+    async def settle(self):
+        """Дождаться остановки дрона вместо фиксированной паузы.
+
+        Returns:
+            airsim.Vector3r: Последняя позиция дрона (после остановки или по истечении времени ожидания).
+        """
+        _, position = await async_wait_until_settled(self.get_position, self.settle_rate, self.settle_window,
+                                                     self.settle_tolerance, self.settle_timeout)
+        return position
+
+    async def fly_plan(self, plan, capture=None, timeout_margin=1.5):
+        """Выполнить план миссии (асинхронный аналог Missions.fly_plan).
+
+        Каждый шаг скомпилированного плана - одна команда AirSim: объединенные участки
+        с движением выполняются одним moveOnPathAsync. Отмена проверяется между шагами
+        и во время ожидания завершения шага.
+
+        Args:
+            plan: План миссии (mission_plan.MissionPlan).
+            capture: Корутинная функция снимка для участков capture.
+            timeout_margin: Запас времени шага относительно расчетного (к нему добавляется settle_timeout).
+        """
+        segments = plan.compile()
+        if capture is None and any(segment.kind == 'capture' for segment in segments):
+            raise ValueError("План содержит снимки, но функция снимка не задана")
+        for segment in segments:
+            self.check_cancelled()
+            self.phase = segment.phase
+            if segment.kind == 'hover':
+                await self.hover()
+            elif segment.kind == 'capture':
+                await capture()
+            else:
+                await self.move_on_path(segment, timeout_margin)
+
+    async def move_on_path(self, segment, timeout_margin=1.5):
+        """Выполнить шаг плана 'move' одним вызовом moveOnPathAsync.
+
+        Если команда завершилась ошибкой, дрон направляется в последнюю точку шага,
+        чтобы следующий шаг начинался из ожидаемой позиции.
+        """
+        path = [airsim.Vector3r(x, y, z) for x, y, z in segment.points.tolist()]
+        pos = await self.get_position()
+        timeout = segment.estimate_time((pos.x_val, pos.y_val, pos.z_val)) * timeout_margin + self.settle_timeout
+        velocity = segment.velocity
+        x, y, z = segment.points[-1].tolist()
+        try:
+            await self.move(self.client.moveOnPathAsync, path, velocity, timeout, airsim.DrivetrainType.ForwardOnly,
+                            airsim.YawMode(False, 0), velocity + (velocity / 2), 1, vehicle_name=self.vehicle_name,
+                            until=self.near(x, y, z), timeout=timeout)
+        except MissionCancelled:
+            raise
+        except Exception as e:
+            logging.info("moveOnPath threw exception: " + str(e))
+            await self.move_to(x, y, z, velocity)
+
+    async def landed(self):
+        """Запустить приземление дрона."""
+        await self.connect()
+        self.phase = 'landing'
+        # Ждем остановки дрона после зависания и снова включаем управление API
+        await self.hover()
+
+        z = (await self.get_state()).kinematics_estimated.position.z_val
+
+        # Если высота выше 5, опускаемся до 5
+        if z < -5:
+            logging.info("Снижаемся")
+            await self.move_to(0, 0, -5, 5)
+            await self.settle()
+
+        # Садимся на землю
+        logging.info("Посадка...")
+        await self.move(self.client.landAsync, vehicle_name=self.vehicle_name,
+                        until=lambda state: state.landed_state == airsim.LandedState.Landed, timeout=60)
+
+        # Блокируем дрон после завершения миссии
+        logging.info("Дрон заблокирован.")
+        await self.call(self.client.armDisarm, False, self.vehicle_name)
+        await self.call(self.client.enableApiControl, False, self.vehicle_name)
+        self.phase = 'landed'
+
+
+# Асинхронное обследование площади по квадрату
+class AsyncSurveyNavigator(AsyncNavigator):
+    def __init__(self, executor=None, vehicle_name='', ip='', client_pool=None, **kwargs):
+        """Инициализация параметров миссии патрулирования.
+
+        Args:
+            executor: Пул потоков для блокирующих вызовов AirSim.
+            vehicle_name: Имя дрона в settings.json AirSim.
+            ip: Адрес симулятора AirSim.
+            client_pool: Пул подключений к AirSim.
+            kwargs: Параметры обследования (см. SurveyNavigator), в том числе готовый маршрут plan
+                и кэш маршрутов plan_cache.
+        """
+        super().__init__(executor, vehicle_name, ip, client_pool)
+        self.boxsize = kwargs.get('boxsize')
+        self.stripewidth = kwargs.get('stripewidth')
+        self.altitude = kwargs.get('altitude')
+        self.velocity = kwargs.get('velocity')
+        self.rotation = kwargs.get('rotation', 0)
+        self.turn_radius = kwargs.get('turn_radius', 0)
+        self.plan = kwargs.get('plan')  # Готовый маршрут вместо обследования квадрата boxsize
+        plan_cache = kwargs.get('plan_cache')
+        self.plan_cache = plan_cache if plan_cache is not None else default_cache
+
+        # Проверка на наличие необходимых параметров
+        if self.plan is None and (self.boxsize is None or self.stripewidth is None) \
+                or self.altitude is None or self.velocity is None:
+            raise ValueError(
+                "Отсутствуют необходимые параметры: boxsize, stripewidth, altitude, and velocity!")
+
+    def build_plan(self):
+        """Составить план миссии патрулирования (см. SurveyNavigator.build_plan).
+
+        Returns:
+            MissionPlan: План миссии.
+        """
+        plan = self.plan
+        if plan is None:
+            plan, _ = self.plan_cache.survey(self.boxsize, self.stripewidth, self.altitude, self.rotation,
+                                             self.turn_radius)
+        return survey_mission(plan, self.altitude, self.velocity)
+
+    async def start(self):
+        """Запуск миссии патрулирования в заданном квадрате."""
+        mission_plan = self.build_plan()
+        mission_plan.compile()  # Ошибки плана обнаруживаются до взлета
+        await self.connect()
+        logging.info("Армирование моторов...")
+        self.phase = 'arm'
+        await self.call(self.client.armDisarm, True, self.vehicle_name)
+
+        # Если дрон приземлен, то начинаем взлет
+        if (await self.get_state()).landed_state == airsim.LandedState.Landed:
+            logging.info("Взлёт...")
+            self.phase = 'takeoff'
+            if not await self.lift_off():
+                logging.info("сбой взлета - проверьте журнал сообщений Unreal для получения подробной информации")
+                return
+
+        logging.info("Набор высоты: " + str(self.altitude))
+        logging.info("Расчетное расстояние полёта:" + str(mission_plan.distance))
+        logging.info("Расчётное время полёта " + str(mission_plan.estimate_time()))
+        await self.fly_plan(mission_plan)
+        self.phase = 'done'
+        logging.info("Миссия завершена. Дрон готов к следующей миссии или посадке.")
+
+
+# Асинхронное орбитальное движение
+class AsyncOrbitNavigator(OrbitTracker, AsyncNavigator):
+    def __init__(self, executor=None, vehicle_name='', ip='', client_pool=None, control_period=0.05, **kwargs):
+        """Инициализация параметров миссии.
+
+        Args:
+            executor: Пул потоков для блокирующих вызовов AirSim.
+            vehicle_name: Имя дрона в settings.json AirSim.
+            ip: Адрес симулятора AirSim.
+            client_pool: Пул подключений к AirSim.
+            control_period: Период цикла управления, с.
+            kwargs: Параметры орбитального движения (см. OrbitNavigator).
+        """
+        AsyncNavigator.__init__(self, executor, vehicle_name, ip, client_pool)
+        self.offset = self.init_orbit(kwargs)
+        self.control_period = control_period
+        self.home = None
+        self.center = None
+        self.camera_heading = 0
+        self.pending_snapshots = []
+        self.stop_for_capture = kwargs.get('stop_for_capture', True)
+        self.capture_workers = kwargs.get('capture_workers', 2)
+        self.capture_format = kwargs.get('capture_format', 'png')
+        self.save_directory = kwargs.get('photo_directory', 'PHOTO')
+        self.pipeline = None
+
+    async def connect(self):
+        """Подключиться к AirSim и дождаться стабилизации дрона перед расчетом центра орбиты."""
+        if self.client is not None:
+            return
+        await super().connect()
+        pos = await self.settle()
+        self.home = airsim.Vector3r(pos.x_val, pos.y_val, pos.z_val)
+        self.center = airsim.Vector3r(pos.x_val + self.offset[0], pos.y_val + self.offset[1], pos.z_val)
+
+    async def start(self):
+        """Запустить выполнение миссии."""
+        await self.connect()
+        logging.info("Армирование дрона...")
+        self.phase = 'arm'
+        await self.call(self.client.armDisarm, True, self.vehicle_name)
+
+        state = await self.get_state()
+        start = state.kinematics_estimated.position
+        if not self.takeoff and state.landed_state == airsim.LandedState.Landed:
+            self.takeoff = True
+            logging.info("Взлёт...")
+            self.phase = 'takeoff'
+            await self.lift_off()
+            start = (await self.get_state()).kinematics_estimated.position
+            z = -self.altitude + self.home.z_val
+        else:
+            logging.info("Уже летим, так что мы выйдем на орбиту на текущей высоте {}".format(start.z_val))
+            z = start.z_val
+
+        logging.info("Подъём на позицию: {},{},{}".format(start.x_val, start.y_val, z))
+        self.check_cancelled()
+        self.phase = 'climb'
+        await self.move_to(start.x_val, start.y_val, z, self.velocity)
+        self.z = z
+
+        logging.info("Набор скорости...")
+        self.phase = 'orbit'
+        if self.snapshots > 0:
+            self.pipeline = await self.call(CapturePipeline, self.ip, self.vehicle_name, self.save_directory,
+                                            self.capture_workers, self.capture_format,
+                                            factory=self.client_pool.factory)
+        try:
+            await self.fly(z)
+        finally:
+            if self.pipeline is not None:
+                await self.call(self.pipeline.close)  # Дожидаемся записи всех снимков
+
+        self.check_cancelled()
+        self.phase = 'return'
+        await self.move_to(start.x_val, start.y_val, z, self.velocity)
+        self.phase = 'done'
+        logging.info("Миссия завершена. Дрон готов к следующей миссии или посадке.")
+
+    async def fly(self, z):
+        """Цикл управления облетом по орбите.
+
+        Args:
+            z: Высота полета в координатах NED.
+        """
+        self.orbit_count = 0
+        self.start_angle = None
+        self.next_snapshot = None
+        ramptime = self.radius / 10  # Время разгона
+        self.start_time = time.time()
+
+        while self.orbit_count < self.iterations:
+            self.check_cancelled()
+            if self.snapshots > 0 and not (self.snapshot_index < self.snapshots):
+                break
+
+            # Увеличение скорости плавно, чтобы избежать резкого старта
+            speed = self.velocity
+            diff = time.time() - self.start_time
+            if diff < ramptime:
+                speed = self.velocity * diff / ramptime
+            elif ramptime > 0:
+                logging.info("Дрон набрал полную скорость...")
+                ramptime = 0
+
+            pos = (await self.get_state()).kinematics_estimated.position
+            vx, vy, angle_to_center, camera_heading = self.orbit_step(pos, speed)
+
+            if self.track_orbits(angle_to_center * 180 / math.pi):
+                self.orbit_count += 1
+                logging.info("Завершение {} круга".format(self.orbit_count))
+
+            while self.pending_snapshots:
+                await self.capture(self.pending_snapshots.pop(0))
+
+            self.camera_heading = camera_heading
+            await self.call(self.client.moveByVelocityZAsync, vx, vy, z, 1,
+                            airsim.DrivetrainType.MaxDegreeOfFreedom, airsim.YawMode(False, camera_heading),
+                            vehicle_name=self.vehicle_name)
+            # Отдаем управление циклу событий вместо холостого опроса
+            await asyncio.sleep(self.control_period)
+
+    def take_snapshot(self):
+        """Запланировать снимок: он выполняется в цикле управления после текущего шага."""
+        self.pending_snapshots.append(self.snapshot_index)
+        self.snapshot_index += 1
+        self.start_time = time.time()
+
+    async def capture(self, index):
+        """Получить снимок с камеры и передать его на запись конвейеру снимков.
+
+        Args:
+            index: Порядковый номер снимка.
+        """
+        pos = (await self.get_state()).kinematics_estimated.position
+        response = None
+        if self.stop_for_capture:
+            await self.move_to(pos.x_val, pos.y_val, self.z, 0.5, timeout=3, timeout_sec=3,
+                               drivetrain=airsim.DrivetrainType.MaxDegreeOfFreedom,
+                               yaw_mode=airsim.YawMode(False, self.camera_heading))
+            responses = await self.call(self.client.simGetImages, [self.pipeline.image_request()],
+                                        vehicle_name=self.vehicle_name)
+            response = responses[0]
+        await self.call(self.pipeline.submit, index, pos, response)
+        self.start_time = time.time()
+
+
+async def run_fleet(missions, land=True):
+    """Выполнить несколько асинхронных миссий одновременно в текущем цикле событий.
+
+    Args:
+        missions: Список экземпляров AsyncMissions.
+        land: Посадить дроны после завершения миссий.
+
+    Returns:
+        list: Результаты start() для каждой миссии (исключение, если миссия завершилась с ошибкой).
+    """
+    results = await asyncio.gather(*(mission.start() for mission in missions), return_exceptions=True)
+    for mission, result in zip(missions, results):
+        if isinstance(result, MissionCancelled):
+            logging.info(f"Миссия {mission} отменена")
+        elif isinstance(result, Exception):
+            logging.error(f"Ошибка при выполнении миссии {mission}: {result}")
+    if land:
+        await asyncio.gather(*(mission.landed() for mission in missions), return_exceptions=True)
+    return results
+
+
+def run_missions(missions, land=True, max_workers=None):
+    """Выполнить миссии в одном цикле событий с общим пулом потоков для вызовов AirSim.
+
+    Args:
+        missions: Список экземпляров AsyncNavigator.
+        land: Посадить дроны после завершения миссий.
+        max_workers: Размер пула потоков (по умолчанию DEFAULT_WORKERS). Поток занят только на время
+            отдельного вызова RPC (команды не ожидаются через join()), поэтому размер пула
+            не зависит от количества дронов.
+
+    Returns:
+        list: Результаты start() для каждой миссии.
+    """
+    executor = ThreadPoolExecutor(max_workers=max_workers or DEFAULT_WORKERS, thread_name_prefix='airsim')
+    for mission in missions:
+        if mission.executor is None:
+            mission.executor = executor
+    try:
+        return asyncio.run(run_fleet(missions, land))
+    finally:
+        executor.shutdown()
@@ -0,0 +1,91 @@
+import asyncio
+import time
+import unittest
+
+from async_missions import AsyncOrbitNavigator, AsyncSurveyNavigator, run_fleet, run_missions
+from client_pool import ClientPool
+from missions import MissionCancelled
+from mock_airsim import MockSimulator
+from plan_cache import PlanCache
+
+
+class TestAsyncSurveyNavigator(unittest.TestCase):
+    def setUp(self):
+        self.simulator = MockSimulator(time_scale=50.0)
+        self.pool = ClientPool(factory=self.simulator.client)
+
+    def survey(self, vehicle_name=''):
+        return AsyncSurveyNavigator(vehicle_name=vehicle_name, client_pool=self.pool, plan_cache=PlanCache(),
+                                    boxsize=30, stripewidth=10, altitude=30, velocity=10)
+
+    def test_init_with_missing_parameters(self):
+        with self.assertRaises(ValueError):
+            AsyncSurveyNavigator()
+
+    def test_start_and_landed(self):
+        mission = self.survey()
+
+        results = run_missions([mission])
+
+        self.assertEqual(results, [None])
+        self.assertEqual(mission.phase, 'landed')
+        # Набор высоты, перелет, обследование и возврат - один шаг скомпилированного плана
+        self.assertEqual(self.simulator.calls['moveOnPathAsync'], 1)
+        self.assertEqual(self.simulator.calls['landAsync'], 1)
+        self.assertTrue(self.simulator.vehicle('').landed(self.simulator.now()))
+
+    def test_fleet_shares_small_pool(self):
+        missions = [self.survey(f'drone{i}') for i in range(10)]
+        flight = missions[0].build_plan().estimate_time() / self.simulator.time_scale
+
+        started = time.monotonic()
+        results = run_missions(missions, land=False, max_workers=2)
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(results, [None] * 10)
+        self.assertEqual([mission.phase for mission in missions], ['done'] * 10)
+        # Два потока не ждут команды: дроны летят одновременно, а не по два
+        self.assertLess(elapsed, 10 * flight / 2)
+
+    def test_cancel(self):
+        mission = self.survey()
+
+        async def cancel_during_flight():
+            task = asyncio.ensure_future(mission.start())
+            while mission.phase != 'survey':
+                await asyncio.sleep(0.01)
+            mission.cancel()
+            with self.assertRaises(MissionCancelled):
+                await task
+            await mission.landed()  # Посадка после отмены не прерывается
+
+        asyncio.run(cancel_during_flight())
+
+        self.assertGreaterEqual(self.simulator.calls['hoverAsync'], 2)  # Зависание при отмене и перед посадкой
+        self.assertEqual(mission.phase, 'landed')
+
+    def test_fleet_reports_cancelled(self):
+        missions = [self.survey('a'), self.survey('b')]
+        missions[1].cancel()
+
+        results = asyncio.run(run_fleet(missions, land=False))
+
+        self.assertIsNone(results[0])
+        self.assertIsInstance(results[1], MissionCancelled)
+
+
+class TestAsyncOrbitNavigator(unittest.TestCase):
+    def test_orbit(self):
+        simulator = MockSimulator(time_scale=50.0)
+        mission = AsyncOrbitNavigator(client_pool=ClientPool(factory=simulator.client), radius=10, altitude=10,
+                                      velocity=10, iterations=1, center=[1, 0], snapshots=0, control_period=0.01)
+
+        run_missions([mission])
+
+        self.assertEqual(mission.orbit_count, 1)
+        self.assertEqual(mission.phase, 'landed')
+        self.assertGreater(simulator.calls['moveByVelocityZAsync'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,208 @@
+import base64
+from collections import OrderedDict
+import hashlib
+import hmac
+import os
+import threading
+import time
+
+
+# Формат хэша пароля: pbkdf2_sha256$<итерации>$<соль base64>$<хэш base64>
+ALGORITHM = 'pbkdf2_sha256'
+SALT_BYTES = 16
+MIN_ITERATIONS = 100_000  # Нижняя граница стоимости независимо от результата калибровки
+
+
+def calibrate_iterations(target=0.05, minimum=MIN_ITERATIONS, sample=20_000):
+    """Количество итераций PBKDF2, при котором хэширование пароля занимает около target секунд.
+
+    Args:
+        target: Желаемое время хэширования одного пароля на этом сервере, с.
+        minimum: Минимальное количество итераций.
+        sample: Количество итераций пробного замера.
+
+    Returns:
+        int: Количество итераций (округлено до тысяч).
+    """
+    started = time.perf_counter()
+    hashlib.pbkdf2_hmac('sha256', b'calibration', bytes(SALT_BYTES), sample)
+    elapsed = max(time.perf_counter() - started, 1e-6)
+    return max(minimum, int(sample * target / elapsed) // 1000 * 1000)
+
+
+def hash_password(password, iterations=MIN_ITERATIONS, salt=None):
+    """Хэш пароля PBKDF2-SHA256 со случайной солью.
+
+    Args:
+        password: Пароль.
+        iterations: Количество итераций (сохраняется в хэше).
+        salt: Соль (по умолчанию - случайная).
+
+    Returns:
+        str: Хэш в формате pbkdf2_sha256$<итерации>$<соль>$<хэш>.
+    """
+    salt = salt if salt is not None else os.urandom(SALT_BYTES)
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, iterations)
+    return '$'.join((ALGORITHM, str(iterations), base64.b64encode(salt).decode(), base64.b64encode(digest).decode()))
+
+
+def verify_password(password, encoded):
+    """Проверить пароль по хэшу (сравнение за постоянное время).
+
+    Записи, созданные до перехода на хэширование, хранят пароль открытым текстом;
+    они проверяются прямым сравнением (см. needs_rehash()).
+
+    Returns:
+        bool: True, если пароль верен.
+    """
+    if not encoded:
+        return False
+    parts = encoded.split('$')
+    if len(parts) != 4 or parts[0] != ALGORITHM:
+        return hmac.compare_digest(password.encode(), encoded.encode())
+    try:
+        iterations, salt, digest = int(parts[1]), base64.b64decode(parts[2]), base64.b64decode(parts[3])
+        computed = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, iterations)
+    except (ValueError, OverflowError):
+        return False  # Поврежденный хэш (в том числе неположительное количество итераций)
+    return hmac.compare_digest(computed, digest)
+
+
+def needs_rehash(encoded, iterations):
+    """True, если хэш нужно пересчитать: пароль хранится открытым текстом, стоимость ниже iterations
+    или количество итераций не читается.
+    """
+    parts = encoded.split('$')
+    if len(parts) != 4 or parts[0] != ALGORITHM:
+        return True
+    try:
+        return int(parts[1]) < iterations
+    except ValueError:
+        return True
+
+
+class Credentials:
+    def __init__(self, store, iterations=MIN_ITERATIONS, cache_size=1024, cache_ttl=300.0):
+        """Проверка учетных данных пользователей с кэшем успешных проверок.
+
+        Хэширование пароля намеренно дорогое, поэтому повторный вход с теми же
+        учетными данными проверяется по кэшу: ключ - HMAC имени и пароля на
+        случайном ключе процесса (пароли в памяти не хранятся), значение - хэш
+        пароля из хранилища на момент проверки. Запись действительна, пока хэш
+        в хранилище не изменился и не истекло время cache_ttl.
+
+        Хэши с меньшим количеством итераций и пароли открытым текстом
+        пересчитываются при успешном входе.
+
+        Args:
+            store: Хранилище пользователей (storage.Store).
+            iterations: Количество итераций PBKDF2 для новых хэшей (см. calibrate_iterations()).
+            cache_size: Максимальное количество записей кэша.
+            cache_ttl: Время жизни записи кэша, с (0 - кэш выключен).
+        """
+        self.store = store
+        self.iterations = iterations
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.hits = 0
+        self.misses = 0
+        self._key = os.urandom(32)
+        self._cache = OrderedDict()  # Ключ -> (хэш пароля, время истечения)
+        self._lock = threading.Lock()
+        # Хэш для проверки несуществующих пользователей: время ответа не выдает, есть ли пользователь
+        self._dummy = hash_password('', iterations)
+
+    def register(self, username, password):
+        """Зарегистрировать пользователя.
+
+        Returns:
+            bool: True, если пользователь добавлен, False, если он уже существует.
+        """
+        return self.store.add_user(username, hash_password(password, self.iterations))
+
+    def verify(self, username, password):
+        """Проверить имя и пароль пользователя.
+
+        Returns:
+            bool: True, если учетные данные верны.
+        """
+        encoded = self.store.get_password(username)
+        if encoded is None:
+            verify_password(password, self._dummy)
+            return False
+        key = hmac.new(self._key, f'{username}\0{password}'.encode(), hashlib.sha256).digest()
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == encoded and cached[1] > now:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return True
+            self.misses += 1
+
+        if not verify_password(password, encoded):
+            return False
+        if needs_rehash(encoded, self.iterations):
+            encoded = hash_password(password, self.iterations)
+            self.store.set_password(username, encoded)
+        if self.cache_ttl > 0:
+            with self._lock:
+                self._cache[key] = (encoded, now + self.cache_ttl)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return True
+
+    def stats(self):
+        """Статистика кэша: попадания, промахи, количество записей."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._cache)}
+
+    def clear(self):
+        """Удалить все записи кэша."""
+        with self._lock:
+            self._cache.clear()
+
+
+class RateLimiter:
+    def __init__(self, rate, burst, max_keys=10_000):
+        """Ограничитель частоты запросов по алгоритму маркерной корзины (token bucket).
+
+        У каждого ключа (например, адреса клиента) своя корзина емкостью burst,
+        которая пополняется со скоростью rate маркеров в секунду; запрос расходует
+        один маркер. Количество корзин ограничено max_keys: давно не использованные
+        удаляются (их ключи снова получают полную корзину).
+
+        Args:
+            rate: Скорость пополнения, запросов в секунду (0 - ограничение выключено).
+            burst: Емкость корзины (допустимый всплеск запросов).
+            max_keys: Максимальное количество хранимых корзин.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.rejected = 0
+        self._buckets = OrderedDict()  # Ключ -> (маркеры, время обновления)
+        self._lock = threading.Lock()
+
+    def acquire(self, key):
+        """Израсходовать маркер корзины key.
+
+        Returns:
+            float: 0, если запрос разрешен, иначе время до появления маркера, с.
+        """
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            else:
+                self.rejected += 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return 0.0 if allowed else (1 - tokens) / self.rate
@@ -0,0 +1,144 @@
+import threading
+import time
+import unittest
+
+from auth import Credentials, RateLimiter, hash_password, needs_rehash, verify_password
+from storage import MemoryStore
+
+
+# Небольшое количество итераций, чтобы тесты выполнялись быстро
+ITERATIONS = 1000
+
+
+class TestPasswordHash(unittest.TestCase):
+    def test_hash_and_verify(self):
+        encoded = hash_password('secret', ITERATIONS)
+
+        self.assertTrue(encoded.startswith(f'pbkdf2_sha256${ITERATIONS}$'))
+        self.assertNotIn('secret', encoded)
+        self.assertTrue(verify_password('secret', encoded))
+        self.assertFalse(verify_password('Secret', encoded))
+        self.assertNotEqual(encoded, hash_password('secret', ITERATIONS))  # Случайная соль
+
+    def test_plaintext_legacy(self):
+        self.assertTrue(verify_password('secret', 'secret'))
+        self.assertFalse(verify_password('other', 'secret'))
+        self.assertTrue(needs_rehash('secret', ITERATIONS))
+
+    def test_needs_rehash(self):
+        encoded = hash_password('secret', ITERATIONS)
+
+        self.assertFalse(needs_rehash(encoded, ITERATIONS))
+        self.assertTrue(needs_rehash(encoded, ITERATIONS * 2))
+
+    def test_malformed_hash(self):
+        _, _, salt, digest = hash_password('secret', ITERATIONS).split('$')
+        for iterations in ('abc', '', '0', '-5', str(2 ** 70)):
+            encoded = '$'.join(('pbkdf2_sha256', iterations, salt, digest))
+            with self.subTest(iterations=iterations):
+                self.assertFalse(verify_password('secret', encoded))
+                self.assertEqual(needs_rehash(encoded, ITERATIONS), iterations in ('abc', '', '0', '-5'))
+
+
+class TestCredentials(unittest.TestCase):
+    def setUp(self):
+        self.store = MemoryStore()
+        self.credentials = Credentials(self.store, iterations=ITERATIONS)
+
+    def test_register_and_verify(self):
+        self.assertTrue(self.credentials.register('user', 'secret'))
+        self.assertFalse(self.credentials.register('user', 'other'))
+
+        self.assertTrue(self.credentials.verify('user', 'secret'))
+        self.assertFalse(self.credentials.verify('user', 'wrong'))
+        self.assertFalse(self.credentials.verify('unknown', 'secret'))
+        self.assertNotEqual(self.store.get_password('user'), 'secret')
+
+    def test_malformed_stored_hash(self):
+        self.store.add_user('user', 'pbkdf2_sha256$abc$c2FsdA==$ZGlnZXN0')
+
+        self.assertFalse(self.credentials.verify('user', 'secret'))  # Ошибка входа, а не исключение
+
+    def test_cache_hit(self):
+        self.credentials.register('user', 'secret')
+        self.credentials.verify('user', 'secret')
+        self.credentials.verify('user', 'secret')
+
+        self.assertEqual(self.credentials.stats(), {'hits': 1, 'misses': 1, 'size': 1})
+
+    def test_cache_invalidated_by_password_change(self):
+        self.credentials.register('user', 'secret')
+        self.credentials.verify('user', 'secret')
+
+        self.store.set_password('user', hash_password('changed', ITERATIONS))
+
+        self.assertFalse(self.credentials.verify('user', 'secret'))
+        self.assertTrue(self.credentials.verify('user', 'changed'))
+
+    def test_cache_bounded(self):
+        credentials = Credentials(self.store, iterations=ITERATIONS, cache_size=2)
+        for name in ('a', 'b', 'c'):
+            credentials.register(name, 'secret')
+            credentials.verify(name, 'secret')
+
+        self.assertEqual(credentials.stats()['size'], 2)
+
+    def test_legacy_password_rehashed(self):
+        self.store.add_user('user', 'secret')
+
+        self.assertTrue(self.credentials.verify('user', 'secret'))
+        self.assertTrue(self.store.get_password('user').startswith('pbkdf2_sha256$'))
+        self.assertTrue(self.credentials.verify('user', 'secret'))
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_burst_then_reject(self):
+        limiter = RateLimiter(rate=1.0, burst=3)
+
+        self.assertEqual([limiter.acquire('a') for _ in range(3)], [0.0, 0.0, 0.0])
+        wait = limiter.acquire('a')
+        self.assertGreater(wait, 0.9)
+        self.assertLessEqual(wait, 1.0)
+        self.assertEqual(limiter.acquire('b'), 0.0)  # У другого ключа своя корзина
+        self.assertEqual(limiter.rejected, 1)
+
+    def test_refill(self):
+        limiter = RateLimiter(rate=100.0, burst=1)
+        limiter.acquire('a')
+        self.assertGreater(limiter.acquire('a'), 0)
+
+        time.sleep(0.03)
+
+        self.assertEqual(limiter.acquire('a'), 0.0)
+
+    def test_disabled(self):
+        limiter = RateLimiter(rate=0, burst=1)
+
+        self.assertEqual([limiter.acquire('a') for _ in range(10)], [0.0] * 10)
+
+    def test_keys_bounded(self):
+        limiter = RateLimiter(rate=1.0, burst=1, max_keys=10)
+        for i in range(100):
+            limiter.acquire(i)
+
+        self.assertEqual(len(limiter._buckets), 10)
+
+    def test_concurrent(self):
+        limiter = RateLimiter(rate=0.001, burst=50)
+        allowed = []
+
+        def worker():
+            for _ in range(20):
+                allowed.append(limiter.acquire('a') == 0)
+
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sum(allowed), 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
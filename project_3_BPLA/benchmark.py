@@ -0,0 +1,197 @@
+"""Бенчмарк миссий на кинематической модели AirSim (mock_airsim.py).
+
+Для каждого набора параметров измеряются время выполнения start() и landed(),
+процессорное время, количество вызовов RPC и время построения маршрута.
+Результаты сохраняются в JSON, чтобы сравнивать их между коммитами:
+
+    python benchmark.py --output before.json
+    python benchmark.py --output after.json --compare before.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+from client_pool import ClientPool
+from missions import SurveyNavigator, OrbitNavigator
+from mock_airsim import MockSimulator
+from planner import plan_rectangle, plan_orbit
+
+
+def survey_cases(quick=False):
+    """Наборы параметров SurveyNavigator."""
+    boxsizes = [30] if quick else [30, 100]
+    stripewidths = [10] if quick else [5, 10]
+    return [{'name': f'survey-box{boxsize}-stripe{stripewidth}', 'kind': 'survey',
+             'params': {'boxsize': boxsize, 'stripewidth': stripewidth, 'altitude': 30, 'velocity': 10}}
+            for boxsize in boxsizes for stripewidth in stripewidths]
+
+
+def orbit_cases(quick=False):
+    """Наборы параметров OrbitNavigator.
+
+    Оба режима отправляют команды по реальному времени с частотой control_rate, поэтому
+    выполняются без ускорения часов симулятора (time_scale=1).
+    """
+    cases = []
+    for mode in ['precomputed', 'closed_loop']:
+        for snapshots in ([4] if quick else [0, 4]):
+            params = {'radius': 10, 'altitude': 10, 'velocity': 10, 'iterations': 1, 'center': [1, 0],
+                      'snapshots': snapshots, 'mode': mode}
+            cases.append({'name': f'orbit-{mode}-snapshots{snapshots}', 'kind': 'orbit', 'params': params,
+                          'time_scale': 1.0})
+    return cases
+
+
+def planning_time(case, repeat=5):
+    """Минимальное время построения маршрута миссии, с (None, если маршрут строится в полете)."""
+    params = case['params']
+    if case['kind'] == 'survey':
+        b = params['boxsize']
+        plan = lambda: plan_rectangle(-b, b, -b, b, params['stripewidth'], params['altitude'])
+    elif params.get('mode') == 'precomputed':
+        plan = lambda: plan_orbit((params['radius'], 0), (0, 0), params['radius'], params['velocity'],
+                                  params['iterations'], params['snapshots'])
+    else:
+        return None
+    timer = timeit.Timer(plan)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def run_case(case, latency=0.0, jitter=0.0, max_speed=20.0, time_scale=20.0, seed=0):
+    """Выполнить миссию на модели симулятора и собрать метрики.
+
+    Returns:
+        dict: Параметры и результаты измерений.
+    """
+    time_scale = case.get('time_scale') or time_scale
+    simulator = MockSimulator(latency=latency, max_speed=max_speed, jitter=jitter, time_scale=time_scale, seed=seed)
+    pool = ClientPool(factory=simulator.client)
+    photos = tempfile.mkdtemp(prefix='bpla-benchmark-')
+    wall = {}
+    cpu_started = time.process_time()
+    try:
+        started = time.perf_counter()
+        if case['kind'] == 'survey':
+            mission = SurveyNavigator(client_pool=pool, **case['params'])
+        else:
+            mission = OrbitNavigator(client_pool=pool, **case['params'])
+            mission.save_directory = photos
+        wall['setup'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        mission.start()
+        wall['start'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        mission.landed()
+        wall['landed'] = time.perf_counter() - started
+    finally:
+        shutil.rmtree(photos, ignore_errors=True)
+
+    return {
+        'name': case['name'],
+        'kind': case['kind'],
+        'params': case['params'],
+        'time_scale': time_scale,
+        'wall_time': wall,
+        'total_wall_time': sum(wall.values()),
+        'cpu_time': time.process_time() - cpu_started,
+        'sim_time': simulator.now(),
+        'rpc_calls': sum(simulator.calls.values()),
+        'rpc_by_method': dict(simulator.calls),
+        'planning_time': planning_time(case),
+    }
+
+
+def git_commit():
+    """Текущий коммит репозитория или None."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, results, threshold=0.1):
+    """Сравнить результаты с сохраненными ранее.
+
+    Args:
+        baseline: Результаты предыдущего запуска (содержимое JSON).
+        results: Результаты текущего запуска.
+        threshold: Относительное изменение, начиная с которого метрика отмечается.
+
+    Returns:
+        list: Строки отчета.
+    """
+    previous = {result['name']: result for result in baseline['results']}
+    lines = []
+    for result in results['results']:
+        old = previous.get(result['name'])
+        if old is None:
+            lines.append(f"{result['name']}: нет в базовых результатах")
+            continue
+        for metric in ('total_wall_time', 'cpu_time', 'rpc_calls', 'planning_time'):
+            before, after = old.get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            mark = '  <--' if abs(change) >= threshold else ''
+            lines.append(f"{result['name']:40s} {metric:16s} {before:12.4g} -> {after:12.4g} ({change:+.1%}){mark}")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк миссий на модели AirSim")
+    parser.add_argument('--output', default='benchmark_results.json', help="Файл для сохранения результатов")
+    parser.add_argument('--compare', help="JSON предыдущего запуска для сравнения")
+    parser.add_argument('--latency', type=float, default=0.0, help="Задержка вызова RPC, с")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Шум позиции, м")
+    parser.add_argument('--max-speed', type=float, default=20.0, help="Максимальная скорость дрона, м/с")
+    parser.add_argument('--time-scale', type=float, default=20.0, help="Ускорение часов симулятора")
+    parser.add_argument('--seed', type=int, default=0, help="Начальное значение генератора шума")
+    parser.add_argument('--quick', action='store_true', help="Сокращенный набор параметров")
+    parser.add_argument('--filter', default='', help="Запускать только наборы, имя которых содержит строку")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)  # Журнал миссий не нужен в отчете
+    cases = [case for case in survey_cases(args.quick) + orbit_cases(args.quick) if args.filter in case['name']]
+    results = {
+        'meta': {
+            'commit': git_commit(),
+            'created_at': time.time(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'config': {'latency': args.latency, 'jitter': args.jitter, 'max_speed': args.max_speed,
+                       'time_scale': args.time_scale, 'seed': args.seed},
+        },
+        'results': [],
+    }
+    for case in cases:
+        result = run_case(case, args.latency, args.jitter, args.max_speed, args.time_scale, args.seed)
+        results['results'].append(result)
+        planning = result['planning_time']
+        print(f"{result['name']:40s} wall {result['total_wall_time']:7.2f} с  cpu {result['cpu_time']:7.2f} с  "
+              f"rpc {result['rpc_calls']:8d}  план {planning * 1e3 if planning else 0:8.3f} мс")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"Результаты сохранены: {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        print("\n".join(compare(baseline, results)))
+    return results
+
+
+if __name__ == '__main__':
+    main()
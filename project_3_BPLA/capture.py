@@ -0,0 +1,178 @@
+import airsim
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+# Поддерживаемые форматы снимков
+FORMATS = ('png', 'raw')
+
+
+class CaptureRequest:
+    def __init__(self, index, position=None, response=None):
+        """Запрос на снимок в очереди конвейера.
+
+        Args:
+            index: Порядковый номер снимка.
+            position: Позиция дрона в момент запроса (для журнала), airsim.Vector3r.
+            response: Уже полученный ответ simGetImages (None - получить в рабочем потоке).
+        """
+        self.index = index
+        self.position = position
+        self.response = response
+        self.requested_at = time.monotonic()
+        self.future = Future()
+
+
+class CapturePipeline:
+    def __init__(self, ip='', vehicle_name='', save_directory='PHOTO', workers=2, image_format='png',
+                 camera='Downward_Camera', max_pending=32, port=41451, factory=None):
+        """Конвейер снимков: цикл управления ставит запросы в очередь, рабочие потоки
+        получают изображение, при необходимости преобразуют его и записывают на диск.
+
+        Каждый рабочий поток использует собственное подключение к AirSim, поэтому
+        получение снимков не конкурирует с командами управления дроном.
+
+        Args:
+            ip: Адрес симулятора AirSim ('' - локальный).
+            vehicle_name: Имя дрона в settings.json AirSim.
+            save_directory: Папка для сохранения снимков.
+            workers: Количество рабочих потоков.
+            image_format: 'png' - изображение, сжатое симулятором, записывается как есть;
+                'raw' - несжатый буфер сохраняется массивом NumPy (.npy) без затрат на сжатие.
+            camera: Имя камеры дрона.
+            max_pending: Максимальная длина очереди запросов; при заполнении submit() ждет.
+            port: Порт RPC-сервера AirSim.
+            factory: Функция создания клиента с аргументами ip и port
+                (по умолчанию airsim.MultirotorClient, см. ClientPool).
+        """
+        if image_format not in FORMATS:
+            raise ValueError("Неизвестный формат снимков: {}".format(image_format))
+        if workers < 1:
+            raise ValueError("Количество рабочих потоков должно быть положительным")
+        self.ip = ip
+        self.port = port
+        self.vehicle_name = vehicle_name
+        self.save_directory = save_directory
+        self.image_format = image_format
+        self.camera = camera
+        self.factory = factory
+        self.captured = 0
+        self.failed = 0
+        self._queue = queue.Queue(max_pending)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._closed = False
+
+        os.makedirs(save_directory, exist_ok=True)  # Папка создается один раз на конвейер
+        self._threads = [threading.Thread(target=self._worker, name='capture-{}'.format(i), daemon=True)
+                         for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def image_request(self):
+        """airsim.ImageRequest для выбранного формата снимков."""
+        return airsim.ImageRequest(self.camera, airsim.ImageType.Scene, False, self.image_format == 'png')
+
+    def submit(self, index, position=None, response=None):
+        """Поставить снимок в очередь.
+
+        Args:
+            index: Порядковый номер снимка.
+            position: Позиция дрона в момент запроса.
+            response: Уже полученный ответ simGetImages, например снятый после остановки
+                дрона; тогда в рабочем потоке выполняется только запись на диск.
+
+        Returns:
+            concurrent.futures.Future: Имя сохраненного файла.
+        """
+        if self._closed:
+            raise RuntimeError("Конвейер снимков остановлен")
+        request = CaptureRequest(index, position, response)
+        try:
+            self._queue.put_nowait(request)
+        except queue.Full:
+            logging.info("Очередь снимков заполнена, ожидание рабочих потоков")
+            self._queue.put(request)
+        return request.future
+
+    def flush(self):
+        """Дождаться обработки всех запросов в очереди."""
+        self._queue.join()
+
+    def close(self):
+        """Обработать оставшиеся запросы и остановить рабочие потоки."""
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _client(self):
+        """Подключение к AirSim текущего рабочего потока."""
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = (self.factory or airsim.MultirotorClient)(ip=self.ip, port=self.port)
+            client.confirmConnection()
+            self._local.client = client
+        return client
+
+    def _worker(self):
+        """Цикл рабочего потока: получение, преобразование и запись снимков."""
+        while True:
+            request = self._queue.get()
+            try:
+                if request is None:
+                    return
+                try:
+                    filename = self._process(request)
+                except Exception as e:
+                    logging.error("Ошибка при сохранении снимка {}: {}".format(request.index, e))
+                    with self._lock:
+                        self.failed += 1
+                    request.future.set_exception(e)
+                else:
+                    with self._lock:
+                        self.captured += 1
+                    request.future.set_result(filename)
+            finally:
+                self._queue.task_done()
+
+    def _process(self, request):
+        """Получить и сохранить один снимок.
+
+        Returns:
+            str: Имя сохраненного файла.
+        """
+        response = request.response
+        if response is None:
+            response = self._client().simGetImages([self.image_request()], vehicle_name=self.vehicle_name)[0]
+
+        name = "photo_" + str(request.index)
+        if self.image_format == 'png':
+            filename = os.path.normpath(os.path.join(self.save_directory, name + '.png'))
+            airsim.write_file(filename, response.image_data_uint8)
+        else:
+            filename = os.path.normpath(os.path.join(self.save_directory, name + '.npy'))
+            image = np.frombuffer(response.image_data_uint8, dtype=np.uint8)
+            np.save(filename, image.reshape(response.height, response.width, -1))
+
+        if request.position is not None:
+            pos = request.position
+            logging.info("Снимок {} запрошен в точке: {},{},{}".format(request.index, pos.x_val, pos.y_val, pos.z_val))
+        logging.info("Снимок сохранён: {} (задержка {:.2f} с)".format(
+            filename, time.monotonic() - request.requested_at))
+        return filename
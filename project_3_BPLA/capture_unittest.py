@@ -0,0 +1,102 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import airsim
+import numpy as np
+from capture import CapturePipeline
+
+
+def image_response(width=4, height=3, data=None):
+    response = airsim.ImageResponse()
+    response.width = width
+    response.height = height
+    response.image_data_uint8 = data if data is not None else bytes(range(width * height * 3))
+    return response
+
+
+class TestCapturePipeline(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.save_directory = os.path.join(self.directory.name, 'PHOTO')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_write_given_response(self):
+        with CapturePipeline(save_directory=self.save_directory) as pipeline:
+            future = pipeline.submit(0, response=image_response(data=b'png'))
+
+        self.assertEqual(future.result(timeout=5), os.path.join(self.save_directory, 'photo_0.png'))
+        with open(future.result(), 'rb') as f:
+            self.assertEqual(f.read(), b'png')
+        self.assertEqual(pipeline.captured, 1)
+
+    def test_raw_buffer_saved_as_array(self):
+        with CapturePipeline(save_directory=self.save_directory, image_format='raw') as pipeline:
+            future = pipeline.submit(3, response=image_response())
+
+        image = np.load(future.result(timeout=5))
+        self.assertEqual(image.shape, (3, 4, 3))
+        self.assertEqual(image[0, 1].tolist(), [3, 4, 5])
+
+    @patch('airsim.MultirotorClient')
+    def test_capture_without_stopping(self, mock_client):
+        mock_client_instance = mock_client.return_value
+        mock_client_instance.simGetImages.return_value = [image_response(data=b'png')]
+
+        with CapturePipeline(vehicle_name='Drone1', save_directory=self.save_directory, workers=1) as pipeline:
+            futures = [pipeline.submit(i) for i in range(3)]
+
+        self.assertEqual(sorted(os.listdir(self.save_directory)), ['photo_0.png', 'photo_1.png', 'photo_2.png'])
+        self.assertEqual([f.result() for f in futures][1], os.path.join(self.save_directory, 'photo_1.png'))
+        self.assertEqual(mock_client.call_count, 1)  # Одно подключение на рабочий поток
+        self.assertEqual(mock_client_instance.simGetImages.call_args.kwargs['vehicle_name'], 'Drone1')
+
+    @patch('airsim.MultirotorClient')
+    def test_workers_run_in_parallel(self, mock_client):
+        mock_client.return_value.simGetImages.side_effect = lambda *args, **kwargs: (
+            time.sleep(0.2), [image_response(data=b'png')])[1]
+
+        started = time.monotonic()
+        with CapturePipeline(save_directory=self.save_directory, workers=4) as pipeline:
+            submitted = time.monotonic()
+            for i in range(4):
+                pipeline.submit(i)
+            submitted = time.monotonic() - submitted
+        elapsed = time.monotonic() - started
+
+        self.assertLess(submitted, 0.1)  # Цикл управления не ждет получения снимков
+        self.assertLess(elapsed, 4 * 0.2)
+        self.assertEqual(pipeline.captured, 4)
+
+    @patch('airsim.MultirotorClient')
+    def test_failed_capture(self, mock_client):
+        mock_client.return_value.simGetImages.side_effect = RuntimeError("нет камеры")
+
+        with CapturePipeline(save_directory=self.save_directory) as pipeline:
+            future = pipeline.submit(0)
+
+        with self.assertRaises(RuntimeError):
+            future.result(timeout=5)
+        self.assertEqual(pipeline.failed, 1)
+
+    def test_closed_pipeline(self):
+        pipeline = CapturePipeline(save_directory=self.save_directory)
+        pipeline.close()
+
+        with self.assertRaises(RuntimeError):
+            pipeline.submit(0)
+        self.assertFalse(any(thread.is_alive() for thread in threading.enumerate()
+                             if thread.name.startswith('capture-')))
+
+    def test_invalid_format(self):
+        with self.assertRaises(ValueError):
+            CapturePipeline(save_directory=self.save_directory, image_format='jpeg')
+
+
+if __name__ == '__main__':
+    unittest.main()
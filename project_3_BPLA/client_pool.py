@@ -0,0 +1,91 @@
+import airsim
+import logging
+import threading
+import time
+
+
+class ClientPool:
+    def __init__(self, factory=None, health_interval=5.0):
+        """Потокобезопасный пул подключений к AirSim.
+
+        Подключение создается один раз на пару (адрес симулятора, имя дрона) и
+        переиспользуется всеми миссиями этого дрона, поэтому миссия не платит за
+        установку соединения и confirmConnection(). Одновременно одним дроном
+        должна управлять только одна миссия: клиент AirSim не рассчитан на
+        параллельные вызовы из разных потоков.
+
+        Args:
+            factory: Функция создания клиента с аргументами ip и port
+                (по умолчанию airsim.MultirotorClient).
+            health_interval: Интервал между проверками подключения (ping), с.
+        """
+        self.factory = factory
+        self.health_interval = health_interval
+        self._clients = {}  # Ключ -> [клиент, время последней проверки]
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+    def get(self, ip='', vehicle_name='', port=41451):
+        """Вернуть подключение к дрону, создав или восстановив его при необходимости.
+
+        Args:
+            ip: Адрес симулятора AirSim ('' - локальный).
+            vehicle_name: Имя дрона в settings.json ('' - дрон по умолчанию).
+            port: Порт RPC-сервера AirSim.
+
+        Returns:
+            airsim.MultirotorClient: Подключенный клиент.
+        """
+        key = (ip, port, vehicle_name)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Подключение выполняется под блокировкой ключа, чтобы не блокировать другие дроны
+        with key_lock:
+            entry = self._clients.get(key)
+            if entry is not None and not self._healthy(entry):
+                logging.info(f"Подключение к дрону '{vehicle_name}' ({ip or 'localhost'}) потеряно, переподключение")
+                entry = None
+            if entry is None:
+                entry = [self._connect(ip, port), time.monotonic()]
+                with self._lock:
+                    self._clients[key] = entry
+            return entry[0]
+
+    def discard(self, ip='', vehicle_name='', port=41451):
+        """Удалить подключение из пула (например, после ошибки RPC)."""
+        with self._lock:
+            self._clients.pop((ip, port, vehicle_name), None)
+
+    def clear(self):
+        """Удалить все подключения из пула."""
+        with self._lock:
+            self._clients.clear()
+            self._key_locks.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._clients)
+
+    def _connect(self, ip, port):
+        """Создать новое подключение к симулятору."""
+        factory = self.factory or airsim.MultirotorClient
+        client = factory(ip=ip, port=port)
+        client.confirmConnection()  # Подтверждение подключения
+        return client
+
+    def _healthy(self, entry):
+        """Проверить подключение, если с последней проверки прошло больше health_interval."""
+        now = time.monotonic()
+        if now - entry[1] < self.health_interval:
+            return True
+        try:
+            entry[0].ping()
+        except Exception:
+            return False
+        entry[1] = now
+        return True
+
+
+# Общий пул подключений процесса
+default_pool = ClientPool()
@@ -0,0 +1,50 @@
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from client_pool import ClientPool
+
+
+class TestClientPool(unittest.TestCase):
+    def test_reuses_client_per_vehicle(self):
+        factory = MagicMock(side_effect=lambda **kwargs: MagicMock())
+        pool = ClientPool(factory=factory)
+
+        first = pool.get(vehicle_name='Drone1')
+        second = pool.get(vehicle_name='Drone1')
+        other = pool.get(vehicle_name='Drone2')
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+        self.assertEqual(factory.call_count, 2)
+        self.assertEqual(first.confirmConnection.call_count, 1)
+
+    def test_reconnects_unhealthy_client(self):
+        factory = MagicMock(side_effect=lambda **kwargs: MagicMock())
+        pool = ClientPool(factory=factory, health_interval=0)
+
+        first = pool.get(vehicle_name='Drone1')
+        first.ping.side_effect = ConnectionError("RPC недоступен")
+        second = pool.get(vehicle_name='Drone1')
+
+        self.assertIsNot(first, second)
+        self.assertEqual(factory.call_count, 2)
+
+    def test_concurrent_get_connects_once(self):
+        factory = MagicMock(side_effect=lambda **kwargs: MagicMock())
+        pool = ClientPool(factory=factory)
+        clients = []
+
+        threads = [threading.Thread(target=lambda: clients.append(pool.get(vehicle_name='Drone1')))
+                   for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(factory.call_count, 1)
+        self.assertEqual(len(set(map(id, clients))), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
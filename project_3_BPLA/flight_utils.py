@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import time
+
+import numpy as np
+
+
+class RateLimiter:
+    def __init__(self, rate):
+        """Ограничитель частоты цикла управления.
+
+        Args:
+            rate: Частота, Гц.
+        """
+        if rate <= 0:
+            raise ValueError("Частота должна быть положительной")
+        self.period = 1.0 / rate
+        self._next = None
+
+    def wait(self):
+        """Дождаться начала следующего такта.
+
+        Если цикл отстал больше чем на такт (например, из-за снимка), пропущенные
+        такты не выполняются пачкой, а отсчет начинается заново.
+        """
+        now = time.monotonic()
+        if self._next is None or now - self._next > self.period:
+            self._next = now
+        delay = self._next - now
+        if delay > 0:
+            time.sleep(delay)
+        self._next += self.period
+
+    def reset(self):
+        """Начать отсчет тактов заново."""
+        self._next = None
+
+
+def _xyz(position):
+    """Координаты позиции airsim.Vector3r, Position или последовательности x, y, z."""
+    if hasattr(position, 'x_val'):
+        return float(position.x_val), float(position.y_val), float(position.z_val)
+    if hasattr(position, 'x'):
+        return float(position.x), float(position.y), float(position.z)
+    return tuple(position)
+
+
+class SettleDetector:
+    def __init__(self, window=5, tolerance=0.05):
+        """Проверка стабилизации по скользящему окну позиций.
+
+        Дрон считается стабилизировавшимся, когда стандартное отклонение каждой
+        координаты в последних window замерах не превышает tolerance.
+
+        Args:
+            window: Размер окна, замеров.
+            tolerance: Допустимое стандартное отклонение координат, м.
+        """
+        if window < 2:
+            raise ValueError("Окно должно содержать не менее двух замеров")
+        self.window = window
+        self.tolerance = tolerance
+        self._samples = np.empty((window, 3))
+        self._count = 0
+
+    def add(self, position):
+        """Добавить замер позиции.
+
+        Returns:
+            bool: True, если позиция стабилизировалась.
+        """
+        self._samples[self._count % self.window] = _xyz(position)
+        self._count += 1
+        if self._count < self.window:
+            return False
+        return bool(self._samples.var(axis=0).max() <= self.tolerance ** 2)
+
+
+def wait_until_settled(sample, rate=20.0, window=5, tolerance=0.05, timeout=10.0):
+    """Дождаться стабилизации позиции дрона.
+
+    Args:
+        sample: Функция без аргументов, возвращающая текущую позицию дрона.
+        rate: Частота опроса позиции, Гц.
+        window: Размер скользящего окна, замеров.
+        tolerance: Допустимое стандартное отклонение координат в окне, м.
+        timeout: Максимальное время ожидания, с.
+
+    Returns:
+        tuple: Признак стабилизации (False, если истекло время ожидания) и последняя позиция.
+    """
+    detector = SettleDetector(window, tolerance)
+    limiter = RateLimiter(rate)
+    deadline = time.monotonic() + timeout
+    while True:
+        limiter.wait()
+        position = sample()
+        if detector.add(position):
+            return True, position
+        if time.monotonic() >= deadline:
+            logging.info("Позиция дрона не стабилизировалась за {} с, продолжаем".format(timeout))
+            return False, position
+
+
+async def async_wait_until_settled(sample, rate=20.0, window=5, tolerance=0.05, timeout=10.0):
+    """Асинхронный вариант wait_until_settled.
+
+    Args:
+        sample: Корутинная функция без аргументов, возвращающая текущую позицию дрона.
+        rate, window, tolerance, timeout: См. wait_until_settled.
+
+    Returns:
+        tuple: Признак стабилизации и последняя позиция.
+    """
+    detector = SettleDetector(window, tolerance)
+    period = 1.0 / rate
+    deadline = time.monotonic() + timeout
+    while True:
+        started = time.monotonic()
+        position = await sample()
+        if detector.add(position):
+            return True, position
+        if time.monotonic() >= deadline:
+            logging.info("Позиция дрона не стабилизировалась за {} с, продолжаем".format(timeout))
+            return False, position
+        await asyncio.sleep(max(period - (time.monotonic() - started), 0))
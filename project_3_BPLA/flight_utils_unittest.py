@@ -0,0 +1,80 @@
+import asyncio
+import time
+import unittest
+
+import airsim
+from flight_utils import RateLimiter, SettleDetector, wait_until_settled, async_wait_until_settled
+
+
+class TestSettleDetector(unittest.TestCase):
+    def test_settles_after_full_window(self):
+        detector = SettleDetector(window=3, tolerance=0.05)
+
+        self.assertFalse(detector.add(airsim.Vector3r(1, 2, -10)))
+        self.assertFalse(detector.add(airsim.Vector3r(1, 2, -10)))
+        self.assertTrue(detector.add(airsim.Vector3r(1.01, 2, -10)))
+
+    def test_drift_is_not_settled(self):
+        detector = SettleDetector(window=3, tolerance=0.05)
+
+        for x in range(10):
+            settled = detector.add((x * 0.5, 0, -10))
+
+        self.assertFalse(settled)
+
+    def test_window_slides(self):
+        detector = SettleDetector(window=3, tolerance=0.05)
+
+        for position in [(5, 0, 0), (0, 0, 0), (0, 0, 0)]:
+            self.assertFalse(detector.add(position))
+        self.assertTrue(detector.add((0, 0, 0)))
+
+
+class TestWaitUntilSettled(unittest.TestCase):
+    def test_returns_last_position(self):
+        positions = iter([(3, 0, 0), (1, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0)])
+
+        settled, position = wait_until_settled(lambda: next(positions), rate=100, window=3)
+
+        self.assertTrue(settled)
+        self.assertEqual(position, (0, 0, 0))
+
+    def test_timeout(self):
+        positions = iter(range(1000))
+
+        settled, position = wait_until_settled(lambda: (next(positions), 0, 0), rate=100, timeout=0.1)
+
+        self.assertFalse(settled)
+        self.assertGreater(position[0], 0)
+
+    def test_async(self):
+        async def sample():
+            return airsim.Vector3r(0, 0, -10)
+
+        started = time.monotonic()
+        settled, position = asyncio.run(async_wait_until_settled(sample, rate=100, window=5))
+
+        self.assertTrue(settled)
+        self.assertEqual(position.z_val, -10)
+        self.assertLess(time.monotonic() - started, 0.5)
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_fixed_rate(self):
+        limiter = RateLimiter(50)
+
+        started = time.monotonic()
+        for _ in range(6):
+            limiter.wait()
+        elapsed = time.monotonic() - started
+
+        self.assertGreaterEqual(elapsed, 5 / 50 - 0.005)
+        self.assertLess(elapsed, 0.5)
+
+    def test_invalid_rate(self):
+        with self.assertRaises(ValueError):
+            RateLimiter(0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,296 @@
+from collections import defaultdict
+from contextlib import contextmanager
+import functools
+import json
+import math
+import threading
+import time
+
+
+# Границы корзин гистограмм, с
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0, 300.0)
+
+# Описания метрик для вывода в формате Prometheus
+DESCRIPTIONS = {
+    'bpla_rpc_seconds': "Время вызова метода клиента AirSim",
+    'bpla_rpc_join_seconds': "Время ожидания join() асинхронной команды AirSim",
+    'bpla_rpc_errors_total': "Ошибки вызовов клиента AirSim",
+    'bpla_phase_seconds': "Длительность этапов миссий",
+    'bpla_compute_seconds': "Время вычислений в цикле управления",
+    'bpla_http_request_seconds': "Время обработки запросов API",
+    'bpla_missions': "Количество активных миссий",
+    'bpla_plan_cache': "Статистика кэша маршрутов",
+    'bpla_credential_cache': "Статистика кэша проверок пароля",
+    'bpla_auth_rejected': "Запросы входа и регистрации, отклоненные ограничителем частоты",
+}
+
+
+class Metrics:
+    def __init__(self, enabled=False, buckets=DEFAULT_BUCKETS):
+        """Реестр счетчиков и гистограмм времени.
+
+        Пока реестр выключен, observe() и inc() ничего не делают, а клиенты AirSim
+        не оборачиваются (см. instrument()), поэтому инструментирование почти ничего
+        не стоит.
+
+        Args:
+            enabled: Включить сбор метрик.
+            buckets: Границы корзин гистограмм, с.
+        """
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self._histograms = {}  # (имя, метки) -> [количество, сумма, счетчики корзин]
+        self._counters = defaultdict(float)
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds, labels=None):
+        """Добавить замер времени в гистограмму name."""
+        if not self.enabled:
+            return
+        key = (name, _labels(labels))
+        with self._lock:
+            entry = self._histograms.get(key)
+            if entry is None:
+                entry = self._histograms[key] = [0, 0.0, [0] * len(self.buckets)]
+            entry[0] += 1
+            entry[1] += seconds
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    entry[2][i] += 1
+                    break
+
+    def inc(self, name, labels=None, value=1):
+        """Увеличить счетчик name."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[(name, _labels(labels))] += value
+
+    def set(self, name, value, labels=None):
+        """Установить значение показателя name."""
+        with self._lock:
+            self._gauges[(name, _labels(labels))] = value
+
+    @contextmanager
+    def timer(self, name, labels=None):
+        """Измерить время выполнения блока with."""
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, labels)
+
+    def reset(self):
+        """Удалить все накопленные метрики."""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._gauges.clear()
+
+    def snapshot(self):
+        """Накопленные метрики.
+
+        Returns:
+            dict: Гистограммы (количество и сумма), счетчики и показатели по именам и меткам.
+        """
+        with self._lock:
+            return {
+                'histograms': [{'name': name, 'labels': dict(labels), 'count': entry[0], 'sum': entry[1]}
+                               for (name, labels), entry in self._histograms.items()],
+                'counters': [{'name': name, 'labels': dict(labels), 'value': value}
+                             for (name, labels), value in self._counters.items()],
+                'gauges': [{'name': name, 'labels': dict(labels), 'value': value}
+                           for (name, labels), value in self._gauges.items()],
+            }
+
+    def render(self):
+        """Метрики в текстовом формате Prometheus."""
+        with self._lock:
+            histograms = {key: (entry[0], entry[1], list(entry[2])) for key, entry in self._histograms.items()}
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+
+        lines = []
+        for kind, series in (('histogram', histograms), ('counter', counters), ('gauge', gauges)):
+            for name in sorted({name for name, _ in series}):
+                lines.append(f"# HELP {name} {DESCRIPTIONS.get(name, name)}")
+                lines.append(f"# TYPE {name} {kind}")
+                for (series_name, labels), value in sorted(series.items()):
+                    if series_name != name:
+                        continue
+                    if kind != 'histogram':
+                        lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                        continue
+                    count, total, buckets = value
+                    cumulative = 0
+                    for bound, bucket in zip(self.buckets, buckets):
+                        cumulative += bucket
+                        lines.append(f"{name}_bucket{_format_labels(labels + (('le', _format_value(bound)),))} "
+                                     f"{cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels):
+    """Метки в виде ключа словаря."""
+    return tuple(sorted(labels.items())) if labels else ()
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + '}'
+
+
+def _format_value(value):
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+# Общий реестр процесса
+metrics = Metrics()
+
+
+class MissionProfile:
+    def __init__(self, kind=''):
+        """Разбивка времени одной миссии по этапам и вызовам AirSim.
+
+        Args:
+            kind: Тип миссии (метка kind в bpla_phase_seconds).
+        """
+        self.kind = kind
+        self.phases = defaultdict(float)  # Этап -> суммарная длительность, с
+        self.rpc_calls = defaultdict(int)
+        self.rpc_seconds = defaultdict(float)  # Метод -> время вызовов и ожидания join(), с
+        self._phase = None
+        self._entered = None
+        self._lock = threading.Lock()
+
+    def enter_phase(self, phase):
+        """Отметить начало этапа; длительность предыдущего этапа учитывается в метриках."""
+        now = time.perf_counter()
+        with self._lock:
+            previous, entered = self._phase, self._entered
+            self._phase, self._entered = phase, now
+            if previous is not None:
+                self.phases[previous] += now - entered
+        if previous is not None:
+            metrics.observe('bpla_phase_seconds', now - entered, {'kind': self.kind, 'phase': previous})
+
+    def record_rpc(self, method, seconds, call=True):
+        """Учесть вызов (call=True) или ожидание join() метода AirSim."""
+        with self._lock:
+            if call:
+                self.rpc_calls[method] += 1
+            self.rpc_seconds[method] += seconds
+
+    def to_dict(self):
+        """Разбивка времени для JSON."""
+        with self._lock:
+            phases = dict(self.phases)
+            if self._phase is not None:
+                phases[self._phase] = phases.get(self._phase, 0.0) + time.perf_counter() - self._entered
+            return {'kind': self.kind, 'phases': phases, 'rpc_calls': dict(self.rpc_calls),
+                    'rpc_seconds': dict(self.rpc_seconds)}
+
+    def save(self, path):
+        """Записать разбивку времени в файл JSON."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+
+class InstrumentedFuture:
+    def __init__(self, future, method, vehicle_name='', profile=None):
+        """Результат асинхронной команды AirSim с замером времени join()."""
+        self._future = future
+        self._method = method
+        self._labels = {'method': method, 'vehicle': vehicle_name}
+        self._profile = profile
+
+    def join(self):
+        started = time.perf_counter()
+        try:
+            return self._future.join()
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.observe('bpla_rpc_join_seconds', elapsed, self._labels)
+            if self._profile is not None:
+                self._profile.record_rpc(self._method, elapsed, call=False)
+
+    def __getattr__(self, name):
+        return getattr(self._future, name)
+
+
+class InstrumentedClient:
+    def __init__(self, client, vehicle_name='', profile=None):
+        """Обертка клиента AirSim, измеряющая время каждого вызова.
+
+        Args:
+            client: Клиент AirSim.
+            vehicle_name: Имя дрона (метка vehicle).
+            profile: Разбивка времени миссии (MissionProfile) или None.
+        """
+        self._client = client
+        self._vehicle_name = vehicle_name
+        self._profile = profile
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+        labels = {'method': name, 'vehicle': self._vehicle_name}
+
+        @functools.wraps(attr)
+        def call(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = attr(*args, **kwargs)
+            except Exception:
+                metrics.inc('bpla_rpc_errors_total', labels)
+                raise
+            finally:
+                elapsed = time.perf_counter() - started
+                metrics.observe('bpla_rpc_seconds', elapsed, labels)
+                if self._profile is not None:
+                    self._profile.record_rpc(name, elapsed)
+            if name.endswith('Async'):
+                return InstrumentedFuture(result, name, self._vehicle_name, self._profile)
+            return result
+
+        self.__dict__[name] = call  # Следующие вызовы не проходят через __getattr__
+        return call
+
+
+def instrument(client, vehicle_name='', profile=None):
+    """Обернуть клиента AirSim, если сбор метрик включен или вызовы учитываются в разбивке
+    времени profile, иначе вернуть его без изменений.
+    """
+    if not metrics.enabled and profile is None:
+        return client
+    return InstrumentedClient(client, vehicle_name, profile)
+
+
+def timed(section):
+    """Декоратор: время выполнения функции учитывается в bpla_compute_seconds{section=...}."""
+    labels = {'section': section}
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return fn(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                metrics.observe('bpla_compute_seconds', time.perf_counter() - started, labels)
+        return wrapper
+    return decorator
@@ -0,0 +1,145 @@
+import json
+import os
+import tempfile
+import unittest
+
+from client_pool import ClientPool
+from instrumentation import (InstrumentedClient, Metrics, MissionProfile, instrument, metrics, timed)
+from missions import SurveyNavigator
+from mock_airsim import MockSimulator
+
+
+class TestMetrics(unittest.TestCase):
+    def test_disabled(self):
+        registry = Metrics()
+        registry.observe('bpla_rpc_seconds', 0.1)
+        registry.inc('bpla_rpc_errors_total')
+        with registry.timer('bpla_compute_seconds'):
+            pass
+
+        snapshot = registry.snapshot()
+        self.assertEqual(snapshot['histograms'], [])
+        self.assertEqual(snapshot['counters'], [])
+
+    def test_render(self):
+        registry = Metrics(enabled=True, buckets=(0.1, 1.0))
+        registry.observe('bpla_rpc_seconds', 0.05, {'method': 'ping'})
+        registry.observe('bpla_rpc_seconds', 0.5, {'method': 'ping'})
+        registry.observe('bpla_rpc_seconds', 5.0, {'method': 'ping'})
+        registry.inc('bpla_rpc_errors_total', {'method': 'ping'})
+        registry.set('bpla_missions', 2, {'status': 'running'})
+
+        lines = registry.render().splitlines()
+        self.assertIn('# TYPE bpla_rpc_seconds histogram', lines)
+        self.assertIn('bpla_rpc_seconds_bucket{method="ping",le="0.1"} 1', lines)
+        self.assertIn('bpla_rpc_seconds_bucket{method="ping",le="1"} 2', lines)
+        self.assertIn('bpla_rpc_seconds_bucket{method="ping",le="+Inf"} 3', lines)
+        self.assertIn('bpla_rpc_seconds_sum{method="ping"} 5.55', lines)
+        self.assertIn('bpla_rpc_seconds_count{method="ping"} 3', lines)
+        self.assertIn('# TYPE bpla_rpc_errors_total counter', lines)
+        self.assertIn('bpla_rpc_errors_total{method="ping"} 1', lines)
+        self.assertIn('bpla_missions{status="running"} 2', lines)
+
+    def test_label_escaping(self):
+        registry = Metrics(enabled=True)
+        registry.inc('bpla_rpc_errors_total', {'method': 'a"b'})
+        self.assertIn('bpla_rpc_errors_total{method="a\\"b"} 1', registry.render())
+
+
+class InstrumentedTestCase(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+        metrics.enabled = True
+
+    def tearDown(self):
+        metrics.enabled = False
+        metrics.reset()
+
+    def histogram(self, name, **labels):
+        for entry in metrics.snapshot()['histograms']:
+            if entry['name'] == name and entry['labels'] == labels:
+                return entry
+        return None
+
+
+class TestInstrumentedClient(InstrumentedTestCase):
+    def test_instrument_disabled(self):
+        client = object()
+        metrics.enabled = False
+        self.assertIs(instrument(client), client)
+        self.assertIsInstance(instrument(client, profile=MissionProfile()), InstrumentedClient)
+
+    def test_rpc_and_join(self):
+        simulator = MockSimulator(time_scale=100.0)
+        profile = MissionProfile('test')
+        client = instrument(simulator.client(), 'Drone1', profile)
+        self.assertIsInstance(client, InstrumentedClient)
+
+        client.getMultirotorState('Drone1')
+        client.moveToPositionAsync(10, 0, 0, 10, vehicle_name='Drone1').join()
+
+        self.assertEqual(self.histogram('bpla_rpc_seconds', method='getMultirotorState', vehicle='Drone1')['count'], 1)
+        join = self.histogram('bpla_rpc_join_seconds', method='moveToPositionAsync', vehicle='Drone1')
+        self.assertGreater(join['sum'], 0.005)
+        self.assertEqual(profile.rpc_calls['moveToPositionAsync'], 1)
+        self.assertGreaterEqual(profile.rpc_seconds['moveToPositionAsync'], join['sum'])
+
+    def test_rpc_error(self):
+        class Broken:
+            def ping(self):
+                raise ConnectionError("нет связи")
+
+        client = instrument(Broken())
+        with self.assertRaises(ConnectionError):
+            client.ping()
+        counters = metrics.snapshot()['counters']
+        self.assertEqual(counters[0]['name'], 'bpla_rpc_errors_total')
+
+    def test_timed(self):
+        @timed('section')
+        def compute(x):
+            return x * 2
+
+        self.assertEqual(compute(2), 4)
+        self.assertEqual(self.histogram('bpla_compute_seconds', section='section')['count'], 1)
+
+    def test_mission_profile(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'timings.json')
+            simulator = MockSimulator(time_scale=50.0)
+            mission = SurveyNavigator(boxsize=10, stripewidth=5, altitude=10, velocity=10, timing_log=path,
+                                      client_pool=ClientPool(factory=simulator.client))
+            mission.start()
+            mission.landed()
+
+            with open(path, encoding='utf-8') as f:
+                timings = json.load(f)
+        for phase in ('arm', 'takeoff', 'survey', 'landing'):
+            self.assertIn(phase, timings['phases'])
+        self.assertEqual(timings['rpc_calls']['moveOnPathAsync'], 1)  # Набор высоты, обследование и возврат
+        self.assertIsNotNone(self.histogram('bpla_phase_seconds', kind='SurveyNavigator', phase='survey'))
+
+    def test_mission_profile_without_metrics(self):
+        metrics.enabled = False
+        simulator = MockSimulator(time_scale=50.0)
+        pool = ClientPool(factory=simulator.client)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'timings.json')
+            mission = SurveyNavigator(boxsize=10, stripewidth=5, altitude=10, velocity=10, timing_log=path,
+                                      client_pool=pool)
+            mission.start()
+            mission.landed()
+
+            with open(path, encoding='utf-8') as f:
+                timings = json.load(f)
+        # Вызовы AirSim учитываются в разбивке времени, даже если метрики не собираются
+        self.assertEqual(timings['rpc_calls']['moveOnPathAsync'], 1)
+        self.assertGreater(timings['rpc_seconds']['landAsync'], 0)
+        self.assertEqual(metrics.snapshot()['histograms'], [])
+        # Без timing_log клиент не оборачивается
+        mission = SurveyNavigator(boxsize=10, stripewidth=5, altitude=10, velocity=10, client_pool=pool)
+        self.assertNotIsInstance(mission.client, InstrumentedClient)
+
+
+if __name__ == '__main__':
+    unittest.main()
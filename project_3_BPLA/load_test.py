@@ -0,0 +1,289 @@
+"""Нагрузочное тестирование API server.py.
+
+Каждый виртуальный оператор регистрируется, входит в систему и выполняет заданное
+количество циклов: список пользователей, метрики системы, запуск миссии обследования,
+запрос состояния миссии и посадка. Для каждого эндпоинта и каждого уровня
+параллельности вычисляются p50/p95/p99 задержки и пропускная способность.
+
+По умолчанию сервер запускается в этом же процессе с моделью симулятора
+(BPLA_AIRSIM_BACKEND=mock) и временной базой SQLite:
+
+    python load_test.py --concurrency 1 4 16 --output before.json
+    python load_test.py --concurrency 1 4 16 --output after.json --compare before.json
+
+Параметр --url направляет нагрузку на уже запущенный сервер.
+"""
+import argparse
+from collections import defaultdict
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+import numpy as np
+
+
+SURVEY_PARAMS = {'boxsize': 10, 'stripewidth': 5, 'altitude': 10, 'velocity': 10}
+
+
+class LatencyRecorder:
+    def __init__(self):
+        """Потокобезопасный сбор задержек запросов по эндпоинтам."""
+        self._samples = defaultdict(list)  # Эндпоинт -> [(задержка, HTTP-статус)]
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, latency, status):
+        """Сохранить результат запроса (status=0 - ошибка соединения)."""
+        with self._lock:
+            self._samples[endpoint].append((latency, status))
+
+    def summary(self, duration):
+        """Сводка по эндпоинтам за тест длительностью duration секунд."""
+        with self._lock:
+            samples = {endpoint: list(values) for endpoint, values in self._samples.items()}
+        endpoints = {endpoint: summarize([latency for latency, _ in values], [status for _, status in values], duration)
+                     for endpoint, values in samples.items()}
+        everything = [sample for values in samples.values() for sample in values]
+        total = summarize([latency for latency, _ in everything], [status for _, status in everything], duration)
+        return endpoints, total
+
+
+def summarize(latencies, statuses, duration):
+    """Статистика задержек одного эндпоинта.
+
+    Args:
+        latencies: Задержки запросов, с.
+        statuses: HTTP-статусы ответов (0 - ошибка соединения).
+        duration: Длительность теста, с.
+
+    Returns:
+        dict: Количество запросов, ошибки (5xx и ошибки соединения), статусы,
+            пропускная способность (запросов/с) и перцентили задержки, мс.
+    """
+    latencies = np.asarray(latencies, dtype=float) * 1e3
+    counts = defaultdict(int)
+    for status in statuses:
+        counts[str(status)] += 1
+    result = {
+        'requests': len(latencies),
+        'errors': sum(1 for status in statuses if status == 0 or status >= 500),
+        'statuses': dict(counts),
+        'throughput': len(latencies) / duration if duration > 0 else 0.0,
+    }
+    if len(latencies):
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        result.update(mean_ms=float(latencies.mean()), p50_ms=float(p50), p95_ms=float(p95), p99_ms=float(p99),
+                      max_ms=float(latencies.max()))
+    return result
+
+
+class Operator:
+    def __init__(self, base_url, recorder, name, vehicle_name, timeout=30.0):
+        """Виртуальный оператор, выполняющий сценарий работы с API.
+
+        Args:
+            base_url: Адрес сервера, например http://127.0.0.1:5000.
+            recorder: Сбор задержек (LatencyRecorder).
+            name: Имя пользователя.
+            vehicle_name: Дрон, на котором оператор запускает миссии.
+            timeout: Таймаут запроса, с.
+        """
+        self.base_url = base_url.rstrip('/')
+        self.recorder = recorder
+        self.name = name
+        self.vehicle_name = vehicle_name
+        self.timeout = timeout
+        self.token = None
+
+    def request(self, method, path, body=None, endpoint=None):
+        """Выполнить запрос и сохранить его задержку.
+
+        Returns:
+            tuple: HTTP-статус и тело ответа (dict или None).
+        """
+        data = json.dumps(body).encode() if body is not None else None
+        headers = {'Content-Type': 'application/json'} if data is not None else {}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        req = urllib.request.Request(self.base_url + path, data=data, headers=headers, method=method)
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                status, payload = response.status, response.read()
+        except urllib.error.HTTPError as e:
+            status, payload = e.code, e.read()
+        except OSError as e:
+            logging.info(f"Ошибка запроса {method} {path}: {e}")
+            status, payload = 0, b''
+        self.recorder.record(endpoint or f'{method} {path}', time.perf_counter() - started, status)
+        try:
+            return status, json.loads(payload) if payload else None
+        except ValueError:
+            return status, None
+
+    def run(self, iterations):
+        """Регистрация, вход и iterations циклов работы с миссиями."""
+        credentials = {'username': self.name, 'password': 'secret'}
+        self.request('POST', '/api/register', credentials)
+        status, body = self.request('POST', '/api/login', credentials)
+        if status != 200:
+            return
+        self.token = body['access_token']
+        for _ in range(iterations):
+            self.request('GET', '/api/users')
+            self.request('GET', '/api/system_info')
+            status, body = self.request('POST', '/api/survey_navigator/start',
+                                        dict(SURVEY_PARAMS, vehicle_name=self.vehicle_name))
+            if status == 202:
+                self.request('GET', f"/api/missions/{body['mission_id']}", endpoint='GET /api/missions/<id>')
+                self.request('POST', '/api/survey_navigator/land')
+
+
+def run_load(base_url, concurrency, iterations=5, timeout=30.0):
+    """Запустить concurrency операторов одновременно.
+
+    Returns:
+        dict: Параметры запуска, сводка по эндпоинтам и общая сводка.
+    """
+    recorder = LatencyRecorder()
+    prefix = uuid.uuid4().hex[:8]  # Уникальные имена для повторных запусков против одного сервера
+    operators = [Operator(base_url, recorder, f'load-{prefix}-{i}', f'Drone{i}', timeout) for i in range(concurrency)]
+    barrier = threading.Barrier(concurrency)
+
+    def session(operator):
+        barrier.wait()
+        operator.run(iterations)
+
+    threads = [threading.Thread(target=session, args=(operator,)) for operator in operators]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duration = time.perf_counter() - started
+    endpoints, total = recorder.summary(duration)
+    return {'concurrency': concurrency, 'iterations': iterations, 'duration': duration, 'endpoints': endpoints,
+            'total': total}
+
+
+def start_server(database=None, time_scale=20.0):
+    """Запустить server.py в этом процессе на свободном порту с моделью симулятора.
+
+    Args:
+        database: Путь к базе SQLite (None - временный файл, '' - хранение в памяти).
+        time_scale: Ускорение часов модели симулятора.
+
+    Returns:
+        tuple: Адрес сервера и функция его остановки.
+    """
+    from werkzeug.serving import make_server
+
+    if database is None:
+        database = os.path.join(tempfile.mkdtemp(prefix='bpla-load-'), 'bpla.db')
+    os.environ['BPLA_AIRSIM_BACKEND'] = 'mock'
+    os.environ['BPLA_MOCK_TIME_SCALE'] = str(time_scale)
+    os.environ['BPLA_DATABASE'] = database
+    # Все операторы обращаются с одного адреса: ограничение частоты входа исказило бы замеры
+    os.environ.setdefault('BPLA_AUTH_RATE', '0')
+    import server  # Конфигурация читается из переменных окружения при импорте
+
+    http = make_server('127.0.0.1', 0, server.app, threaded=True)
+    thread = threading.Thread(target=http.serve_forever, name='load-test-server', daemon=True)
+    thread.start()
+
+    def shutdown():
+        http.shutdown()
+        thread.join()
+
+    return f'http://127.0.0.1:{http.server_port}', shutdown
+
+
+def compare(baseline, results, threshold=0.1):
+    """Сравнить p50/p95/p99 и пропускную способность с предыдущим запуском.
+
+    Returns:
+        list: Строки отчета; изменения больше threshold отмечаются.
+    """
+    previous = {run['concurrency']: run for run in baseline['runs']}
+    lines = []
+    for run in results['runs']:
+        old = previous.get(run['concurrency'])
+        if old is None:
+            lines.append(f"concurrency={run['concurrency']}: нет в базовых результатах")
+            continue
+        for endpoint, summary in sorted(run['endpoints'].items()) + [('TOTAL', run['total'])]:
+            before = old['total'] if endpoint == 'TOTAL' else old['endpoints'].get(endpoint)
+            if before is None:
+                continue
+            for metric in ('p50_ms', 'p95_ms', 'p99_ms', 'throughput'):
+                a, b = before.get(metric), summary.get(metric)
+                if not a or b is None:
+                    continue
+                change = (b - a) / a
+                mark = '  <--' if abs(change) >= threshold else ''
+                lines.append(f"c={run['concurrency']:<4d} {endpoint:36s} {metric:11s} {a:10.2f} -> {b:10.2f} "
+                             f"({change:+.1%}){mark}")
+    return lines
+
+
+def print_run(run):
+    print(f"\nconcurrency={run['concurrency']}  {run['duration']:.2f} с  "
+          f"{run['total']['throughput']:.1f} запросов/с  ошибок {run['total']['errors']}")
+    print(f"{'эндпоинт':36s} {'n':>6s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'rps':>8s}")
+    for endpoint, summary in sorted(run['endpoints'].items()):
+        print(f"{endpoint:36s} {summary['requests']:6d} {summary.get('p50_ms', 0):8.1f} "
+              f"{summary.get('p95_ms', 0):8.1f} {summary.get('p99_ms', 0):8.1f} {summary['throughput']:8.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Нагрузочное тестирование API server.py")
+    parser.add_argument('--url', help="Адрес запущенного сервера (по умолчанию сервер запускается в этом процессе)")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16],
+                        help="Уровни параллельности (количество операторов)")
+    parser.add_argument('--iterations', type=int, default=5, help="Циклов работы с миссиями на оператора")
+    parser.add_argument('--timeout', type=float, default=30.0, help="Таймаут запроса, с")
+    parser.add_argument('--database', help="База SQLite встроенного сервера ('' - в памяти)")
+    parser.add_argument('--time-scale', type=float, default=20.0, help="Ускорение часов модели симулятора")
+    parser.add_argument('--output', default='load_test_results.json', help="Файл для сохранения результатов")
+    parser.add_argument('--compare', help="JSON предыдущего запуска для сравнения")
+    args = parser.parse_args(argv)
+
+    shutdown = None
+    base_url = args.url
+    if base_url is None:
+        base_url, shutdown = start_server(args.database, args.time_scale)
+    logging.disable(logging.INFO)  # Журнал сервера не нужен в отчете
+
+    results = {
+        'meta': {'url': args.url, 'created_at': time.time(), 'python': sys.version.split()[0],
+                 'iterations': args.iterations},
+        'runs': [],
+    }
+    try:
+        for concurrency in args.concurrency:
+            run = run_load(base_url, concurrency, args.iterations, args.timeout)
+            results['runs'].append(run)
+            print_run(run)
+    finally:
+        if shutdown is not None:
+            shutdown()
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\nРезультаты сохранены: {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        print("\n".join(compare(baseline, results)))
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import unittest
+
+from load_test import LatencyRecorder, Operator, compare, run_load, summarize
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Минимальная имитация API server.py: все запросы успешны."""
+    def do_GET(self):
+        self.reply(200, {})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        if self.path == '/api/login':
+            self.reply(200, {'access_token': 'token'})
+        elif self.path.endswith('/start'):
+            self.reply(202, {'mission_id': 'a'})
+        else:
+            self.reply(201, {})
+
+    def reply(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestSummarize(unittest.TestCase):
+    def test_percentiles(self):
+        summary = summarize([i / 1000 for i in range(1, 101)], [200] * 99 + [503], duration=2.0)
+
+        self.assertEqual(summary['requests'], 100)
+        self.assertEqual(summary['errors'], 1)
+        self.assertEqual(summary['statuses'], {'200': 99, '503': 1})
+        self.assertAlmostEqual(summary['throughput'], 50.0)
+        self.assertAlmostEqual(summary['p50_ms'], 50.5)
+        self.assertAlmostEqual(summary['p99_ms'], 99.01)
+        self.assertAlmostEqual(summary['max_ms'], 100.0)
+
+    def test_empty(self):
+        summary = summarize([], [], duration=1.0)
+        self.assertEqual(summary['requests'], 0)
+        self.assertNotIn('p50_ms', summary)
+
+    def test_recorder(self):
+        recorder = LatencyRecorder()
+        recorder.record('GET /a', 0.01, 200)
+        recorder.record('GET /b', 0.02, 0)
+
+        endpoints, total = recorder.summary(1.0)
+        self.assertEqual(set(endpoints), {'GET /a', 'GET /b'})
+        self.assertEqual(total['requests'], 2)
+        self.assertEqual(total['errors'], 1)
+
+    def test_compare(self):
+        run = {'concurrency': 4, 'endpoints': {'GET /a': {'p50_ms': 10.0, 'p95_ms': 20.0}},
+               'total': {'throughput': 100.0}}
+        slower = {'concurrency': 4, 'endpoints': {'GET /a': {'p50_ms': 10.0, 'p95_ms': 40.0}},
+                  'total': {'throughput': 100.0}}
+
+        lines = compare({'runs': [run]}, {'runs': [slower]})
+        marked = [line for line in lines if line.endswith('<--')]
+        self.assertEqual(len(marked), 1)
+        self.assertIn('p95_ms', marked[0])
+
+
+class TestOperator(unittest.TestCase):
+    def setUp(self):
+        self.http = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        self.thread = threading.Thread(target=self.http.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f'http://127.0.0.1:{self.http.server_port}'
+
+    def tearDown(self):
+        self.http.shutdown()
+        self.http.server_close()
+
+    def test_scenario(self):
+        recorder = LatencyRecorder()
+        Operator(self.url, recorder, 'user', 'Drone1').run(iterations=2)
+
+        endpoints, total = recorder.summary(1.0)
+        self.assertEqual(endpoints['POST /api/login']['requests'], 1)
+        self.assertEqual(endpoints['GET /api/missions/<id>']['requests'], 2)
+        self.assertEqual(endpoints['POST /api/survey_navigator/land']['requests'], 2)
+        self.assertEqual(total['errors'], 0)
+
+    def test_connection_error(self):
+        recorder = LatencyRecorder()
+        operator = Operator('http://127.0.0.1:1', recorder, 'user', 'Drone1', timeout=1.0)
+        status, body = operator.request('GET', '/api/users')
+
+        self.assertEqual(status, 0)
+        self.assertIsNone(body)
+
+    def test_run_load(self):
+        run = run_load(self.url, concurrency=3, iterations=1)
+
+        self.assertEqual(run['concurrency'], 3)
+        self.assertEqual(run['endpoints']['POST /api/register']['requests'], 3)
+        self.assertEqual(run['total']['requests'], 3 * 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
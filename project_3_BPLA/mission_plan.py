@@ -0,0 +1,250 @@
+import numpy as np
+
+
+# Типы участков плана миссии
+LEG_KINDS = ('climb', 'transit', 'path', 'hover', 'capture', 'return')
+
+# Участки с движением по точкам; соседние такие участки объединяются в один moveOnPathAsync
+MOTION_LEGS = ('climb', 'transit', 'path', 'return')
+
+
+class Leg:
+    def __init__(self, kind, points=None, velocity=None, phase=None):
+        """Участок плана миссии.
+
+        Args:
+            kind: Тип участка (см. LEG_KINDS): climb - набор высоты, transit - перелет,
+                path - полет по маршруту, hover - зависание до стабилизации,
+                capture - снимок в текущей точке, return - возврат.
+            points: Точки участка в координатах NED (для участков с движением).
+            velocity: Скорость на участке, м/с (None - скорость плана).
+            phase: Имя этапа для телеметрии (по умолчанию - тип участка).
+        """
+        self.kind = kind
+        self.points = None if points is None else np.asarray(points, dtype=float).reshape(-1, 3)
+        self.velocity = velocity
+        self.phase = phase or kind
+
+    def __repr__(self):
+        count = 0 if self.points is None else len(self.points)
+        return f"Leg({self.kind!r}, points={count}, velocity={self.velocity}, phase={self.phase!r})"
+
+
+class Segment:
+    def __init__(self, kind, legs, points=None, velocity=None):
+        """Шаг скомпилированного плана: одна команда AirSim.
+
+        Args:
+            kind: 'move' (moveOnPathAsync), 'hover' или 'capture'.
+            legs: Участки плана, вошедшие в шаг.
+            points: Точки маршрута для 'move', массив (N, 3).
+            velocity: Скорость для 'move', м/с.
+        """
+        self.kind = kind
+        self.legs = legs
+        self.points = points
+        self.velocity = velocity
+
+    @property
+    def phase(self):
+        """str: Этап для телеметрии - этап самого длинного участка шага."""
+        if self.kind != 'move' or len(self.legs) == 1:
+            return self.legs[0].phase
+        lengths, previous = [], None
+        for leg in self.legs:
+            points = leg.points if previous is None else np.vstack([previous, leg.points])
+            lengths.append(_length(points))
+            previous = leg.points[-1:]
+        return self.legs[int(np.argmax(lengths))].phase
+
+    @property
+    def distance(self):
+        """float: Длина маршрута шага (без перелета от текущей позиции к первой точке), м."""
+        return _length(self.points) if self.points is not None else 0.0
+
+    def estimate_time(self, start=None):
+        """Расчетное время шага 'move', с.
+
+        Args:
+            start: Текущая позиция дрона (x, y, z); если задана, учитывается перелет к первой точке.
+        """
+        if self.kind != 'move':
+            return 0.0
+        distance = self.distance
+        if start is not None:
+            distance += float(np.linalg.norm(self.points[0] - np.asarray(start, dtype=float)))
+        return distance / self.velocity
+
+    def __repr__(self):
+        return f"Segment({self.kind!r}, legs={[leg.kind for leg in self.legs]}, phase={self.phase!r})"
+
+
+def _length(points):
+    """Длина ломаной."""
+    if points is None or len(points) < 2:
+        return 0.0
+    return float(np.linalg.norm(np.diff(points, axis=0), axis=1).sum())
+
+
+class MissionPlan:
+    def __init__(self, velocity, legs=None):
+        """План миссии - последовательность типизированных участков.
+
+        План проверяется и компилируется заранее (compile()): соседние участки
+        с движением и одинаковой скоростью сливаются в один шаг, который
+        выполняется одним вызовом moveOnPathAsync, поэтому между участками нет
+        пауз и лишних запросов состояния дрона. Зависание и снимок разделяют шаги.
+
+        Args:
+            velocity: Скорость полета по умолчанию, м/с.
+            legs: Начальный список участков (Leg).
+        """
+        self.velocity = velocity
+        self.legs = list(legs) if legs else []
+        self._compiled = None
+
+    def add(self, kind, points=None, velocity=None, phase=None):
+        """Добавить участок в конец плана.
+
+        Returns:
+            MissionPlan: Этот же план (для цепочки вызовов).
+        """
+        self.legs.append(Leg(kind, points, velocity, phase))
+        self._compiled = None
+        return self
+
+    def climb(self, point, **kwargs):
+        """Набор высоты до точки point."""
+        return self.add('climb', [point], **kwargs)
+
+    def transit(self, point, **kwargs):
+        """Перелет в точку point."""
+        return self.add('transit', [point], **kwargs)
+
+    def path(self, points, **kwargs):
+        """Полет по маршруту points."""
+        return self.add('path', points, **kwargs)
+
+    def hover(self, **kwargs):
+        """Зависание до стабилизации дрона."""
+        return self.add('hover', **kwargs)
+
+    def capture(self, **kwargs):
+        """Снимок в текущей точке."""
+        return self.add('capture', **kwargs)
+
+    def return_to(self, point, **kwargs):
+        """Возврат в точку point."""
+        return self.add('return', [point], **kwargs)
+
+    def validate(self):
+        """Проверить план.
+
+        Raises:
+            ValueError: Если план пуст, содержит неизвестный тип участка, участок с движением
+                без точек, нечисловые координаты, точку ниже уровня земли (z > 0 в NED)
+                или неположительную скорость.
+        """
+        if not self.legs:
+            raise ValueError("План миссии пуст")
+        for i, leg in enumerate(self.legs):
+            if leg.kind not in LEG_KINDS:
+                raise ValueError(f"Неизвестный тип участка {i}: {leg.kind}")
+            velocity = leg.velocity if leg.velocity is not None else self.velocity
+            if leg.kind not in MOTION_LEGS:
+                continue
+            if velocity is None or velocity <= 0:
+                raise ValueError(f"Скорость участка {i} ({leg.kind}) должна быть положительной")
+            if leg.points is None or len(leg.points) == 0:
+                raise ValueError(f"Участок {i} ({leg.kind}) не содержит точек")
+            if not np.isfinite(leg.points).all():
+                raise ValueError(f"Участок {i} ({leg.kind}) содержит нечисловые координаты")
+            if (leg.points[:, 2] > 0).any():
+                raise ValueError(f"Участок {i} ({leg.kind}) проходит ниже уровня земли")
+
+    def compile(self):
+        """Проверить план и объединить участки в шаги выполнения.
+
+        Соседние участки с движением и одинаковой скоростью объединяются в один шаг
+        'move'; повторяющиеся подряд точки удаляются. Результат кэшируется до
+        следующего изменения плана.
+
+        Returns:
+            list: Шаги выполнения (Segment).
+        """
+        if self._compiled is not None:
+            return self._compiled
+        self.validate()
+        segments = []
+        for leg in self.legs:
+            if leg.kind not in MOTION_LEGS:
+                segments.append(Segment(leg.kind, [leg]))
+                continue
+            velocity = leg.velocity if leg.velocity is not None else self.velocity
+            last = segments[-1] if segments else None
+            if last is not None and last.kind == 'move' and last.velocity == velocity:
+                last.legs.append(leg)
+                last.points = np.vstack([last.points, leg.points])
+            else:
+                segments.append(Segment('move', [leg], leg.points, velocity))
+        for segment in segments:
+            if segment.kind == 'move':
+                points = segment.points
+                keep = np.ones(len(points), dtype=bool)
+                keep[1:] = np.linalg.norm(np.diff(points, axis=0), axis=1) > 1e-9
+                segment.points = points[keep]
+        self._compiled = segments
+        return segments
+
+    @property
+    def distance(self):
+        """float: Длина всех шагов с движением, м."""
+        return sum(segment.distance for segment in self.compile())
+
+    def estimate_time(self, start=None):
+        """Расчетное время полета по плану, с (без зависаний и снимков).
+
+        Args:
+            start: Позиция дрона перед началом плана (x, y, z).
+        """
+        total, position = 0.0, start
+        for segment in self.compile():
+            if segment.kind == 'move':
+                total += segment.estimate_time(position)
+                position = segment.points[-1]
+        return total
+
+    def to_dict(self):
+        """План и его шаги для JSON."""
+        return {
+            'velocity': self.velocity,
+            'legs': [{'kind': leg.kind, 'phase': leg.phase, 'velocity': leg.velocity,
+                      'points': None if leg.points is None else leg.points.tolist()} for leg in self.legs],
+            'segments': [{'kind': segment.kind, 'phase': segment.phase, 'legs': [leg.kind for leg in segment.legs],
+                          'points': None if segment.points is None else len(segment.points)}
+                         for segment in self.compile()],
+        }
+
+
+def survey_mission(plan, altitude, velocity):
+    """План миссии обследования по маршруту змейкой.
+
+    Набор высоты над точкой старта, перелет к первой точке маршрута, полет по маршруту
+    и возврат; при компиляции объединяются в один шаг moveOnPathAsync.
+
+    Args:
+        plan: Маршрут обследования (planner.SurveyPlan).
+        altitude: Высота полета, м.
+        velocity: Скорость полета, м/с.
+
+    Returns:
+        MissionPlan: План миссии.
+    """
+    # В AirSim используются координаты NED, поэтому ось Z направлена вверх
+    z = -altitude
+    corner = plan.points[0]
+    return (MissionPlan(velocity)
+            .climb((0, 0, z))
+            .transit((corner[0], corner[1], z))
+            .path(plan.points[1:], phase='survey')
+            .return_to((0, 0, z)))
@@ -0,0 +1,99 @@
+import unittest
+
+import numpy as np
+
+from client_pool import ClientPool
+from mission_plan import MissionPlan
+from missions import SurveyNavigator
+from mock_airsim import MockSimulator
+
+
+class TestMissionPlan(unittest.TestCase):
+    def test_motion_legs_merged(self):
+        plan = (MissionPlan(5)
+                .climb((0, 0, -10))
+                .transit((-10, -10, -10))
+                .path([(-10, -10, -10), (-10, 10, -10), (0, 10, -10), (0, -10, -10)], phase='survey')
+                .return_to((0, 0, -10)))
+
+        segments = plan.compile()
+
+        self.assertEqual(len(segments), 1)
+        self.assertEqual([leg.kind for leg in segments[0].legs], ['climb', 'transit', 'path', 'return'])
+        self.assertEqual(len(segments[0].points), 6)  # Повтор первой точки маршрута удален
+        self.assertEqual(segments[0].phase, 'survey')
+        self.assertAlmostEqual(plan.distance, np.hypot(10, 10) + 20 + 10 + 20 + 10)
+
+    def test_hover_and_capture_split_segments(self):
+        plan = (MissionPlan(5)
+                .climb((0, 0, -10))
+                .hover()
+                .transit((10, 0, -10))
+                .capture()
+                .transit((20, 0, -10), velocity=2))
+
+        self.assertEqual([segment.kind for segment in plan.compile()], ['move', 'hover', 'move', 'capture', 'move'])
+
+    def test_different_velocity_not_merged(self):
+        plan = MissionPlan(5).transit((10, 0, -10)).transit((20, 0, -10), velocity=2)
+
+        segments = plan.compile()
+        self.assertEqual(len(segments), 2)
+        self.assertAlmostEqual(plan.estimate_time(start=(0, 0, -10)), 10 / 5 + 10 / 2)
+
+    def test_compile_cached_until_changed(self):
+        plan = MissionPlan(5).transit((10, 0, -10))
+        segments = plan.compile()
+
+        self.assertIs(plan.compile(), segments)
+        plan.hover()
+        self.assertEqual(len(plan.compile()), 2)
+
+    def test_validation(self):
+        for plan in (MissionPlan(5),
+                     MissionPlan(5).add('teleport', [(0, 0, -10)]),
+                     MissionPlan(5).path([]),
+                     MissionPlan(0).transit((0, 0, -10)),
+                     MissionPlan(5).transit((0, float('nan'), -10)),
+                     MissionPlan(5).transit((0, 0, 3))):
+            with self.assertRaises(ValueError):
+                plan.compile()
+
+    def test_to_dict(self):
+        plan = MissionPlan(5).climb((0, 0, -10)).hover()
+
+        data = plan.to_dict()
+        self.assertEqual([leg['kind'] for leg in data['legs']], ['climb', 'hover'])
+        self.assertEqual([segment['kind'] for segment in data['segments']], ['move', 'hover'])
+
+
+class TestSurveyPlanOnMock(unittest.TestCase):
+    def test_single_path_command(self):
+        simulator = MockSimulator(time_scale=50.0)
+        mission = SurveyNavigator(boxsize=10, stripewidth=5, altitude=10, velocity=10,
+                                  client_pool=ClientPool(factory=simulator.client))
+        mission.start()
+
+        self.assertEqual(mission.phase, 'done')
+        self.assertEqual(simulator.calls['moveOnPathAsync'], 1)
+        self.assertEqual(simulator.calls['moveToPositionAsync'], 0)
+        self.assertEqual(simulator.calls['hoverAsync'], 0)
+        self.assertEqual(simulator.calls['getMultirotorState'], 2)  # Проверка перед взлетом и после него
+        self.assertGreater(mission.profile.to_dict()['phases']['survey'], 0)
+        position = simulator.client().getMultirotorState().kinematics_estimated.position
+        self.assertAlmostEqual(position.x_val, 0.0, places=3)
+        self.assertAlmostEqual(position.z_val, -10.0, places=3)
+
+    def test_cancelled_before_flight(self):
+        simulator = MockSimulator(time_scale=50.0)
+        mission = SurveyNavigator(boxsize=10, stripewidth=5, altitude=10, velocity=10,
+                                  client_pool=ClientPool(factory=simulator.client))
+        mission.cancel()
+
+        with self.assertRaises(Exception):
+            mission.start()
+        self.assertEqual(simulator.calls['moveOnPathAsync'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
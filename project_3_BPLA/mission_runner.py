@@ -0,0 +1,364 @@
+from collections import OrderedDict
+import logging
+import threading
+import time
+import uuid
+
+from missions import MissionCancelled
+from scheduler import VehicleScheduler
+
+
+# Состояния миссии
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+CANCELLED = 'cancelled'
+FAILED = 'failed'
+LANDING = 'landing'
+LANDED = 'landed'
+
+ACTIVE_STATES = (QUEUED, RUNNING, LANDING)
+
+# Приоритет посадки: выполняется раньше миссий из очереди
+LAND_PRIORITY = 100
+
+# Количество завершенных миссий, которые хранятся в памяти для посадки дрона
+MAX_FINISHED = 100
+
+
+class RunnerBusy(Exception):
+    """Очередь миссий переполнена, новая миссия не может быть принята."""
+
+
+class MissionRecord:
+    def __init__(self, owner, kind, params=None, priority=0, vehicle_name=None, mission_id=None):
+        """Запись о миссии, выполняемой в фоне.
+
+        Args:
+            owner: Имя пользователя, запустившего миссию.
+            kind: Тип миссии ('survey' или 'orbit').
+            params: Параметры миссии, переданные в запросе.
+            priority: Приоритет в очереди (больше - раньше).
+            vehicle_name: Имя дрона (None - назначается планировщиком).
+            mission_id: Идентификатор миссии (по умолчанию создается новый).
+        """
+        self.id = mission_id or uuid.uuid4().hex
+        self.owner = owner
+        self.kind = kind
+        self.params = params or {}
+        self.priority = priority
+        self.vehicle_name = vehicle_name
+        self.status = QUEUED
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.mission = None  # Экземпляр миссии, создается в рабочем потоке
+        self.future = None
+        self.cancel_requested = False
+        self.land_requested = False
+
+    @property
+    def active(self):
+        """bool: True, пока миссия ожидает выполнения или выполняется."""
+        return self.status in ACTIVE_STATES
+
+    def to_dict(self):
+        """Представление записи для JSON-ответа."""
+        return {
+            'mission_id': self.id,
+            'owner': self.owner,
+            'kind': self.kind,
+            'params': self.params,
+            'priority': self.priority,
+            'vehicle_name': self.vehicle_name,
+            'status': self.status,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class MissionRunner:
+    def __init__(self, max_workers=4, max_pending=16, store=None, vehicles=None, max_finished=MAX_FINISHED):
+        """Пул фоновых потоков для выполнения миссий.
+
+        Миссии выполняются планировщиком VehicleScheduler: в порядке приоритета,
+        миссии и посадки одного дрона - строго по очереди, разных дронов - параллельно.
+
+        Args:
+            max_workers: Количество одновременно выполняемых миссий.
+            max_pending: Количество миссий, которые могут ожидать в очереди.
+            store: Хранилище (storage.Store), в котором сохраняется история миссий
+                при каждом изменении состояния (None - не сохранять).
+            vehicles: Парк дронов для миссий без указанного дрона (по умолчанию [''] - дрон по умолчанию).
+            max_finished: Количество завершенных миссий, которые хранятся в памяти, чтобы посадить
+                их дрон; более старые доступны только в хранилище.
+        """
+        self.store = store
+        self.max_finished = max_finished
+        self._scheduler = VehicleScheduler(max_workers=max_workers, vehicles=vehicles, thread_name_prefix='mission')
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)  # Ограничение очереди
+        self._records = {}  # Активные миссии
+        self._finished = OrderedDict()  # Завершенные миссии, дрон которых можно посадить (старые - первыми)
+        self._lock = threading.Lock()
+
+    def submit(self, owner, kind, factory, params=None, priority=0, vehicle_name=None, mission_id=None):
+        """Поставить миссию в очередь на выполнение.
+
+        Args:
+            owner: Имя пользователя, запустившего миссию.
+            kind: Тип миссии.
+            factory: Функция без аргументов, создающая экземпляр Missions.
+            params: Параметры миссии для отображения в статусе. Если в них есть ключ
+                vehicle_name, перед вызовом factory в него записывается назначенный дрон.
+            priority: Приоритет в очереди (больше - раньше).
+            vehicle_name: Имя дрона; None - первый свободный дрон парка.
+            mission_id: Идентификатор миссии, если он нужен factory заранее (например, для папки снимков).
+
+        Returns:
+            MissionRecord: Запись о поставленной в очередь миссии.
+
+        Raises:
+            RunnerBusy: Если очередь миссий заполнена.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise RunnerBusy("Очередь миссий заполнена")
+
+        record = MissionRecord(owner, kind, params, priority, vehicle_name, mission_id)
+        with self._lock:
+            self._records[record.id] = record
+        self._save(record)
+        try:
+            record.future = self._scheduler.submit(self._run, record, factory, priority=priority,
+                                                   vehicle=vehicle_name)
+        except Exception:
+            self._slots.release()
+            raise
+        record.future.add_done_callback(lambda _: self._slots.release())
+        logging.info(f"Миссия {record.id} ({kind}) поставлена в очередь пользователем {owner}")
+        return record
+
+    def get(self, mission_id):
+        """Вернуть запись о миссии, которая хранится в памяти, или None."""
+        with self._lock:
+            return self._records.get(mission_id) or self._finished.get(mission_id)
+
+    def lookup(self, mission_id):
+        """Вернуть состояние миссии (словарь, см. MissionRecord.to_dict) из памяти или из хранилища.
+
+        В хранилище находятся миссии, вытесненные из памяти, а также миссии других
+        процессов сервера и запущенные до перезапуска.
+
+        Returns:
+            dict: Состояние миссии или None, если миссия не найдена.
+        """
+        record = self.get(mission_id)
+        if record is not None:
+            return record.to_dict()
+        return self.store.get_mission(mission_id) if self.store is not None else None
+
+    def active_missions(self):
+        """Метрики активных миссий для мониторинга.
+
+        Returns:
+            list: Словари с идентификатором, типом, владельцем, состоянием миссии
+                и временем с момента запуска (или постановки в очередь), с.
+        """
+        with self._lock:
+            records = [record for record in self._records.values() if record.active]
+        now = time.time()
+        return [{'mission_id': record.id, 'kind': record.kind, 'owner': record.owner, 'status': record.status,
+                 'elapsed': now - (record.started_at or record.created_at)} for record in records]
+
+    def telemetry(self):
+        """Телеметрия активных миссий для потока /api/stream.
+
+        Returns:
+            list: Словари с идентификатором, владельцем, типом, состоянием миссии, именем дрона
+                и телеметрией экземпляра миссии (этап, счетчики кругов и снимков).
+        """
+        with self._lock:
+            records = [record for record in self._records.values() if record.active]
+        result = []
+        for record in records:
+            data = {'mission_id': record.id, 'owner': record.owner, 'kind': record.kind, 'status': record.status,
+                    'vehicle_name': record.vehicle_name}
+            if record.mission is not None:
+                data.update(record.mission.telemetry())
+            result.append(data)
+        return result
+
+    def cancel(self, mission_id):
+        """Отменить миссию.
+
+        Миссия из очереди снимается сразу, выполняющаяся миссия прерывается
+        в ближайшей контрольной точке.
+
+        Посадка дрона (состояние LANDING) не отменяется.
+
+        Returns:
+            bool: True, если отмена принята, False, если миссия уже завершена или дрон садится.
+        """
+        record = self.get(mission_id)
+        if record is None or not record.active or record.status == LANDING:
+            return False
+
+        record.cancel_requested = True
+        if record.future.cancel():
+            record.status = CANCELLED
+            record.finished_at = time.time()
+            self._save(record)
+        elif record.mission is not None:
+            record.mission.cancel()
+        logging.info(f"Запрошена отмена миссии {mission_id}")
+        return True
+
+    def land(self, mission_id):
+        """Посадить дрон миссии.
+
+        Если миссия еще выполняется, она отменяется и посадка выполняется
+        тем же рабочим потоком сразу после остановки. Для завершенной миссии
+        посадка ставится в очередь отдельной задачей.
+
+        Returns:
+            bool: True, если посадка принята.
+
+        Raises:
+            RunnerBusy: Если очередь миссий заполнена.
+        """
+        record = self.get(mission_id)
+        if record is None:
+            return False
+
+        if record.status == LANDING:
+            return True  # Посадка уже поставлена в очередь или выполняется: повторный запрос ее не отменяет
+
+        if record.active:
+            record.land_requested = True
+            self.cancel(mission_id)
+            return True
+
+        with self._lock:  # Одновременные запросы ставят в очередь одну посадку
+            if record.status == LANDING:
+                return True
+            if record.mission is None or record.status == LANDED:
+                return False
+            if not self._slots.acquire(blocking=False):
+                raise RunnerBusy("Очередь миссий заполнена")
+            record.status = LANDING
+        self._save(record)
+        record.future = self._scheduler.submit(self._land, record, priority=LAND_PRIORITY,
+                                               vehicle=record.vehicle_name)
+        record.future.add_done_callback(lambda _: self._slots.release())
+        return True
+
+    def shutdown(self, wait=True):
+        """Остановить пул, отменив миссии в очереди, и завершить журналы непосаженных миссий."""
+        with self._lock:
+            records = list(self._records.values())
+        for record in records:
+            if record.active:
+                self.cancel(record.id)
+        self._scheduler.shutdown(wait=wait)
+        with self._lock:
+            finished = list(self._finished.values())
+        for record in finished:
+            self._finish(record)
+
+    def _run(self, vehicle_name, record, factory):
+        """Выполнить миссию в рабочем потоке на назначенном дроне."""
+        record.vehicle_name = vehicle_name
+        if 'vehicle_name' in record.params:
+            record.params['vehicle_name'] = vehicle_name
+        if record.cancel_requested:
+            record.status = CANCELLED
+            record.finished_at = time.time()
+            self._save(record)
+            return
+
+        record.status = RUNNING
+        record.started_at = time.time()
+        self._save(record)
+        try:
+            record.mission = factory()
+            if record.cancel_requested:
+                record.mission.cancel()
+            record.mission.start()
+            record.status = COMPLETED
+        except MissionCancelled:
+            logging.info(f"Миссия {record.id} отменена")
+            record.status = CANCELLED
+        except Exception as e:
+            logging.error(f"Ошибка при выполнении миссии {record.id}: {e}")
+            record.status = FAILED
+            record.error = str(e)
+        record.finished_at = time.time()
+        if record.land_requested and record.mission is not None:
+            self._save(record)
+            self._land(vehicle_name, record)
+            return
+        if record.status != COMPLETED:
+            # Отмененная или сбойная миссия не доходит до посадки (landed() завершает журнал сам)
+            self._finish(record)
+        self._save(record)
+
+    def _land(self, vehicle_name, record):
+        """Выполнить посадку дрона миссии в рабочем потоке."""
+        record.status = LANDING
+        self._save(record)
+        try:
+            record.mission.landed()
+            record.status = LANDED
+        except Exception as e:
+            logging.error(f"Ошибка при посадке дрона миссии {record.id}: {e}")
+            record.status = FAILED
+            record.error = str(e)
+            self._finish(record)
+        record.finished_at = time.time()
+        self._save(record)
+
+    def _save(self, record):
+        """Сохранить запись о миссии в хранилище и перенести ее в нужный словарь."""
+        persisted = False
+        if self.store is not None:
+            try:
+                self.store.save_mission(record.to_dict())
+                persisted = True
+            except Exception as e:
+                logging.error(f"Ошибка при сохранении миссии {record.id}: {e}")
+        self._track(record, persisted)
+
+    def _track(self, record, persisted):
+        """Хранить в памяти только активные миссии и ограниченное число завершенных.
+
+        Завершенная миссия, дрон которой уже посажен или не поднимался, после сохранения
+        в хранилище удаляется из памяти сразу; остальные завершенные миссии хранятся,
+        пока их не вытеснят более новые (max_finished), чтобы их дрон можно было посадить.
+        """
+        with self._lock:
+            if record.active:
+                self._finished.pop(record.id, None)
+                self._records[record.id] = record
+                return
+            self._records.pop(record.id, None)
+            if persisted and (record.status == LANDED or record.mission is None):
+                self._finished.pop(record.id, None)
+                return
+            self._finished[record.id] = record
+            self._finished.move_to_end(record.id)
+            evicted = []
+            while len(self._finished) > self.max_finished:
+                evicted.append(self._finished.popitem(last=False)[1])
+        for evicted_record in evicted:
+            self._finish(evicted_record)  # Посадить дрон вытесненной миссии уже нельзя
+
+    def _finish(self, record):
+        """Завершить журнал полета и разбивку времени миссии, которая не будет посажена."""
+        if record.mission is None:
+            return
+        try:
+            record.mission.finish()
+        except Exception as e:
+            logging.error(f"Ошибка при завершении журнала миссии {record.id}: {e}")
@@ -0,0 +1,250 @@
+import threading
+import time
+import unittest
+
+from missions import Missions
+from mission_runner import MissionRunner, RunnerBusy, COMPLETED, CANCELLED, FAILED, LANDED, LANDING, QUEUED
+from storage import MemoryStore
+
+
+class FakeMission(Missions):
+    def __init__(self, release=None):
+        super().__init__()
+        self.release = release
+        self.started = threading.Event()
+        self.landed_calls = 0
+
+    def start(self):
+        self.started.set()
+        while self.release is not None and not self.release.wait(0.01):
+            self.check_cancelled()
+
+    def landed(self):
+        self.landed_calls += 1
+
+    def finish(self):
+        self.finish_calls = getattr(self, 'finish_calls', 0) + 1
+
+
+class FailingMission(FakeMission):
+    def start(self):
+        raise RuntimeError("сбой взлета")
+
+
+class TestMissionRunner(unittest.TestCase):
+    def setUp(self):
+        self.runner = MissionRunner(max_workers=1, max_pending=1)
+
+    def tearDown(self):
+        self.runner.shutdown()
+
+    def test_submit_completes(self):
+        record = self.runner.submit('user', 'survey', FakeMission)
+        record.future.result(timeout=5)
+
+        self.assertEqual(record.status, COMPLETED)
+        self.assertIsNotNone(record.finished_at)
+
+    def test_given_mission_id(self):
+        record = self.runner.submit('user', 'orbit', FakeMission, mission_id='abc123')
+        record.future.result(timeout=5)
+
+        self.assertEqual(record.id, 'abc123')
+        self.assertIs(self.runner.get('abc123'), record)
+
+    def test_failed_mission(self):
+        record = self.runner.submit('user', 'survey', FailingMission)
+        record.future.result(timeout=5)
+
+        self.assertEqual(record.status, FAILED)
+        self.assertEqual(record.error, "сбой взлета")
+
+    def test_cancel_running_and_queued(self):
+        release = threading.Event()
+        mission = FakeMission(release)
+        running = self.runner.submit('user', 'orbit', lambda: mission)
+        queued = self.runner.submit('user', 'orbit', FakeMission)
+        mission.started.wait(5)
+
+        self.assertTrue(self.runner.cancel(queued.id))
+        self.assertEqual(queued.status, CANCELLED)
+        self.assertTrue(self.runner.cancel(running.id))
+        running.future.result(timeout=5)
+        self.assertEqual(running.status, CANCELLED)
+        self.assertFalse(self.runner.cancel(running.id))
+
+    def test_queue_is_bounded(self):
+        release = threading.Event()
+        self.runner.submit('user', 'orbit', lambda: FakeMission(release))
+        self.runner.submit('user', 'orbit', lambda: FakeMission(release))
+
+        with self.assertRaises(RunnerBusy):
+            self.runner.submit('user', 'orbit', FakeMission)
+        release.set()
+
+    def test_land_after_active_mission(self):
+        release = threading.Event()
+        mission = FakeMission(release)
+        record = self.runner.submit('user', 'orbit', lambda: mission)
+        mission.started.wait(5)
+
+        self.assertTrue(self.runner.land(record.id))
+        record.future.result(timeout=5)
+        self.assertEqual(record.status, LANDED)
+        self.assertEqual(mission.landed_calls, 1)
+
+    def test_same_vehicle_missions_serialized(self):
+        runner = MissionRunner(max_workers=2, max_pending=2, vehicles=['A'])
+        try:
+            release = threading.Event()
+            first_mission = FakeMission(release)
+            first = runner.submit('user', 'orbit', lambda: first_mission, {'vehicle_name': None})
+            second = runner.submit('other', 'orbit', FakeMission, {'vehicle_name': None})
+            first_mission.started.wait(5)
+            time.sleep(0.05)
+
+            self.assertEqual(second.status, QUEUED)  # Дрон A занят первой миссией
+            self.assertEqual(first.params['vehicle_name'], 'A')
+            release.set()
+            second.future.result(timeout=5)
+            self.assertEqual(second.status, COMPLETED)
+            self.assertEqual(second.vehicle_name, 'A')
+        finally:
+            runner.shutdown()
+
+    def test_priority(self):
+        release = threading.Event()
+        order = []
+
+        class OrderedMission(FakeMission):
+            def __init__(self, name):
+                super().__init__()
+                self.name = name
+
+            def start(self):
+                order.append(self.name)
+
+        runner = MissionRunner(max_workers=1, max_pending=3)
+        try:
+            blocker = FakeMission(release)
+            runner.submit('user', 'orbit', lambda: blocker)
+            blocker.started.wait(5)
+            low = runner.submit('user', 'orbit', lambda: OrderedMission('low'))
+            high = runner.submit('user', 'orbit', lambda: OrderedMission('high'), priority=5)
+            release.set()
+            low.future.result(timeout=5)
+            high.future.result(timeout=5)
+        finally:
+            runner.shutdown()
+        self.assertEqual(order, ['high', 'low'])
+
+    def test_history_saved_to_store(self):
+        runner = MissionRunner(max_workers=1, max_pending=1, store=MemoryStore())
+        try:
+            record = runner.submit('user', 'survey', FailingMission, {'boxsize': 10})
+            record.future.result(timeout=5)
+        finally:
+            runner.shutdown()
+
+        saved = runner.store.get_mission(record.id)
+        self.assertEqual(saved['status'], FAILED)
+        self.assertEqual(saved['params'], {'boxsize': 10})
+        self.assertEqual([m['mission_id'] for m in runner.store.list_missions('user')], [record.id])
+
+    def test_finished_records_dropped(self):
+        runner = MissionRunner(max_workers=1, max_pending=1, store=MemoryStore(), max_finished=2)
+        try:
+            records = []
+            for _ in range(4):
+                records.append(runner.submit('user', 'orbit', FakeMission))
+                records[-1].future.result(timeout=5)
+            self.assertTrue(runner.land(records[3].id))
+            records[3].future.result(timeout=5)
+        finally:
+            runner.shutdown()
+
+        # В памяти остается только последняя завершенная миссия с поднятым дроном
+        self.assertEqual(list(runner._finished), [records[2].id])
+        self.assertEqual(runner._records, {})
+        self.assertIsNone(runner.get(records[0].id))
+        self.assertIsNone(runner.get(records[3].id))  # Дрон посажен
+        self.assertIs(runner.get(records[2].id), records[2])
+        self.assertEqual(runner.lookup(records[0].id)['status'], COMPLETED)
+        self.assertEqual(runner.lookup(records[3].id)['status'], LANDED)
+        self.assertEqual(runner.active_missions(), [])
+
+    def test_unlanded_missions_finished(self):
+        failing = FailingMission()
+        failed = self.runner.submit('user', 'survey', lambda: failing)
+        failed.future.result(timeout=5)
+        release = threading.Event()
+        cancelled_mission = FakeMission(release)
+        cancelled = self.runner.submit('user', 'orbit', lambda: cancelled_mission)
+        cancelled_mission.started.wait(5)
+        self.runner.cancel(cancelled.id)
+        cancelled.future.result(timeout=5)
+        completed_mission = FakeMission()
+        completed = self.runner.submit('user', 'orbit', lambda: completed_mission)
+        completed.future.result(timeout=5)
+
+        # Журнал сбойной и отмененной миссии завершается сразу, выполненной - при посадке
+        self.assertEqual((failed.status, cancelled.status), (FAILED, CANCELLED))
+        self.assertEqual(failing.finish_calls, 1)
+        self.assertEqual(cancelled_mission.finish_calls, 1)
+        self.assertFalse(hasattr(completed_mission, 'finish_calls'))
+        self.runner.shutdown()
+        self.assertEqual(completed_mission.finish_calls, 1)  # Непосаженная миссия при остановке пула
+
+    def test_evicted_mission_finished(self):
+        runner = MissionRunner(max_workers=1, max_pending=1, max_finished=1)
+        try:
+            missions = [FakeMission(), FakeMission()]
+            for mission in missions:
+                runner.submit('user', 'orbit', lambda mission=mission: mission).future.result(timeout=5)
+
+            self.assertEqual(missions[0].finish_calls, 1)
+            self.assertFalse(hasattr(missions[1], 'finish_calls'))
+        finally:
+            runner.shutdown()
+
+    def test_repeated_land(self):
+        class SlowLanding(FakeMission):
+            def __init__(self):
+                super().__init__()
+                self.landing = threading.Event()
+                self.touchdown = threading.Event()
+
+            def landed(self):
+                self.landing.set()
+                self.touchdown.wait(5)
+                super().landed()
+
+        runner = MissionRunner(max_workers=1, max_pending=2)
+        try:
+            mission = SlowLanding()
+            record = runner.submit('user', 'orbit', lambda: mission)
+            record.future.result(timeout=5)
+            release = threading.Event()
+            blocker = FakeMission(release)
+            runner.submit('other', 'orbit', lambda: blocker)  # Занимает дрон: посадка ждет в очереди
+            blocker.started.wait(5)
+
+            self.assertTrue(runner.land(record.id))
+            self.assertTrue(runner.land(record.id))  # Повторный запрос не отменяет посадку из очереди
+            self.assertFalse(runner.cancel(record.id))
+            self.assertEqual(record.status, LANDING)
+            release.set()
+            mission.landing.wait(5)
+            self.assertTrue(runner.land(record.id))  # И не прерывает выполняющуюся посадку
+            self.assertFalse(mission.cancelled)
+            mission.touchdown.set()
+            record.future.result(timeout=5)
+        finally:
+            runner.shutdown()
+
+        self.assertEqual(record.status, LANDED)
+        self.assertEqual(mission.landed_calls, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,18 +1,191 @@
 from abc import ABC, abstractmethod
 import airsim
-import sys
 import math
 import time
 import logging
-import os
+import threading
+
+from capture import CapturePipeline
+from client_pool import default_pool
+from flight_utils import RateLimiter, wait_until_settled
+from instrumentation import MissionProfile, instrument, timed
+from mission_plan import survey_mission
+from plan_cache import default_cache
+from recorder import FlightRecorder
 
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO, filemode="w")
 
+# Режимы облета по орбите (первый - по умолчанию)
+ORBIT_MODES = ('precomputed', 'closed_loop')
+
+
+class MissionCancelled(Exception):
+    """Исключение, прерывающее миссию по запросу оператора."""
+
 
 # Абстрактный класс для миссий
 class Missions(ABC):
+    def __init__(self, vehicle_name='', ip='', client_pool=None, **kwargs):
+        """Общие параметры миссий.
+
+        Args:
+            vehicle_name: Имя дрона в settings.json AirSim ('' - дрон по умолчанию).
+            ip: Адрес симулятора AirSim ('' - локальный).
+            client_pool: Пул подключений к AirSim (по умолчанию - общий пул процесса).
+            kwargs: Параметры конкретной миссии, а также параметры ожидания стабилизации
+                settle_rate, settle_window, settle_tolerance и settle_timeout (см. wait_until_settled),
+                журнала полета flight_log (путь к файлу, по умолчанию журнал не ведется) и record_rate
+                (частота замеров, Гц). Журнал пишется от начала start() до завершения landed().
+                Параметр timing_log задает файл JSON, в который после landed() записывается
+                разбивка времени миссии по этапам и вызовам AirSim (см. MissionProfile).
+                Параметр plan_cache задает кэш маршрутов (по умолчанию - общий кэш процесса, см. plan_cache.py).
+        """
+        self.vehicle_name = vehicle_name
+        self.ip = ip
+        self.client_pool = client_pool if client_pool is not None else default_pool
+        self.settle_rate = kwargs.get('settle_rate', 20)  # Частота опроса позиции при стабилизации, Гц
+        self.settle_window = kwargs.get('settle_window', 5)  # Размер окна замеров
+        self.settle_tolerance = kwargs.get('settle_tolerance', 0.05)  # Допустимый разброс позиции, м
+        self.settle_timeout = kwargs.get('settle_timeout', 10)  # Максимальное время ожидания, с
+        self.flight_log = kwargs.get('flight_log')  # Путь к журналу полета (None - не записывать)
+        self.record_rate = kwargs.get('record_rate', 50.0)  # Частота записи журнала, Гц
+        self.recorder = None
+        self.timing_log = kwargs.get('timing_log')  # Файл разбивки времени миссии (None - не записывать)
+        self.profile = MissionProfile(type(self).__name__)  # Время этапов и вызовов AirSim
+        plan_cache = kwargs.get('plan_cache')
+        self.plan_cache = plan_cache if plan_cache is not None else default_cache  # Кэш рассчитанных маршрутов
+        self._cancelled = threading.Event()  # Флаг отмены миссии
+        self.phase = 'created'  # Текущий этап миссии для телеметрии
+
+    @property
+    def phase(self):
+        """str: Текущий этап миссии; смена этапа отмечается в разбивке времени (profile)."""
+        return self._phase
+
+    @phase.setter
+    def phase(self, phase):
+        self._phase = phase
+        self.profile.enter_phase(phase)
+
+    def connect(self):
+        """Подключение к AirSim из пула миссии.
+
+        Вызовы замеряются, если включен сбор метрик или задан timing_log: иначе
+        разбивка времени в timing_log не содержала бы вызовов AirSim.
+        """
+        client = self.client_pool.get(self.ip, self.vehicle_name)
+        return instrument(client, self.vehicle_name, self.profile if self.timing_log is not None else None)
+
+    def cancel(self):
+        """Запросить отмену миссии.
+
+        Миссия прерывается в ближайшей контрольной точке (между этапами полета
+        или на очередной итерации цикла управления), дрон остается в воздухе.
+        """
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        """bool: True, если запрошена отмена миссии."""
+        return self._cancelled.is_set()
+
+    def check_cancelled(self):
+        """Прервать миссию, если запрошена отмена.
+
+        Raises:
+            MissionCancelled: Если была вызвана cancel().
+        """
+        if self._cancelled.is_set():
+            raise MissionCancelled("Миссия отменена")
+
+    def telemetry(self):
+        """Телеметрия миссии для потока /api/stream.
+
+        Returns:
+            dict: Текущий этап миссии и счетчики, специфичные для типа миссии.
+        """
+        return {'phase': self.phase}
+
+    def wait_settled(self):
+        """Дождаться стабилизации позиции дрона.
+
+        Returns:
+            airsim.Vector3r: Последняя измеренная позиция дрона.
+        """
+        _, position = wait_until_settled(
+            lambda: self.client.getMultirotorState(self.vehicle_name).kinematics_estimated.position,
+            self.settle_rate, self.settle_window, self.settle_tolerance, self.settle_timeout)
+        return position
+
+    def fly_plan(self, plan, capture=None, timeout_margin=1.5):
+        """Выполнить план миссии (см. mission_plan.MissionPlan).
+
+        Каждый шаг скомпилированного плана - одна команда AirSim: объединенные участки
+        с движением выполняются одним moveOnPathAsync без промежуточных пауз и запросов
+        состояния дрона. Отмена миссии проверяется между шагами.
+
+        Args:
+            plan: План миссии (MissionPlan).
+            capture: Функция снимка для участков capture.
+            timeout_margin: Запас времени команды moveOnPathAsync относительно расчетного
+                времени шага (к нему добавляется settle_timeout на перелет к первой точке).
+        """
+        segments = plan.compile()
+        if capture is None and any(segment.kind == 'capture' for segment in segments):
+            raise ValueError("План содержит снимки, но функция снимка не задана")
+        for segment in segments:
+            self.check_cancelled()
+            self.phase = segment.phase
+            if segment.kind == 'hover':
+                # Ждем стабилизации дрона после зависания и снова включаем управление API
+                self.client.hoverAsync(self.vehicle_name).join()
+                self.wait_settled()
+                self.client.enableApiControl(True, self.vehicle_name)
+            elif segment.kind == 'capture':
+                capture()
+            else:
+                self.move_on_path(segment, timeout_margin)
+
+    def move_on_path(self, segment, timeout_margin=1.5):
+        """Выполнить шаг плана 'move' одним вызовом moveOnPathAsync.
+
+        Если команда завершилась ошибкой, дрон направляется в последнюю точку шага,
+        чтобы следующий шаг начинался из ожидаемой позиции.
+        """
+        path = [airsim.Vector3r(x, y, z) for x, y, z in segment.points.tolist()]
+        timeout = segment.estimate_time() * timeout_margin + self.settle_timeout
+        velocity = segment.velocity
+        try:
+            self.client.moveOnPathAsync(path, velocity, timeout, airsim.DrivetrainType.ForwardOnly,
+                                        airsim.YawMode(False, 0), velocity + (velocity / 2), 1,
+                                        vehicle_name=self.vehicle_name).join()
+        except Exception as e:
+            logging.info("moveOnPath threw exception: " + str(e))
+            x, y, z = segment.points[-1].tolist()
+            self.client.moveToPositionAsync(x, y, z, velocity, vehicle_name=self.vehicle_name).join()
+
+    def start_recording(self):
+        """Начать запись журнала полета, если он включен (см. FlightRecorder)."""
+        if self.flight_log is None or self.recorder is not None:
+            return
+        self.recorder = FlightRecorder(self.flight_log, self.ip, self.vehicle_name, self.record_rate,
+                                       factory=self.client_pool.factory)
+        self.recorder.start()
+
+    def stop_recording(self):
+        """Завершить запись журнала полета."""
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def finish(self):
+        """Завершить журнал полета и записать разбивку времени миссии, если задан timing_log."""
+        self.stop_recording()
+        if self.timing_log is not None:
+            self.profile.save(self.timing_log)
+
     @abstractmethod
     def start(self):
         """Запустить миссию."""
@@ -35,129 +208,118 @@ class SurveyNavigator(Missions):
                 stripewidth: ширина полосы, по которой будет осуществляться движение.
                 altitude: высота полета.
                 velocity: скорость дрона.
+                rotation: угол поворота направления полос в градусах (по умолчанию 0).
+                turn_radius: радиус разворота дрона (по умолчанию 0).
+                plan: готовый маршрут (planner.SurveyPlan в системе координат дрона), например
+                    часть области из partition.partition_polygon; boxsize и stripewidth тогда не нужны.
+                vehicle_name: имя дрона в settings.json AirSim (по умолчанию - дрон по умолчанию).
+                ip: адрес симулятора AirSim (по умолчанию - локальный).
+                client_pool: пул подключений к AirSim (по умолчанию - общий пул процесса).
         """
+        super().__init__(**kwargs)
         self.boxsize = kwargs.get('boxsize')
         self.stripewidth = kwargs.get('stripewidth')
         self.altitude = kwargs.get('altitude')
         self.velocity = kwargs.get('velocity')
+        self.rotation = kwargs.get('rotation', 0)  # Угол поворота полос
+        self.turn_radius = kwargs.get('turn_radius', 0)  # Радиус разворота дрона
+        self.plan = kwargs.get('plan')  # Готовый маршрут вместо обследования квадрата boxsize
 
         # Проверка на наличие необходимых параметров
-        if self.boxsize is None or self.stripewidth is None or self.altitude is None or self.velocity is None:
+        if self.plan is None and (self.boxsize is None or self.stripewidth is None) \
+                or self.altitude is None or self.velocity is None:
             raise ValueError(
                 "Отсутствуют необходимые параметры: boxsize, stripewidth, altitude, and velocity!")
 
-        self.client = airsim.MultirotorClient()  # Инициализация клиента AirSim
-        self.client.confirmConnection()  # Подтверждение подключения
-        self.client.enableApiControl(True)  # Включение API управления
+        # Подключение к AirSim из общего пула (с замером времени вызовов, см. connect())
+        self.client = self.connect()
+        self.client.enableApiControl(True, self.vehicle_name)  # Включение API управления
+
+    def build_plan(self):
+        """Составить план миссии патрулирования.
+
+        Маршрут змейкой берется из кэша планов (см. plan_cache.py), поэтому повторный
+        запуск с теми же параметрами не пересчитывает маршрут. Набор высоты, перелет
+        к первому углу, полет змейкой и возврат объединяются при компиляции в один
+        вызов moveOnPathAsync.
+
+        Returns:
+            MissionPlan: План миссии.
+        """
+        plan = self.plan
+        if plan is None:
+            plan, _ = self.plan_cache.survey(self.boxsize, self.stripewidth, self.altitude, self.rotation,
+                                             self.turn_radius)
+        return survey_mission(plan, self.altitude, self.velocity)
 
     # Метод начала патрулирования
     def start(self):
         """Запуск миссии патрулирования в заданном квадрате."""
-        # Запускаем дрон (подготавливаем к полету)
-        logging.info("Армирование моторов...")
-        self.client.armDisarm(True)  # Армируем дрон
-        time.sleep(2)  # Небольшая пауза для стабилизации
-
-        # Получаем текущее состояние дрона (приземлен ли он)
-        landed = self.client.getMultirotorState().landed_state
-        # Если дрон приземлен, то начинаем взлет
-        if landed == airsim.LandedState.Landed:
-            logging.info("Взлёт...")
-            self.client.takeoffAsync().join()  # Запускаем взлет
-
-        # Проверяем снова, приземлен ли дрон после взлета
-        landed = self.client.getMultirotorState().landed_state
-        if landed == airsim.LandedState.Landed:
-            logging.info("сбой взлета - проверьте журнал сообщений Unreal для получения подробной информации")
-            return  # Выходим из метода, если взлет не удался
-
-        # В AirSim используются координаты NED, поэтому ось Z направлена вверх
-        x = -self.boxsize
-        z = -self.altitude
-
-        # Поднимаемся на заданную высоту
-        logging.info("Набор высоты: " + str(self.altitude))
-        self.client.moveToPositionAsync(0, 0, z, self.velocity).join()
-        time.sleep(2)
-
-        # Летаем к первому углу коробки для обследования
-        logging.info("Начало патрулирования")
-        self.client.moveToPositionAsync(x, -self.boxsize, z, self.velocity).join()
-
-        # Даем дрону немного времени для стабилизации
-        self.client.hoverAsync().join()
-        time.sleep(2)
-
-        # После зависания снова включаем управление API для следующего этапа полета
-        self.client.enableApiControl(True)
-
-        # Теперь вычисляем путь для обследования, чтобы заполнить коробку
-        path = []
-        distance = 0
-        # Цикл для вычисления координат пути
-        while x < self.boxsize:
-            distance += self.boxsize
-            path.append(airsim.Vector3r(x, self.boxsize, z))  # Добавляем первую позицию
-            x += self.stripewidth  # Сдвигаем x на ширину полосы
-            distance += self.stripewidth
-            path.append(airsim.Vector3r(x, self.boxsize, z))  # Добавляем вторую позицию
-            distance += self.boxsize
-
-        path.append(airsim.Vector3r(x, -self.boxsize, z))  # Добавляем третью позицию
-        x += self.stripewidth  # Сдвигаем x на ширину полосы
-        distance += self.stripewidth
-        path.append(airsim.Vector3r(x, -self.boxsize, z))  # Добавляем четвертую позицию
-        distance += self.boxsize
-
-        # Сообщаем о начале обследования и вычисленной дистанции
-        logging.info("Расчетное расстояние полёта:" + str(distance))
-        trip_time = distance / self.velocity  # Вычисляем время поездки
-        logging.info("Расчётное время полёта " + str(trip_time))
-        time.sleep(2)
-
+        mission_plan = self.build_plan()
+        mission_plan.compile()  # Ошибки плана обнаруживаются до взлета
+        self.start_recording()
         try:
-            # Даем команду на движение по рассчитанному пути
-            result = self.client.moveOnPathAsync(path, self.velocity, trip_time, airsim.DrivetrainType.ForwardOnly,
-                                                 airsim.YawMode(False, 0), self.velocity + (self.velocity / 2),
-                                                 1).join()
-        except:
-            # Обработка ошибок, если команда движения не удалась
-            errorType, value, traceback = sys.exc_info()
-            logging.info("moveOnPath threw exception: " + str(value))
-            pass
-
-        # Возвращаемся к начальной позиции
-        logging.info("Возврат к точке старта")
-        self.client.moveToPositionAsync(0, 0, z, self.velocity).join()
-        logging.info("Миссия завершена. Дрон готов к следующей миссии или посадке.")
-
-
+            # Запускаем дрон (подготавливаем к полету)
+            logging.info("Армирование моторов...")
+            self.phase = 'arm'
+            self.client.armDisarm(True, self.vehicle_name)  # Армируем дрон
+
+            # Получаем текущее состояние дрона (приземлен ли он)
+            landed = self.client.getMultirotorState(self.vehicle_name).landed_state
+            # Если дрон приземлен, то начинаем взлет
+            if landed == airsim.LandedState.Landed:
+                logging.info("Взлёт...")
+                self.phase = 'takeoff'
+                self.client.takeoffAsync(vehicle_name=self.vehicle_name).join()  # Запускаем взлет
+
+                # Проверяем снова, приземлен ли дрон после взлета
+                landed = self.client.getMultirotorState(self.vehicle_name).landed_state
+                if landed == airsim.LandedState.Landed:
+                    logging.info("сбой взлета - проверьте журнал сообщений Unreal для получения подробной информации")
+                    self.stop_recording()
+                    return  # Выходим из метода, если взлет не удался
+
+            # Сообщаем о начале обследования и вычисленной дистанции
+            logging.info("Набор высоты: " + str(self.altitude))
+            logging.info("Расчетное расстояние полёта:" + str(mission_plan.distance))
+            logging.info("Расчётное время полёта " + str(mission_plan.estimate_time()))
+            self.fly_plan(mission_plan)
+            self.phase = 'done'
+            logging.info("Миссия завершена. Дрон готов к следующей миссии или посадке.")
+        except MissionCancelled:
+            raise  # После отмены журнал продолжается до посадки
+        except Exception:
+            self.stop_recording()  # Миссия не дойдет до посадки: останавливаем потоки журнала
+            raise
 
     def landed(self):
         """Запустить приземление дрона."""
-        # Даем дрону немного времени для стабилизации
-        self.client.hoverAsync().join()
-        time.sleep(2)
+        self.phase = 'landing'
+        # Ждем стабилизации дрона после зависания
+        self.client.hoverAsync(self.vehicle_name).join()
+        self.wait_settled()
 
         # После зависания снова включаем управление API для следующего этапа полета
-        self.client.enableApiControl(True)
+        self.client.enableApiControl(True, self.vehicle_name)
 
-        z = self.client.getMultirotorState().kinematics_estimated.position.z_val
+        z = self.client.getMultirotorState(self.vehicle_name).kinematics_estimated.position.z_val
 
         # Если высота выше 5, опускаемся до 5
         if z < -5:
             logging.info("Снижаемся")
-            self.client.moveToPositionAsync(0, 0, -5, 5).join()
-            time.sleep(2)
+            self.client.moveToPositionAsync(0, 0, -5, 5, vehicle_name=self.vehicle_name).join()
+            self.wait_settled()
 
         # Садимся на землю
         logging.info("Посадка...")
-        self.client.landAsync().join()
+        self.client.landAsync(vehicle_name=self.vehicle_name).join()
 
         # Блокируем дрон после завершения миссии
         logging.info("Дрон заблокирован.")
-        self.client.armDisarm(False)
-        self.client.enableApiControl(False)
+        self.client.armDisarm(False, self.vehicle_name)
+        self.client.enableApiControl(False, self.vehicle_name)
+        self.phase = 'landed'
+        self.finish()
 
 
 class Position:
@@ -172,19 +334,16 @@ class Position:
         self.z = pos.z_val
 
 
-# Класс для орбитального движения
-class OrbitNavigator(Missions):
-    def __init__(self, **kwargs):
-        """Инициализация параметров миссии.
+# Общая логика орбитального полета для синхронной и асинхронной миссий
+class OrbitTracker:
+    def init_orbit(self, kwargs):
+        """Разобрать параметры орбитального движения.
 
         Args:
-            kwargs: Параметры орбитального движения:
-                radius: радиус круга.
-                altitude: высота полета.
-                velocity: скорость дрона.
-                iterations: количество кругов.
-                center: список с координатами центра круга.
-                snapshots: количество требуемых снимков.
+            kwargs: Параметры орбитального движения (см. OrbitNavigator).
+
+        Returns:
+            tuple: Смещение центра орбиты (cx, cy) относительно стартовой позиции.
         """
         self.radius = kwargs.get('radius')  # Радиус орбиты
         self.altitude = kwargs.get('altitude')  # Высота полета
@@ -196,12 +355,19 @@ class OrbitNavigator(Missions):
         self.next_snapshot = None
         self.z = None
         self.snapshot_index = 0
+        self.orbit_count = 0  # Количество завершенных кругов
         self.takeoff = False  # Флаг успешного взлета
 
-        if self.snapshots is not None and self.snapshots > 0:
+        # Проверка на наличие необходимых параметров
+        if (self.radius is None or self.altitude is None or self.velocity is None or self.iterations is None
+                or self.snapshots is None or center is None):
+            raise ValueError(
+                "Отсутствуют необходимые параметры: radius, altitude, velocity, iterations, center  and snapshots!")
+
+        if self.snapshots > 0:
             self.snapshot_delta = 360 / self.snapshots  # Вычисляем интервал для снимков
 
-        if self.iterations is not None and self.iterations <= 0:
+        if self.iterations <= 0:
             self.iterations = 1  # Устанавливаем минимальное количество итераций
 
         if len(center) != 2:
@@ -216,144 +382,44 @@ class OrbitNavigator(Missions):
         cy /= length  # Нормализуем y
         cx *= self.radius  # Масштабируем до радиуса
         cy *= self.radius  # Масштабируем до радиуса
+        return cx, cy
 
-        # Проверка на наличие необходимых параметров
-        if (self.radius is None or self.altitude is None or self.velocity is None or self.iterations is None
-                or self.snapshots is None or center is None):
-            raise ValueError(
-                "Отсутствуют необходимые параметры: radius, altitude, velocity, iterations, center  and snapshots!")
-
-        self.client = airsim.MultirotorClient()  # Инициализация клиента AirSim
-        self.client.confirmConnection()  # Подтверждение подключения
-        self.client.enableApiControl(True)  # Включение API управления
-
-        # Хранение текущего положения дрона
-        self.home = self.client.getMultirotorState().kinematics_estimated.position
-
-        # Логика для стабилизации позиции
-        start = time.time()  # Время начала стабилизации
-        count = 0  # Счетчик успеха стабилизации
-        while count < 100:
-            pos = self.client.getMultirotorState().kinematics_estimated.position  # Получение текущей позиции
-            if abs(pos.z_val - self.home.z_val) > 1:  # Проверка на дрейф по вертикали
-                count = 0
-                self.home = pos  # Обновление домашней позиции
-                if time.time() - start > 10:  # Время ожидания
-                    logging.info("Drone position is drifting, we are waiting for it to settle down...")
-                    start = time.time()  # Сброс времени
-            else:
-                count += 1  # Успешная стабилизация
-
-        self.center = pos  # Установка центра орбиты
-        self.center.x_val += cx  # Установка x центра
-        self.center.y_val += cy  # Установка y центра
-
-
-    def start(self):
-        """Запустить выполнение миссии."""
-        logging.info("Армирование дрона...")
-        self.client.armDisarm(True)  # Армируем дрон
-
-        # AirSim использует координаты NED, поэтому ось Z направлена вверх.
-        start = self.client.getMultirotorState().kinematics_estimated.position  # Получение текущей позиции дрона
-        landed = self.client.getMultirotorState().landed_state  # Определение, приземлен ли дрон
-        if not self.takeoff and landed == airsim.LandedState.Landed:
-            self.takeoff = True  # Установка флага взлета
-            logging.info("Взлёт...")
-            self.client.takeoffAsync().join()  # Запуск взлета
-            start = self.client.getMultirotorState().kinematics_estimated.position  # Получение обновленной позиции после взлета
-            z = -self.altitude + self.home.z_val  # Установка высоты
-        else:
-            logging.info("Уже летим, так что мы выйдем на орбиту на текущей высоте {}".format(start.z_val))
-            z = start.z_val  # Используем текущую высоту
-
-        logging.info("Подъём на позицию: {},{},{}".format(start.x_val, start.y_val, z))
-        self.client.moveToPositionAsync(start.x_val, start.y_val, z,
-                                        self.velocity).join()  # Переход к начальной позиции на высоте
-        self.z = z
-
-        logging.info("Набор скорости...")
-        count = 0  # Счетчик итераций
-        self.start_angle = None
-        self.next_snapshot = None
-
-        # ramp up time
-        ramptime = self.radius / 10  # Время разгона
-        self.start_time = time.time()  # Время начала разгона
-
-        while count < self.iterations:
-            if self.snapshots > 0 and not (self.snapshot_index < self.snapshots):
-                break
-
-            # Увеличение скорости плавно, чтобы избежать резкого старта
-            now = time.time()
-            speed = self.velocity
-            diff = now - self.start_time
-            if diff < ramptime:  # Если еще не разогнались до полной скорости
-                speed = self.velocity * diff / ramptime
-            elif ramptime > 0:
-                logging.info("Дрон набрал полную скорость...")
-                ramptime = 0  # Завершаем разгон
-
-            lookahead_angle = speed / self.radius  # Угол опережения
-
-            # вычисляем текущий угол
-            pos = self.client.getMultirotorState().kinematics_estimated.position  # Получаем текущую позицию
-            dx = pos.x_val - self.center.x_val  # Расстояние по оси x до центра
-            dy = pos.y_val - self.center.y_val  # Расстояние по оси y до центра
-            actual_radius = math.sqrt((dx * dx) + (dy * dy))  # Расчет фактического радиуса
-            angle_to_center = math.atan2(dy, dx)  # Угол между позицией дрона и центром
-
-            camera_heading = (angle_to_center - math.pi) * 180 / math.pi  # Направление камеры
-
-            # вычисляем угол опережения
-            lookahead_x = self.center.x_val + self.radius * math.cos(angle_to_center + lookahead_angle)
-            lookahead_y = self.center.y_val + self.radius * math.sin(angle_to_center + lookahead_angle)
-
-            vx = lookahead_x - pos.x_val  # Вертикальная скорость
-            vy = lookahead_y - pos.y_val  # Горизонтальная скорость
-
-            if self.track_orbits(angle_to_center * 180 / math.pi):  # Отслеживание кругов
-                count += 1
-                logging.info("Завершение {} круга".format(count))
-
-            self.camera_heading = camera_heading  # Сохраняем направление камеры
-            self.client.moveByVelocityZAsync(vx, vy, z, 1, airsim.DrivetrainType.MaxDegreeOfFreedom,
-                                             airsim.YawMode(False, camera_heading))
-
-        # Возвращаемся к начальной позиции
-        self.client.moveToPositionAsync(start.x_val, start.y_val, z, self.velocity).join()
-        logging.info("Миссия завершена. Дрон готов к следующей миссии или посадке.")
-
+    @timed('orbit_step')
+    def orbit_step(self, pos, speed):
+        """Вычислить скорость движения по орбите из текущей позиции.
 
+        Args:
+            pos: Текущая позиция дрона (airsim.Vector3r).
+            speed: Текущая скорость полета.
 
-    def landed(self):
-        """Обработать событие приземления."""
-        # Даем дрону немного времени для стабилизации
-        self.client.hoverAsync().join()
-        time.sleep(2)
-
-        # После зависания снова включаем управление API для следующего этапа полета
-        self.client.enableApiControl(True)
+        Returns:
+            tuple: Скорости vx, vy, угол к центру (радианы) и направление камеры (градусы).
+        """
+        lookahead_angle = speed / self.radius  # Угол опережения
 
-        z = self.client.getMultirotorState().kinematics_estimated.position.z_val  # Текущая высота дрона
+        # вычисляем текущий угол
+        dx = pos.x_val - self.center.x_val  # Расстояние по оси x до центра
+        dy = pos.y_val - self.center.y_val  # Расстояние по оси y до центра
+        angle_to_center = math.atan2(dy, dx)  # Угол между позицией дрона и центром
 
-        # Если высота выше 5, опускаемся до 5
-        if z < -5:
-            logging.info("Снижаемся")
-            self.client.moveToPositionAsync(0, 0, -5, 5).join()
-            time.sleep(2)
+        camera_heading = (angle_to_center - math.pi) * 180 / math.pi  # Направление камеры
 
-        # Садимся на землю
-        logging.info("Посадка...")
-        self.client.landAsync().join()
+        # вычисляем угол опережения
+        lookahead_x = self.center.x_val + self.radius * math.cos(angle_to_center + lookahead_angle)
+        lookahead_y = self.center.y_val + self.radius * math.sin(angle_to_center + lookahead_angle)
 
-        # Блокируем дрон после завершения миссии
-        logging.info("Дрон заблокирован.")
-        self.client.armDisarm(False)
-        self.client.enableApiControl(False)
+        vx = lookahead_x - pos.x_val  # Вертикальная скорость
+        vy = lookahead_y - pos.y_val  # Горизонтальная скорость
+        return vx, vy, angle_to_center, camera_heading
 
+    def telemetry(self):
+        """Телеметрия орбитальной миссии: этап, количество кругов и номер следующего снимка."""
+        data = super().telemetry()
+        data.update({'orbit_count': self.orbit_count, 'snapshot_index': self.snapshot_index,
+                     'snapshots': self.snapshots})
+        return data
 
+    @timed('track_orbits')
     def track_orbits(self, angle):
         """Отслеживание завершенных орбит.
 
@@ -418,34 +484,6 @@ class OrbitNavigator(Missions):
         return crossing
 
 
-    def take_snapshot(self):
-        """Захватывает снимок текущей позиции дрона."""
-        # Получаем текущую позицию дрона
-        pos = self.client.getMultirotorState().kinematics_estimated.position
-        self.client.moveToPositionAsync(pos.x_val, pos.y_val, self.z, 0.5, 3, airsim.DrivetrainType.MaxDegreeOfFreedom,
-                                        airsim.YawMode(False, self.camera_heading)).join()  # Устанавливаем yaw на 0
-        responses = self.client.simGetImages(
-            [airsim.ImageRequest("Downward_Camera", airsim.ImageType.Scene)])  # Получаем изображение с камеры
-        response = responses[0]
-
-        # Определяем папку для сохранения фото
-        save_directory = 'PHOTO'
-
-        # Убедитесь, что директория существует
-        if not os.path.exists(save_directory):
-            os.makedirs(save_directory)  # Создаем директорию, если ее нет
-
-        # Создаем имя файла с указанием директории
-        filename = os.path.join(save_directory, "photo_" + str(self.snapshot_index) + '.png')
-        self.snapshot_index += 1  # Увеличиваем индекс снимка
-
-        # Сохраняем изображение
-        airsim.write_file(os.path.normpath(filename), response.image_data_uint8)  # Сохранение изображения
-        logging.info("Снимок сохранён: {}".format(filename))  # Сообщение о сохранении снимка
-
-        self.start_time = time.time()  # Обновляем время
-
-
     def sign(self, s):
         """Функция для определения знака числа.
 
@@ -460,6 +498,240 @@ class OrbitNavigator(Missions):
         return 1
 
 
+# Класс для орбитального движения
+class OrbitNavigator(OrbitTracker, Missions):
+    def __init__(self, **kwargs):
+        """Инициализация параметров миссии.
+
+        Args:
+            kwargs: Параметры орбитального движения:
+                radius: радиус круга.
+                altitude: высота полета.
+                velocity: скорость дрона.
+                iterations: количество кругов.
+                center: список с координатами центра круга.
+                snapshots: количество требуемых снимков.
+                mode: режим облета: 'precomputed' (по умолчанию) - по заранее рассчитанному расписанию
+                    скоростей, 'closed_loop' - с опросом позиции на каждом такте управления.
+                control_rate: частота управления, Гц (по умолчанию 20).
+                stop_for_capture: останавливать дрон для снимка (по умолчанию True); при False
+                    снимок получается рабочим потоком конвейера во время полета.
+                capture_workers: количество рабочих потоков конвейера снимков (по умолчанию 2).
+                capture_format: формат снимков конвейера: 'png' (по умолчанию) или 'raw'.
+                photo_directory: папка для снимков миссии (по умолчанию 'PHOTO').
+                vehicle_name: имя дрона в settings.json AirSim (по умолчанию - дрон по умолчанию).
+                ip: адрес симулятора AirSim (по умолчанию - локальный).
+                client_pool: пул подключений к AirSim (по умолчанию - общий пул процесса).
+        """
+        super().__init__(**kwargs)
+        cx, cy = self.init_orbit(kwargs)
+        self.mode = kwargs.get('mode', ORBIT_MODES[0])  # Режим облета
+        self.control_rate = kwargs.get('control_rate', 20)  # Частота управления, Гц
+        if self.mode not in ORBIT_MODES:
+            raise ValueError("Неизвестный режим облета: {}".format(self.mode))
+        self.stop_for_capture = kwargs.get('stop_for_capture', True)  # Остановка дрона для снимка
+        self.capture_workers = kwargs.get('capture_workers', 2)  # Потоки конвейера снимков
+        self.capture_format = kwargs.get('capture_format', 'png')  # Формат снимков
+        self.save_directory = kwargs.get('photo_directory', 'PHOTO')  # Папка для сохранения снимков
+        self.pipeline = None  # Конвейер снимков создается при запуске миссии
+
+        # Подключение к AirSim из общего пула (с замером времени вызовов, см. connect())
+        self.client = self.connect()
+        self.client.enableApiControl(True, self.vehicle_name)  # Включение API управления
+
+        # Ждем, пока позиция дрона перестанет дрейфовать, и запоминаем ее как домашнюю
+        pos = self.wait_settled()
+        self.home = airsim.Vector3r(pos.x_val, pos.y_val, pos.z_val)  # Хранение текущего положения дрона
+        self.center = airsim.Vector3r(pos.x_val + cx, pos.y_val + cy, pos.z_val)  # Установка центра орбиты
+
+
+    def start(self):
+        """Запустить выполнение миссии."""
+        self.start_recording()
+        try:
+            logging.info("Армирование дрона...")
+            self.phase = 'arm'
+            self.client.armDisarm(True, self.vehicle_name)  # Армируем дрон
+
+            # AirSim использует координаты NED, поэтому ось Z направлена вверх.
+            start = self.client.getMultirotorState(self.vehicle_name).kinematics_estimated.position  # Получение текущей позиции дрона
+            landed = self.client.getMultirotorState(self.vehicle_name).landed_state  # Определение, приземлен ли дрон
+            if not self.takeoff and landed == airsim.LandedState.Landed:
+                self.takeoff = True  # Установка флага взлета
+                logging.info("Взлёт...")
+                self.phase = 'takeoff'
+                self.client.takeoffAsync(vehicle_name=self.vehicle_name).join()  # Запуск взлета
+                start = self.client.getMultirotorState(self.vehicle_name).kinematics_estimated.position  # Получение обновленной позиции после взлета
+                z = -self.altitude + self.home.z_val  # Установка высоты
+            else:
+                logging.info("Уже летим, так что мы выйдем на орбиту на текущей высоте {}".format(start.z_val))
+                z = start.z_val  # Используем текущую высоту
+
+            logging.info("Подъём на позицию: {},{},{}".format(start.x_val, start.y_val, z))
+            self.phase = 'climb'
+            self.client.moveToPositionAsync(start.x_val, start.y_val, z,
+                                            self.velocity, vehicle_name=self.vehicle_name).join()  # Переход к начальной позиции на высоте
+            self.z = z
+
+            logging.info("Набор скорости...")
+            self.phase = 'orbit'
+            if self.snapshots > 0:
+                self.pipeline = CapturePipeline(self.ip, self.vehicle_name, self.save_directory, self.capture_workers,
+                                                self.capture_format, factory=self.client_pool.factory)
+            try:
+                if self.mode == 'precomputed':
+                    self.fly_schedule(start, z)
+                else:
+                    self.fly_closed_loop(z)
+            finally:
+                if self.pipeline is not None:
+                    self.pipeline.close()  # Дожидаемся записи всех снимков
+
+            # Возвращаемся к начальной позиции
+            self.phase = 'return'
+            self.client.moveToPositionAsync(start.x_val, start.y_val, z, self.velocity,
+                                            vehicle_name=self.vehicle_name).join()
+            self.phase = 'done'
+            logging.info("Миссия завершена. Дрон готов к следующей миссии или посадке.")
+        except MissionCancelled:
+            raise  # После отмены журнал продолжается до посадки
+        except Exception:
+            self.stop_recording()  # Миссия не дойдет до посадки: останавливаем потоки журнала
+            raise
+
+    def fly_closed_loop(self, z):
+        """Облет по орбите с обратной связью: на каждом такте запрашивается позиция дрона.
+
+        Такты следуют с частотой control_rate, поэтому цикл не загружает RPC и CPU
+        непрерывными запросами позиции.
+
+        Args:
+            z: Высота полета в координатах NED.
+        """
+        limiter = RateLimiter(self.control_rate)
+        self.orbit_count = 0  # Счетчик итераций
+        self.start_angle = None
+        self.next_snapshot = None
+
+        # ramp up time
+        ramptime = self.radius / 10  # Время разгона
+        self.start_time = time.time()  # Время начала разгона
+
+        while self.orbit_count < self.iterations:
+            self.check_cancelled()
+            if self.snapshots > 0 and not (self.snapshot_index < self.snapshots):
+                break
+            limiter.wait()
+
+            # Увеличение скорости плавно, чтобы избежать резкого старта
+            now = time.time()
+            speed = self.velocity
+            diff = now - self.start_time
+            if diff < ramptime:  # Если еще не разогнались до полной скорости
+                speed = self.velocity * diff / ramptime
+            elif ramptime > 0:
+                logging.info("Дрон набрал полную скорость...")
+                ramptime = 0  # Завершаем разгон
+
+            # вычисляем текущий угол и скорость движения к точке опережения
+            pos = self.client.getMultirotorState(self.vehicle_name).kinematics_estimated.position  # Получаем текущую позицию
+            vx, vy, angle_to_center, camera_heading = self.orbit_step(pos, speed)
+
+            if self.track_orbits(angle_to_center * 180 / math.pi):  # Отслеживание кругов
+                self.orbit_count += 1
+                logging.info("Завершение {} круга".format(self.orbit_count))
+
+            self.camera_heading = camera_heading  # Сохраняем направление камеры
+            self.client.moveByVelocityZAsync(vx, vy, z, 1, airsim.DrivetrainType.MaxDegreeOfFreedom,
+                                             airsim.YawMode(False, camera_heading), vehicle_name=self.vehicle_name)
+
+    def fly_schedule(self, start, z):
+        """Облет по заранее рассчитанному расписанию скоростей с фиксированной частотой управления.
+
+        Позиция дрона во время облета не запрашивается: на каждом такте отправляется
+        одна команда moveByVelocityZAsync, поэтому нагрузка на RPC и CPU ограничена
+        частотой control_rate.
+
+        Args:
+            start: Стартовая позиция дрона на орбите.
+            z: Высота полета в координатах NED.
+        """
+        # Расписание строится относительно точки старта и берется из кэша планов
+        offset = (self.center.x_val - self.home.x_val, self.center.y_val - self.home.y_val)
+        plan, _ = self.plan_cache.orbit(offset, self.radius, self.velocity, self.iterations, self.snapshots,
+                                        self.control_rate)
+        logging.info("Расчетное расстояние облета: {:.1f}, время: {:.1f} с".format(plan.distance, plan.duration))
+
+        limiter = RateLimiter(self.control_rate)
+        duration = 2 * limiter.period  # Команда действует до прихода следующей с запасом в один такт
+        self.orbit_count = 0
+        for (vx, vy), yaw, snapshot, laps in zip(plan.velocities.tolist(), plan.yaw.tolist(), plan.snapshot.tolist(),
+                                                 plan.laps.tolist()):
+            self.check_cancelled()
+            limiter.wait()
+            self.camera_heading = yaw
+            self.orbit_count = laps
+            self.client.moveByVelocityZAsync(vx, vy, z, duration, airsim.DrivetrainType.MaxDegreeOfFreedom,
+                                             airsim.YawMode(False, yaw), vehicle_name=self.vehicle_name)
+            if snapshot:
+                limiter.wait()  # Дожидаемся выхода в точку снимка
+                logging.info("Снимок {} по расписанию".format(self.snapshot_index))
+                self.take_snapshot()
+                limiter.reset()
+
+
+    def landed(self):
+        """Обработать событие приземления."""
+        self.phase = 'landing'
+        # Ждем стабилизации дрона после зависания
+        self.client.hoverAsync(self.vehicle_name).join()
+        self.wait_settled()
+
+        # После зависания снова включаем управление API для следующего этапа полета
+        self.client.enableApiControl(True, self.vehicle_name)
+
+        z = self.client.getMultirotorState(self.vehicle_name).kinematics_estimated.position.z_val  # Текущая высота дрона
+
+        # Если высота выше 5, опускаемся до 5
+        if z < -5:
+            logging.info("Снижаемся")
+            self.client.moveToPositionAsync(0, 0, -5, 5, vehicle_name=self.vehicle_name).join()
+            self.wait_settled()
+
+        # Садимся на землю
+        logging.info("Посадка...")
+        self.client.landAsync(vehicle_name=self.vehicle_name).join()
+
+        # Блокируем дрон после завершения миссии
+        logging.info("Дрон заблокирован.")
+        self.client.armDisarm(False, self.vehicle_name)
+        self.client.enableApiControl(False, self.vehicle_name)
+        self.phase = 'landed'
+        self.finish()
+
+
+    def take_snapshot(self):
+        """Захватывает снимок текущей позиции дрона.
+
+        Получение (при stop_for_capture=False), преобразование и запись снимка на диск
+        выполняются рабочими потоками конвейера, цикл управления не ждет их завершения.
+        """
+        # Получаем текущую позицию дрона
+        pos = self.client.getMultirotorState(self.vehicle_name).kinematics_estimated.position
+        response = None
+        if self.stop_for_capture:
+            self.client.moveToPositionAsync(pos.x_val, pos.y_val, self.z, 0.5, 3, airsim.DrivetrainType.MaxDegreeOfFreedom,
+                                            airsim.YawMode(False, self.camera_heading),
+                                            vehicle_name=self.vehicle_name).join()  # Устанавливаем yaw на 0
+            response = self.client.simGetImages([self.pipeline.image_request()],
+                                                vehicle_name=self.vehicle_name)[0]  # Получаем изображение с камеры
+
+        self.pipeline.submit(self.snapshot_index, pos, response)  # Запись снимка в фоновом потоке
+        self.snapshot_index += 1  # Увеличиваем индекс снимка
+
+        self.start_time = time.time()  # Обновляем время
+
+
 # Пример использования
 if __name__ == "__main__":
     # Создание экземпляра класса SurveyNavigator и запуск миссии
@@ -1,29 +1,75 @@
+import os
+import tempfile
+import threading
+import time
 import unittest
 from unittest.mock import patch, call
 import airsim
-from missions import SurveyNavigator, OrbitNavigator, Position
+from client_pool import ClientPool, default_pool
+from missions import ORBIT_MODES, MissionCancelled, SurveyNavigator, OrbitNavigator, Position
+from mock_airsim import MockSimulator
+from planner import plan_orbit
 
 class TestSurveyNavigator(unittest.TestCase):
+    def setUp(self):
+        default_pool.clear()  # Каждый тест получает собственный mock-клиент
+
     def test_init_with_missing_parameters(self):
         with self.assertRaises(ValueError):
             SurveyNavigator()
 
+    @patch('time.sleep')
     @patch('airsim.MultirotorClient')
-    def test_start(self, mock_client):
+    def test_start(self, mock_client, mock_sleep):
         # Arrange
         mock_client_instance = mock_client.return_value
-        mock_client_instance.getMultirotorState.return_value.landed_state = airsim.LandedState.Landed
-        mock_client_instance.moveToPositionAsync.return_value.join.return_value = None
-        mock_client_instance.moveOnPathAsync.return_value.join.return_value = None
+        mock_client_instance.getMultirotorState.return_value.landed_state = airsim.LandedState.Flying
         mission = SurveyNavigator(boxsize=30, stripewidth=10, altitude=30, velocity=10)
+        expected = mission.build_plan().compile()
 
         # Act
         mission.start()
 
         # Assert
         self.assertEqual(mock_client_instance.armDisarm.call_count, 1)
-        self.assertEqual(mock_client_instance.moveToPositionAsync.call_count, 2)
+        # Набор высоты, перелет к углу, полет змейкой и возврат - один вызов moveOnPathAsync
+        self.assertEqual(len(expected), 1)
         self.assertEqual(mock_client_instance.moveOnPathAsync.call_count, 1)
+        path = mock_client_instance.moveOnPathAsync.call_args.args[0]
+        self.assertEqual([[p.x_val, p.y_val, p.z_val] for p in path], expected[0].points.tolist())
+        self.assertEqual(mock_client_instance.moveToPositionAsync.call_count, 0)
+        mock_sleep.assert_not_called()  # Нет фиксированных пауз между участками
+        self.assertEqual(mission.phase, 'done')
+
+    def test_recorder_stopped_on_error(self):
+        simulator = MockSimulator(time_scale=50.0)
+        with tempfile.TemporaryDirectory() as directory:
+            mission = SurveyNavigator(boxsize=30, stripewidth=10, altitude=30, velocity=10,
+                                      flight_log=os.path.join(directory, 'flight'),
+                                      client_pool=ClientPool(factory=simulator.client))
+            threads = threading.active_count()
+
+            with patch.object(mission, 'fly_plan', side_effect=RuntimeError("сбой связи")):
+                with self.assertRaises(RuntimeError):
+                    mission.start()
+
+            # Потоки замеров и записи журнала остановлены, файл закрыт
+            self.assertIsNone(mission.recorder)
+            self.assertEqual(threading.active_count(), threads)
+
+    def test_recorder_kept_after_cancel(self):
+        simulator = MockSimulator(time_scale=50.0)
+        with tempfile.TemporaryDirectory() as directory:
+            mission = SurveyNavigator(boxsize=30, stripewidth=10, altitude=30, velocity=10,
+                                      flight_log=os.path.join(directory, 'flight'),
+                                      client_pool=ClientPool(factory=simulator.client))
+            mission.cancel()
+
+            with self.assertRaises(MissionCancelled):
+                mission.start()
+            self.assertIsNotNone(mission.recorder)  # Журнал продолжается до посадки
+            mission.finish()
+            self.assertIsNone(mission.recorder)
 
     @patch('airsim.MultirotorClient')
     def test_landed(self, mock_client):
@@ -43,6 +89,9 @@ class TestSurveyNavigator(unittest.TestCase):
         self.assertEqual(mock_client_instance.enableApiControl.call_count, 1)
 
 class TestOrbitNavigator(unittest.TestCase):
+    def setUp(self):
+        default_pool.clear()  # Каждый тест получает собственный mock-клиент
+
     def test_1_init_with_missing_parameters(self):
         with self.assertRaises(ValueError):
             OrbitNavigator()
@@ -83,6 +132,49 @@ class TestOrbitNavigator(unittest.TestCase):
         self.assertEqual(mock_client_instance.landAsync.call_count, 1)
         self.assertEqual(mock_client_instance.armDisarm.call_count, 1)
         self.assertEqual(mock_client_instance.enableApiControl.call_count, 1)
+    @patch('airsim.MultirotorClient')
+    def test_4_start_precomputed(self, mock_client):
+        # Arrange
+        mock_client_instance = mock_client.return_value
+        mock_client_instance.getMultirotorState.return_value.kinematics_estimated.position = airsim.Vector3r(0, 0, 0)
+        mock_client_instance.getMultirotorState.return_value.landed_state = airsim.LandedState.Landed
+        mission = OrbitNavigator(radius=1, altitude=30, velocity=10, iterations=1, center=[1, 0], snapshots=0,
+                                 mode='precomputed', control_rate=200)
+        mock_client_instance.getMultirotorState.reset_mock()
+        expected = plan_orbit((1, 0), (0, 0), 1, 10, 1, 0, rate=200)
+
+        # Act
+        mission.start()
+
+        # Assert
+        self.assertEqual(mock_client_instance.moveByVelocityZAsync.call_count, len(expected))
+        self.assertEqual(mock_client_instance.getMultirotorState.call_count, 3)  # Только до начала облета
+        self.assertEqual(mock_client_instance.moveToPositionAsync.call_count, 2)
+
+    def test_5_closed_loop_rate_limited(self):
+        simulator = MockSimulator(time_scale=10.0)
+        mission = OrbitNavigator(client_pool=ClientPool(factory=simulator.client), radius=5, altitude=5, velocity=5,
+                                 iterations=1, center=[1, 0], snapshots=0, mode='closed_loop', control_rate=100)
+
+        started = time.monotonic()
+        mission.start()
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(mission.orbit_count, 1)
+        # Не больше одного запроса позиции и одной команды на такт управления
+        self.assertLessEqual(simulator.calls['moveByVelocityZAsync'], elapsed * 100 + 1)
+
+    def test_6_default_mode(self):
+        simulator = MockSimulator()
+        mission = OrbitNavigator(client_pool=ClientPool(factory=simulator.client), radius=5, altitude=5, velocity=5,
+                                 iterations=1, center=[1, 0], snapshots=0)
+
+        self.assertEqual(mission.mode, 'precomputed')
+        self.assertEqual(ORBIT_MODES[0], mission.mode)
+        with self.assertRaises(ValueError):
+            OrbitNavigator(client_pool=ClientPool(factory=simulator.client), radius=5, altitude=5, velocity=5,
+                           iterations=1, center=[1, 0], snapshots=0, mode='busy_loop')
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,274 @@
+from collections import Counter
+import bisect
+import math
+import random
+import threading
+import time
+
+import airsim
+
+
+class MockFuture:
+    def __init__(self, vehicle, command, end):
+        """Результат асинхронной команды, аналог msgpackrpc Future в AirSim.
+
+        Args:
+            vehicle: Состояние дрона (MockVehicle).
+            command: Номер команды дрона; новая команда прерывает предыдущую.
+            end: Время завершения движения по часам симулятора.
+        """
+        self.vehicle = vehicle
+        self.command = command
+        self.end = end
+
+    def join(self):
+        """Дождаться завершения движения или его прерывания новой командой."""
+        simulator = self.vehicle.simulator
+        with simulator.condition:
+            while self.vehicle.command == self.command:
+                remaining = (self.end - simulator.now()) / simulator.time_scale
+                if remaining <= 0:
+                    break
+                simulator.condition.wait(remaining)
+        return None
+
+
+class MockVehicle:
+    def __init__(self, simulator, name):
+        """Кинематическое состояние одного дрона.
+
+        Движение задается ключевыми точками (время, позиция) с линейной интерполяцией
+        между ними; после последней точки дрон висит на месте.
+        """
+        self.simulator = simulator
+        self.name = name
+        self.times = [0.0]
+        self.points = [(0.0, 0.0, 0.0)]
+        self.landed_at = 0.0  # Время касания земли (None - дрон в воздухе)
+        self.command = 0
+        self.api_control = False
+        self.armed = False
+
+    def landed(self, t):
+        """True, если в момент t дрон стоит на земле."""
+        return self.landed_at is not None and t >= self.landed_at
+
+    def position(self, t):
+        """Позиция дрона в момент t по часам симулятора."""
+        i = bisect.bisect_right(self.times, t) - 1
+        if i < 0:
+            return self.points[0]
+        if i >= len(self.times) - 1:
+            return self.points[-1]
+        t0, t1 = self.times[i], self.times[i + 1]
+        k = (t - t0) / (t1 - t0) if t1 > t0 else 1.0
+        p0, p1 = self.points[i], self.points[i + 1]
+        return tuple(a + (b - a) * k for a, b in zip(p0, p1))
+
+    def velocity(self, t):
+        """Скорость дрона в момент t."""
+        i = bisect.bisect_right(self.times, t) - 1
+        if i < 0 or i >= len(self.times) - 1:
+            return (0.0, 0.0, 0.0)
+        dt = self.times[i + 1] - self.times[i]
+        if dt <= 0:
+            return (0.0, 0.0, 0.0)
+        return tuple((b - a) / dt for a, b in zip(self.points[i], self.points[i + 1]))
+
+    def start(self, waypoints, velocity=None, duration=None, timeout=None):
+        """Начать движение, прервав текущую команду.
+
+        Args:
+            waypoints: Точки маршрута (x, y, z).
+            velocity: Скорость движения, м/с (ограничивается max_speed симулятора).
+            duration: Общая длительность движения, с (вместо velocity).
+            timeout: Максимальная длительность команды, с.
+
+        Returns:
+            MockFuture: Результат команды.
+        """
+        simulator = self.simulator
+        with simulator.condition:
+            now = simulator.now()
+            times, points = [now], [self.position(now)]
+        if duration is None:
+            speed = min(velocity, simulator.max_speed) if velocity else simulator.max_speed
+            for point in waypoints:
+                distance = math.dist(points[-1], point)
+                times.append(times[-1] + distance / speed)
+                points.append(tuple(point))
+        else:
+            times.append(now + duration)
+            points.append(tuple(waypoints[-1]))
+        if timeout is not None and times[-1] - now > timeout:
+            end = now + timeout
+            stop = self.position_on(times, points, end)
+            i = bisect.bisect_right(times, end)
+            times, points = times[:i] + [end], points[:i] + [stop]
+
+        with simulator.condition:
+            self.times, self.points = times, points
+            self.command += 1
+            self.landed_at = None
+            simulator.condition.notify_all()
+            return MockFuture(self, self.command, times[-1])
+
+    @staticmethod
+    def position_on(times, points, t):
+        """Позиция на ломаной (times, points) в момент t."""
+        i = max(bisect.bisect_right(times, t) - 1, 0)
+        if i >= len(times) - 1:
+            return points[-1]
+        k = (t - times[i]) / (times[i + 1] - times[i]) if times[i + 1] > times[i] else 1.0
+        return tuple(a + (b - a) * k for a, b in zip(points[i], points[i + 1]))
+
+
+class MockSimulator:
+    def __init__(self, latency=0.0, max_speed=20.0, jitter=0.0, time_scale=1.0, seed=None, image_size=(64, 48)):
+        """Кинематическая модель AirSim в памяти процесса для тестов и бенчмарков.
+
+        Дроны перемещаются по прямым с заданной скоростью без динамики. Все вызовы
+        RPC подсчитываются в calls.
+
+        Args:
+            latency: Задержка каждого вызова RPC, с.
+            max_speed: Максимальная скорость дронов, м/с.
+            jitter: Стандартное отклонение шума позиции в getMultirotorState, м.
+            time_scale: Ускорение часов симулятора относительно реального времени.
+            seed: Начальное значение генератора шума.
+            image_size: Размер снимков камеры (ширина, высота).
+        """
+        self.latency = latency
+        self.max_speed = max_speed
+        self.jitter = jitter
+        self.time_scale = time_scale
+        self.image_size = image_size
+        self.calls = Counter()
+        self.condition = threading.Condition()
+        self._vehicles = {}
+        self._random = random.Random(seed)
+        self._started = time.monotonic()
+
+    def now(self):
+        """Время по часам симулятора, с."""
+        return (time.monotonic() - self._started) * self.time_scale
+
+    def vehicle(self, name=''):
+        """Состояние дрона (создается при первом обращении)."""
+        with self.condition:
+            if name not in self._vehicles:
+                self._vehicles[name] = MockVehicle(self, name)
+            return self._vehicles[name]
+
+    def client(self, ip='', port=41451):
+        """Создать клиента, совместимого с airsim.MultirotorClient (фабрика для ClientPool)."""
+        return MockMultirotorClient(self, ip, port)
+
+    def rpc(self, method):
+        """Учесть вызов RPC и выдержать задержку."""
+        with self.condition:
+            self.calls[method] += 1
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    def noise(self):
+        """Шум позиции, м."""
+        if self.jitter <= 0:
+            return 0.0
+        with self.condition:
+            return self._random.gauss(0, self.jitter)
+
+
+class MockMultirotorClient:
+    def __init__(self, simulator, ip='', port=41451):
+        """Клиент MockSimulator с интерфейсом airsim.MultirotorClient.
+
+        Args:
+            simulator: Модель симулятора.
+            ip: Адрес симулятора (не используется).
+            port: Порт RPC-сервера (не используется).
+        """
+        self.simulator = simulator
+        self.ip = ip
+        self.port = port
+
+    def _vehicle(self, method, vehicle_name):
+        self.simulator.rpc(method)
+        return self.simulator.vehicle(vehicle_name)
+
+    def confirmConnection(self):
+        self.simulator.rpc('confirmConnection')
+
+    def ping(self):
+        self.simulator.rpc('ping')
+        return True
+
+    def enableApiControl(self, is_enabled, vehicle_name=''):
+        self._vehicle('enableApiControl', vehicle_name).api_control = is_enabled
+
+    def armDisarm(self, arm, vehicle_name=''):
+        self._vehicle('armDisarm', vehicle_name).armed = arm
+        return True
+
+    def getMultirotorState(self, vehicle_name=''):
+        vehicle = self._vehicle('getMultirotorState', vehicle_name)
+        with self.simulator.condition:
+            t = self.simulator.now()
+            x, y, z = vehicle.position(t)
+            vx, vy, vz = vehicle.velocity(t)
+            landed = vehicle.landed(t)
+        state = airsim.MultirotorState()
+        state.kinematics_estimated.position = airsim.Vector3r(
+            x + self.simulator.noise(), y + self.simulator.noise(), z + self.simulator.noise())
+        state.kinematics_estimated.linear_velocity = airsim.Vector3r(vx, vy, vz)
+        state.landed_state = airsim.LandedState.Landed if landed else airsim.LandedState.Flying
+        return state
+
+    def takeoffAsync(self, timeout_sec=20, vehicle_name=''):
+        vehicle = self._vehicle('takeoffAsync', vehicle_name)
+        x, y, z = vehicle.position(self.simulator.now())
+        return vehicle.start([(x, y, z - 3)], velocity=1.0, timeout=timeout_sec)  # AirSim взлетает на 3 м
+
+    def landAsync(self, timeout_sec=60, vehicle_name=''):
+        vehicle = self._vehicle('landAsync', vehicle_name)
+        x, y, _ = vehicle.position(self.simulator.now())
+        future = vehicle.start([(x, y, 0.0)], velocity=2.0, timeout=timeout_sec)
+        vehicle.landed_at = future.end
+        return future
+
+    def hoverAsync(self, vehicle_name=''):
+        vehicle = self._vehicle('hoverAsync', vehicle_name)
+        return vehicle.start([vehicle.position(self.simulator.now())], duration=0.0)
+
+    def moveToPositionAsync(self, x, y, z, velocity, timeout_sec=3e+38, drivetrain=None, yaw_mode=None,
+                            lookahead=-1, adaptive_lookahead=1, vehicle_name=''):
+        vehicle = self._vehicle('moveToPositionAsync', vehicle_name)
+        return vehicle.start([(x, y, z)], velocity=velocity, timeout=timeout_sec)
+
+    def moveOnPathAsync(self, path, velocity, timeout_sec=3e+38, drivetrain=None, yaw_mode=None,
+                        lookahead=-1, adaptive_lookahead=1, vehicle_name=''):
+        vehicle = self._vehicle('moveOnPathAsync', vehicle_name)
+        return vehicle.start([(p.x_val, p.y_val, p.z_val) for p in path], velocity=velocity, timeout=timeout_sec)
+
+    def moveByVelocityZAsync(self, vx, vy, z, duration, drivetrain=None, yaw_mode=None, vehicle_name=''):
+        vehicle = self._vehicle('moveByVelocityZAsync', vehicle_name)
+        x0, y0, _ = vehicle.position(self.simulator.now())
+        speed = math.hypot(vx, vy)
+        if speed > self.simulator.max_speed:
+            vx, vy = vx * self.simulator.max_speed / speed, vy * self.simulator.max_speed / speed
+        return vehicle.start([(x0 + vx * duration, y0 + vy * duration, z)], duration=duration)
+
+    def simGetImages(self, requests, vehicle_name=''):
+        self._vehicle('simGetImages', vehicle_name)
+        width, height = self.simulator.image_size
+        responses = []
+        for request in requests:
+            response = airsim.ImageResponse()
+            response.width, response.height = width, height
+            response.compress = request.compress
+            if request.compress:
+                response.image_data_uint8 = b'\x89PNG\r\n\x1a\n' + bytes(width * height // 8)
+            else:
+                response.image_data_uint8 = bytes(width * height * 3)
+            responses.append(response)
+        return responses
@@ -0,0 +1,122 @@
+import threading
+import time
+import unittest
+
+import airsim
+
+from client_pool import ClientPool
+from missions import SurveyNavigator
+from mock_airsim import MockSimulator
+
+
+class TestMockSimulator(unittest.TestCase):
+    def setUp(self):
+        self.simulator = MockSimulator(time_scale=100.0)
+        self.client = self.simulator.client()
+
+    def position(self):
+        pos = self.client.getMultirotorState().kinematics_estimated.position
+        return pos.x_val, pos.y_val, pos.z_val
+
+    def test_move_duration(self):
+        started = self.simulator.now()
+        self.client.moveToPositionAsync(10, 0, 0, 5).join()
+
+        self.assertAlmostEqual(self.simulator.now() - started, 2.0, delta=0.2)
+        self.assertEqual(self.position(), (10.0, 0.0, 0.0))
+
+    def test_max_speed(self):
+        self.simulator.max_speed = 5.0
+        started = self.simulator.now()
+        self.client.moveToPositionAsync(10, 0, 0, 50).join()
+
+        self.assertGreaterEqual(self.simulator.now() - started, 2.0)
+
+    def test_path(self):
+        path = [airsim.Vector3r(10, 0, -5), airsim.Vector3r(10, 10, -5)]
+        self.client.moveOnPathAsync(path, 10).join()
+
+        self.assertEqual(self.position(), (10.0, 10.0, -5.0))
+
+    def test_new_command_interrupts_join(self):
+        future = self.client.moveToPositionAsync(1000, 0, 0, 1)
+        threading.Timer(0.05, self.client.hoverAsync).start()
+
+        started = time.monotonic()
+        future.join()
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertLess(self.position()[0], 1000)
+
+    def test_takeoff_and_land(self):
+        self.assertEqual(self.client.getMultirotorState().landed_state, airsim.LandedState.Landed)
+
+        self.client.takeoffAsync().join()
+        state = self.client.getMultirotorState()
+        self.assertEqual(state.landed_state, airsim.LandedState.Flying)
+        self.assertAlmostEqual(state.kinematics_estimated.position.z_val, -3.0)
+
+        self.client.landAsync().join()
+        self.assertEqual(self.client.getMultirotorState().landed_state, airsim.LandedState.Landed)
+
+    def test_timeout(self):
+        started = self.simulator.now()
+        self.client.moveToPositionAsync(100, 0, 0, 1, timeout_sec=1).join()
+
+        self.assertLess(self.simulator.now() - started, 2.0)
+        self.assertAlmostEqual(self.position()[0], 1.0, delta=0.01)
+
+    def test_vehicles_independent(self):
+        self.client.moveToPositionAsync(10, 0, 0, 20, vehicle_name='Drone1').join()
+        pos = self.client.getMultirotorState('Drone2').kinematics_estimated.position
+
+        self.assertEqual((pos.x_val, pos.y_val, pos.z_val), (0.0, 0.0, 0.0))
+
+    def test_rpc_count(self):
+        self.client.confirmConnection()
+        self.client.getMultirotorState()
+        self.client.getMultirotorState()
+
+        self.assertEqual(self.simulator.calls['getMultirotorState'], 2)
+        self.assertEqual(sum(self.simulator.calls.values()), 3)
+
+    def test_latency(self):
+        simulator = MockSimulator(latency=0.02)
+        client = simulator.client()
+
+        started = time.monotonic()
+        for _ in range(5):
+            client.ping()
+        self.assertGreaterEqual(time.monotonic() - started, 0.1)
+
+    def test_jitter(self):
+        simulator = MockSimulator(jitter=0.5, seed=1)
+        client = simulator.client()
+        xs = {client.getMultirotorState().kinematics_estimated.position.x_val for _ in range(5)}
+
+        self.assertEqual(len(xs), 5)
+
+    def test_images(self):
+        png, raw = self.client.simGetImages([
+            airsim.ImageRequest('Downward_Camera', airsim.ImageType.Scene),
+            airsim.ImageRequest('Downward_Camera', airsim.ImageType.Scene, False, False)])
+
+        self.assertTrue(png.image_data_uint8.startswith(b'\x89PNG'))
+        self.assertEqual(len(raw.image_data_uint8), raw.width * raw.height * 3)
+
+
+class TestSurveyOnMock(unittest.TestCase):
+    def test_mission(self):
+        simulator = MockSimulator(time_scale=50.0)
+        mission = SurveyNavigator(boxsize=10, stripewidth=5, altitude=10, velocity=10,
+                                  client_pool=ClientPool(factory=simulator.client))
+        mission.start()
+        mission.landed()
+
+        self.assertEqual(mission.phase, 'landed')
+        self.assertEqual(simulator.calls['moveOnPathAsync'], 1)
+        state = simulator.client().getMultirotorState()
+        self.assertEqual(state.landed_state, airsim.LandedState.Landed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,300 @@
+"""Разбиение области обследования между несколькими дронами.
+
+Полосы обследования области (см. planner.plan_polygon) делятся на K непрерывных
+групп, по одной на дрон. Границы групп подбираются динамическим программированием
+так, чтобы минимизировать время самого долгого дрона (makespan) с учетом перелета
+от точки старта дрона к его группе и возврата обратно. Группы полос не пересекаются
+и вместе покрывают все полосы, поэтому разбиение не дает ни перекрытий, ни пропусков.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from planner import SurveyPlan, _serpentine, _stripes
+
+
+class FleetPlan:
+    def __init__(self, plans, starts, ranges, times, velocity):
+        """Маршруты обследования для группы дронов.
+
+        Args:
+            plans: Маршруты дронов (SurveyPlan или None, если дрону не досталось полос).
+            starts: Точки старта дронов (x, y) в общей системе координат.
+            ranges: Номера полос каждого дрона, пары (первая, следующая за последней).
+            times: Расчетное время каждого дрона с перелетом к маршруту и возвратом, с.
+            velocity: Скорость полета, м/с.
+        """
+        self.plans = plans
+        self.starts = starts
+        self.ranges = ranges
+        self.times = times
+        self.velocity = velocity
+
+    def __len__(self):
+        return len(self.plans)
+
+    @property
+    def makespan(self):
+        """float: Расчетное время обследования - время самого долгого дрона, с."""
+        return max(self.times) if self.times else 0.0
+
+    @property
+    def balance(self):
+        """float: Отношение времени самого быстрого дрона с маршрутом к makespan (1 - идеальный баланс)."""
+        busy = [time for plan, time in zip(self.plans, self.times) if plan is not None]
+        return min(busy) / self.makespan if busy and self.makespan > 0 else 1.0
+
+    def local_plan(self, index):
+        """Маршрут дрона index в его собственной системе координат (относительно точки старта).
+
+        AirSim отсчитывает позицию каждого дрона от точки его появления, поэтому
+        маршрут в общей системе координат сдвигается на точку старта дрона.
+        """
+        plan = self.plans[index]
+        if plan is None:
+            return None
+        sx, sy = self.starts[index]
+        return SurveyPlan(plan.points - np.array([sx, sy, 0.0]), plan.stripes)
+
+
+def _block_costs(xs, y_low, y_high, start, velocity, turn_penalty):
+    """Время облета каждой непрерывной группы полос одним дроном.
+
+    Для группы [a, b) рассматриваются четыре варианта входа: с первой или последней
+    полосы, снизу или сверху; выбирается самый быстрый с учетом перелета от точки
+    start к началу маршрута и возврата от конца маршрута в start.
+
+    Returns:
+        tuple: Матрица времени формы (N + 1, N + 1) (inf при a > b, 0 при a == b)
+            и код варианта входа для каждой группы (0..3, см. _block_plan).
+    """
+    n = len(xs)
+    length = y_high - y_low
+    prefix = np.concatenate([[0.0], np.cumsum(length)])
+    dx = np.diff(xs)
+    c_high = np.hypot(dx, np.diff(y_high))
+    c_low = np.hypot(dx, np.diff(y_low))
+    even = np.arange(n - 1) % 2 == 0
+    # Суммы переходов между полосами при чередовании направлений: E - переход по верхним
+    # концам после четных полос, O - после нечетных
+    E = np.concatenate([[0.0], np.cumsum(np.where(even, c_high, c_low))])
+    O = np.concatenate([[0.0], np.cumsum(np.where(even, c_low, c_high))])
+
+    a, b = np.meshgrid(np.arange(n + 1), np.arange(n + 1), indexing='ij')
+    valid = a < b
+    ai = np.where(valid, a, 0)
+    li = np.where(valid, b - 1, 0)  # Последняя полоса группы
+    bi = np.where(valid, b - 1, 0)  # Индекс префикса переходов, заканчивающегося на последней полосе
+    count = np.where(valid, b - a, 0)
+    stripes = prefix[np.where(valid, b, 0)] - prefix[ai]
+
+    def point_distance(x, y):
+        return np.hypot(x - start[0], y - start[1])
+
+    def conn(high_on_even_start):
+        # Сумма переходов от полосы a до последней полосы: E или O по четности
+        return np.where(high_on_even_start, E[bi] - E[ai], O[bi] - O[ai])
+
+    same_parity = (count - 1) % 2 == 0  # Последняя полоса облетается в том же направлении, что и первая
+    options = []
+    # 0: с первой полосы вверх; 1: с первой полосы вниз
+    for up in (True, False):
+        connections = conn((ai % 2 == 0) == up)
+        entry = point_distance(xs[ai], np.where(up, y_low[ai], y_high[ai]))
+        last_up = same_parity == up
+        exit_ = point_distance(xs[li], np.where(last_up, y_high[li], y_low[li]))
+        options.append(entry + stripes + connections + exit_)
+    # 2: с последней полосы вверх; 3: с последней полосы вниз (облет в обратном порядке)
+    for up in (True, False):
+        connections = conn(((b % 2) == 0) == up)
+        entry = point_distance(xs[li], np.where(up, y_low[li], y_high[li]))
+        last_up = same_parity == up
+        exit_ = point_distance(xs[ai], np.where(last_up, y_high[ai], y_low[ai]))
+        options.append(entry + stripes + connections + exit_)
+
+    distance = np.stack(options)
+    choice = distance.argmin(axis=0)
+    times = distance.min(axis=0) / velocity + np.maximum(2 * count - 2, 0) * turn_penalty
+    times = np.where(valid, times, np.inf)
+    times[np.arange(n + 1), np.arange(n + 1)] = 0.0
+    return times, choice
+
+
+def _block_plan(xs, y_low, y_high, a, b, choice, origin, rotate, altitude):
+    """Маршрут дрона по группе полос [a, b) с выбранным вариантом входа."""
+    order = np.arange(a, b) if choice < 2 else np.arange(b - 1, a - 1, -1)
+    up = choice % 2 == 0
+    forward = (np.arange(len(order)) % 2 == 0) == up
+    points = _serpentine(xs[order], y_low[order], y_high[order], forward, origin, rotate, altitude)
+    return SurveyPlan(points, len(order))
+
+
+def partition_polygon(vertices, stripewidth, altitude, drones=None, starts=None, velocity=1.0, rotation=0.0,
+                      turn_radius=0.0, turn_penalty=0.0):
+    """Разбить обследование многоугольника между дронами с минимальным makespan.
+
+    Args:
+        vertices: Вершины многоугольника, последовательность пар (x, y).
+        stripewidth: Максимальное расстояние между полосами, м.
+        altitude: Высота полета, м.
+        drones: Количество дронов (по умолчанию - по количеству точек старта).
+        starts: Точки старта дронов (x, y) в системе координат области (по умолчанию все в (0, 0)).
+        velocity: Скорость полета, м/с.
+        rotation: Угол поворота направления полос, градусы.
+        turn_radius: Радиус разворота дрона, м (концы полос продлеваются, полосы не чередуются).
+        turn_penalty: Дополнительное время на каждый поворот, с.
+
+    Returns:
+        FleetPlan: Маршруты дронов в порядке точек старта.
+    """
+    if starts is None:
+        if not drones or drones < 1:
+            raise ValueError("Нужно задать количество дронов или их точки старта")
+        starts = [(0.0, 0.0)] * drones
+    starts = [tuple(map(float, start)) for start in starts]
+    if drones is not None and drones != len(starts):
+        raise ValueError("Количество точек старта не совпадает с количеством дронов")
+    if velocity <= 0:
+        raise ValueError("Скорость должна быть положительной")
+
+    xs, y_low, y_high, _, origin, rotate = _stripes(vertices, stripewidth, rotation, turn_radius)
+    n, k = len(xs), len(starts)
+
+    # Дроны получают группы полос в порядке расположения точек старта вдоль оси разбиения
+    local_starts = (np.asarray(starts) - origin) @ rotate
+    order = np.argsort(local_starts[:, 0], kind='stable')
+
+    costs, choices = [], []
+    for i in order:
+        cost, choice = _block_costs(xs, y_low, y_high, local_starts[i], velocity, turn_penalty)
+        costs.append(cost)
+        choices.append(choice)
+
+    # best[b] - минимальный makespan для полос [0, b) и уже рассмотренных дронов
+    best = costs[0][0].copy()
+    splits = []
+    for cost in costs[1:]:
+        candidates = np.maximum(best[:, None], cost)  # Последний дрон берет полосы [a, b)
+        splits.append(candidates.argmin(axis=0))
+        best = candidates.min(axis=0)
+
+    bounds = [n]
+    for split in reversed(splits):
+        bounds.append(int(split[bounds[-1]]))
+    bounds.append(0)
+    bounds.reverse()
+
+    plans, ranges, times = [None] * k, [None] * k, [0.0] * k
+    for position, i in enumerate(order):
+        a, b = bounds[position], bounds[position + 1]
+        ranges[i] = (a, b)
+        times[i] = float(costs[position][a, b])
+        if b > a:
+            plans[i] = _block_plan(xs, y_low, y_high, a, b, choices[position][a, b], origin, rotate, altitude)
+    return FleetPlan(plans, starts, ranges, times, velocity)
+
+
+def partition_rectangle(x_min, x_max, y_min, y_max, stripewidth, altitude, drones=None, starts=None, velocity=1.0,
+                        rotation=0.0, turn_radius=0.0, turn_penalty=0.0):
+    """Разбить обследование прямоугольника между дронами (см. partition_polygon)."""
+    vertices = [(x_min, y_min), (x_max, y_min), (x_max, y_max), (x_min, y_max)]
+    return partition_polygon(vertices, stripewidth, altitude, drones, starts, velocity, rotation, turn_radius,
+                             turn_penalty)
+
+
+def _segment_distance(points, a, b):
+    """Расстояние от точек формы (M, 2) до отрезков a-b формы (S, 2), матрица (M, S)."""
+    ab = b - a
+    length = np.maximum((ab ** 2).sum(axis=1), 1e-12)
+    t = np.clip(((points[:, None, :] - a) * ab).sum(axis=2) / length, 0.0, 1.0)
+    nearest = a + t[:, :, None] * ab
+    return np.linalg.norm(points[:, None, :] - nearest, axis=2)
+
+
+def plan_quality(fleet, vertices, stripewidth, resolution=None):
+    """Оценка качества разбиения по сетке точек области.
+
+    Точка считается покрытой дроном, если она не дальше stripewidth / 2 от отрезка его
+    маршрута (ширина полосы съемки равна stripewidth); перекрытием считаются точки строго
+    внутри полос нескольких дронов.
+
+    Args:
+        fleet: Маршруты дронов (FleetPlan).
+        vertices: Вершины области, последовательность пар (x, y).
+        stripewidth: Ширина полосы съемки, м.
+        resolution: Шаг сетки, м (по умолчанию stripewidth / 4).
+
+    Returns:
+        dict: makespan и баланс времени, доля пропусков (точки области без покрытия),
+            доля перекрытий (точки, покрытые несколькими дронами) и длины маршрутов.
+    """
+    vertices = np.asarray(vertices, dtype=float)
+    step = resolution or stripewidth / 4
+    (x_min, y_min), (x_max, y_max) = vertices.min(axis=0), vertices.max(axis=0)
+    gx, gy = np.meshgrid(np.arange(x_min, x_max + step / 2, step), np.arange(y_min, y_max + step / 2, step))
+    grid = np.column_stack([gx.ravel(), gy.ravel()])
+    grid = grid[_inside(grid, vertices)]
+
+    covered = np.zeros(len(grid), dtype=int)
+    inner = np.zeros(len(grid), dtype=int)  # Покрытие без границы полосы: стык соседних дронов не перекрытие
+    for plan in fleet.plans:
+        if plan is None or len(plan.points) < 2:
+            continue
+        path = plan.points[:, :2]
+        distance = _segment_distance(grid, path[:-1], path[1:]).min(axis=1)
+        covered += distance <= stripewidth / 2 + 1e-9
+        inner += distance < stripewidth / 2 - 1e-9
+    total = max(len(grid), 1)
+    return {
+        'makespan': fleet.makespan,
+        'balance': fleet.balance,
+        'gaps': float((covered == 0).sum() / total),
+        'overlap': float((inner > 1).sum() / total),
+        'distances': [plan.distance if plan is not None else 0.0 for plan in fleet.plans],
+    }
+
+
+def _inside(points, vertices):
+    """Признак попадания точек внутрь многоугольника или на его границу."""
+    x, y = points[:, 0:1], points[:, 1:2]
+    x1, y1 = vertices[:, 0], vertices[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        crosses = ((y1 > y) != (y2 > y)) & (x < (x2 - x1) * (y - y1) / (y2 - y1) + x1)
+    inside = crosses.sum(axis=1) % 2 == 1
+    on_edge = (_segment_distance(points, vertices, np.roll(vertices, -1, axis=0)) < 1e-9).any(axis=1)
+    return inside | on_edge
+
+
+def run_fleet_survey(fleet, vehicles, altitude, velocity, client_pool=None, land=True, **kwargs):
+    """Выполнить маршруты дронов одновременно миссиями SurveyNavigator.
+
+    Args:
+        fleet: Маршруты дронов (FleetPlan).
+        vehicles: Имена дронов в порядке точек старта fleet.
+        altitude: Высота полета, м.
+        velocity: Скорость полета, м/с.
+        client_pool: Пул подключений к AirSim.
+        land: Посадить дроны после обследования.
+        kwargs: Прочие параметры SurveyNavigator.
+
+    Returns:
+        list: Миссии дронов, получивших маршрут.
+    """
+    from missions import SurveyNavigator
+
+    if len(vehicles) != len(fleet):
+        raise ValueError("Количество дронов не совпадает с количеством маршрутов")
+    missions = [SurveyNavigator(plan=fleet.local_plan(i), altitude=altitude, velocity=velocity,
+                                vehicle_name=vehicle, client_pool=client_pool, **kwargs)
+                for i, vehicle in enumerate(vehicles) if fleet.plans[i] is not None]
+
+    def fly(mission):
+        mission.start()
+        if land:
+            mission.landed()
+
+    with ThreadPoolExecutor(max_workers=max(len(missions), 1), thread_name_prefix='fleet') as executor:
+        for future in [executor.submit(fly, mission) for mission in missions]:
+            future.result()
+    return missions
@@ -0,0 +1,118 @@
+import itertools
+import math
+import unittest
+
+import numpy as np
+
+from client_pool import ClientPool
+from mock_airsim import MockSimulator
+from partition import _block_costs, partition_polygon, partition_rectangle, plan_quality, run_fleet_survey
+from planner import _stripes, plan_rectangle
+
+SQUARE = [(-100, -100), (100, -100), (100, 100), (-100, 100)]
+TRIANGLE = [(0, 0), (100, 0), (0, 80)]
+
+
+def route_time(plan, start, velocity):
+    """Время по геометрии маршрута: перелет к началу, маршрут и возврат."""
+    first, last = plan.points[0, :2], plan.points[-1, :2]
+    return (math.dist(start, first) + plan.distance + math.dist(last, start)) / velocity
+
+
+class TestPartition(unittest.TestCase):
+    def test_ranges_cover_all_stripes(self):
+        fleet = partition_rectangle(-100, 100, -100, 100, 10, 30, drones=3, velocity=10)
+
+        bounds = sorted(fleet.ranges)
+        self.assertEqual(bounds[0][0], 0)
+        self.assertEqual(bounds[-1][1], 21)
+        for (_, end), (begin, _) in zip(bounds, bounds[1:]):
+            self.assertEqual(end, begin)
+        self.assertEqual(sum(plan.stripes for plan in fleet.plans), 21)
+
+    def test_makespan_scales_with_drones(self):
+        single = plan_rectangle(-100, 100, -100, 100, 10, 30).distance / 10
+        for drones in (2, 4):
+            fleet = partition_rectangle(-100, 100, -100, 100, 10, 30, drones=drones, velocity=10)
+            self.assertLess(fleet.makespan, 1.4 * single / drones)
+
+    def test_times_match_geometry(self):
+        starts = [(-150, 20), (30, 120), (90, -60)]
+        for vertices in (SQUARE, TRIANGLE):
+            fleet = partition_polygon(vertices, 7, 30, starts=starts, velocity=5)
+            for plan, start, time in zip(fleet.plans, starts, fleet.times):
+                if plan is not None:
+                    self.assertAlmostEqual(route_time(plan, start, 5), time, places=6)
+
+    def test_all_entry_variants_match_geometry(self):
+        xs, y_low, y_high, _, _, _ = _stripes(TRIANGLE, 9)
+        for start in [(-50, -50), (-50, 150), (150, -50), (150, 150)]:
+            fleet = partition_polygon(TRIANGLE, 9, 30, starts=[start], velocity=1)
+            self.assertAlmostEqual(route_time(fleet.plans[0], start, 1), fleet.times[0], places=6)
+
+    def test_dp_is_optimal(self):
+        xs, y_low, y_high, _, _, _ = _stripes(TRIANGLE, 12)
+        starts = [(0, 0), (40, 0), (90, 0)]
+        costs = [_block_costs(xs, y_low, y_high, np.array(start) - np.mean(TRIANGLE, axis=0), 1.0, 0.0)[0]
+                 for start in starts]
+        n = len(xs)
+        brute = min(max(costs[0][0, a], costs[1][a, b], costs[2][b, n])
+                    for a, b in itertools.combinations_with_replacement(range(n + 1), 2))
+
+        fleet = partition_polygon(TRIANGLE, 12, 30, starts=starts, velocity=1)
+        self.assertAlmostEqual(fleet.makespan, brute, places=6)
+
+    def test_starts_order_blocks(self):
+        fleet = partition_rectangle(-100, 100, -100, 100, 10, 30, starts=[(100, 0), (-100, 0)], velocity=10)
+
+        self.assertGreater(fleet.ranges[0][0], fleet.ranges[1][0])  # Правый дрон получает правые полосы
+        self.assertGreaterEqual(fleet.plans[0].points[:, 0].min(), 0)
+
+    def test_more_drones_than_stripes(self):
+        fleet = partition_rectangle(0, 10, 0, 100, 10, 30, drones=4, velocity=10)
+
+        self.assertEqual(sum(plan is not None for plan in fleet.plans), 2)
+        self.assertEqual(sorted(fleet.times)[:2], [0.0, 0.0])
+
+    def test_quality(self):
+        fleet = partition_polygon(SQUARE, 10, 30, drones=3, velocity=10)
+        quality = plan_quality(fleet, SQUARE, 10)
+
+        self.assertEqual(quality['gaps'], 0.0)
+        self.assertEqual(quality['overlap'], 0.0)
+        self.assertAlmostEqual(quality['makespan'], fleet.makespan)
+        self.assertGreater(quality['balance'], 0.8)
+
+    def test_quality_detects_gaps(self):
+        fleet = partition_polygon(SQUARE, 10, 30, drones=2, velocity=10)
+        fleet.plans[1] = None  # Один дрон не вылетел
+
+        self.assertGreater(plan_quality(fleet, SQUARE, 10)['gaps'], 0.3)
+
+    def test_invalid_parameters(self):
+        with self.assertRaises(ValueError):
+            partition_polygon(SQUARE, 10, 30)
+        with self.assertRaises(ValueError):
+            partition_polygon(SQUARE, 10, 30, drones=2, starts=[(0, 0)])
+
+    def test_local_plan(self):
+        fleet = partition_rectangle(-50, 50, -50, 50, 10, 30, starts=[(-50, 0), (50, 0)], velocity=10)
+        local = fleet.local_plan(1)
+
+        np.testing.assert_allclose(local.points[:, 0] + 50, fleet.plans[1].points[:, 0])
+
+
+class TestFleetSurvey(unittest.TestCase):
+    def test_run_on_mock(self):
+        simulator = MockSimulator(time_scale=50.0)
+        fleet = partition_rectangle(-10, 10, -10, 10, 5, 10, drones=2, velocity=10)
+
+        missions = run_fleet_survey(fleet, ['Drone1', 'Drone2'], altitude=10, velocity=10,
+                                    client_pool=ClientPool(factory=simulator.client))
+
+        self.assertEqual([mission.phase for mission in missions], ['landed', 'landed'])
+        self.assertEqual(simulator.calls['moveOnPathAsync'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
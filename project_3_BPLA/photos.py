@@ -0,0 +1,205 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+import io
+import logging
+import math
+import os
+import re
+import struct
+import threading
+import zlib
+
+import numpy as np
+
+try:
+    from PIL import Image  # Необязательная зависимость: уменьшение снимков PNG
+except ImportError:
+    Image = None
+
+
+# Имена файлов снимков конвейера (см. capture.py)
+PHOTO_PATTERN = re.compile(r'^photo_(\d+)\.(png|npy)$')
+
+# Допустимые идентификаторы миссий (имя папки снимков)
+MISSION_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]+$')
+
+# Допустимые размеры миниатюр (наибольшая сторона), пикселей
+THUMBNAIL_SIZES = (64, 128, 256, 512)
+
+
+def encode_png(image):
+    """Сжать изображение в PNG без сторонних библиотек.
+
+    Args:
+        image: Массив uint8 формы (H, W), (H, W, 1), (H, W, 3) или (H, W, 4).
+
+    Returns:
+        bytes: Файл PNG.
+    """
+    image = np.ascontiguousarray(image, dtype=np.uint8)
+    if image.ndim == 2:
+        image = image[:, :, None]
+    height, width, channels = image.shape
+    color_type = {1: 0, 3: 2, 4: 6}[channels]
+    rows = np.zeros((height, width * channels + 1), dtype=np.uint8)  # Первый байт строки - фильтр 0
+    rows[:, 1:] = image.reshape(height, width * channels)
+
+    def chunk(tag, data):
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff)
+
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(rows.tobytes(), 6)) + chunk(b'IEND', b''))
+
+
+def _npy_thumbnail(source, size):
+    """Миниатюра несжатого снимка (.npy): прореживание без чтения всего файла в память."""
+    image = np.load(source, mmap_mode='r')
+    step = max(1, math.ceil(max(image.shape[:2]) / size))
+    thumbnail = np.array(image[::step, ::step])
+    if thumbnail.ndim == 3 and thumbnail.shape[2] in (3, 4):
+        thumbnail[:, :, :3] = thumbnail[:, :, 2::-1]  # Несжатый буфер AirSim хранится в порядке BGR
+    return encode_png(thumbnail)
+
+
+def _png_thumbnail(source, size):
+    """Миниатюра снимка PNG через Pillow."""
+    with Image.open(source) as image:
+        image.thumbnail((size, size))
+        if image.mode not in ('RGB', 'RGBA', 'L'):
+            image = image.convert('RGB')
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class PhotoStore:
+    def __init__(self, root='PHOTO', thumbnail_size=256, workers=2):
+        """Снимки миссий: отдельная папка на миссию и миниатюры, создаваемые по запросу.
+
+        Снимки миссии хранятся в <root>/<mission_id>/photo_N.png (или .npy для
+        формата 'raw'), поэтому следующая миссия их не перезаписывает. Миниатюры
+        создаются в фоновом пуле потоков при первом запросе и сохраняются рядом
+        со снимками в папке thumbs; повторные запросы отдают готовый файл.
+        Одновременные запросы одной миниатюры ждут одну задачу пула.
+
+        Уменьшение снимков PNG требует Pillow; без него вместо миниатюры PNG
+        отдается исходный снимок. Миниатюры снимков .npy создаются средствами NumPy.
+
+        Args:
+            root: Корневая папка снимков.
+            thumbnail_size: Размер миниатюры по умолчанию (наибольшая сторона), пикселей.
+            workers: Количество потоков создания миниатюр.
+        """
+        self.root = os.path.abspath(root)
+        self.thumbnail_size = thumbnail_size
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='thumbnail')
+        self._pending = {}  # Путь миниатюры -> Future создаваемой миниатюры
+        self._lock = threading.Lock()
+        self._warned = False
+
+    def directory(self, mission_id):
+        """Папка снимков миссии.
+
+        Raises:
+            ValueError: Если идентификатор миссии содержит недопустимые символы.
+        """
+        if not MISSION_ID_PATTERN.match(str(mission_id)):
+            raise ValueError("Некорректный идентификатор миссии")
+        return os.path.join(self.root, mission_id)
+
+    def list(self, mission_id):
+        """Снимки миссии в порядке номеров.
+
+        Returns:
+            list: Словари с номером, именем файла, форматом, размером (байт) и временем изменения.
+        """
+        photos = []
+        try:
+            entries = os.scandir(self.directory(mission_id))
+        except FileNotFoundError:
+            return photos
+        with entries:
+            for entry in entries:
+                match = PHOTO_PATTERN.match(entry.name)
+                if match is None or not entry.is_file():
+                    continue
+                stat = entry.stat()
+                photos.append({'index': int(match.group(1)), 'filename': entry.name, 'format': match.group(2),
+                               'size': stat.st_size, 'modified': stat.st_mtime})
+        photos.sort(key=lambda photo: photo['index'])
+        return photos
+
+    def path(self, mission_id, index):
+        """Путь к снимку index миссии или None, если снимка нет."""
+        directory = self.directory(mission_id)
+        for extension in ('png', 'npy'):
+            path = os.path.join(directory, f'photo_{int(index)}.{extension}')
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def thumbnail(self, mission_id, index, size=None):
+        """Миниатюра снимка.
+
+        Args:
+            mission_id: Идентификатор миссии.
+            index: Номер снимка.
+            size: Наибольшая сторона миниатюры (по умолчанию thumbnail_size).
+
+        Returns:
+            concurrent.futures.Future: Путь к файлу миниатюры (PNG) или None, если снимка нет.
+        """
+        size = size or self.thumbnail_size
+        source = self.path(mission_id, index)
+        if source is None:
+            return None
+        if source.endswith('.png') and Image is None:
+            if not self._warned:
+                logging.info("Pillow не установлен, вместо миниатюр PNG отдаются исходные снимки")
+                self._warned = True
+            return _done(source)
+
+        target = os.path.join(os.path.dirname(source), 'thumbs', f'photo_{int(index)}_{size}.png')
+        if _fresh(target, source):
+            return _done(target)
+        with self._lock:
+            future = self._pending.get(target)
+            if future is not None:
+                return future
+            future = self._executor.submit(self._build, source, target, size)
+            self._pending[target] = future
+        # Вне блокировки: обратный вызов завершенной задачи выполняется сразу в этом потоке
+        future.add_done_callback(lambda _: self._forget(target))
+        return future
+
+    def close(self):
+        """Остановить пул создания миниатюр."""
+        self._executor.shutdown(wait=True)
+
+    def _forget(self, target):
+        with self._lock:
+            self._pending.pop(target, None)
+
+    def _build(self, source, target, size):
+        """Создать миниатюру в рабочем потоке (запись через временный файл)."""
+        data = _npy_thumbnail(source, size) if source.endswith('.npy') else _png_thumbnail(source, size)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        temporary = f'{target}.{threading.get_ident()}.tmp'
+        with open(temporary, 'wb') as f:
+            f.write(data)
+        os.replace(temporary, target)
+        return target
+
+
+def _fresh(target, source):
+    """True, если миниатюра существует и не старше снимка."""
+    try:
+        return os.path.getmtime(target) >= os.path.getmtime(source)
+    except OSError:
+        return False
+
+
+def _done(result):
+    """Завершенный Future с результатом result."""
+    future = Future()
+    future.set_result(result)
+    return future
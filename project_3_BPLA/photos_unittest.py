@@ -0,0 +1,130 @@
+import os
+import struct
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+import photos
+from photos import PhotoStore, encode_png
+
+
+def png_size(data):
+    """Ширина и высота изображения PNG из заголовка IHDR."""
+    return struct.unpack('>II', data[16:24])
+
+
+class TestPhotoStore(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.store = PhotoStore(self.root.name, thumbnail_size=64)
+        self.directory = self.store.directory('m1')
+        os.makedirs(self.directory)
+
+    def tearDown(self):
+        self.store.close()
+        self.root.cleanup()
+
+    def save_npy(self, index, shape=(300, 200, 3)):
+        path = os.path.join(self.directory, f'photo_{index}.npy')
+        np.save(path, np.random.default_rng(index).integers(0, 255, shape, dtype=np.uint8))
+        return path
+
+    def test_list_sorted_by_index(self):
+        for index in (10, 2, 1):
+            self.save_npy(index, (4, 4, 3))
+        open(os.path.join(self.directory, 'notes.txt'), 'w').close()
+
+        listed = self.store.list('m1')
+
+        self.assertEqual([photo['index'] for photo in listed], [1, 2, 10])
+        self.assertEqual(listed[0]['format'], 'npy')
+        self.assertEqual(listed[0]['size'], os.path.getsize(os.path.join(self.directory, 'photo_1.npy')))
+        self.assertEqual(self.store.list('unknown'), [])
+
+    def test_invalid_mission_id(self):
+        with self.assertRaises(ValueError):
+            self.store.directory('../etc')
+        with self.assertRaises(ValueError):
+            self.store.path('a/b', 0)
+
+    def test_path(self):
+        path = self.save_npy(0, (4, 4, 3))
+
+        self.assertEqual(self.store.path('m1', 0), path)
+        self.assertIsNone(self.store.path('m1', 1))
+        self.assertIsNone(self.store.thumbnail('m1', 1))
+
+    def test_npy_thumbnail(self):
+        self.save_npy(0)
+
+        path = self.store.thumbnail('m1', 0).result(timeout=5)
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        self.assertTrue(data.startswith(b'\x89PNG'))
+        width, height = png_size(data)
+        self.assertLessEqual(max(width, height), 64)
+        self.assertEqual((width, height), (40, 60))
+
+    def test_thumbnail_cached(self):
+        self.save_npy(0)
+        first = self.store.thumbnail('m1', 0).result(timeout=5)
+        modified = os.path.getmtime(first)
+
+        second = self.store.thumbnail('m1', 0)
+
+        self.assertTrue(second.done())
+        self.assertEqual(second.result(), first)
+        self.assertEqual(os.path.getmtime(first), modified)
+
+    def test_concurrent_requests_share_task(self):
+        self.save_npy(0)
+        calls = []
+        build = self.store._build
+        self.store._build = lambda *args: (calls.append(args), time.sleep(0.1), build(*args))[2]
+
+        futures = [self.store.thumbnail('m1', 0) for _ in range(5)]
+
+        self.assertEqual(len({result.result(timeout=5) for result in futures}), 1)
+        self.assertEqual(len(calls), 1)
+
+    def test_thumbnail_rebuilt_for_newer_photo(self):
+        source = self.save_npy(0)
+        thumbnail = self.store.thumbnail('m1', 0).result(timeout=5)
+        os.utime(thumbnail, (1, 1))
+
+        self.store.thumbnail('m1', 0).result(timeout=5)
+
+        self.assertGreaterEqual(os.path.getmtime(thumbnail), os.path.getmtime(source))
+
+    @unittest.skipIf(photos.Image is not None, "Pillow установлен")
+    def test_png_without_pillow(self):
+        path = os.path.join(self.directory, 'photo_0.png')
+        with open(path, 'wb') as f:
+            f.write(encode_png(np.zeros((8, 8, 3), dtype=np.uint8)))
+
+        self.assertEqual(self.store.thumbnail('m1', 0).result(timeout=5), path)
+
+    @unittest.skipIf(photos.Image is None, "Pillow не установлен")
+    def test_png_thumbnail(self):
+        with open(os.path.join(self.directory, 'photo_0.png'), 'wb') as f:
+            f.write(encode_png(np.zeros((300, 200, 3), dtype=np.uint8)))
+
+        with open(self.store.thumbnail('m1', 0).result(timeout=5), 'rb') as f:
+            width, height = png_size(f.read())
+        self.assertLessEqual(max(width, height), 64)
+
+
+class TestEncodePng(unittest.TestCase):
+    def test_header(self):
+        data = encode_png(np.zeros((3, 5), dtype=np.uint8))
+
+        self.assertTrue(data.startswith(b'\x89PNG\r\n\x1a\n'))
+        self.assertEqual(png_size(data), (5, 3))
+        self.assertTrue(data.endswith(b'IEND\xaeB`\x82'))
+
+
+if __name__ == '__main__':
+    unittest.main()
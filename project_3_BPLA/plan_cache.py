@@ -0,0 +1,310 @@
+from collections import OrderedDict
+import math
+import threading
+
+import numpy as np
+
+from mission_plan import survey_mission
+from planner import plan_orbit, plan_rectangle
+
+
+# Точность нормализации параметров ключа кэша (знаков после запятой)
+KEY_DIGITS = 6
+
+# Наибольшее количество точек (тактов) одного маршрута: параметры запроса, для которых
+# маршрут больше, отклоняются до его построения (ограничение памяти и времени расчета)
+MAX_PLAN_POINTS = 2_000_000
+
+
+def _number(value):
+    """Параметр ключа: число с фиксированной точностью (1, 1.0 и '1' дают один ключ)."""
+    value = float(value)
+    if not math.isfinite(value):
+        raise ValueError("Параметры плана должны быть конечными числами")
+    return round(value, KEY_DIGITS) + 0.0  # + 0.0 превращает -0.0 в 0.0
+
+
+def survey_key(boxsize, stripewidth, altitude, rotation=0.0, turn_radius=0.0):
+    """Нормализованный ключ маршрута обследования квадрата.
+
+    Скорость в ключ не входит: от нее зависит только расчетное время, а не маршрут.
+    """
+    return ('survey', _number(boxsize), _number(stripewidth), _number(altitude), _number(float(rotation) % 360),
+            _number(turn_radius))
+
+
+def orbit_key(offset, radius, velocity, iterations=1, snapshots=0, rate=20.0):
+    """Нормализованный ключ расписания облета (см. PlanCache.orbit())."""
+    return ('orbit', _number(offset[0]), _number(offset[1]), _number(radius), _number(velocity),
+            max(int(iterations), 1), int(snapshots), _number(rate))
+
+
+def survey_points(boxsize, stripewidth, rotation=0.0):
+    """Оценка количества точек маршрута обследования квадрата без его построения.
+
+    Маршрут содержит по две точки на полосу; ширина квадрата поперек полос
+    зависит от угла поворота (до 2 * boxsize * sqrt(2)).
+    """
+    theta = math.radians(rotation)
+    width = 2 * boxsize * (abs(math.cos(theta)) + abs(math.sin(theta)))
+    return 2 * (width / stripewidth + 2)
+
+
+def orbit_points(radius, velocity, iterations=1, snapshots=0, rate=20.0):
+    """Оценка сверху количества тактов расписания облета без его построения.
+
+    Время облета - длина дуги, деленная на скорость, плюс задержка из-за разгона
+    на каждом участке между снимками: не больше половины времени разгона radius / 10
+    (см. planner.plan_orbit).
+    """
+    laps = 1 if snapshots > 0 else max(iterations, 1)
+    segments = max(snapshots, 1)
+    duration = 2 * math.pi * radius * laps / velocity + segments * radius / 20
+    return duration * rate + segments + 1
+
+
+def orbit_offset(center, radius):
+    """Смещение центра орбиты от точки старта: направление center, масштабированное до radius."""
+    if isinstance(center, (str, bytes)) or len(center) != 2:
+        raise ValueError("Направление на центр орбиты задается двумя координатами [x, y]")
+    cx, cy = float(center[0]), float(center[1])
+    length = math.hypot(cx, cy)
+    if length == 0:
+        raise ValueError("Направление на центр орбиты не может быть нулевым")
+    return cx / length * radius, cy / length * radius
+
+
+def _plan_size(plan):
+    """Количество точек плана (мера занимаемой памяти)."""
+    return len(plan.points)
+
+
+def _freeze(plan):
+    """Запретить изменение массивов плана: один план используется многими миссиями."""
+    for value in vars(plan).values():
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False
+    return plan
+
+
+class PlanCache:
+    def __init__(self, maxsize=256, max_points=2_000_000, max_plan_points=MAX_PLAN_POINTS):
+        """Потокобезопасный кэш маршрутов с вытеснением давно не использованных (LRU).
+
+        Ключ - нормализованные параметры миссии, поэтому одинаковые запросы на запуск
+        и /api/plan используют один рассчитанный маршрут. Размер кэша ограничен
+        количеством записей и суммарным количеством точек маршрутов.
+
+        Args:
+            maxsize: Максимальное количество маршрутов.
+            max_points: Максимальное суммарное количество точек; маршрут больше
+                этого предела не кэшируется.
+            max_plan_points: Максимальное количество точек одного маршрута; маршрут
+                больше этого предела не строится (ValueError).
+        """
+        if maxsize < 1 or max_points < 1 or max_plan_points < 1:
+            raise ValueError("Размер кэша должен быть положительным")
+        self.maxsize = maxsize
+        self.max_points = max_points
+        self.max_plan_points = max_plan_points
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._plans = OrderedDict()  # Ключ -> маршрут, от давно использованных к недавним
+        self._points = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._plans)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._plans
+
+    def get_or_build(self, key, build):
+        """Вернуть маршрут из кэша или построить и сохранить его.
+
+        Маршрут строится вне блокировки, поэтому медленный расчет не задерживает
+        другие запросы; если два потока одновременно строят один маршрут,
+        в кэше остается первый.
+
+        Args:
+            key: Ключ маршрута (см. survey_key(), orbit_key()).
+            build: Функция без аргументов, строящая маршрут.
+
+        Returns:
+            tuple: Маршрут и признак того, что он взят из кэша.
+        """
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+                self.hits += 1
+                return plan, True
+            self.misses += 1
+
+        plan = _freeze(build())
+        size = _plan_size(plan)
+        if size > self.max_points:
+            return plan, False
+        with self._lock:
+            existing = self._plans.get(key)
+            if existing is not None:
+                return existing, False
+            self._plans[key] = plan
+            self._points += size
+            while len(self._plans) > self.maxsize or self._points > self.max_points:
+                _, evicted = self._plans.popitem(last=False)
+                self._points -= _plan_size(evicted)
+                self.evictions += 1
+        return plan, False
+
+    def check_size(self, points):
+        """Проверить оценку размера маршрута до его построения.
+
+        Raises:
+            ValueError: Если маршрут больше max_plan_points точек.
+        """
+        if points > self.max_plan_points:
+            raise ValueError(f"Маршрут слишком большой: около {points:.0f} точек при пределе {self.max_plan_points}")
+
+    def survey(self, boxsize, stripewidth, altitude, rotation=0.0, turn_radius=0.0):
+        """Маршрут обследования квадрата со стороной 2 * boxsize (см. planner.plan_rectangle).
+
+        Returns:
+            tuple: Маршрут (planner.SurveyPlan) и признак того, что он взят из кэша.
+
+        Raises:
+            ValueError: Если параметры некорректны или маршрут больше max_plan_points точек.
+        """
+        key = survey_key(boxsize, stripewidth, altitude, rotation, turn_radius)
+        if key[2] > 0:  # Некорректную ширину полосы отклоняет planner
+            self.check_size(survey_points(abs(key[1]), key[2], key[4]))
+        return self.get_or_build(key, lambda: plan_rectangle(-boxsize, boxsize, -boxsize, boxsize, stripewidth,
+                                                             altitude, rotation, turn_radius))
+
+    def orbit(self, offset, radius, velocity, iterations=1, snapshots=0, rate=20.0):
+        """Расписание облета по орбите относительно точки старта (см. planner.plan_orbit).
+
+        Расписание скоростей не зависит от положения точки старта, поэтому план
+        строится для старта в начале координат и центра орбиты в точке offset
+        (координаты точек плана - относительно точки старта).
+
+        Args:
+            offset: Смещение центра орбиты от точки старта (x, y), м.
+
+        Returns:
+            tuple: Расписание (planner.OrbitPlan) и признак того, что оно взято из кэша.
+
+        Raises:
+            ValueError: Если параметры некорректны или расписание больше max_plan_points тактов.
+        """
+        key = orbit_key(offset, radius, velocity, iterations, snapshots, rate)
+        if key[3] > 0 and key[4] > 0 and key[7] > 0:  # Некорректные значения отклоняет planner
+            self.check_size(orbit_points(key[3], key[4], key[5], key[6], key[7]))
+        return self.get_or_build(key, lambda: plan_orbit(offset, (0.0, 0.0), radius, velocity, iterations,
+                                                         snapshots, rate=rate))
+
+    def stats(self):
+        """Статистика кэша: попадания, промахи, вытеснения, количество маршрутов и точек."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'size': len(self._plans), 'points': self._points, 'maxsize': self.maxsize,
+                    'max_points': self.max_points}
+
+    def clear(self):
+        """Удалить все маршруты."""
+        with self._lock:
+            self._plans.clear()
+            self._points = 0
+
+
+# Общий кэш процесса: используется миссиями и /api/plan
+default_cache = PlanCache()
+
+
+def _mission_args(kind, params):
+    """Параметры маршрута миссии из запроса (см. dry_run())."""
+    if kind not in ('survey', 'orbit'):
+        raise ValueError(f"Неизвестный тип миссии: {kind}")
+    try:
+        altitude = float(params['altitude'])
+        velocity = float(params['velocity'])
+        if kind == 'survey':
+            boxsize, stripewidth = float(params['boxsize']), float(params['stripewidth'])
+            if boxsize <= 0 or stripewidth <= 0:
+                raise ValueError("boxsize и stripewidth должны быть положительными")
+            return {'boxsize': boxsize, 'stripewidth': stripewidth, 'altitude': altitude, 'velocity': velocity,
+                    'rotation': float(params.get('rotation', 0)), 'turn_radius': float(params.get('turn_radius', 0))}
+        radius = float(params['radius'])
+        return {'offset': orbit_offset(params['center'], radius), 'radius': radius, 'altitude': altitude,
+                'velocity': velocity, 'iterations': int(params.get('iterations', 1)),
+                'snapshots': int(params.get('snapshots', 0)), 'rate': float(params.get('control_rate', 20.0))}
+    except KeyError as e:
+        raise ValueError(f"Отсутствует параметр {e.args[0]}")
+    except TypeError:
+        raise ValueError("Параметры плана должны быть числами")
+
+
+def validate(kind, params, cache=None):
+    """Проверить параметры миссии и оценку размера маршрута, не строя его (для запросов на запуск).
+
+    Args:
+        kind: Тип миссии: 'survey' или 'orbit'.
+        params: Параметры миссии, как в запросе на запуск (см. dry_run()).
+        cache: Кэш маршрутов, предел размера которого проверяется (по умолчанию - общий кэш процесса).
+
+    Raises:
+        ValueError: Если тип миссии неизвестен, параметры некорректны или маршрут слишком большой.
+    """
+    cache = cache if cache is not None else default_cache
+    args = _mission_args(kind, params)
+    if kind == 'survey':
+        survey_key(args['boxsize'], args['stripewidth'], args['altitude'], args['rotation'], args['turn_radius'])
+        cache.check_size(survey_points(args['boxsize'], args['stripewidth'], args['rotation']))
+        return
+    orbit_key(args['offset'], args['radius'], args['velocity'], args['iterations'], args['snapshots'], args['rate'])
+    if args['radius'] > 0 and args['velocity'] > 0 and args['rate'] > 0:
+        cache.check_size(orbit_points(args['radius'], args['velocity'], args['iterations'], args['snapshots'],
+                                      args['rate']))
+
+
+def dry_run(kind, params, cache=None):
+    """Рассчитать маршрут миссии без полета (для /api/plan).
+
+    Координаты - NED относительно точки старта дрона.
+
+    Args:
+        kind: Тип миссии: 'survey' или 'orbit'.
+        params: Параметры миссии, как в запросе на запуск (survey: boxsize, stripewidth, altitude,
+            velocity, rotation, turn_radius; orbit: radius, altitude, velocity, iterations, center,
+            snapshots, control_rate).
+        cache: Кэш маршрутов (по умолчанию - общий кэш процесса).
+
+    Returns:
+        dict: Точки маршрута, длина, расчетное время, точки снимков и признак cached.
+
+    Raises:
+        ValueError: Если тип миссии неизвестен, параметры некорректны или маршрут больше
+            предела кэша max_plan_points.
+    """
+    cache = cache if cache is not None else default_cache
+    args = _mission_args(kind, params)
+    altitude, velocity = args['altitude'], args['velocity']
+    if kind == 'survey':
+        plan, cached = cache.survey(args['boxsize'], args['stripewidth'], altitude, args['rotation'],
+                                    args['turn_radius'])
+        mission = survey_mission(plan, altitude, velocity)
+        path = np.vstack([segment.points for segment in mission.compile() if segment.kind == 'move'])
+        return {'kind': kind, 'path': path.tolist(), 'distance': mission.distance,
+                'estimated_time': mission.estimate_time(start=(0.0, 0.0, 0.0)), 'stripes': plan.stripes,
+                'snapshot_points': [], 'cached': cached}
+    offset = args['offset']
+    plan, cached = cache.orbit(offset, args['radius'], velocity, args['iterations'], args['snapshots'], args['rate'])
+    z = np.full((len(plan.points), 1), -altitude)
+    snapshots = plan.snapshot_points
+    return {'kind': kind, 'path': np.hstack([plan.points, z]).tolist(), 'distance': plan.distance,
+            'estimated_time': plan.duration, 'center': list(offset),
+            'snapshot_points': np.hstack([snapshots, np.full((len(snapshots), 1), -altitude)]).tolist(),
+            'cached': cached}
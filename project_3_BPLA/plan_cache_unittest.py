@@ -0,0 +1,150 @@
+import unittest
+
+import numpy as np
+
+from client_pool import ClientPool
+from missions import SurveyNavigator
+from mock_airsim import MockSimulator
+from plan_cache import PlanCache, dry_run, orbit_key, orbit_points, survey_key, survey_points, validate
+from planner import SurveyPlan, plan_orbit, plan_rectangle
+
+
+def line(points):
+    """Маршрут из points точек."""
+    return SurveyPlan(np.zeros((points, 3)), 1)
+
+
+class TestPlanCache(unittest.TestCase):
+    def test_hit_and_miss(self):
+        cache = PlanCache()
+        first, cached = cache.survey(30, 10, 30)
+        second, cached_again = cache.survey(30.0, '10', 30)
+
+        self.assertFalse(cached)
+        self.assertTrue(cached_again)
+        self.assertIs(first, second)
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_key_normalization(self):
+        self.assertEqual(survey_key(30, 10, 30, rotation=360), survey_key(30.0, 10.0, 30.0, rotation=0))
+        self.assertNotEqual(survey_key(30, 10, 30), survey_key(30, 10, 31))
+        self.assertEqual(orbit_key((1, 0), 50, 10, iterations=0), orbit_key((1.0, -0.0), 50, 10, iterations=1))
+        with self.assertRaises(ValueError):
+            survey_key(float('nan'), 10, 30)
+
+    def test_lru_eviction(self):
+        cache = PlanCache(maxsize=2)
+        cache.get_or_build('a', lambda: line(2))
+        cache.get_or_build('b', lambda: line(2))
+        cache.get_or_build('a', lambda: line(2))  # 'a' использован недавно
+        cache.get_or_build('c', lambda: line(2))
+
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_points_bound(self):
+        cache = PlanCache(maxsize=10, max_points=10)
+        cache.get_or_build('a', lambda: line(6))
+        cache.get_or_build('b', lambda: line(6))
+
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.stats()['points'], 6)
+
+        _, cached = cache.get_or_build('huge', lambda: line(11))
+        self.assertFalse(cached)
+        self.assertNotIn('huge', cache)
+
+    def test_plans_read_only(self):
+        plan, _ = PlanCache().survey(30, 10, 30)
+        with self.assertRaises(ValueError):
+            plan.points[0, 0] = 1.0
+
+
+class TestDryRun(unittest.TestCase):
+    def test_survey(self):
+        cache = PlanCache()
+        result = dry_run('survey', {'boxsize': 30, 'stripewidth': 10, 'altitude': 30, 'velocity': 10}, cache)
+        plan = plan_rectangle(-30, 30, -30, 30, 10, 30)
+
+        self.assertFalse(result['cached'])
+        self.assertEqual(result['path'][0], [0.0, 0.0, -30.0])
+        self.assertEqual(result['path'][-1], [0.0, 0.0, -30.0])
+        self.assertGreater(result['distance'], plan.distance)  # С набором высоты, перелетом и возвратом
+        self.assertAlmostEqual(result['estimated_time'], (result['distance'] + 30) / 10)
+        self.assertTrue(dry_run('survey', {'boxsize': 30, 'stripewidth': 10, 'altitude': 30, 'velocity': 5},
+                                cache)['cached'])
+
+    def test_orbit(self):
+        result = dry_run('orbit', {'radius': 50, 'altitude': 30, 'velocity': 10, 'iterations': 1,
+                                   'center': [2, 0], 'snapshots': 4}, PlanCache())
+        expected = plan_orbit((50, 0), (0, 0), 50, 10, 1, 4)
+
+        self.assertEqual(result['center'], [50.0, 0.0])
+        self.assertEqual(len(result['path']), len(expected.points))
+        self.assertEqual(len(result['snapshot_points']), 4)
+        self.assertAlmostEqual(result['estimated_time'], expected.duration)
+        self.assertEqual(result['snapshot_points'][0][2], -30.0)
+
+    def test_invalid(self):
+        cache = PlanCache()
+        for kind, params in (('survey', {'boxsize': 30, 'stripewidth': 10, 'altitude': 30}),
+                             ('survey', {'boxsize': -1, 'stripewidth': 10, 'altitude': 30, 'velocity': 10}),
+                             ('survey', {'boxsize': 30, 'stripewidth': 10, 'altitude': 30, 'velocity': 0}),
+                             ('orbit', {'radius': 50, 'altitude': 30, 'velocity': 10, 'center': [0, 0]}),
+                             ('spiral', {'altitude': 30, 'velocity': 10})):
+            with self.assertRaises(ValueError):
+                dry_run(kind, params, cache)
+
+    def test_invalid_center(self):
+        for center in ([1], [1, 2, 3], 5, 'ab'):
+            params = {'radius': 50, 'altitude': 30, 'velocity': 10, 'center': center}
+            with self.assertRaises(ValueError):
+                dry_run('orbit', params, PlanCache())
+            with self.assertRaises(ValueError):
+                validate('orbit', params, PlanCache())
+
+    def test_size_estimates(self):
+        for boxsize, stripewidth, rotation in ((30, 10, 0), (100, 3, 30), (50, 7, 45)):
+            plan = plan_rectangle(-boxsize, boxsize, -boxsize, boxsize, stripewidth, 30, rotation)
+            estimate = survey_points(boxsize, stripewidth, rotation)
+            self.assertGreaterEqual(estimate, len(plan.points))
+            self.assertLess(estimate, len(plan.points) + 8)
+        for iterations, snapshots in ((1, 0), (3, 0), (1, 5)):
+            plan = plan_orbit((50, 0), (0, 0), 50, 10, iterations, snapshots)
+            estimate = orbit_points(50, 10, iterations, snapshots)
+            self.assertGreaterEqual(estimate, len(plan.points))
+            self.assertLess(estimate, len(plan.points) * 1.2)
+
+    def test_size_limit(self):
+        cache = PlanCache(max_plan_points=1000)
+        huge = (('survey', {'boxsize': 1e6, 'stripewidth': 0.001, 'altitude': 30, 'velocity': 10}),
+                ('orbit', {'radius': 50, 'altitude': 30, 'velocity': 10, 'iterations': 10 ** 9, 'center': [1, 0]}))
+        for kind, params in huge:
+            with self.assertRaises(ValueError):
+                validate(kind, params, cache)
+            with self.assertRaises(ValueError):
+                dry_run(kind, params, cache)
+        with self.assertRaises(ValueError):
+            cache.survey(1e6, 0.001, 30)
+        self.assertEqual(cache.stats()['misses'], 0)  # Маршруты не строились
+        validate('survey', {'boxsize': 30, 'stripewidth': 10, 'altitude': 30, 'velocity': 10}, cache)
+
+
+class TestMissionsUseCache(unittest.TestCase):
+    def test_survey_reuses_plan(self):
+        cache = PlanCache()
+        dry_run('survey', {'boxsize': 10, 'stripewidth': 5, 'altitude': 10, 'velocity': 10}, cache)
+        simulator = MockSimulator(time_scale=50.0)
+        mission = SurveyNavigator(boxsize=10, stripewidth=5, altitude=10, velocity=10, plan_cache=cache,
+                                  client_pool=ClientPool(factory=simulator.client))
+        mission.start()
+
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+        self.assertEqual(mission.phase, 'done')
+
+
+if __name__ == '__main__':
+    unittest.main()
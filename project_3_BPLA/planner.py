@@ -0,0 +1,306 @@
+import math
+
+import numpy as np
+
+
+class SurveyPlan:
+    def __init__(self, points, stripes):
+        """Маршрут обследования площади змейкой (boustrophedon).
+
+        Args:
+            points: Массив точек маршрута формы (N, 3) в координатах NED.
+            stripes: Количество полос в маршруте.
+        """
+        self.points = points
+        self.stripes = stripes
+        self._distance = None
+
+    def __len__(self):
+        return len(self.points)
+
+    @property
+    def distance(self):
+        """float: Точная длина маршрута (сумма длин отрезков между точками)."""
+        if self._distance is None:
+            self._distance = float(np.linalg.norm(np.diff(self.points, axis=0), axis=1).sum())
+        return self._distance
+
+    @property
+    def turns(self):
+        """int: Количество поворотов на маршруте."""
+        return max(len(self.points) - 2, 0)
+
+    def estimate_time(self, velocity, turn_penalty=0.0):
+        """Оценить время полета по маршруту.
+
+        Args:
+            velocity: Скорость полета, м/с.
+            turn_penalty: Дополнительное время на каждый поворот (торможение и разгон), с.
+
+        Returns:
+            float: Расчетное время полета, с.
+        """
+        return self.distance / velocity + self.turns * turn_penalty
+
+    def to_vector3r(self):
+        """Преобразовать маршрут в список airsim.Vector3r для moveOnPathAsync."""
+        import airsim
+        return [airsim.Vector3r(x, y, z) for x, y, z in self.points.tolist()]
+
+
+def _rotation_matrix(angle):
+    """Матрица поворота на плоскости на угол angle (градусы)."""
+    theta = math.radians(angle)
+    c, s = math.cos(theta), math.sin(theta)
+    return np.array([[c, -s], [s, c]])
+
+
+def _stripe_order(count, spacing, turn_radius):
+    """Порядок облета полос с учетом радиуса разворота.
+
+    Если расстояние между соседними полосами меньше диаметра разворота, полосы
+    облетаются через одну группу: 0, m, 1, m + 1, ..., чтобы расстояние между
+    последовательными полосами было не меньше 2 * turn_radius.
+    """
+    order = np.arange(count)
+    if turn_radius <= 0 or spacing >= 2 * turn_radius or count < 3:
+        return order
+    half = (count + 1) // 2
+    if (half - 1) * spacing < 2 * turn_radius:
+        return order  # Область слишком узкая для чередования полос
+    interleaved = np.empty(count, dtype=int)
+    interleaved[0::2] = order[:half]
+    interleaved[1::2] = order[half:]
+    return interleaved
+
+
+def _stripes(vertices, stripewidth, rotation=0.0, turn_radius=0.0):
+    """Полосы обследования многоугольника в повернутой системе координат.
+
+    Полосы проходят вдоль оси y, повернутой на угол rotation, с шагом не более
+    stripewidth; крайние полосы проходят по границе области. Для невыпуклого
+    многоугольника каждая полоса покрывает отрезок от первого до последнего
+    пересечения с границей. Концы полос продлеваются на turn_radius.
+
+    Returns:
+        tuple: Координаты полос xs, их начала y_low и концы y_high (массивы формы (N,)),
+            расстояние между полосами, центр системы координат и матрица поворота.
+    """
+    vertices = np.asarray(vertices, dtype=float)
+    if vertices.ndim != 2 or vertices.shape[1] != 2 or len(vertices) < 3:
+        raise ValueError("Ожидается не менее трех вершин многоугольника в виде пар (x, y)")
+    if stripewidth <= 0:
+        raise ValueError("Ширина полосы должна быть положительной")
+
+    # Переходим в систему координат, где полосы параллельны оси y
+    origin = vertices.mean(axis=0)
+    rotate = _rotation_matrix(rotation)
+    local = (vertices - origin) @ rotate
+
+    x_min, x_max = local[:, 0].min(), local[:, 0].max()
+    count = max(int(math.ceil((x_max - x_min) / stripewidth - 1e-9)), 0) + 1
+    xs = np.linspace(x_min, x_max, count)
+    spacing = (x_max - x_min) / (count - 1) if count > 1 else 0.0
+
+    # Пересечения всех полос со всеми ребрами многоугольника за одну операцию
+    x1, y1 = local[:, 0], local[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+    dx = x2 - x1
+    eps = 1e-9 * max(x_max - x_min, 1.0)
+    lo, hi = np.minimum(x1, x2) - eps, np.maximum(x1, x2) + eps
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.clip((xs[:, None] - x1) / dx, 0.0, 1.0)
+    ys = y1 + t * (y2 - y1)
+    hit = (xs[:, None] >= lo) & (xs[:, None] <= hi) & (dx != 0)
+    y_low = np.where(hit, ys, np.inf).min(axis=1)
+    y_high = np.where(hit, ys, -np.inf).max(axis=1)
+
+    # Полосы, касающиеся области в одной точке (вершина многоугольника), не облетаем
+    valid = np.isfinite(y_low) & (y_high - y_low > eps)
+    return xs[valid], y_low[valid] - turn_radius, y_high[valid] + turn_radius, spacing, origin, rotate
+
+
+def _serpentine(xs, y_low, y_high, forward, origin, rotate, altitude):
+    """Точки маршрута змейкой по полосам в заданном порядке.
+
+    Args:
+        xs, y_low, y_high: Полосы в повернутой системе координат в порядке облета.
+        forward: Признак облета полосы в сторону увеличения y, массив bool формы (N,).
+        origin, rotate: Центр и матрица поворота системы координат полос.
+        altitude: Высота полета, м.
+
+    Returns:
+        numpy.ndarray: Точки маршрута формы (2N, 3) в координатах NED.
+    """
+    local_path = np.empty((2 * len(xs), 2))
+    local_path[0::2, 0] = xs
+    local_path[1::2, 0] = xs
+    local_path[0::2, 1] = np.where(forward, y_low, y_high)
+    local_path[1::2, 1] = np.where(forward, y_high, y_low)
+
+    points = np.empty((len(local_path), 3))
+    points[:, :2] = local_path @ rotate.T + origin
+    points[:, 2] = -altitude  # В AirSim используются координаты NED, ось Z направлена вниз
+    return points
+
+
+def plan_polygon(vertices, stripewidth, altitude, rotation=0.0, turn_radius=0.0):
+    """Построить маршрут обследования многоугольника змейкой.
+
+    Полосы проходят вдоль оси y, повернутой на угол rotation, с шагом не более
+    stripewidth; крайние полосы проходят по границе области. Для невыпуклого
+    многоугольника каждая полоса покрывает отрезок от первого до последнего
+    пересечения с границей.
+
+    Args:
+        vertices: Вершины многоугольника, последовательность пар (x, y).
+        stripewidth: Максимальное расстояние между полосами, м.
+        altitude: Высота полета, м.
+        rotation: Угол поворота направления полос, градусы.
+        turn_radius: Радиус разворота дрона, м. Концы полос продлеваются на
+            turn_radius за границу области, чтобы разворот не срезал покрытие.
+
+    Returns:
+        SurveyPlan: Маршрут обследования.
+    """
+    xs, y_low, y_high, spacing, origin, rotate = _stripes(vertices, stripewidth, rotation, turn_radius)
+
+    order = _stripe_order(len(xs), spacing, turn_radius)
+    xs, y_low, y_high = xs[order], y_low[order], y_high[order]
+
+    # Направление полос чередуется: четные - в сторону увеличения y, нечетные - обратно
+    forward = np.arange(len(xs)) % 2 == 0
+    return SurveyPlan(_serpentine(xs, y_low, y_high, forward, origin, rotate, altitude), len(xs))
+
+
+def plan_rectangle(x_min, x_max, y_min, y_max, stripewidth, altitude, rotation=0.0, turn_radius=0.0):
+    """Построить маршрут обследования прямоугольника змейкой.
+
+    Args:
+        x_min, x_max, y_min, y_max: Границы прямоугольника в координатах NED, м.
+        stripewidth: Максимальное расстояние между полосами, м.
+        altitude: Высота полета, м.
+        rotation: Угол поворота направления полос, градусы.
+        turn_radius: Радиус разворота дрона, м.
+
+    Returns:
+        SurveyPlan: Маршрут обследования.
+    """
+    vertices = [(x_min, y_min), (x_max, y_min), (x_max, y_max), (x_min, y_max)]
+    return plan_polygon(vertices, stripewidth, altitude, rotation, turn_radius)
+
+
+class OrbitPlan:
+    def __init__(self, velocities, yaw, snapshot, points, rate, laps=None):
+        """Заранее рассчитанное расписание скоростей для облета по орбите.
+
+        Args:
+            velocities: Массив скоростей (vx, vy) формы (N, 2), по одной команде на такт.
+            yaw: Направление камеры на каждом такте, градусы, массив формы (N,).
+            snapshot: Признак снимка после такта, массив bool формы (N,).
+            points: Точки орбиты формы (N + 1, 2), к которым ведут команды.
+            rate: Частота управления, Гц.
+            laps: Количество завершенных кругов после каждого такта, массив формы (N,).
+        """
+        self.velocities = velocities
+        self.yaw = yaw
+        self.snapshot = snapshot
+        self.points = points
+        self.rate = rate
+        self.laps = laps if laps is not None else np.zeros(len(velocities), dtype=int)
+
+    def __len__(self):
+        return len(self.velocities)
+
+    @property
+    def duration(self):
+        """float: Длительность облета без учета остановок для снимков, с."""
+        return len(self.velocities) / self.rate
+
+    @property
+    def distance(self):
+        """float: Длина траектории облета, м."""
+        return float(np.linalg.norm(np.diff(self.points, axis=0), axis=1).sum())
+
+    @property
+    def snapshot_points(self):
+        """numpy.ndarray: Точки, в которых выполняются снимки, формы (K, 2)."""
+        return self.points[1:][self.snapshot]
+
+
+def _ramp_distance(t, velocity, ramp_time):
+    """Пройденный путь при линейном разгоне до velocity за ramp_time."""
+    if ramp_time <= 0:
+        return velocity * t
+    return np.where(t < ramp_time, velocity * t * t / (2 * ramp_time),
+                    velocity * ramp_time / 2 + velocity * (t - ramp_time))
+
+
+def _ramp_time_for(distance, velocity, ramp_time):
+    """Время, за которое при разгоне проходится путь distance."""
+    ramp_distance = velocity * ramp_time / 2
+    if ramp_time > 0 and distance < ramp_distance:
+        return math.sqrt(2 * ramp_time * distance / velocity)
+    return ramp_time + (distance - ramp_distance) / velocity
+
+
+def plan_orbit(center, start, radius, velocity, iterations=1, snapshots=0, ramp_time=None, rate=20.0,
+               ramp_after_snapshot=True):
+    """Рассчитать расписание скоростей для облета по орбите с фиксированной частотой управления.
+
+    Облет начинается из точки start и идет против часовой стрелки (в сторону
+    увеличения угла), как в режиме с обратной связью OrbitNavigator. Снимки
+    равномерно распределяются по первому кругу; если снимки заданы, облет
+    заканчивается последним снимком.
+
+    Args:
+        center: Центр орбиты (x, y).
+        start: Стартовая точка (x, y), по ней определяется начальный угол.
+        radius: Радиус орбиты, м.
+        velocity: Скорость полета, м/с.
+        iterations: Количество кругов (при snapshots == 0).
+        snapshots: Количество снимков.
+        ramp_time: Время разгона, с (по умолчанию radius / 10, как в OrbitNavigator).
+        rate: Частота управления, Гц.
+        ramp_after_snapshot: Разгоняться заново после каждого снимка с остановкой.
+
+    Returns:
+        OrbitPlan: Расписание скоростей.
+    """
+    if radius <= 0 or velocity <= 0 or rate <= 0:
+        raise ValueError("Радиус, скорость и частота управления должны быть положительными")
+    if ramp_time is None:
+        ramp_time = radius / 10
+    dt = 1.0 / rate
+    center = np.asarray(center, dtype=float)
+    start = np.asarray(start, dtype=float)
+    start_angle = math.atan2(start[1] - center[1], start[0] - center[0])
+
+    # Границы участков: снимок в конце каждого участка
+    total = 2 * math.pi * (1 if snapshots > 0 else max(iterations, 1))
+    if snapshots > 0 and ramp_after_snapshot:
+        bounds = np.linspace(0, total, snapshots + 1)
+    else:
+        bounds = np.array([0, total])
+    snapshot_angles = np.linspace(0, total, snapshots + 1)[1:] if snapshots > 0 else np.empty(0)
+
+    angles = [np.zeros(1)]
+    for begin, end in zip(bounds[:-1], bounds[1:]):
+        arc = (end - begin) * radius
+        duration = _ramp_time_for(arc, velocity, ramp_time)
+        ticks = np.arange(1, int(math.ceil(duration / dt - 1e-9)) + 1) * dt
+        travelled = np.minimum(_ramp_distance(ticks, velocity, ramp_time), arc)
+        angles.append(begin + travelled / radius)
+    angles = np.concatenate(angles)
+
+    theta = start_angle + angles
+    points = center + radius * np.column_stack((np.cos(theta), np.sin(theta)))
+    velocities = np.diff(points, axis=0) / dt
+    yaw = np.degrees(theta[:-1] - math.pi)  # Камера направлена на центр орбиты
+
+    snapshot = np.zeros(len(velocities), dtype=bool)
+    if len(snapshot_angles):
+        ticks = np.searchsorted(angles[1:], snapshot_angles - 1e-9)
+        snapshot[np.minimum(ticks, len(snapshot) - 1)] = True
+    laps = np.floor(angles[1:] / (2 * math.pi) + 1e-9).astype(int)
+    return OrbitPlan(velocities, yaw, snapshot, points, rate, laps)
@@ -0,0 +1,96 @@
+import math
+import time
+import unittest
+
+import numpy as np
+
+from planner import plan_rectangle, plan_polygon, plan_orbit
+
+
+class TestPlanner(unittest.TestCase):
+    def test_rectangle_path(self):
+        plan = plan_rectangle(-30, 30, -30, 30, stripewidth=10, altitude=30)
+
+        self.assertEqual(plan.stripes, 7)
+        self.assertEqual(plan.points.shape, (14, 3))
+        np.testing.assert_allclose(plan.points[0], [-30, -30, -30])
+        np.testing.assert_allclose(plan.points[-1], [30, 30, -30])
+        self.assertAlmostEqual(plan.distance, 7 * 60 + 6 * 10)
+        self.assertAlmostEqual(plan.estimate_time(10), 48)
+        self.assertAlmostEqual(plan.estimate_time(10, turn_penalty=1), 48 + 12)
+
+    def test_spacing_never_exceeds_stripewidth(self):
+        plan = plan_rectangle(0, 25, 0, 10, stripewidth=10, altitude=5)
+
+        xs = plan.points[0::2, 0]
+        self.assertEqual(plan.stripes, 4)
+        self.assertTrue(np.all(np.diff(xs) <= 10))
+
+    def test_rotation_keeps_coverage_length(self):
+        plan = plan_rectangle(0, 100, 0, 100, stripewidth=10, altitude=5, rotation=90)
+
+        legs = np.linalg.norm(np.diff(plan.points, axis=0), axis=1)
+        self.assertAlmostEqual(legs[0], 100)
+        np.testing.assert_allclose(plan.points[0, :2], [100, 0], atol=1e-9)
+        np.testing.assert_allclose(plan.points[1, :2], [0, 0], atol=1e-9)
+
+    def test_triangle(self):
+        plan = plan_polygon([(0, 0), (10, 0), (0, 10)], stripewidth=5, altitude=5)
+
+        np.testing.assert_allclose(plan.points[:, :2], [[0, 0], [0, 10], [5, 5], [5, 0]])
+
+    def test_turn_radius_interleaves_stripes(self):
+        plan = plan_rectangle(0, 100, 0, 10, stripewidth=10, altitude=5, turn_radius=12)
+
+        xs = plan.points[0::2, 0]
+        self.assertEqual(sorted(xs), list(range(0, 101, 10)))
+        self.assertTrue(np.all(np.abs(np.diff(xs)) >= 24))
+        self.assertAlmostEqual(plan.points[:, 1].min(), -12)
+        self.assertAlmostEqual(plan.points[:, 1].max(), 22)
+
+    def test_invalid_parameters(self):
+        with self.assertRaises(ValueError):
+            plan_polygon([(0, 0), (1, 1)], stripewidth=1, altitude=5)
+        with self.assertRaises(ValueError):
+            plan_rectangle(0, 1, 0, 1, stripewidth=0, altitude=5)
+
+    def test_large_area_is_fast(self):
+        started = time.perf_counter()
+        plan = plan_rectangle(0, 1000, 0, 1000, stripewidth=1, altitude=30, rotation=30)
+        elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 0.1)
+        self.assertGreater(plan.stripes, 1000)
+        self.assertTrue(math.isfinite(plan.distance))
+
+
+class TestOrbitPlanner(unittest.TestCase):
+    def test_orbit_stays_on_circle(self):
+        plan = plan_orbit(center=(50, 0), start=(0, 0), radius=50, velocity=10, iterations=2, rate=20)
+
+        radii = np.linalg.norm(plan.points - [50, 0], axis=1)
+        np.testing.assert_allclose(radii, 50)
+        self.assertAlmostEqual(plan.distance, 2 * 2 * math.pi * 50, delta=0.1)
+        self.assertLessEqual(np.linalg.norm(plan.velocities, axis=1).max(), 10 + 1e-6)
+        self.assertFalse(plan.snapshot.any())
+        self.assertEqual(plan.laps[len(plan) // 4], 0)
+        self.assertEqual(plan.laps[-1], 2)
+        self.assertTrue(np.all(np.diff(plan.laps) >= 0))
+
+    def test_ramp_up(self):
+        plan = plan_orbit(center=(0, 0), start=(10, 0), radius=10, velocity=10, ramp_time=1, rate=10)
+
+        speeds = np.linalg.norm(plan.velocities, axis=1)
+        self.assertTrue(np.all(np.diff(speeds[:10]) > 0))
+        self.assertAlmostEqual(speeds[20], 10, delta=0.1)
+
+    def test_snapshots_evenly_spaced(self):
+        plan = plan_orbit(center=(0, 0), start=(10, 0), radius=10, velocity=5, iterations=3, snapshots=4, rate=20)
+
+        self.assertEqual(plan.snapshot.sum(), 4)
+        np.testing.assert_allclose(plan.snapshot_points, [[0, 10], [-10, 0], [0, -10], [10, 0]], atol=1e-6)
+        self.assertAlmostEqual(plan.distance, 2 * math.pi * 10, delta=0.1)
+
+
+if __name__ == '__main__':
+    unittest.main()
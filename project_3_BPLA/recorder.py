@@ -0,0 +1,177 @@
+import airsim
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+from flight_utils import RateLimiter
+
+
+# Формат записи журнала полета: время (Unix, с), позиция и скорость в NED (м, м/с), рыскание (рад)
+FLIGHT_DTYPE = np.dtype([('t', '<f8'), ('x', '<f4'), ('y', '<f4'), ('z', '<f4'),
+                         ('vx', '<f4'), ('vy', '<f4'), ('vz', '<f4'), ('yaw', '<f4')])
+
+
+class FlightRecorder:
+    def __init__(self, path, ip='', vehicle_name='', rate=50.0, chunk_size=512, buffers=4, port=41451, factory=None):
+        """Запись кинематики дрона в журнал полета.
+
+        Поток записи опрашивает дрон с частотой rate через собственное подключение
+        к AirSim, поэтому цикл управления миссии не замедляется. Замеры складываются
+        в заранее выделенные блоки NumPy по chunk_size записей; заполненный блок
+        дописывается в файл отдельным потоком и возвращается в пул. Память ограничена
+        buffers блоками: если запись на диск не успевает, новые замеры пропускаются
+        и учитываются в dropped.
+
+        Журнал - двоичный файл записей FLIGHT_DTYPE и файл описания <path>.json
+        (см. load_flight()).
+
+        Args:
+            path: Путь к файлу журнала.
+            ip: Адрес симулятора AirSim ('' - локальный).
+            vehicle_name: Имя дрона в settings.json AirSim.
+            rate: Частота замеров, Гц.
+            chunk_size: Количество записей в блоке.
+            buffers: Количество блоков в пуле.
+            port: Порт RPC-сервера AirSim.
+            factory: Функция создания клиента с аргументами ip и port
+                (по умолчанию airsim.MultirotorClient, см. ClientPool).
+        """
+        if rate <= 0:
+            raise ValueError("Частота замеров должна быть положительной")
+        if chunk_size < 1 or buffers < 2:
+            raise ValueError("Нужно не менее двух блоков хотя бы по одной записи")
+        self.path = path
+        self.ip = ip
+        self.port = port
+        self.vehicle_name = vehicle_name
+        self.rate = rate
+        self.chunk_size = chunk_size
+        self.factory = factory
+        self.samples = 0  # Записано замеров
+        self.dropped = 0  # Пропущено из-за переполнения пула блоков
+        self.errors = 0  # Ошибки запроса состояния дрона
+        self._free = queue.Queue()
+        for _ in range(buffers):
+            self._free.put(np.zeros(chunk_size, dtype=FLIGHT_DTYPE))
+        self._full = queue.Queue()
+        self._stop = threading.Event()
+        self._sampler = None
+        self._writer = None
+
+    def start(self):
+        """Создать журнал и запустить потоки записи (повторный вызов ничего не делает)."""
+        if self._sampler is not None:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path + '.json', 'w', encoding='utf-8') as f:
+            json.dump({'dtype': FLIGHT_DTYPE.descr, 'rate': self.rate, 'vehicle_name': self.vehicle_name,
+                       'started_at': time.time()}, f)
+        self._file = open(self.path, 'wb')
+        self._stop.clear()
+        self._writer = threading.Thread(target=self._write_loop, name='flight-writer', daemon=True)
+        self._sampler = threading.Thread(target=self._sample_loop, name='flight-recorder', daemon=True)
+        self._writer.start()
+        self._sampler.start()
+
+    def close(self):
+        """Остановить запись и дописать оставшиеся замеры."""
+        if self._sampler is None:
+            return
+        self._stop.set()
+        self._sampler.join()
+        self._full.put(None)
+        self._writer.join()
+        self._file.close()
+        self._sampler = self._writer = None
+        logging.info(f"Журнал полета {self.path}: {self.samples} замеров, пропущено {self.dropped}")
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _client(self):
+        client = (self.factory or airsim.MultirotorClient)(ip=self.ip, port=self.port)
+        client.confirmConnection()
+        return client
+
+    def _sample_loop(self):
+        """Цикл потока замеров."""
+        limiter = RateLimiter(self.rate)
+        client = None
+        block, count = self._free.get(), 0
+        while not self._stop.is_set():
+            limiter.wait()
+            if block is None:
+                try:
+                    block = self._free.get_nowait()
+                except queue.Empty:
+                    self.dropped += 1
+                    continue
+            try:
+                if client is None:
+                    client = self._client()
+                kinematics = client.getMultirotorState(self.vehicle_name).kinematics_estimated
+            except Exception as e:
+                if self.errors == 0:
+                    logging.info(f"Ошибка записи журнала полета '{self.vehicle_name}': {e}")
+                self.errors += 1
+                client = None
+                continue
+            pos, vel = kinematics.position, kinematics.linear_velocity
+            _, _, yaw = airsim.to_eularian_angles(kinematics.orientation)
+            block[count] = (time.time(), pos.x_val, pos.y_val, pos.z_val, vel.x_val, vel.y_val, vel.z_val, yaw)
+            count += 1
+            if count == self.chunk_size:
+                self._full.put((block, count))
+                block, count = None, 0
+        if block is not None:
+            if count:
+                self._full.put((block, count))
+            else:
+                self._free.put(block)
+
+    def _write_loop(self):
+        """Цикл потока записи блоков на диск."""
+        while True:
+            item = self._full.get()
+            if item is None:
+                return
+            block, count = item
+            try:
+                block[:count].tofile(self._file)
+                self._file.flush()
+                self.samples += count
+            except Exception as e:
+                logging.error(f"Ошибка записи журнала полета {self.path}: {e}")
+            self._free.put(block)
+
+
+def load_flight(path):
+    """Открыть журнал полета без загрузки в память.
+
+    Количество записей определяется по размеру файла, поэтому читается и журнал
+    незавершенного полета.
+
+    Args:
+        path: Путь к файлу журнала.
+
+    Returns:
+        tuple: Записи журнала (numpy.memmap с полями FLIGHT_DTYPE) и описание журнала (dict).
+    """
+    with open(path + '.json', encoding='utf-8') as f:
+        meta = json.load(f)
+    dtype = np.dtype([tuple(field) for field in meta['dtype']])
+    count = os.path.getsize(path) // dtype.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=dtype), meta
+    return np.memmap(path, dtype=dtype, mode='r', shape=(count,)), meta
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from client_pool import ClientPool
+from missions import SurveyNavigator
+from mock_airsim import MockSimulator
+from recorder import FLIGHT_DTYPE, FlightRecorder, load_flight
+
+
+class TestFlightRecorder(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'flight.bin')
+        self.simulator = MockSimulator(time_scale=10.0)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_record_and_load(self):
+        with FlightRecorder(self.path, vehicle_name='Drone1', rate=100, chunk_size=8,
+                            factory=self.simulator.client) as recorder:
+            self.simulator.client().moveToPositionAsync(10, 0, -5, 10, vehicle_name='Drone1').join()
+
+        records, meta = load_flight(self.path)
+        self.assertIsInstance(records, np.memmap)
+        self.assertEqual(records.dtype, FLIGHT_DTYPE)
+        self.assertEqual(len(records), recorder.samples)
+        self.assertGreater(len(records), 5)
+        self.assertEqual(recorder.dropped, 0)
+        self.assertEqual(meta['vehicle_name'], 'Drone1')
+        self.assertTrue(np.all(np.diff(records['t']) > 0))
+        self.assertAlmostEqual(float(records['x'][-1]), 10.0, places=3)
+        self.assertGreater(float(records['vx'].max()), 5.0)
+
+    def test_partial_chunk_flushed_on_close(self):
+        recorder = FlightRecorder(self.path, rate=200, chunk_size=1000, factory=self.simulator.client)
+        recorder.start()
+        time.sleep(0.05)
+        recorder.close()
+
+        records, _ = load_flight(self.path)
+        self.assertGreater(len(records), 0)
+        self.assertEqual(len(records), recorder.samples)
+
+    def test_bounded_memory(self):
+        release = threading.Event()
+        recorder = FlightRecorder(self.path, rate=500, chunk_size=2, buffers=2, factory=self.simulator.client)
+        write_loop = recorder._write_loop
+
+        def blocked_write_loop():
+            release.wait()  # Имитация медленного диска
+            write_loop()
+
+        recorder._write_loop = blocked_write_loop
+        recorder.start()
+        time.sleep(0.1)
+        release.set()
+        recorder.close()
+
+        self.assertGreater(recorder.dropped, 0)
+        records, _ = load_flight(self.path)
+        self.assertEqual(len(records), recorder.samples)
+
+    def test_empty_log(self):
+        with FlightRecorder(self.path, rate=1, factory=lambda ip, port: None):
+            pass
+        records, _ = load_flight(self.path)
+        self.assertEqual(len(records), 0)
+
+
+class TestMissionRecording(unittest.TestCase):
+    def test_survey_flight_log(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'survey.bin')
+            simulator = MockSimulator(time_scale=50.0)
+            mission = SurveyNavigator(boxsize=10, stripewidth=5, altitude=10, velocity=10, flight_log=path,
+                                      record_rate=50, client_pool=ClientPool(factory=simulator.client))
+            mission.start()
+            mission.landed()
+
+            self.assertIsNone(mission.recorder)
+            records, _ = load_flight(path)
+            self.assertGreater(len(records), 10)
+            self.assertAlmostEqual(float(records['z'].min()), -10.0, delta=0.5)
+            del records
+
+
+if __name__ == '__main__':
+    unittest.main()
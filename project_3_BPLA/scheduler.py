@@ -0,0 +1,123 @@
+from concurrent.futures import Future
+import heapq
+import itertools
+import logging
+import threading
+
+
+class VehicleScheduler:
+    def __init__(self, max_workers=4, vehicles=None, thread_name_prefix='mission'):
+        """Пул потоков с приоритетной очередью и последовательным выполнением задач каждого дрона.
+
+        Задачи одного дрона выполняются строго по очереди, поэтому две миссии никогда
+        не управляют одним дроном одновременно; задачи разных дронов выполняются
+        параллельно. Свободный поток берет задачу с наибольшим приоритетом, дрон
+        которой свободен (при равном приоритете - в порядке постановки), поэтому
+        задача занятого дрона не задерживает задачи остальных.
+
+        Args:
+            max_workers: Количество рабочих потоков.
+            vehicles: Парк дронов для задач без указанного дрона (по умолчанию [''] - дрон по умолчанию).
+            thread_name_prefix: Префикс имен рабочих потоков.
+        """
+        if max_workers < 1:
+            raise ValueError("Количество рабочих потоков должно быть положительным")
+        self.vehicles = list(vehicles) if vehicles else ['']
+        self._queue = []  # Куча (-приоритет, номер, задача)
+        self._counter = itertools.count()
+        self._busy = set()  # Дроны, задачи которых выполняются
+        self._condition = threading.Condition()
+        self._shutdown = False
+        self._threads = [threading.Thread(target=self._worker, name=f'{thread_name_prefix}-{i}', daemon=True)
+                         for i in range(max_workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, fn, *args, priority=0, vehicle=None):
+        """Поставить задачу в очередь.
+
+        Args:
+            fn: Функция задачи; первым аргументом получает имя назначенного дрона.
+            args: Остальные аргументы fn.
+            priority: Приоритет (больше - раньше).
+            vehicle: Имя дрона; None - первый свободный дрон парка.
+
+        Returns:
+            concurrent.futures.Future: Результат fn. Задачу из очереди можно снять
+                вызовом Future.cancel().
+        """
+        future = Future()
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("Планировщик остановлен")
+            heapq.heappush(self._queue, (-priority, next(self._counter), (fn, args, vehicle, future)))
+            self._condition.notify()
+        return future
+
+    @property
+    def busy_vehicles(self):
+        """set: Дроны, задачи которых выполняются."""
+        with self._condition:
+            return set(self._busy)
+
+    def pending(self):
+        """Количество задач в очереди."""
+        with self._condition:
+            return sum(1 for _, _, task in self._queue if not task[3].cancelled())
+
+    def shutdown(self, wait=True):
+        """Остановить рабочие потоки после выполнения задач из очереди (снятые задачи пропускаются)."""
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _take(self):
+        """Взять из очереди задачу со свободным дроном (вызывается под блокировкой).
+
+        Returns:
+            tuple: Задача и назначенный дрон или None, если подходящей задачи нет.
+        """
+        for entry in sorted(self._queue):
+            fn, args, vehicle, future = entry[2]
+            if future.cancelled():
+                self._queue.remove(entry)
+                continue
+            if vehicle is None:
+                vehicle = next((name for name in self.vehicles if name not in self._busy), None)
+                if vehicle is None:
+                    continue
+            elif vehicle in self._busy:
+                continue
+            self._queue.remove(entry)
+            heapq.heapify(self._queue)
+            self._busy.add(vehicle)
+            return entry[2], vehicle
+        heapq.heapify(self._queue)
+        return None
+
+    def _worker(self):
+        """Цикл рабочего потока."""
+        while True:
+            with self._condition:
+                while True:
+                    taken = self._take()
+                    if taken is not None:
+                        break
+                    if self._shutdown and not self._queue:
+                        return
+                    self._condition.wait()
+            (fn, args, _, future), vehicle = taken
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(fn(vehicle, *args))
+                    except BaseException as e:
+                        logging.error(f"Ошибка задачи дрона '{vehicle}': {e}")
+                        future.set_exception(e)
+            finally:
+                with self._condition:
+                    self._busy.discard(vehicle)
+                    self._condition.notify_all()
@@ -0,0 +1,116 @@
+import threading
+import time
+import unittest
+
+from scheduler import VehicleScheduler
+
+
+class TestVehicleScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = None
+
+    def tearDown(self):
+        if self.scheduler is not None:
+            self.scheduler.shutdown()
+
+    def occupy(self, gate, vehicle=None):
+        """Запустить задачу, ожидающую gate, и дождаться ее начала."""
+        started = threading.Event()
+        self.scheduler.submit(lambda name: (started.set(), gate.wait(5)), vehicle=vehicle)
+        self.assertTrue(started.wait(5))
+
+    def test_priority_order(self):
+        self.scheduler = VehicleScheduler(max_workers=1)
+        gate = threading.Event()
+        order = []
+        self.occupy(gate)  # Занимает единственный поток
+        futures = [self.scheduler.submit(lambda vehicle, name=name: order.append(name), priority=priority)
+                   for name, priority in [('low', 0), ('high', 10), ('middle', 5), ('low2', 0)]]
+        gate.set()
+        for future in futures:
+            future.result(timeout=5)
+
+        self.assertEqual(order, ['high', 'middle', 'low', 'low2'])
+
+    def test_same_vehicle_serialized(self):
+        self.scheduler = VehicleScheduler(max_workers=4)
+        running = []
+        overlap = []
+        lock = threading.Lock()
+
+        def task(vehicle):
+            with lock:
+                running.append(vehicle)
+                if running.count(vehicle) > 1:
+                    overlap.append(vehicle)
+            time.sleep(0.02)
+            with lock:
+                running.remove(vehicle)
+
+        futures = [self.scheduler.submit(task, vehicle='Drone1') for _ in range(5)]
+        for future in futures:
+            future.result(timeout=5)
+        self.assertEqual(overlap, [])
+
+    def test_different_vehicles_parallel(self):
+        self.scheduler = VehicleScheduler(max_workers=2)
+        barrier = threading.Barrier(2, timeout=5)
+        futures = [self.scheduler.submit(lambda vehicle: barrier.wait(), vehicle=name) for name in ('A', 'B')]
+        for future in futures:
+            future.result(timeout=5)  # BrokenBarrierError, если задачи выполнялись по очереди
+
+    def test_busy_vehicle_does_not_block_others(self):
+        self.scheduler = VehicleScheduler(max_workers=2)
+        gate = threading.Event()
+        self.occupy(gate, vehicle='A')
+        blocked = self.scheduler.submit(lambda vehicle: vehicle, priority=10, vehicle='A')
+        free = self.scheduler.submit(lambda vehicle: vehicle, vehicle='B')
+
+        self.assertEqual(free.result(timeout=5), 'B')
+        self.assertFalse(blocked.done())
+        gate.set()
+        self.assertEqual(blocked.result(timeout=5), 'A')
+
+    def test_assign_free_vehicle(self):
+        self.scheduler = VehicleScheduler(max_workers=3, vehicles=['A', 'B'])
+        gate = threading.Event()
+        first = self.scheduler.submit(lambda vehicle: (gate.wait(5), vehicle)[1])
+        second = self.scheduler.submit(lambda vehicle: (gate.wait(5), vehicle)[1])
+        third = self.scheduler.submit(lambda vehicle: vehicle)
+        time.sleep(0.05)
+
+        self.assertFalse(third.done())  # Свободных дронов нет
+        self.assertEqual(self.scheduler.busy_vehicles, {'A', 'B'})
+        gate.set()
+        self.assertEqual({first.result(timeout=5), second.result(timeout=5)}, {'A', 'B'})
+        self.assertIn(third.result(timeout=5), ('A', 'B'))
+
+    def test_cancel_queued(self):
+        self.scheduler = VehicleScheduler(max_workers=1)
+        gate = threading.Event()
+        self.occupy(gate)
+        queued = self.scheduler.submit(lambda vehicle: self.fail("снятая задача выполнена"))
+
+        self.assertTrue(queued.cancel())
+        self.assertEqual(self.scheduler.pending(), 0)
+        gate.set()
+
+    def test_exception(self):
+        self.scheduler = VehicleScheduler(max_workers=1)
+
+        def fail(vehicle):
+            raise RuntimeError("сбой")
+
+        with self.assertRaises(RuntimeError):
+            self.scheduler.submit(fail).result(timeout=5)
+        self.assertEqual(self.scheduler.submit(lambda vehicle: 1).result(timeout=5), 1)
+
+    def test_shutdown_rejects(self):
+        self.scheduler = VehicleScheduler(max_workers=1)
+        self.scheduler.shutdown()
+        with self.assertRaises(RuntimeError):
+            self.scheduler.submit(lambda vehicle: None)
+
+
+if __name__ == '__main__':
+    unittest.main()
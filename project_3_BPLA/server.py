@@ -1,13 +1,25 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify, send_file, stream_with_context
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
 from datetime import timedelta, datetime
 from flask_cors import CORS
 from flask_jwt_extended.exceptions import NoAuthorizationError
 import logging
-import psutil
-from flask_caching import Cache
-
-from missions import SurveyNavigator, OrbitNavigator
+from concurrent.futures import TimeoutError as FutureTimeout
+import math
+import os
+import time
+import uuid
+
+from auth import Credentials, RateLimiter, calibrate_iterations
+from client_pool import ClientPool, default_pool
+from instrumentation import metrics
+from missions import ORBIT_MODES, SurveyNavigator, OrbitNavigator
+from mission_runner import MissionRunner, RunnerBusy, ACTIVE_STATES
+from photos import PhotoStore, THUMBNAIL_SIZES
+from plan_cache import default_cache, dry_run, validate
+from storage import MemoryStore, SQLiteStore
+from system_monitor import SystemMonitor
+from telemetry import TelemetryHub
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO, filemode="w")
@@ -17,75 +29,210 @@ app = Flask(__name__)
 CORS(app)  # Разрешаем все CORS запросы
 app.config['JWT_SECRET_KEY'] = 'AbraKadabra'  # Секретный ключ для подписи токенов
 
-# Настройка кэширования
-cache = Cache(config={'CACHE_TYPE': 'simple'})
-cache.init_app(app)
-
 jwt = JWTManager(app)
 
-users = {}  # Словарь для хранения пользователей
-missions = {}  # Словарь для хранения активных миссий
+# Пул фоновых потоков для выполнения миссий
+app.config['MISSION_WORKERS'] = 4  # Количество одновременно выполняемых миссий
+app.config['MISSION_QUEUE_SIZE'] = 16  # Количество миссий, ожидающих в очереди
+app.config['AIRSIM_HOST'] = ''  # Адрес симулятора AirSim ('' - локальный)
+# Парк дронов (имена из settings.json AirSim через запятую): миссия без vehicle_name получает
+# первый свободный дрон, миссии одного дрона выполняются по очереди
+app.config['VEHICLES'] = os.environ.get('BPLA_VEHICLES', '').split(',')
+
+# Источник подключений к дронам: 'airsim' - симулятор AirSim, 'mock' - кинематическая модель
+# mock_airsim.py в памяти процесса (нагрузочное тестирование и отладка без симулятора)
+app.config['AIRSIM_BACKEND'] = os.environ.get('BPLA_AIRSIM_BACKEND', 'airsim')
+app.config['MOCK_TIME_SCALE'] = float(os.environ.get('BPLA_MOCK_TIME_SCALE', 20.0))  # Ускорение часов модели
+if app.config['AIRSIM_BACKEND'] == 'mock':
+    from mock_airsim import MockSimulator
+    client_pool = ClientPool(factory=MockSimulator(time_scale=app.config['MOCK_TIME_SCALE']).client)
+else:
+    client_pool = default_pool
+
+# Хранилище пользователей и истории миссий: файл SQLite, общий для всех процессов сервера
+# (по умолчанию в папке экземпляра приложения instance/, а не в текущей папке;
+# '' - хранение в памяти процесса, данные теряются при перезапуске)
+app.config['DATABASE'] = os.environ.get('BPLA_DATABASE', os.path.join(app.instance_path, 'bpla.db'))
+if app.config['DATABASE']:
+    os.makedirs(os.path.dirname(os.path.abspath(app.config['DATABASE'])), exist_ok=True)
+store = SQLiteStore(app.config['DATABASE']) if app.config['DATABASE'] else MemoryStore()
+
+# Пароли хранятся хэшами PBKDF2; количество итераций подбирается при запуске так, чтобы хэширование
+# занимало около PASSWORD_HASH_TIME секунд (BPLA_PASSWORD_ITERATIONS задает его явно)
+app.config['PASSWORD_HASH_TIME'] = 0.05
+app.config['PASSWORD_ITERATIONS'] = (int(os.environ.get('BPLA_PASSWORD_ITERATIONS', 0))
+                                     or calibrate_iterations(app.config['PASSWORD_HASH_TIME']))
+app.config['CREDENTIAL_CACHE_SIZE'] = 4096  # Количество запомненных успешных проверок пароля
+app.config['CREDENTIAL_CACHE_TTL'] = 300.0  # Время жизни успешной проверки, с
+credentials = Credentials(store, iterations=app.config['PASSWORD_ITERATIONS'],
+                          cache_size=app.config['CREDENTIAL_CACHE_SIZE'], cache_ttl=app.config['CREDENTIAL_CACHE_TTL'])
+
+# Ограничение частоты входа и регистрации с одного адреса (BPLA_AUTH_RATE=0 - без ограничения)
+app.config['AUTH_RATE'] = float(os.environ.get('BPLA_AUTH_RATE', 1.0))  # Запросов в секунду
+app.config['AUTH_BURST'] = int(os.environ.get('BPLA_AUTH_BURST', 10))  # Допустимый всплеск запросов
+auth_limiter = RateLimiter(app.config['AUTH_RATE'], app.config['AUTH_BURST'])
+
+# Снимки миссий: <PHOTO_ROOT>/<mission_id>/photo_N.png, миниатюры создаются по запросу
+app.config['PHOTO_ROOT'] = os.environ.get('BPLA_PHOTO_ROOT', 'PHOTO')
+app.config['THUMBNAIL_WAIT'] = 5.0  # Ожидание создания миниатюры, с (дольше - ответ 202)
+# Передача файлов веб-сервером (nginx X-Accel/X-Sendfile) вместо процесса Flask
+app.config['USE_X_SENDFILE'] = os.environ.get('BPLA_X_SENDFILE', '') not in ('', '0')
+photos = PhotoStore(app.config['PHOTO_ROOT'])
+
+runner = MissionRunner(max_workers=app.config['MISSION_WORKERS'], max_pending=app.config['MISSION_QUEUE_SIZE'],
+                       store=store, vehicles=app.config['VEHICLES'])
+
+# Фоновый сбор метрик системы и активных миссий
+app.config['MONITOR_INTERVAL'] = 1.0  # Интервал между замерами, с
+app.config['MONITOR_HISTORY'] = 600  # Количество хранимых замеров
+monitor = SystemMonitor(interval=app.config['MONITOR_INTERVAL'], history=app.config['MONITOR_HISTORY'],
+                        missions=runner.active_missions)
+monitor.start()
+
+# Сбор метрик времени вызовов AirSim, этапов миссий и запросов API для /api/metrics
+# (выключен по умолчанию: без него клиенты AirSim не оборачиваются)
+app.config['INSTRUMENTATION'] = os.environ.get('BPLA_INSTRUMENTATION', '') not in ('', '0')
+metrics.enabled = app.config['INSTRUMENTATION']
+
+# Поток телеметрии для панели мониторинга (Server-Sent Events)
+app.config['TELEMETRY_RATE'] = 2.0  # Максимальная частота обновлений, Гц
+telemetry = TelemetryHub(runner.telemetry, monitor, rate=app.config['TELEMETRY_RATE'], ip=app.config['AIRSIM_HOST'],
+                         client_pool=ClientPool(factory=client_pool.factory))
+
+@app.before_request
+def start_request_timer():
+    """Запоминает время начала запроса для метрики bpla_http_request_seconds."""
+    if metrics.enabled:
+        g.request_started = time.perf_counter()
+
+@app.after_request
+def observe_request(response):
+    """Учитывает время обработки запроса (поток /api/stream учитывается до начала передачи)."""
+    started = g.get('request_started')
+    if started is not None:
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unknown'
+        metrics.observe('bpla_http_request_seconds', time.perf_counter() - started,
+                        {'endpoint': endpoint, 'method': request.method, 'status': response.status_code})
+    return response
+
+@app.teardown_appcontext
+def release_store(exception=None):
+    """Закрывает подключение к хранилищу потока запроса: сервер создает поток на каждый запрос."""
+    store.release()
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Возвращает метрики в текстовом формате Prometheus: время вызовов AirSim и ожидания join(),
+        длительность этапов миссий, время вычислений в цикле управления, время обработки запросов API
+        и количество активных миссий по состояниям.
+        Returns: Response: Метрики в формате text/plain.
+        """
+    counts = {}
+    for mission in runner.active_missions():
+        counts[mission['status']] = counts.get(mission['status'], 0) + 1
+    for status in ACTIVE_STATES:
+        metrics.set('bpla_missions', counts.get(status, 0), {'status': status})
+    for stat, value in default_cache.stats().items():
+        metrics.set('bpla_plan_cache', value, {'stat': stat})
+    for stat, value in credentials.stats().items():
+        metrics.set('bpla_credential_cache', value, {'stat': stat})
+    metrics.set('bpla_auth_rejected', auth_limiter.rejected)
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/api/system_info', methods=['GET'])
-@cache.memoize(timeout=5)  # Кэшировать результат на 5 секунд
 def get_system_info():
-    """Возвращает информацию о системе (процентное использование ЦП, памяти и дискового пространства).
+    """Возвращает последний замер фонового монитора (процентное использование ЦП, памяти и дискового
+        пространства, активные миссии). Параметр запроса history=N добавляет последние N замеров.
         Returns: dict: Словарь с информацией о системе.
         """
-    cpu_percent = psutil.cpu_percent(interval=1)
-    memory_percent = psutil.virtual_memory().percent
-    disk_usage = psutil.disk_usage('/').percent
-    return jsonify({'cpu_percent': cpu_percent, 'memory_percent': memory_percent, 'disk_usage': disk_usage})
+    info = dict(monitor.latest() or monitor.sample())
+    count = request.args.get('history', 0, type=int)
+    if count > 0:
+        info['history'] = monitor.history(count)
+    return jsonify(info)
+
+@app.route('/api/stream', methods=['GET'])
+@jwt_required(optional=True, locations=['headers', 'query_string'])
+def stream_telemetry():
+    """Поток Server-Sent Events с метриками системы и телеметрией миссий пользователя
+        (позиция дрона, этап миссии, количество кругов, номер снимка).
+        EventSource не передает заголовки, поэтому токен можно передать параметром запроса jwt.
+        Без токена поток содержит только метрики системы.
+        Returns: Response: Поток text/event-stream.
+        """
+    current_user = get_jwt_identity()
+    return Response(stream_with_context(telemetry.stream(current_user)), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def mission_priority(json_data):
+    """Приоритет миссии из запроса (по умолчанию 0, больше - раньше).
+        Raises: ValueError: Если приоритет не целое число.
+        """
+    priority = json_data.get('priority', 0)
+    if isinstance(priority, bool) or not isinstance(priority, int):
+        raise ValueError("Приоритет должен быть целым числом")
+    return priority
+
+def rate_limited(key):
+    """Ответ 429, если для key превышена частота запросов, иначе None."""
+    wait = auth_limiter.acquire(key)
+    if wait <= 0:
+        return None
+    return jsonify({'msg': 'Слишком много запросов, повторите позже'}), 429, {'Retry-After': str(math.ceil(wait))}
 
 @app.route('/api/register', methods=['POST'])
 def register():
-    """Регистрирует нового пользователя.
+    """Регистрирует нового пользователя (пароль сохраняется хэшем PBKDF2).
+        Частота регистраций с одного адреса ограничена.
         Returns: tuple: Кортеж, содержащий JSON-ответ с сообщением и HTTP-статус.
         """
-    print("Запрос получен на /api/register")  # Лог получения запроса
+    limited = rate_limited(('register', request.remote_addr))
+    if limited is not None:
+        return limited
     try:
-        json_data = request.json
-        print("Полученные данные: ", json_data)  # Получаем данные из запроса в формате JSON
+        json_data = request.get_json(silent=True)
         if not json_data:
             return jsonify({'msg': 'Пустые данные'}), 400
 
         username = json_data.get('username')
         password = json_data.get('password')
-        print(f"Данные запроса: username={username}, password={password}")
-
 
-        if not username or not password:
+        if not username or not password or not isinstance(username, str) or not isinstance(password, str):
             return jsonify({'msg': 'Некорректные данные'}), 400
 
-
-        if username in users:
+        if not credentials.register(username, password):
             return jsonify({'msg': f"Пользователь {username} уже существует."}), 400
 
-
-        users[username] = password
         logging.info(f"Пользователь {username} успешно зарегистрирован.")
         return jsonify({'msg': f"Пользователь {username} успешно зарегистрирован."}), 201
 
     except Exception as e:
-        print(f"Ошибка: {e}")
+        logging.error(f"Ошибка при регистрации: {e}")
         return jsonify({'msg': 'Ошибка при обработке запроса'}), 500
 
 
 @app.route('/api/login', methods=['POST'])
 def login():
     """Выполняет вход пользователя и возвращает токен доступа.
+       Частота попыток входа с одного адреса и в одну учетную запись с одного адреса ограничена.
        Returns: tuple: Кортеж, содержащий JSON-ответ с токеном доступа и HTTP-статус.
        """
-    username = request.json.get('username')
-    password = request.json.get('password')
+    json_data = request.get_json(silent=True) or {}
+    username = json_data.get('username')
+    password = json_data.get('password')
+    if not isinstance(username, str) or not isinstance(password, str):
+        return jsonify({'msg': 'Неверные учетные данные'}), 401
 
-    if users.get(username) != password:
+    # Сначала корзина адреса: перебор имен не дает новых всплесков дорогих проверок пароля
+    # и не заполняет ограничитель корзинами отдельных имен
+    for key in (('login', request.remote_addr), ('login', request.remote_addr, username)):
+        limited = rate_limited(key)
+        if limited is not None:
+            return limited
+    if not credentials.verify(username, password):
         return jsonify({'msg': 'Неверные учетные данные'}), 401
 
     expiration = datetime.utcnow() + timedelta(hours=1)
-    logging.info(f"Текущее время: {datetime.utcnow()}")
-    logging.info(f"Токен действителен до: {expiration}")
-
 
     # Генерация токена
     access_token = create_access_token(identity=username, expires_delta=timedelta(hours=1))
@@ -96,12 +243,33 @@ def login():
 @app.route('/api/users', methods=['GET'])
 @jwt_required()  # Проверка наличия токена в токенах
 def get_users():
-    """Возвращает список всех зарегистрированных пользователей.
+    """Возвращает страницу зарегистрированных пользователей (имя и время регистрации) в порядке имен.
+        Параметры запроса limit (по умолчанию 100, не более 1000) и offset задают страницу списка.
         Returns: tuple: Кортеж, содержащий JSON-ответ со списком пользователей и HTTP-статус.
         """
-    current_user = get_jwt_identity()
-    logging.info(f"Текущий пользователь: {current_user}")  # Получаем данные из токена
-    return jsonify(users), 200
+    limit = min(request.args.get('limit', 100, type=int), 1000)
+    offset = request.args.get('offset', 0, type=int)
+    if limit < 1 or offset < 0:
+        return jsonify({'msg': 'Некорректные параметры limit и offset'}), 400
+    return jsonify({'users': store.list_users(limit, offset), 'total': store.count_users(), 'limit': limit,
+                    'offset': offset}), 200
+
+
+@app.route('/api/plan', methods=['POST'])
+@jwt_required()
+def plan_mission():
+    """Рассчитывает маршрут миссии без полета: точки маршрута, длину, расчетное время и точки снимков.
+        Тип миссии задается полем kind ('survey' или 'orbit'), остальные поля - как в запросе на запуск.
+        Маршрут сохраняется в кэше планов и используется при запуске миссии с теми же параметрами.
+        Returns: tuple: Кортеж, содержащий JSON-ответ с маршрутом и HTTP-статус.
+        """
+    json_data = request.json
+    if not json_data:
+        return jsonify({'msg': 'Пустые данные в запросе'}), 400
+    try:
+        return jsonify(dry_run(json_data.get('kind'), json_data)), 200
+    except ValueError as e:
+        return jsonify({'msg': str(e)}), 400
 
 
 @app.route('/api/survey_navigator/start', methods=['POST'])
@@ -130,11 +298,27 @@ def start_survey_navigator():
         if not all([boxsize, stripewidth, altitude, velocity]):
             return jsonify({'msg': 'Отсутствуют необходимые параметры: boxsize, stripewidth, altitude и velocity'}), 400
 
-        # Создание и запуск дрона
-        mission = SurveyNavigator(boxsize=boxsize, stripewidth=stripewidth, altitude=altitude, velocity=velocity)
-        mission.start()
-        missions[current_user] = mission  # Сохраняем миссию для текущего пользователя
-        return jsonify({'msg': 'Дрон запущен'}), 200
+        try:
+            priority = mission_priority(json_data)
+        except ValueError as e:
+            return jsonify({'msg': str(e)}), 400
+
+        # Постановка миссии в очередь, дрон создается и запускается в фоновом потоке
+        # (vehicle_name заполняется планировщиком, если дрон не указан)
+        params = {'boxsize': boxsize, 'stripewidth': stripewidth, 'altitude': altitude, 'velocity': velocity,
+                  'vehicle_name': json_data.get('vehicle_name')}
+        try:
+            validate('survey', params)  # Некорректный или слишком большой маршрут отклоняется до постановки в очередь
+        except ValueError as e:
+            return jsonify({'msg': str(e)}), 400
+        record = runner.submit(current_user, 'survey',
+                               lambda: SurveyNavigator(ip=app.config['AIRSIM_HOST'], client_pool=client_pool, **params),
+                               params, priority, params['vehicle_name'])
+        store.set_active_mission(current_user, record.id)  # Сохраняем миссию для текущего пользователя
+        return jsonify({'msg': 'Миссия поставлена в очередь', 'mission_id': record.id, 'status': record.status}), 202
+
+    except RunnerBusy:
+        return jsonify({'msg': 'Очередь миссий заполнена, повторите запрос позже'}), 503
 
     except Exception as e:
         logging.error(f"Ошибка при запуске дрона: {e}")
@@ -153,14 +337,16 @@ def land_survey_navigator():
         logging.info(f"Попытка посадить дрон пользователем {current_user}")
 
         # Получаем миссию текущего пользователя
-        mission = missions.get(current_user)
-        if mission is None:
+        mission_id = store.get_active_mission(current_user)
+        if mission_id is None or not runner.land(mission_id):
             return jsonify({'msg': 'Нет активной миссии для остановки'}), 400
 
-        mission.landed()  # Останавливаем миссию дрона
-        del missions[current_user]  # Удаляем миссию после остановки
-        logging.info(f"Дрон остановлен пользователем {current_user}")
-        return jsonify({'msg': 'Дрон остановлен'}), 200
+        store.set_active_mission(current_user, None)  # Удаляем миссию после постановки посадки в очередь
+        logging.info(f"Посадка дрона поставлена в очередь пользователем {current_user}")
+        return jsonify({'msg': 'Посадка дрона поставлена в очередь', 'mission_id': mission_id}), 202
+
+    except RunnerBusy:
+        return jsonify({'msg': 'Очередь миссий заполнена, повторите запрос позже'}), 503
 
     except Exception as e:
         logging.error(f"Ошибка при остановке дрона: {e}")
@@ -196,12 +382,32 @@ def start_orbit_navigator():
             return jsonify({
                                'msg': 'Отсутствуют необходимые параметры: radius, altitude, velocity, iterations, center и snapshots'}), 400
 
-        # Создание и запуск дрона
-        mission = OrbitNavigator(radius=radius, altitude=altitude, velocity=velocity, iterations=iterations,
-                                 center=center, snapshots=snapshots)
-        mission.start()
-        missions[current_user] = mission  # Сохраняем миссию для текущего пользователя
-        return jsonify({'msg': 'Миссия выполнена'}), 200
+        try:
+            priority = mission_priority(json_data)
+        except ValueError as e:
+            return jsonify({'msg': str(e)}), 400
+
+        # Постановка миссии в очередь, дрон создается и запускается в фоновом потоке
+        # (vehicle_name заполняется планировщиком, если дрон не указан)
+        params = {'radius': radius, 'altitude': altitude, 'velocity': velocity, 'iterations': iterations,
+                  'center': center, 'snapshots': snapshots, 'vehicle_name': json_data.get('vehicle_name'),
+                  'mode': json_data.get('mode', ORBIT_MODES[0])}
+        if params['mode'] not in ORBIT_MODES:
+            return jsonify({'msg': f"Режим облета mode должен быть одним из {list(ORBIT_MODES)}"}), 400
+        try:
+            validate('orbit', params)  # Некорректный или слишком большой маршрут отклоняется до постановки в очередь
+        except ValueError as e:
+            return jsonify({'msg': str(e)}), 400
+        mission_id = uuid.uuid4().hex  # Известен заранее: по нему называется папка снимков миссии
+        record = runner.submit(current_user, 'orbit',
+                               lambda: OrbitNavigator(ip=app.config['AIRSIM_HOST'], client_pool=client_pool,
+                                                      photo_directory=photos.directory(mission_id), **params),
+                               params, priority, params['vehicle_name'], mission_id)
+        store.set_active_mission(current_user, record.id)  # Сохраняем миссию для текущего пользователя
+        return jsonify({'msg': 'Миссия поставлена в очередь', 'mission_id': record.id, 'status': record.status}), 202
+
+    except RunnerBusy:
+        return jsonify({'msg': 'Очередь миссий заполнена, повторите запрос позже'}), 503
 
     except Exception as e:
         logging.error(f"Ошибка при запуске дрона: {e}")
@@ -219,20 +425,189 @@ def land_orbit_navigator():
         logging.info(f"Попытка посадить дрон пользователем {current_user}")
 
         # Получаем миссию текущего пользователя
-        mission = missions.get(current_user)
-        if mission is None:
+        mission_id = store.get_active_mission(current_user)
+        if mission_id is None or not runner.land(mission_id):
             return jsonify({'msg': 'Нет активной миссии для остановки'}), 400
 
-        mission.landed()  # Останавливаем миссию дрона
-        del missions[current_user]  # Удаляем миссию после остановки
-        logging.info(f"Дрон остановлен пользователем {current_user}")
-        return jsonify({'msg': 'Дрон остановлен'}), 200
+        store.set_active_mission(current_user, None)  # Удаляем миссию после постановки посадки в очередь
+        logging.info(f"Посадка дрона поставлена в очередь пользователем {current_user}")
+        return jsonify({'msg': 'Посадка дрона поставлена в очередь', 'mission_id': mission_id}), 202
+
+    except RunnerBusy:
+        return jsonify({'msg': 'Очередь миссий заполнена, повторите запрос позже'}), 503
 
     except Exception as e:
         logging.error(f"Ошибка при остановке дрона: {e}")
         return jsonify({'msg': 'Ошибка при остановке дрона'}), 500
 
 
+@app.route('/api/missions/<mission_id>', methods=['GET'])
+@jwt_required()
+def get_mission(mission_id):
+    """Возвращает состояние миссии.
+        Args:
+            mission_id (str): Идентификатор миссии.
+        Returns:
+            tuple: Кортеж, содержащий JSON-ответ с состоянием миссии и HTTP-статус.
+        """
+    mission = owned_mission(mission_id, get_jwt_identity())
+    if mission is None:
+        return jsonify({'msg': 'Миссия не найдена'}), 404
+    return jsonify(mission), 200
+
+
+def owned_mission(mission_id, owner):
+    """Состояние миссии пользователя owner или None, если миссии нет или она чужая.
+        Миссия, запущенная другим процессом сервера или до перезапуска, берется из хранилища.
+        """
+    mission = runner.lookup(mission_id)
+    if mission is None or mission['owner'] != owner:
+        return None
+    return mission
+
+
+@app.route('/api/missions/<mission_id>/photos', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def list_photos(mission_id):
+    """Возвращает список снимков миссии (номер, размер, время изменения, адреса снимка и миниатюры).
+        Параметры запроса limit (по умолчанию 100, не более 1000) и offset задают страницу списка.
+        Токен можно передать параметром запроса jwt, как для /api/stream.
+        Args:
+            mission_id (str): Идентификатор миссии.
+        Returns:
+            tuple: Кортеж, содержащий JSON-ответ со списком снимков и HTTP-статус.
+        """
+    if owned_mission(mission_id, get_jwt_identity()) is None:
+        return jsonify({'msg': 'Миссия не найдена'}), 404
+    limit = min(request.args.get('limit', 100, type=int), 1000)
+    offset = request.args.get('offset', 0, type=int)
+    if limit < 1 or offset < 0:
+        return jsonify({'msg': 'Некорректные параметры limit и offset'}), 400
+    try:
+        items = photos.list(mission_id)
+    except ValueError as e:
+        return jsonify({'msg': str(e)}), 404
+    page = items[offset:offset + limit]
+    for photo in page:
+        photo['url'] = f"/api/missions/{mission_id}/photos/{photo['index']}"
+        photo['thumbnail_url'] = f"{photo['url']}?size={photos.thumbnail_size}"
+    return jsonify({'photos': page, 'total': len(items), 'limit': limit, 'offset': offset}), 200
+
+
+@app.route('/api/missions/<mission_id>/photos/<int:index>', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def get_photo(mission_id, index):
+    """Отдает снимок миссии файлом без чтения в память (поддерживаются запросы Range,
+        If-None-Match и If-Modified-Since). Параметр запроса size возвращает миниатюру PNG
+        с наибольшей стороной size; миниатюра создается в фоне при первом запросе.
+        Args:
+            mission_id (str): Идентификатор миссии.
+            index (int): Номер снимка.
+        Returns:
+            Response: Файл снимка или миниатюры; 202, если миниатюра еще создается.
+        """
+    if owned_mission(mission_id, get_jwt_identity()) is None:
+        return jsonify({'msg': 'Миссия не найдена'}), 404
+    size = request.args.get('size', type=int)
+    if size is not None and size not in THUMBNAIL_SIZES:
+        return jsonify({'msg': f"Размер миниатюры должен быть одним из {list(THUMBNAIL_SIZES)}"}), 400
+    try:
+        if size is None:
+            path = photos.path(mission_id, index)
+        else:
+            future = photos.thumbnail(mission_id, index, size)
+            path = future.result(timeout=app.config['THUMBNAIL_WAIT']) if future is not None else None
+    except FutureTimeout:
+        return jsonify({'msg': 'Миниатюра создается, повторите запрос позже'}), 202, {'Retry-After': '1'}
+    except ValueError as e:
+        return jsonify({'msg': str(e)}), 404
+    except Exception as e:
+        logging.error(f"Ошибка при создании миниатюры снимка {index} миссии {mission_id}: {e}")
+        return jsonify({'msg': 'Ошибка при создании миниатюры'}), 500
+    if path is None:
+        return jsonify({'msg': 'Снимок не найден'}), 404
+    mimetype = 'image/png' if path.endswith('.png') else 'application/octet-stream'
+    return send_file(path, mimetype=mimetype, conditional=True, etag=True, max_age=3600)
+
+
+@app.route('/api/missions', methods=['GET'])
+@jwt_required()
+def list_missions():
+    """Возвращает историю миссий текущего пользователя, начиная с последней.
+        Параметры запроса limit (по умолчанию 50, не более 500) и offset задают страницу истории.
+        Returns:
+            tuple: Кортеж, содержащий JSON-ответ со списком миссий и HTTP-статус.
+        """
+    current_user = get_jwt_identity()
+    limit = min(request.args.get('limit', 50, type=int), 500)
+    offset = request.args.get('offset', 0, type=int)
+    if limit < 1 or offset < 0:
+        return jsonify({'msg': 'Некорректные параметры limit и offset'}), 400
+    return jsonify({'missions': store.list_missions(current_user, limit, offset), 'limit': limit,
+                    'offset': offset}), 200
+
+
+@app.route('/api/missions/<mission_id>/land', methods=['POST'])
+@jwt_required()
+def land_mission(mission_id):
+    """Ставит в очередь посадку дрона миссии (выполнение миссии при этом прерывается).
+        Посадка выполняется раньше миссий из очереди, но после текущей задачи того же дрона.
+        Args:
+            mission_id (str): Идентификатор миссии.
+        Returns:
+            tuple: Кортеж, содержащий JSON-ответ с сообщением и HTTP-статус.
+        """
+    current_user = get_jwt_identity()
+    record = runner.get(mission_id)
+    if record is None:
+        # Завершенная миссия, вытесненная из памяти, или миссия другого процесса сервера
+        mission = owned_mission(mission_id, current_user)
+        if mission is None:
+            return jsonify({'msg': 'Миссия не найдена'}), 404
+        return jsonify({'msg': 'Миссия не поднимала дрон или дрон уже посажен', 'status': mission['status']}), 409
+    if record.owner != current_user:
+        return jsonify({'msg': 'Миссия не найдена'}), 404
+    try:
+        if not runner.land(mission_id):
+            return jsonify({'msg': 'Миссия не поднимала дрон или дрон уже посажен', 'status': record.status}), 409
+    except RunnerBusy:
+        return jsonify({'msg': 'Очередь миссий заполнена, повторите запрос позже'}), 503
+
+    if store.get_active_mission(current_user) == mission_id:
+        store.set_active_mission(current_user, None)
+    logging.info(f"Посадка дрона миссии {mission_id} поставлена в очередь пользователем {current_user}")
+    return jsonify({'msg': 'Посадка дрона поставлена в очередь', 'mission_id': mission_id}), 202
+
+
+@app.route('/api/missions/<mission_id>', methods=['DELETE'])
+@jwt_required()
+def cancel_mission(mission_id):
+    """Отменяет миссию: снимает ее с очереди или прерывает выполнение.
+        Args:
+            mission_id (str): Идентификатор миссии.
+        Returns:
+            tuple: Кортеж, содержащий JSON-ответ с состоянием миссии и HTTP-статус.
+        """
+    current_user = get_jwt_identity()
+    record = runner.get(mission_id)
+    if record is None:
+        mission = store.get_mission(mission_id)
+        if mission is None or mission['owner'] != current_user:
+            return jsonify({'msg': 'Миссия не найдена'}), 404
+        if mission['status'] in ACTIVE_STATES:
+            return jsonify({'msg': 'Миссия выполняется другим процессом сервера', 'status': mission['status']}), 409
+        return jsonify({'msg': 'Миссия уже завершена', 'status': mission['status']}), 409
+
+    if record.owner != current_user:
+        return jsonify({'msg': 'Миссия не найдена'}), 404
+
+    if not runner.cancel(mission_id):
+        return jsonify({'msg': 'Миссия уже завершена', 'status': record.status}), 409
+
+    logging.info(f"Миссия {mission_id} отменена пользователем {current_user}")
+    return jsonify({'msg': 'Отмена миссии принята', 'mission_id': mission_id, 'status': record.status}), 202
+
+
 @app.errorhandler(NoAuthorizationError)
 def handle_auth_error(e):
     """Обрабатывает ошибку авторизации, когда токен не найден или недействителен.
@@ -0,0 +1,315 @@
+from abc import ABC, abstractmethod
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+
+# Поля записи о миссии (см. MissionRecord.to_dict)
+MISSION_FIELDS = ('mission_id', 'owner', 'kind', 'params', 'status', 'error', 'created_at', 'started_at',
+                  'finished_at', 'priority', 'vehicle_name')
+
+
+# Абстрактный класс хранилища пользователей и миссий
+class Store(ABC):
+    @abstractmethod
+    def add_user(self, username, password):
+        """Добавить пользователя.
+
+        Args:
+            username: Имя пользователя.
+            password: Хэш пароля (см. auth.hash_password).
+
+        Returns:
+            bool: True, если пользователь добавлен, False, если он уже существует.
+        """
+        pass
+
+    @abstractmethod
+    def get_password(self, username):
+        """Вернуть хэш пароля пользователя или None, если пользователь не найден."""
+        pass
+
+    @abstractmethod
+    def set_password(self, username, password):
+        """Заменить хэш пароля пользователя (например, при повышении стоимости хэширования)."""
+        pass
+
+    @abstractmethod
+    def list_users(self, limit=100, offset=0):
+        """Вернуть страницу пользователей в порядке имен: словари с именем и временем регистрации."""
+        pass
+
+    @abstractmethod
+    def count_users(self):
+        """Вернуть количество пользователей."""
+        pass
+
+    @abstractmethod
+    def set_active_mission(self, username, mission_id):
+        """Запомнить последнюю миссию пользователя (None - удалить)."""
+        pass
+
+    @abstractmethod
+    def get_active_mission(self, username):
+        """Вернуть идентификатор последней миссии пользователя или None."""
+        pass
+
+    @abstractmethod
+    def save_mission(self, mission):
+        """Сохранить или обновить запись о миссии.
+
+        Args:
+            mission: Словарь с полями MISSION_FIELDS.
+        """
+        pass
+
+    @abstractmethod
+    def get_mission(self, mission_id):
+        """Вернуть запись о миссии (словарь) или None."""
+        pass
+
+    @abstractmethod
+    def list_missions(self, owner, limit=50, offset=0):
+        """Вернуть историю миссий пользователя, начиная с последней."""
+        pass
+
+    def release(self):
+        """Освободить ресурсы текущего потока (например, в конце обработки запроса)."""
+        pass
+
+    def close(self):
+        """Освободить ресурсы хранилища."""
+        pass
+
+
+# Хранилище в памяти процесса (для тестов и запуска одним процессом)
+class MemoryStore(Store):
+    def __init__(self):
+        self._users = {}  # Имя -> (хэш пароля, время регистрации)
+        self._active = {}
+        self._missions = {}
+        self._lock = threading.Lock()
+
+    def add_user(self, username, password):
+        with self._lock:
+            if username in self._users:
+                return False
+            self._users[username] = (password, time.time())
+            return True
+
+    def get_password(self, username):
+        with self._lock:
+            user = self._users.get(username)
+            return user[0] if user is not None else None
+
+    def set_password(self, username, password):
+        with self._lock:
+            if username in self._users:
+                self._users[username] = (password, self._users[username][1])
+
+    def list_users(self, limit=100, offset=0):
+        with self._lock:
+            users = sorted(self._users.items())
+        return [{'username': username, 'created_at': created_at}
+                for username, (_, created_at) in users[offset:offset + limit]]
+
+    def count_users(self):
+        with self._lock:
+            return len(self._users)
+
+    def set_active_mission(self, username, mission_id):
+        with self._lock:
+            if mission_id is None:
+                self._active.pop(username, None)
+            else:
+                self._active[username] = mission_id
+
+    def get_active_mission(self, username):
+        with self._lock:
+            return self._active.get(username)
+
+    def save_mission(self, mission):
+        with self._lock:
+            self._missions[mission['mission_id']] = {field: mission.get(field) for field in MISSION_FIELDS}
+
+    def get_mission(self, mission_id):
+        with self._lock:
+            mission = self._missions.get(mission_id)
+            return dict(mission) if mission is not None else None
+
+    def list_missions(self, owner, limit=50, offset=0):
+        with self._lock:
+            missions = [dict(m) for m in self._missions.values() if m['owner'] == owner]
+        missions.sort(key=lambda m: m['created_at'] or 0, reverse=True)
+        return missions[offset:offset + limit]
+
+
+# Хранилище SQLite, общее для нескольких процессов сервера (например, воркеров gunicorn)
+class SQLiteStore(Store):
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS users (
+            username TEXT PRIMARY KEY,
+            password TEXT NOT NULL,
+            created_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS active_missions (
+            username TEXT PRIMARY KEY,
+            mission_id TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS missions (
+            mission_id TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            kind TEXT,
+            params TEXT,
+            status TEXT,
+            error TEXT,
+            created_at REAL,
+            started_at REAL,
+            finished_at REAL,
+            priority INTEGER,
+            vehicle_name TEXT
+        );
+        CREATE INDEX IF NOT EXISTS missions_owner_created ON missions (owner, created_at DESC);
+    """
+
+    # Столбцы, добавленные в таблицу missions после первой версии схемы (столбец -> тип)
+    MIGRATIONS = {'priority': 'INTEGER', 'vehicle_name': 'TEXT'}
+
+    def __init__(self, path, timeout=5.0):
+        """Хранилище пользователей и миссий в файле SQLite.
+
+        База открывается в режиме WAL: чтение не блокируется записью, поэтому
+        несколько процессов сервера могут работать с одним файлом. Каждый поток
+        использует собственное подключение: оно закрывается методом release() (сервер
+        вызывает его в конце каждого запроса) или при создании подключения другим потоком,
+        если поток-владелец уже завершился.
+
+        Args:
+            path: Путь к файлу базы данных.
+            timeout: Время ожидания блокировки базы другим процессом, с.
+        """
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connections = {}  # Поток -> его подключение
+        self._lock = threading.Lock()
+        self._connect().executescript(self.SCHEMA)
+        self._migrate()
+        logging.info(f"Хранилище SQLite: {path}")
+
+    def _connect(self):
+        """Подключение к базе текущего потока."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')  # В режиме WAL безопасно и быстрее FULL
+            self._local.connection = connection
+            with self._lock:
+                # Подключения завершившихся потоков закрываются, а не копятся до close()
+                finished = [thread for thread in self._connections if not thread.is_alive()]
+                for thread in finished:
+                    self._connections.pop(thread).close()
+                self._connections[threading.current_thread()] = connection
+        return connection
+
+    def release(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            return
+        self._local.connection = None
+        with self._lock:
+            self._connections.pop(threading.current_thread(), None)
+        connection.close()
+
+    def _migrate(self):
+        """Добавить в таблицу missions существующей базы недостающие столбцы (см. MIGRATIONS)."""
+        connection = self._connect()
+        columns = {row['name'] for row in connection.execute('PRAGMA table_info(missions)')}
+        for column, column_type in self.MIGRATIONS.items():
+            if column in columns:
+                continue
+            try:
+                with connection:
+                    connection.execute(f'ALTER TABLE missions ADD COLUMN {column} {column_type}')
+                logging.info(f"Хранилище SQLite: добавлен столбец missions.{column}")
+            except sqlite3.OperationalError:
+                # Столбец мог добавить другой процесс сервера, открывший базу одновременно
+                columns = {row['name'] for row in connection.execute('PRAGMA table_info(missions)')}
+                if column not in columns:
+                    raise
+
+    def add_user(self, username, password):
+        try:
+            with self._connect() as connection:
+                connection.execute('INSERT INTO users (username, password, created_at) VALUES (?, ?, ?)',
+                                   (username, password, time.time()))
+            return True
+        except sqlite3.IntegrityError:
+            return False
+
+    def get_password(self, username):
+        row = self._connect().execute('SELECT password FROM users WHERE username = ?', (username,)).fetchone()
+        return row['password'] if row is not None else None
+
+    def set_password(self, username, password):
+        with self._connect() as connection:
+            connection.execute('UPDATE users SET password = ? WHERE username = ?', (password, username))
+
+    def list_users(self, limit=100, offset=0):
+        # Первичный ключ username - индекс, поэтому страница читается без сортировки всей таблицы
+        rows = self._connect().execute('SELECT username, created_at FROM users ORDER BY username LIMIT ? OFFSET ?',
+                                       (limit, offset)).fetchall()
+        return [dict(row) for row in rows]
+
+    def count_users(self):
+        return self._connect().execute('SELECT COUNT(*) FROM users').fetchone()[0]
+
+    def set_active_mission(self, username, mission_id):
+        with self._connect() as connection:
+            if mission_id is None:
+                connection.execute('DELETE FROM active_missions WHERE username = ?', (username,))
+            else:
+                connection.execute('INSERT OR REPLACE INTO active_missions (username, mission_id) VALUES (?, ?)',
+                                   (username, mission_id))
+
+    def get_active_mission(self, username):
+        row = self._connect().execute('SELECT mission_id FROM active_missions WHERE username = ?',
+                                      (username,)).fetchone()
+        return row['mission_id'] if row is not None else None
+
+    def save_mission(self, mission):
+        values = {field: mission.get(field) for field in MISSION_FIELDS}
+        values['params'] = json.dumps(values['params'])
+        with self._connect() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO missions ({}) VALUES ({})'.format(
+                    ', '.join(MISSION_FIELDS), ', '.join('?' * len(MISSION_FIELDS))),
+                [values[field] for field in MISSION_FIELDS])
+
+    def get_mission(self, mission_id):
+        row = self._connect().execute('SELECT * FROM missions WHERE mission_id = ?', (mission_id,)).fetchone()
+        return self._mission(row) if row is not None else None
+
+    def list_missions(self, owner, limit=50, offset=0):
+        rows = self._connect().execute(
+            'SELECT * FROM missions WHERE owner = ? ORDER BY created_at DESC LIMIT ? OFFSET ?',
+            (owner, limit, offset)).fetchall()
+        return [self._mission(row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            for connection in self._connections.values():
+                connection.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    @staticmethod
+    def _mission(row):
+        """Преобразовать строку таблицы missions в словарь."""
+        mission = dict(row)
+        mission['params'] = json.loads(mission['params']) if mission['params'] else {}
+        return mission
@@ -0,0 +1,169 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from storage import MemoryStore, SQLiteStore
+
+
+def mission(mission_id, owner='user', created_at=1.0, status='queued'):
+    return {'mission_id': mission_id, 'owner': owner, 'kind': 'orbit', 'params': {'radius': 10},
+            'status': status, 'error': None, 'created_at': created_at, 'started_at': None, 'finished_at': None,
+            'priority': 0, 'vehicle_name': None}
+
+
+# Общие тесты для всех реализаций хранилища
+class StoreTests:
+    def test_users(self):
+        self.assertTrue(self.store.add_user('user', 'secret'))
+        self.assertFalse(self.store.add_user('user', 'other'))
+
+        self.assertEqual(self.store.get_password('user'), 'secret')
+        self.assertIsNone(self.store.get_password('unknown'))
+        self.assertEqual([user['username'] for user in self.store.list_users()], ['user'])
+        self.assertIsInstance(self.store.list_users()[0]['created_at'], float)
+
+        self.store.set_password('user', 'changed')
+        self.assertEqual(self.store.get_password('user'), 'changed')
+
+    def test_list_users_pages(self):
+        for name in ('c', 'a', 'b'):
+            self.store.add_user(name, 'secret')
+
+        self.assertEqual([user['username'] for user in self.store.list_users(limit=2)], ['a', 'b'])
+        self.assertEqual([user['username'] for user in self.store.list_users(limit=2, offset=2)], ['c'])
+        self.assertEqual(self.store.count_users(), 3)
+
+    def test_active_mission(self):
+        self.store.set_active_mission('user', 'a')
+        self.store.set_active_mission('user', 'b')
+        self.assertEqual(self.store.get_active_mission('user'), 'b')
+
+        self.store.set_active_mission('user', None)
+        self.assertIsNone(self.store.get_active_mission('user'))
+
+    def test_save_and_update_mission(self):
+        self.store.save_mission(mission('a'))
+        self.store.save_mission(dict(mission('a'), status='completed', finished_at=2.0))
+
+        saved = self.store.get_mission('a')
+        self.assertEqual(saved['status'], 'completed')
+        self.assertEqual(saved['params'], {'radius': 10})
+        self.assertEqual(saved['finished_at'], 2.0)
+        self.assertIsNone(self.store.get_mission('unknown'))
+
+    def test_priority_and_vehicle(self):
+        self.store.save_mission(dict(mission('a'), priority=5, vehicle_name='Drone2'))
+
+        saved = self.store.get_mission('a')
+        self.assertEqual((saved['priority'], saved['vehicle_name']), (5, 'Drone2'))
+        self.assertEqual(self.store.list_missions('user')[0]['vehicle_name'], 'Drone2')
+        self.assertIsNone(self.store.get_mission('unknown'))
+
+    def test_list_missions(self):
+        for i in range(5):
+            self.store.save_mission(mission(str(i), created_at=float(i)))
+        self.store.save_mission(mission('other', owner='other'))
+
+        page = self.store.list_missions('user', limit=2, offset=1)
+        self.assertEqual([m['mission_id'] for m in page], ['3', '2'])
+        self.assertEqual(len(self.store.list_missions('other')), 1)
+
+    def test_concurrent_writes(self):
+        def register(prefix):
+            for i in range(20):
+                self.store.add_user(f'{prefix}{i}', 'secret')
+                self.store.save_mission(mission(f'{prefix}{i}', owner=prefix))
+
+        threads = [threading.Thread(target=register, args=(f'u{t}',)) for t in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.store.count_users(), 80)
+        self.assertEqual(len(self.store.list_users()), 80)
+        self.assertEqual(len(self.store.list_missions('u3', limit=100)), 20)
+
+
+class TestMemoryStore(StoreTests, unittest.TestCase):
+    def setUp(self):
+        self.store = MemoryStore()
+
+
+class TestSQLiteStore(StoreTests, unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'bpla.db')
+        self.store = SQLiteStore(self.path)
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def test_wal_mode(self):
+        mode = self.store._connect().execute('PRAGMA journal_mode').fetchone()[0]
+        self.assertEqual(mode, 'wal')
+
+    def test_release(self):
+        self.store.add_user('user', 'secret')
+        self.store.release()
+
+        self.assertEqual(self.store._connections, {})
+        self.assertEqual(self.store.get_password('user'), 'secret')  # Подключение открывается заново
+        self.assertEqual(len(self.store._connections), 1)
+
+    def test_finished_thread_connections_closed(self):
+        connections = []
+
+        def request(i):
+            self.store.add_user(f'user{i}', 'secret')
+            connections.append(self.store._connect())
+
+        for i in range(20):  # Поток на каждый запрос, как у сервера Flask
+            thread = threading.Thread(target=request, args=(i,))
+            thread.start()
+            thread.join()
+        self.store.get_password('user0')
+
+        self.assertEqual(self.store.count_users(), 20)
+        self.assertLessEqual(len(self.store._connections), 2)  # Текущий поток и последний завершившийся
+        with self.assertRaises(sqlite3.ProgrammingError):
+            connections[0].execute('SELECT 1')  # Подключение закрыто
+
+    def test_shared_between_instances(self):
+        # Второй экземпляр имитирует другой процесс сервера
+        other = SQLiteStore(self.path)
+        try:
+            self.store.add_user('user', 'secret')
+            self.store.save_mission(mission('a'))
+
+            self.assertEqual(other.get_password('user'), 'secret')
+            self.assertEqual(other.get_mission('a')['owner'], 'user')
+        finally:
+            other.close()
+
+    def test_migrates_old_schema(self):
+        self.store.close()
+        os.remove(self.path)
+        # База первой версии: таблица missions без priority и vehicle_name
+        connection = sqlite3.connect(self.path)
+        connection.execute('CREATE TABLE missions (mission_id TEXT PRIMARY KEY, owner TEXT NOT NULL, kind TEXT, '
+                           'params TEXT, status TEXT, error TEXT, created_at REAL, started_at REAL, '
+                           'finished_at REAL)')
+        connection.execute("INSERT INTO missions (mission_id, owner, kind, params, status) "
+                           "VALUES ('old', 'user', 'orbit', '{}', 'completed')")
+        connection.commit()
+        connection.close()
+
+        self.store = SQLiteStore(self.path)
+        self.store.save_mission(dict(mission('new'), priority=1, vehicle_name='Drone1'))
+
+        self.assertIsNone(self.store.get_mission('old')['vehicle_name'])
+        self.assertEqual(self.store.get_mission('new')['vehicle_name'], 'Drone1')
+        SQLiteStore(self.path).close()  # Повторное открытие не изменяет схему
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+from collections import deque
+import logging
+import threading
+import time
+
+import psutil
+
+
+class SystemMonitor:
+    def __init__(self, interval=1.0, history=300, missions=None, disk_path='/'):
+        """Фоновый сбор метрик системы в кольцевой буфер.
+
+        Замеры выполняет отдельный поток с заданным интервалом, поэтому запрос
+        к /api/system_info только читает последний замер и не ждет psutil.
+
+        Args:
+            interval: Интервал между замерами, с.
+            history: Количество хранимых замеров.
+            missions: Функция без аргументов, возвращающая список метрик активных миссий
+                (например, MissionRunner.active_missions).
+            disk_path: Путь, для которого измеряется заполнение диска.
+        """
+        if interval <= 0:
+            raise ValueError("Интервал замеров должен быть положительным")
+        self.interval = interval
+        self.missions = missions
+        self.disk_path = disk_path
+        self._samples = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Запустить поток сбора метрик (повторный вызов ничего не делает)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        psutil.cpu_percent(interval=None)  # Первый вызов только запоминает счетчики ЦП
+        self._record()
+        self._thread = threading.Thread(target=self._loop, name='system-monitor', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Остановить поток сбора метрик."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def latest(self):
+        """Вернуть последний замер или None, если замеров еще нет."""
+        with self._lock:
+            return self._samples[-1] if self._samples else None
+
+    def history(self, count):
+        """Вернуть последние count замеров, начиная с самого старого."""
+        if count <= 0:
+            return []
+        with self._lock:
+            samples = list(self._samples)
+        return samples[-count:]
+
+    def sample(self):
+        """Выполнить один замер.
+
+        Returns:
+            dict: Время замера, загрузка ЦП, памяти, диска и метрики активных миссий.
+        """
+        return {
+            'timestamp': time.time(),
+            'cpu_percent': psutil.cpu_percent(interval=None),  # Загрузка с момента предыдущего замера
+            'memory_percent': psutil.virtual_memory().percent,
+            'disk_usage': psutil.disk_usage(self.disk_path).percent,
+            'missions': self.missions() if self.missions is not None else [],
+        }
+
+    def _record(self):
+        """Выполнить замер и добавить его в буфер."""
+        try:
+            sample = self.sample()
+        except Exception as e:
+            logging.error(f"Ошибка при сборе метрик системы: {e}")
+            return
+        with self._lock:
+            self._samples.append(sample)
+
+    def _loop(self):
+        """Цикл потока сбора метрик."""
+        while not self._stop.wait(self.interval):
+            self._record()
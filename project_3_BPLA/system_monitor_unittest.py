@@ -0,0 +1,56 @@
+import time
+import unittest
+from unittest.mock import patch
+
+from system_monitor import SystemMonitor
+
+
+class TestSystemMonitor(unittest.TestCase):
+    def test_sample(self):
+        monitor = SystemMonitor(missions=lambda: [{'mission_id': 'a'}])
+
+        sample = monitor.sample()
+
+        self.assertEqual(set(sample), {'timestamp', 'cpu_percent', 'memory_percent', 'disk_usage', 'missions'})
+        self.assertEqual(sample['missions'], [{'mission_id': 'a'}])
+
+    def test_latest_is_available_after_start(self):
+        monitor = SystemMonitor(interval=10)
+        monitor.start()
+        try:
+            started = time.monotonic()
+            latest = monitor.latest()
+            self.assertLess(time.monotonic() - started, 0.01)  # Чтение не ждет замера
+            self.assertIsNotNone(latest)
+        finally:
+            monitor.stop()
+
+    def test_ring_buffer(self):
+        monitor = SystemMonitor(interval=0.01, history=5)
+        monitor.start()
+        try:
+            time.sleep(0.2)
+        finally:
+            monitor.stop()
+
+        history = monitor.history(100)
+        self.assertEqual(len(history), 5)
+        self.assertEqual(monitor.history(2), history[-2:])
+        self.assertEqual(monitor.history(0), [])
+        self.assertEqual([s['timestamp'] for s in history], sorted(s['timestamp'] for s in history))
+
+    @patch('psutil.cpu_percent', side_effect=RuntimeError("нет доступа"))
+    def test_failed_sample_is_skipped(self, _):
+        monitor = SystemMonitor()
+
+        monitor._record()
+
+        self.assertIsNone(monitor.latest())
+
+    def test_invalid_interval(self):
+        with self.assertRaises(ValueError):
+            SystemMonitor(interval=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import json
+import logging
+import threading
+import time
+
+from client_pool import ClientPool
+from flight_utils import RateLimiter
+
+
+class TelemetryHub:
+    def __init__(self, missions, monitor=None, rate=2.0, ip='', client_pool=None, keepalive=15.0):
+        """Рассылка телеметрии подписчикам потока /api/stream.
+
+        Один поток опроса с частотой rate собирает последний замер системного монитора,
+        телеметрию активных миссий и позицию каждого летающего дрона (один запрос на дрон
+        за такт), после чего публикует общий снимок состояния. Подписчики получают
+        только последний снимок: если клиент не успевает, промежуточные обновления
+        пропускаются. Поток опроса работает, только пока есть подписчики.
+
+        Args:
+            missions: Функция без аргументов, возвращающая телеметрию активных миссий
+                (например, MissionRunner.telemetry).
+            monitor: Системный монитор (SystemMonitor) или None.
+            rate: Максимальная частота обновлений, Гц.
+            ip: Адрес симулятора AirSim ('' - локальный).
+            client_pool: Пул подключений для запроса позиций. По умолчанию создается
+                отдельный пул, чтобы не использовать клиентов, управляющих дронами.
+            keepalive: Интервал служебных сообщений при отсутствии обновлений, с.
+        """
+        if rate <= 0:
+            raise ValueError("Частота обновлений должна быть положительной")
+        self.missions = missions
+        self.monitor = monitor
+        self.rate = rate
+        self.ip = ip
+        self.client_pool = client_pool if client_pool is not None else ClientPool()
+        self.keepalive = keepalive
+        self._condition = threading.Condition()
+        self._latest = None
+        self._version = 0
+        self._subscribers = 0
+        self._thread = None
+
+    @property
+    def subscribers(self):
+        """int: Количество подключенных подписчиков."""
+        with self._condition:
+            return self._subscribers
+
+    def sample(self):
+        """Собрать снимок состояния.
+
+        Returns:
+            dict: Время, последний замер системы и телеметрия миссий с позициями дронов.
+        """
+        missions = self.missions()
+        positions = {}
+        for mission in missions:
+            if mission.get('status') == 'queued':
+                mission['position'] = None  # Дрон миссии из очереди еще не подключен
+                continue
+            vehicle = mission.get('vehicle_name', '')
+            if vehicle not in positions:
+                positions[vehicle] = self._position(vehicle)
+            mission['position'] = positions[vehicle]
+        system = self.monitor.latest() if self.monitor is not None else None
+        if system is not None:
+            system = {key: value for key, value in system.items() if key != 'missions'}
+        return {'timestamp': time.time(), 'system': system, 'missions': missions}
+
+    def publish(self, snapshot):
+        """Опубликовать снимок состояния для всех подписчиков."""
+        with self._condition:
+            self._latest = snapshot
+            self._version += 1
+            self._condition.notify_all()
+
+    def subscribe(self, owner=None):
+        """Подписаться на обновления.
+
+        Генератор возвращает снимки состояния (dict) по мере публикации и None,
+        если за keepalive секунд обновлений не было. При закрытии генератора
+        подписка снимается.
+
+        Args:
+            owner: Имя пользователя: в снимок попадают только его миссии
+                (None - без миссий, только метрики системы).
+        """
+        with self._condition:
+            self._subscribers += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name='telemetry', daemon=True)
+                self._thread.start()
+            seen = 0
+        try:
+            while True:
+                with self._condition:
+                    self._condition.wait_for(lambda: self._version != seen, timeout=self.keepalive)
+                    if self._version == seen:
+                        snapshot = None
+                    else:
+                        seen, snapshot = self._version, self._latest
+                if snapshot is None:
+                    yield None
+                    continue
+                missions = [m for m in snapshot['missions'] if owner is not None and m.get('owner') == owner]
+                yield dict(snapshot, missions=missions)
+        finally:
+            with self._condition:
+                self._subscribers -= 1
+
+    def stream(self, owner=None):
+        """Поток Server-Sent Events для подписчика.
+
+        Yields:
+            str: Сообщения в формате text/event-stream.
+        """
+        yield 'retry: 2000\n\n'  # Интервал переподключения EventSource, мс
+        for snapshot in self.subscribe(owner):
+            if snapshot is None:
+                yield ': keepalive\n\n'
+            else:
+                yield 'data: {}\n\n'.format(json.dumps(snapshot))
+
+    def _position(self, vehicle):
+        """Позиция дрона [x, y, z] или None, если симулятор недоступен."""
+        try:
+            client = self.client_pool.get(self.ip, vehicle)
+            pos = client.getMultirotorState(vehicle).kinematics_estimated.position
+            return [float(pos.x_val), float(pos.y_val), float(pos.z_val)]
+        except Exception as e:
+            logging.info(f"Нет позиции дрона '{vehicle}' для телеметрии: {e}")
+            self.client_pool.discard(self.ip, vehicle)
+            return None
+
+    def _loop(self):
+        """Цикл опроса: работает, пока есть подписчики."""
+        limiter = RateLimiter(self.rate)
+        while True:
+            with self._condition:
+                if self._subscribers == 0:
+                    self._thread = None
+                    return
+            limiter.wait()
+            try:
+                self.publish(self.sample())
+            except Exception as e:
+                logging.error(f"Ошибка при сборе телеметрии: {e}")
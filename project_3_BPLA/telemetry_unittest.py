@@ -0,0 +1,99 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+import airsim
+from client_pool import ClientPool
+from telemetry import TelemetryHub
+
+
+def missions():
+    return [{'mission_id': 'a', 'owner': 'user', 'kind': 'orbit', 'status': 'running', 'vehicle_name': 'Drone1',
+             'phase': 'orbit'},
+            {'mission_id': 'b', 'owner': 'other', 'kind': 'orbit', 'status': 'running', 'vehicle_name': 'Drone1',
+             'phase': 'climb'},
+            {'mission_id': 'c', 'owner': 'user', 'kind': 'survey', 'status': 'queued', 'vehicle_name': 'Drone2'}]
+
+
+class TestTelemetryHub(unittest.TestCase):
+    def setUp(self):
+        self.client = MagicMock()
+        self.client.getMultirotorState.return_value.kinematics_estimated.position = airsim.Vector3r(1, 2, -10)
+        self.pool = ClientPool(factory=lambda ip, port: self.client)
+        self.monitor = MagicMock()
+        self.monitor.latest.return_value = {'timestamp': 1.0, 'cpu_percent': 5.0, 'missions': []}
+
+    def test_sample_queries_each_drone_once(self):
+        hub = TelemetryHub(missions, self.monitor, client_pool=self.pool)
+
+        snapshot = hub.sample()
+
+        self.assertEqual(self.client.getMultirotorState.call_count, 1)  # Drone2 в очереди не опрашивается
+        self.assertEqual(snapshot['missions'][0]['position'], [1.0, 2.0, -10.0])
+        self.assertIsNone(snapshot['missions'][2]['position'])
+        self.assertEqual(snapshot['system'], {'timestamp': 1.0, 'cpu_percent': 5.0})
+
+    def test_subscribers_see_only_own_missions(self):
+        hub = TelemetryHub(missions, self.monitor, rate=50, client_pool=self.pool)
+
+        user, anonymous = hub.subscribe('user'), hub.subscribe(None)
+        try:
+            self.assertEqual([m['mission_id'] for m in next(user)['missions']], ['a', 'c'])
+            snapshot = next(anonymous)
+            self.assertEqual(snapshot['missions'], [])
+            self.assertEqual(snapshot['system']['cpu_percent'], 5.0)
+        finally:
+            user.close()
+            anonymous.close()
+
+    def test_updates_are_coalesced(self):
+        calls = []
+        hub = TelemetryHub(lambda: calls.append(1) or [], rate=20)
+
+        subscribers = [hub.subscribe() for _ in range(10)]
+        try:
+            for subscriber in subscribers:
+                next(subscriber)
+            time.sleep(0.5)
+        finally:
+            for subscriber in subscribers:
+                subscriber.close()
+
+        # Один опрос на такт независимо от числа подписчиков
+        self.assertLessEqual(len(calls), 0.5 * 20 + 3)
+        self.assertEqual(hub.subscribers, 0)
+
+    def test_sampler_stops_without_subscribers(self):
+        hub = TelemetryHub(lambda: [], rate=50)
+
+        subscriber = hub.subscribe()
+        next(subscriber)
+        subscriber.close()
+        time.sleep(0.1)
+
+        self.assertFalse(any(thread.name == 'telemetry' for thread in threading.enumerate()))
+
+    def test_stream_format(self):
+        hub = TelemetryHub(lambda: [], rate=50, keepalive=0.01)
+        stream = hub.stream()
+        try:
+            self.assertTrue(next(stream).startswith('retry:'))
+            self.assertTrue(next(stream).startswith('data: {'))
+        finally:
+            stream.close()
+
+    def test_keepalive(self):
+        hub = TelemetryHub(lambda: [], rate=50, keepalive=0.01)
+        hub._thread = threading.Thread()  # Поток опроса не запускается, обновлений нет
+        hub._thread.is_alive = lambda: True
+        stream = hub.stream()
+        try:
+            next(stream)
+            self.assertEqual(next(stream), ': keepalive\n\n')
+        finally:
+            stream.close()
+
+
+if __name__ == '__main__':
+    unittest.main()